@@ -0,0 +1,102 @@
+"""
+Benchmark of the ways git-sensei can start Git.
+
+Compares execute_git_command with the ``subprocess.run`` call it used to
+make (text output and a timeout) and with an untimed ``subprocess.run``,
+the lower bound for starting a process from Python. execute_git_command
+adds a process group, output decoding and repository pinning on top.
+fork copies the page tables of the calling process, so its cost grows
+with the caller's memory; use --ballast-mb to grow this process first and
+see the effect on a large host process. Since Python 3.10 subprocess
+starts children with vfork, so none of the rows should grow.
+
+Usage:
+    python benchmarks/spawn_benchmark.py [--runs N] [--ballast-mb MB]
+"""
+
+import argparse
+import mmap
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from git_sensei.git_ops import execute_git_command, get_git_runtime  # noqa: E402
+
+
+def _time_runs(run: Callable[[], None], runs: int) -> List[float]:
+    """Call run repeatedly and return the duration of each call in seconds."""
+    run()  # warm up caches
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _allocate_ballast(megabytes: int) -> mmap.mmap:
+    """Map and touch anonymous memory so that it counts towards RSS."""
+    ballast = mmap.mmap(-1, max(megabytes, 1) * 1024 * 1024)
+    for offset in range(0, len(ballast), mmap.PAGESIZE):
+        ballast[offset] = 1
+    return ballast
+
+
+def benchmark(command: str, runs: int) -> Dict[str, List[float]]:
+    """
+    Time one Git command started in each way.
+
+    Args:
+        command: Git command string, e.g. "git rev-parse HEAD"
+        runs: Number of timed runs per way
+
+    Returns:
+        Durations in seconds by name of the way Git was started
+    """
+    args = [get_git_runtime().executable] + command.split()[1:]
+    return {
+        "subprocess.run (no timeout)": _time_runs(
+            lambda: subprocess.run(args, capture_output=True, check=False), runs
+        ),
+        "subprocess.run (previous path)": _time_runs(
+            lambda: subprocess.run(
+                args, capture_output=True, text=True, timeout=30, check=False
+            ),
+            runs,
+        ),
+        "execute_git_command": _time_runs(lambda: execute_git_command(command), runs),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print one line per way of starting Git."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--command", default="git rev-parse --git-dir")
+    parser.add_argument(
+        "--ballast-mb",
+        type=int,
+        default=0,
+        help="grow this process by this many megabytes first",
+    )
+    options = parser.parse_args()
+
+    ballast = _allocate_ballast(options.ballast_mb) if options.ballast_mb else None
+    print(f"{options.command!r}, {options.runs} runs, {options.ballast_mb} MB ballast")
+    for name, durations in benchmark(options.command, options.runs).items():
+        print(
+            f"{name:<36} median {statistics.median(durations) * 1000:7.3f} ms"
+            f"  mean {statistics.mean(durations) * 1000:7.3f} ms"
+        )
+    if ballast is not None:
+        ballast.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+Repository backend module for Git sensei.
+
+This module implements the GitBackend protocol from git_ops twice: on top
+of Git subprocesses, and in-process through libgit2 when the optional
+``pygit2`` package is installed. get_backend picks the in-process backend
+when it is available, which removes the fork/exec cost of the queries
+git-sensei makes while gathering context.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .git_ops import (
+    GitBackend,
+    GitCommit,
+    GitObject,
+    GitResult,
+    execute_git_command,
+    get_object_server,
+)
+from .repository import Repository, get_repository
+from .status import (
+    ENTRY_IGNORED,
+    ENTRY_ORDINARY,
+    ENTRY_UNMERGED,
+    ENTRY_UNTRACKED,
+    STATUS_COMMAND,
+    GitStatus,
+    StatusParseError,
+    status_from_result,
+)
+
+try:
+    import pygit2
+except ImportError:  # Optional dependency
+    pygit2 = None  # type: ignore[assignment]
+
+# Fields of one commit, separated by newlines; commands are split on
+# whitespace, so spaces are written as %x20
+_LOG_FORMAT = "%H%n%T%n%P%n%an%x20<%ae>%x20%ad%n%cn%x20<%ce>%x20%cd%n%B"
+
+# git_status_t flags from libgit2
+_INDEX_FLAGS = ((1, "A"), (2, "M"), (4, "D"), (8, "R"), (16, "T"))
+_WORKTREE_FLAGS = ((256, "M"), (512, "D"), (1024, "T"), (2048, "R"))
+_STATUS_WT_NEW = 128
+_STATUS_IGNORED = 16384
+_STATUS_CONFLICTED = 32768
+
+# git_object_t values from libgit2
+_OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+
+# GIT_SORT_TIME: newest committer date first, as ``git log`` does
+_SORT_TIME = 2
+
+
+class SubprocessBackend:
+    """
+    Backend that answers every query by running Git.
+
+    Attributes:
+        repository: Repository the queries run in, None for the current one
+    """
+
+    name = "subprocess"
+
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository
+
+    def _run(self, command: str, text: bool = True) -> GitResult:
+        return execute_git_command(command, text=text, repository=self.repository)
+
+    def status(self, untracked_files: str = "normal") -> Optional[GitStatus]:
+        """Run ``git status --porcelain=v2`` and parse it."""
+        result = self._run(
+            f"{STATUS_COMMAND} --untracked-files={untracked_files}", text=False
+        )
+        if not result.success:
+            return None
+        try:
+            return status_from_result(result)
+        except StatusParseError:
+            return None
+
+    def current_branch(self) -> Optional[str]:
+        """Run ``git symbolic-ref`` on HEAD."""
+        result = self._run("git symbolic-ref --quiet --short HEAD")
+        return (result.stdout.strip() or None) if result.success else None
+
+    def recent_commits(self, limit: int = 5) -> Optional[List[GitCommit]]:
+        """Run ``git log`` and parse one commit per NUL-terminated record."""
+        result = self._run(
+            f"git log -z -n {limit} --date=raw --format={_LOG_FORMAT}", text=False
+        )
+        if not result.success:
+            return None
+        commits = []
+        for record in (result.stdout_bytes or b"").split(b"\0"):
+            fields = record.decode("utf-8", "replace").split("\n", 5)
+            if len(fields) < 5:
+                continue
+            oid, tree, parents, author, committer = fields[:5]
+            commits.append(
+                GitCommit(
+                    oid=oid,
+                    tree=tree,
+                    parents=parents.split(),
+                    author=author,
+                    committer=committer,
+                    message=fields[5] if len(fields) > 5 else "",
+                )
+            )
+        return commits
+
+    def list_refs(self, prefix: str = "refs/") -> Optional[Dict[str, str]]:
+        """Run ``git for-each-ref``."""
+        result = self._run(
+            f"git for-each-ref --format=%(objectname)%00%(refname) {prefix}"
+        )
+        if not result.success:
+            return None
+        refs = {}
+        for line in result.stdout.splitlines():
+            oid, _, name = line.partition("\0")
+            refs[name] = oid
+        return refs
+
+    def ahead_behind(self, left: str, right: str) -> Optional[Tuple[int, int]]:
+        """Run ``git rev-list --left-right --count``."""
+        result = self._run(f"git rev-list --left-right --count {left}...{right} --")
+        try:
+            ahead, behind = result.stdout.split()
+            return int(ahead), int(behind)
+        except ValueError:
+            return None
+
+    def read_object(self, oid: str) -> Optional[GitObject]:
+        """Read the object through the shared ``git cat-file`` server."""
+        path = "."
+        if self.repository is not None:
+            path = self.repository.work_tree or self.repository.git_dir
+        return get_object_server(path).read_object(oid)
+
+
+class Pygit2Backend:
+    """
+    Backend that reads the repository in-process with libgit2.
+
+    Status is computed by libgit2, which does not detect renames: a renamed
+    file is reported as a deletion and an addition.
+
+    Attributes:
+        repository: Repository being read
+    """
+
+    name = "libgit2"
+
+    def __init__(self, repository: Repository):
+        if pygit2 is None:
+            raise ImportError("pygit2 is required for the libgit2 backend")
+        self.repository = repository
+        self._repo = pygit2.Repository(repository.work_tree or repository.git_dir)
+        self._errors = (KeyError, ValueError, pygit2.GitError)
+        self._lock = threading.Lock()
+
+    def status(self, untracked_files: str = "normal") -> Optional[GitStatus]:
+        """Compute the status with libgit2."""
+        with self._lock:
+            try:
+                flags = self._repo.status(untracked_files=untracked_files)
+                status = _status_from_flags(flags.items())
+                self._read_headers(status)
+            except self._errors:
+                return None
+        return status
+
+    def _read_headers(self, status: GitStatus) -> None:
+        """Fill in the branch, upstream and stash headers of a status."""
+        repo = self._repo
+        status.stash_count = len(repo.listall_stashes())
+        if repo.head_is_unborn:
+            status.head = self._unborn_branch()
+            return
+        status.oid = str(repo.head.target)
+        if repo.head_is_detached:
+            return
+        status.head = repo.head.shorthand
+        branch = repo.branches.local.get(status.head)
+        upstream = branch.upstream if branch is not None else None
+        if upstream is not None:
+            status.upstream = upstream.shorthand
+            status.ahead, status.behind = repo.ahead_behind(
+                repo.head.target, upstream.target
+            )
+
+    def _unborn_branch(self) -> Optional[str]:
+        """Branch that HEAD points to on a repository without commits."""
+        target = self._repo.references["HEAD"].target
+        if isinstance(target, str) and target.startswith("refs/heads/"):
+            return target[len("refs/heads/") :]
+        return None
+
+    def current_branch(self) -> Optional[str]:
+        """Read HEAD with libgit2."""
+        with self._lock:
+            try:
+                if self._repo.head_is_unborn:
+                    return self._unborn_branch()
+                if self._repo.head_is_detached:
+                    return None
+                branch: str = self._repo.head.shorthand
+                return branch
+            except self._errors:
+                return None
+
+    def recent_commits(self, limit: int = 5) -> Optional[List[GitCommit]]:
+        """Walk history from HEAD with libgit2."""
+        with self._lock:
+            try:
+                if self._repo.head_is_unborn:
+                    return []
+                commits = []
+                for commit in self._repo.walk(self._repo.head.target, _SORT_TIME):
+                    commits.append(_convert_commit(commit))
+                    if len(commits) >= limit:
+                        break
+                return commits
+            except self._errors:
+                return None
+
+    def list_refs(self, prefix: str = "refs/") -> Optional[Dict[str, str]]:
+        """List references with libgit2, resolving symbolic ones."""
+        with self._lock:
+            try:
+                return {
+                    name: str(self._repo.references[name].resolve().target)
+                    for name in self._repo.references
+                    if name.startswith(prefix)
+                }
+            except self._errors:
+                return None
+
+    def ahead_behind(self, left: str, right: str) -> Optional[Tuple[int, int]]:
+        """Count unique commits with libgit2."""
+        with self._lock:
+            try:
+                left_id = self._repo.revparse_single(left).peel(pygit2.Commit).id
+                right_id = self._repo.revparse_single(right).peel(pygit2.Commit).id
+                ahead, behind = self._repo.ahead_behind(left_id, right_id)
+                return ahead, behind
+            except self._errors:
+                return None
+
+    def read_object(self, oid: str) -> Optional[GitObject]:
+        """Read an object from the object database with libgit2."""
+        with self._lock:
+            try:
+                type_id, data = self._repo.read(oid)
+            except self._errors:
+                return None
+        return GitObject(
+            oid=oid, type=_OBJECT_TYPES.get(int(type_id), ""), size=len(data), data=data
+        )
+
+
+def _status_from_flags(entries: Iterable[Tuple[str, int]]) -> GitStatus:
+    """
+    Build a GitStatus from libgit2 status flags.
+
+    Entries are ordered like ``git status --porcelain=v2``: tracked changes
+    and conflicts first, then untracked and ignored paths.
+
+    Args:
+        entries: Pairs of (path, git_status_t flags)
+
+    Returns:
+        GitStatus without headers
+    """
+    groups: Tuple[List[Tuple[str, int, str, str]], ...] = ([], [], [])
+    for path, flags in entries:
+        if flags & _STATUS_CONFLICTED:
+            groups[0].append((path, ENTRY_UNMERGED, "U", "U"))
+            continue
+        index = next((code for bit, code in _INDEX_FLAGS if flags & bit), ".")
+        worktree = next((code for bit, code in _WORKTREE_FLAGS if flags & bit), ".")
+        if index != "." or worktree != ".":
+            groups[0].append((path, ENTRY_ORDINARY, index, worktree))
+        # A path removed from the index but kept on disk is one libgit2 entry;
+        # Git reports it twice, as a staged deletion and as untracked
+        if flags & _STATUS_WT_NEW:
+            groups[1].append((path, ENTRY_UNTRACKED, "?", "?"))
+        elif flags & _STATUS_IGNORED:
+            groups[2].append((path, ENTRY_IGNORED, "!", "!"))
+
+    status = GitStatus()
+    for group in groups:
+        for path, kind, index, worktree in sorted(group):
+            status.types.append(kind)
+            status.index_codes.append(ord(index))
+            status.worktree_codes.append(ord(worktree))
+            status.paths.append(path)
+    return status
+
+
+def _signature(signature: "pygit2.Signature") -> str:
+    """Format a pygit2 signature like the author line of a commit object."""
+    offset = signature.offset
+    sign = "-" if offset < 0 else "+"
+    hours, minutes = divmod(abs(offset), 60)
+    return (
+        f"{signature.name} <{signature.email}> {signature.time} "
+        f"{sign}{hours:02d}{minutes:02d}"
+    )
+
+
+def _convert_commit(commit: "pygit2.Commit") -> GitCommit:
+    """Convert a pygit2 commit to a GitCommit."""
+    return GitCommit(
+        oid=str(commit.id),
+        tree=str(commit.tree_id),
+        parents=[str(parent) for parent in commit.parent_ids],
+        author=_signature(commit.author),
+        committer=_signature(commit.committer),
+        message=commit.message,
+    )
+
+
+def is_libgit2_available() -> bool:
+    """True if the optional pygit2 package can be imported."""
+    return pygit2 is not None
+
+
+_backends: Dict[Tuple[str, str], GitBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(
+    repository: Optional[Repository] = None, prefer: Optional[str] = None
+) -> GitBackend:
+    """
+    Get a cached backend for a repository.
+
+    The libgit2 backend is used when pygit2 is installed and the repository
+    can be opened with it; otherwise Git subprocesses are used.
+
+    Args:
+        repository: Repository to read, by default that of the current
+            directory
+        prefer: "subprocess" to never use libgit2, "libgit2" to use it
+            whenever possible (the default)
+
+    Returns:
+        Backend implementing GitBackend
+    """
+    if repository is None:
+        repository = get_repository()
+    if repository is None:
+        return SubprocessBackend()
+    use_libgit2 = prefer != SubprocessBackend.name and pygit2 is not None
+    key = (repository.git_dir, Pygit2Backend.name if use_libgit2 else "subprocess")
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is not None:
+            return backend
+        backend = SubprocessBackend(repository)
+        if use_libgit2:
+            try:
+                backend = Pygit2Backend(repository)
+            except (ImportError, pygit2.GitError):
+                pass
+        _backends[key] = backend
+        return backend
+
+
+def get_in_process_backend(
+    repository: Optional[Repository] = None,
+) -> Optional[GitBackend]:
+    """
+    Get the libgit2 backend for a repository, if it can be used.
+
+    Args:
+        repository: Repository to read, by default that of the current
+            directory
+
+    Returns:
+        Backend reading the repository in-process, or None
+    """
+    if pygit2 is None:
+        return None
+    backend = get_backend(repository)
+    return backend if backend.name == Pygit2Backend.name else None
+
+
+def clear_backend_cache() -> None:
+    """Forget all cached backends."""
+    with _backends_lock:
+        _backends.clear()
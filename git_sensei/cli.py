@@ -5,16 +5,31 @@ This module provides the command-line interface and entry point for the applicat
 It handles argument parsing and coordinates between the safety and git_ops modules.
 """
 
+import functools
 import signal
 import sys
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 import typer
 
 from .ai import translate_to_git_sync
 from .context import get_git_context
-from .git_ops import execute_git_command, is_git_available
+from .git_ops import (
+    GitResult,
+    UsageReport,
+    execute_git_command,
+    is_git_available,
+    stream_git_command,
+)
 from .safety import check_command_safety, get_user_confirmation
+from .workspace import (
+    WorkspaceError,
+    format_results_json,
+    format_results_table,
+    load_workspace_file,
+    resolve_repositories,
+    run_in_repositories,
+)
 
 app = typer.Typer(
     name="git-sensei",
@@ -34,6 +49,34 @@ def main(
     phrase: Optional[List[str]] = typer.Argument(
         None, help="Natural language description of what you want to do"
     ),
+    stats: bool = typer.Option(
+        False,
+        "--stats",
+        help="Report time, CPU, memory and output size of every git process run",
+    ),
+    repos: Optional[List[str]] = typer.Option(
+        None,
+        "--repos",
+        help="Run in these repositories instead of the current one "
+        "(comma separated paths or glob patterns; may be repeated)",
+    ),
+    workspace: Optional[str] = typer.Option(
+        None,
+        "--workspace",
+        help="File listing repository paths or glob patterns, one per line",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Maximum number of repositories processed at once",
+    ),
+    json_output: bool = typer.Option(
+        False,
+        "--json",
+        help="Print per-repository results as JSON (with --repos or --workspace)",
+    ),
 ) -> None:
     """
     An AI-powered command-line assistant for safer Git usage.
@@ -42,16 +85,27 @@ def main(
     operations. Use natural language to describe what you want to do, or use
     --execute for direct commands.
     """
+    report = UsageReport().start() if stats else None
     try:
+        run: Callable[[str], None] = execute_command
+        if repos or workspace:
+            run = functools.partial(
+                execute_workspace_command,
+                entries=[entry for value in repos or [] for entry in value.split(",")],
+                workspace=workspace,
+                jobs=jobs,
+                as_json=json_output,
+            )
+
         # If --execute flag is used, use Phase 1 workflow
         if execute is not None:
-            execute_command(execute)
+            run(execute)
             return
 
         # If natural language arguments provided, use Phase 2 workflow
         if phrase:
             natural_language = " ".join(phrase)
-            execute_natural_language(natural_language)
+            execute_natural_language(natural_language, run)
             return
 
         # No input provided at all
@@ -82,6 +136,10 @@ def main(
         typer.echo(f"Error: Unexpected error occurred: {str(e)}", err=True)
         typer.echo("Please report this issue if it persists", err=True)
         raise typer.Exit(1) from e
+    finally:
+        if report is not None:
+            report.stop()
+            _print_usage_report(report)
 
 
 def _handle_interrupt(signum, frame):  # pylint: disable=unused-argument
@@ -91,12 +149,89 @@ def _handle_interrupt(signum, frame):  # pylint: disable=unused-argument
     sys.exit(130)  # Standard exit code for Ctrl+C
 
 
-def execute_natural_language(phrase: str) -> None:
+def _print_usage_report(report: UsageReport) -> None:
+    """
+    Print the resources used by the git processes of this invocation.
+
+    Args:
+        report: Usage collected while the command ran
+    """
+    typer.echo("\nGit process statistics:", err=True)
+    if not report.records:
+        typer.echo("No git processes were run.", err=True)
+        return
+    typer.echo(report.format(), err=True)
+
+
+def _can_stream_output() -> bool:
+    """
+    Check whether Git output can be written straight to stdout as it arrives.
+
+    Returns:
+        True if stdout is backed by a file descriptor with a binary buffer
+    """
+    try:
+        sys.stdout.fileno()
+        return hasattr(sys.stdout, "buffer")
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def _stream_command(command: str) -> GitResult:
+    """
+    Run a Git command, copying its output to stdout as Git produces it.
+
+    Args:
+        command: The Git command string to execute
+
+    Returns:
+        GitResult with exit code and stderr; stdout has already been written
+    """
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    with stream_git_command(command, foreground=True) as stream:
+        for chunk in stream:
+            out.write(chunk)
+            out.flush()
+    return stream.result
+
+
+def _write_stdout(result: GitResult) -> None:
+    """
+    Write the captured stdout of a command to stdout.
+
+    Output captured in bytes mode is written to the underlying binary
+    buffer unchanged, so it is never decoded and re-encoded and paths that
+    are not valid in the locale encoding pass through intact.
+
+    Args:
+        result: Result of a command that did not stream its output
+    """
+    data = result.stdout_bytes
+    out = getattr(sys.stdout, "buffer", None)
+    if not isinstance(data, bytes) or out is None:
+        if result.stdout:
+            typer.echo(result.stdout)
+        return
+    if not data:
+        return
+    sys.stdout.flush()
+    out.write(data)
+    if not data.endswith(b"\n"):
+        out.write(b"\n")
+    out.flush()
+
+
+def execute_natural_language(
+    phrase: str, run: Optional[Callable[[str], None]] = None
+) -> None:
     """
     Execute a natural language phrase by translating it to a Git command.
 
     Args:
         phrase: Natural language description of what the user wants to do
+        run: Function executing the translated command; execute_command
+            by default
     """
     try:
         # Validate phrase input
@@ -109,7 +244,7 @@ def execute_natural_language(phrase: str) -> None:
 
         # Gather repository context for better AI decisions
         try:
-            context = get_git_context()
+            context = get_git_context(phrase=phrase)
             typer.echo("� Analyzing repository context...")
         except Exception as e:  # pylint: disable=broad-exception-caught
             typer.echo(f"⚠️  Warning: Could not gather repository context: {str(e)}")
@@ -139,7 +274,7 @@ def execute_natural_language(phrase: str) -> None:
             raise typer.Exit(1)
 
         # Execute the translated command using existing workflow
-        execute_command(git_command)
+        (run or execute_command)(git_command)
 
     except KeyboardInterrupt as exc:
         typer.echo("\n\nOperation interrupted by user (Ctrl+C).", err=True)
@@ -211,9 +346,12 @@ def execute_command(command: str) -> None:
                 typer.echo("Command execution aborted for safety reasons", err=True)
                 raise typer.Exit(1)
 
-        # Execute the Git command
+        # Execute the Git command, streaming output when stdout is a real stream
         try:
-            result = execute_git_command(command)
+            if _can_stream_output():
+                result = _stream_command(command)
+            else:
+                result = execute_git_command(command, text=False, foreground=True)
         except Exception as e:
             typer.echo(
                 f"Error: Unexpected error during command execution: {str(e)}", err=True
@@ -223,8 +361,7 @@ def execute_command(command: str) -> None:
 
         # Display results
         if result.success:
-            if result.stdout:
-                typer.echo(result.stdout)
+            _write_stdout(result)
         else:
             # Handle specific error cases with helpful messages
             if result.exit_code == 127:
@@ -251,8 +388,7 @@ def execute_command(command: str) -> None:
             else:
                 typer.echo(f"Error: {result.stderr}", err=True)
 
-            if result.stdout:
-                typer.echo(result.stdout)
+            _write_stdout(result)
 
             typer.echo(f"Command failed with exit code: {result.exit_code}", err=True)
             raise typer.Exit(result.exit_code)
@@ -270,5 +406,79 @@ def execute_command(command: str) -> None:
         raise typer.Exit(1)
 
 
+def execute_workspace_command(
+    command: str,
+    entries: List[str],
+    workspace: Optional[str] = None,
+    jobs: Optional[int] = None,
+    as_json: bool = False,
+) -> None:
+    """
+    Execute a Git command in several repositories with one safety check.
+
+    Args:
+        command: The Git command string to execute
+        entries: Repository paths and glob patterns
+        workspace: Workspace file listing more paths and patterns
+        jobs: Maximum number of repositories processed at once
+        as_json: Print results as JSON instead of a table
+    """
+    if not command or not command.strip():
+        typer.echo("Error: Empty command provided", err=True)
+        typer.echo("Please specify a Git command to execute", err=True)
+        raise typer.Exit(1)
+
+    if not is_git_available():
+        typer.echo("Error: Git is not installed or not available in PATH", err=True)
+        raise typer.Exit(1)
+
+    try:
+        if workspace:
+            entries = entries + load_workspace_file(workspace)
+        repositories = resolve_repositories(entries)
+    except WorkspaceError as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+    if not repositories:
+        typer.echo("Error: No Git repositories matched", err=True)
+        raise typer.Exit(1)
+
+    try:
+        # Repository details describe the current directory, which need not
+        # be one of the target repositories, so only the patterns are named
+        safety_check = check_command_safety(command, describe_repository=False)
+    except Exception as e:
+        typer.echo(f"Error: Failed to analyze command safety: {str(e)}", err=True)
+        typer.echo("Command execution aborted for safety reasons", err=True)
+        raise typer.Exit(1)
+
+    if not safety_check.is_safe:
+        typer.echo(f"WARNING: {safety_check.warning_message}", err=True)
+        patterns = ", ".join(safety_check.dangerous_patterns)
+        typer.echo(f"Dangerous patterns detected: {patterns}", err=True)
+        typer.echo(
+            f"The command will run in {len(repositories)} repositories.", err=True
+        )
+        try:
+            if not get_user_confirmation(safety_check.warning_message):
+                typer.echo("Command execution aborted by user.", err=True)
+                return
+        except KeyboardInterrupt as exc:
+            typer.echo("\n\nOperation interrupted during confirmation.", err=True)
+            typer.echo("Command execution aborted for safety.", err=True)
+            raise typer.Exit(130) from exc
+
+    results = run_in_repositories(
+        command, repositories, max_workers=jobs, allow_dangerous=True
+    )
+    if as_json:
+        typer.echo(format_results_json(results))
+    else:
+        typer.echo(format_results_table(results))
+
+    if not all(repo_result.result.success for repo_result in results):
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,542 @@
+"""
+Commit-graph module for Git sensei.
+
+This module reads Git's commit-graph files (a single ``commit-graph`` or a
+split ``commit-graphs`` chain) and walks history with their generation
+numbers to answer reachability questions in-process: ahead/behind counts,
+merge bases, and commits that would become unreachable. Commits newer than
+the graph are read from the object database.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union, cast
+
+from .odb import ObjectDatabase, commit_time, get_object_database
+
+GENERATION_INFINITY = 0xFFFFFFFF
+
+_PARENT_NONE = 0x70000000
+_EXTRA_EDGES = 0x80000000
+_LAST_EDGE = 0x80000000
+
+# Walk flags
+_LEFT = 1
+_RIGHT = 2
+_BOTH = _LEFT | _RIGHT
+_STALE = 4
+
+# A walk key is a graph position for commits in the graph, or a hex id
+_Key = Union[int, str]
+
+
+class CommitGraphError(Exception):
+    """Custom exception for unreadable or inconsistent commit-graph files."""
+
+
+class CommitGraphLayer:
+    """
+    One memory-mapped commit-graph file.
+
+    Args:
+        path: Path of the graph file
+        oid_size: Binary object id length (20 for SHA-1, 32 for SHA-256)
+    """
+
+    def __init__(self, path: str, oid_size: int = 20):
+        self.path = path
+        self.oid_size = oid_size
+        with open(path, "rb") as graph_file:
+            self._map = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._map
+        if buf[:4] != b"CGPH" or buf[4] != 1:
+            raise CommitGraphError(f"{path} is not a version 1 commit-graph")
+        hash_version = buf[5]
+        if (hash_version == 1 and oid_size != 20) or (
+            hash_version == 2 and oid_size != 32
+        ):
+            raise CommitGraphError(f"{path} uses a different object format")
+        num_chunks = buf[6]
+        self.num_bases = buf[7]
+
+        chunks: Dict[bytes, int] = {}
+        for i in range(num_chunks):
+            start = 8 + i * 12
+            chunk_id = bytes(buf[start : start + 4])
+            (offset,) = struct.unpack_from(">Q", buf, start + 4)
+            chunks[chunk_id] = offset
+        for required in (b"OIDF", b"OIDL", b"CDAT"):
+            if required not in chunks:
+                raise CommitGraphError(
+                    f"{path} is missing the {required.decode()} chunk"
+                )
+
+        self._fanout: Tuple[int, ...] = struct.unpack_from(
+            ">256I", buf, chunks[b"OIDF"]
+        )
+        self.count = self._fanout[255]
+        self._oids = chunks[b"OIDL"]
+        self._data = chunks[b"CDAT"]
+        self._edges = chunks.get(b"EDGE")
+        self.base_offset = 0
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """
+        Find the position of a commit within this file.
+
+        Args:
+            oid: Binary object id
+
+        Returns:
+            Position relative to this file, or None if absent
+        """
+        first = oid[0]
+        lo = self._fanout[first - 1] if first else 0
+        hi = self._fanout[first]
+        size = self.oid_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._oids + mid * size
+            name = self._map[start : start + size]
+            if name == oid:
+                return mid
+            if name < oid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def oid_at(self, local: int) -> bytes:
+        """Get the binary id of the commit at a position within this file."""
+        start = self._oids + local * self.oid_size
+        return self._map[start : start + self.oid_size]
+
+    def commit_at(self, local: int) -> Tuple[List[int], int, int]:
+        """
+        Decode the commit data at a position within this file.
+
+        Args:
+            local: Position relative to this file
+
+        Returns:
+            Tuple of (parent positions across the chain, generation, commit time)
+        """
+        start = self._data + local * (self.oid_size + 16) + self.oid_size
+        parent1, parent2, gen_high, time_low = struct.unpack_from(
+            ">IIII", self._map, start
+        )
+        parents = []
+        if parent1 != _PARENT_NONE:
+            parents.append(parent1)
+        if parent2 != _PARENT_NONE:
+            if parent2 & _EXTRA_EDGES:
+                if self._edges is None:
+                    raise CommitGraphError(f"{self.path} is missing the EDGE chunk")
+                edge = self._edges + (parent2 & ~_EXTRA_EDGES) * 4
+                while True:
+                    (value,) = struct.unpack_from(">I", self._map, edge)
+                    parents.append(value & ~_LAST_EDGE)
+                    if value & _LAST_EDGE:
+                        break
+                    edge += 4
+            else:
+                parents.append(parent2)
+        generation = gen_high >> 2
+        timestamp = ((gen_high & 0x3) << 32) | time_low
+        return parents, generation, timestamp
+
+    def close(self) -> None:
+        """Release the memory mapping."""
+        self._map.close()
+
+
+class CommitGraph:
+    """
+    A commit-graph made of one or more layers, base layer first.
+
+    Positions are global across the chain: a layer's commits follow those
+    of all layers below it.
+
+    Args:
+        layers: Graph files ordered from the base to the tip of the chain
+    """
+
+    def __init__(self, layers: List[CommitGraphLayer]):
+        self.layers = layers
+        offset = 0
+        for depth, layer in enumerate(layers):
+            if layer.num_bases != depth:
+                raise CommitGraphError(f"{layer.path} does not fit its chain")
+            layer.base_offset = offset
+            offset += layer.count
+        self.count = offset
+
+    def _layer_for(self, position: int) -> CommitGraphLayer:
+        for layer in reversed(self.layers):
+            if position >= layer.base_offset:
+                return layer
+        raise CommitGraphError(f"Position {position} is outside the graph")
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """
+        Find the global position of a commit.
+
+        Args:
+            oid: Binary object id
+
+        Returns:
+            Position in the chain, or None if the commit is not in the graph
+        """
+        for layer in self.layers:
+            local = layer.find(oid)
+            if local is not None:
+                return layer.base_offset + local
+        return None
+
+    def oid_at(self, position: int) -> bytes:
+        """Get the binary id of the commit at a global position."""
+        layer = self._layer_for(position)
+        return layer.oid_at(position - layer.base_offset)
+
+    def commit_at(self, position: int) -> Tuple[List[int], int, int]:
+        """Decode (parents, generation, commit time) at a global position."""
+        layer = self._layer_for(position)
+        return layer.commit_at(position - layer.base_offset)
+
+    def close(self) -> None:
+        """Release all memory mappings."""
+        for layer in self.layers:
+            layer.close()
+
+
+def _graph_files(objects_dir: str) -> List[str]:
+    """List the graph files Git would load, base first."""
+    info = os.path.join(objects_dir, "info")
+    single = os.path.join(info, "commit-graph")
+    if os.path.isfile(single):
+        return [single]
+    chain = os.path.join(info, "commit-graphs", "commit-graph-chain")
+    try:
+        with open(chain, encoding="ascii") as chain_file:
+            hashes = [line.strip() for line in chain_file if line.strip()]
+    except OSError:
+        return []
+    return [
+        os.path.join(info, "commit-graphs", f"graph-{digest}.graph")
+        for digest in hashes
+    ]
+
+
+def load_commit_graph(objects_dir: str, oid_size: int = 20) -> Optional[CommitGraph]:
+    """
+    Load the commit-graph of an object directory.
+
+    Args:
+        objects_dir: Path of the ``objects`` directory
+        oid_size: Binary object id length
+
+    Returns:
+        CommitGraph, or None if the repository has no usable graph
+    """
+    layers = []
+    try:
+        for path in _graph_files(objects_dir):
+            layers.append(CommitGraphLayer(path, oid_size))
+        return CommitGraph(layers) if layers else None
+    except (OSError, ValueError, struct.error, CommitGraphError):
+        for layer in layers:
+            layer.close()
+        return None
+
+
+def _graph_stamp(objects_dir: str) -> Tuple:
+    """Identify the current graph files so replaced graphs are reloaded."""
+    stamp: List[Optional[Tuple[int, int, int]]] = []
+    for name in ("commit-graph", os.path.join("commit-graphs", "commit-graph-chain")):
+        try:
+            info = os.stat(os.path.join(objects_dir, "info", name))
+            stamp.append((info.st_ino, info.st_size, info.st_mtime_ns))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+class RevWalker:
+    """
+    Generation-aware history walks over a commit-graph and object database.
+
+    Commits found in the graph are identified by their position and never
+    parsed; commits newer than the graph are read from the object database
+    and treated as having infinite generation, as Git does.
+
+    Args:
+        odb: Object database for commits outside the graph
+        graph: Commit-graph, or None to walk using commit dates only
+    """
+
+    def __init__(self, odb: ObjectDatabase, graph: Optional[CommitGraph] = None):
+        self.odb = odb
+        self.graph = graph
+        self._info: Dict[_Key, Tuple[Tuple[_Key, ...], int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _positions(self) -> CommitGraph:
+        """Graph that integer walk keys index; _key only makes them with one."""
+        return cast(CommitGraph, self.graph)
+
+    def _key(self, oid: str) -> _Key:
+        if self.graph is not None:
+            position = self.graph.find(bytes.fromhex(oid))
+            if position is not None:
+                return position
+        return oid
+
+    def _hex(self, key: _Key) -> str:
+        if isinstance(key, int):
+            return self._positions().oid_at(key).hex()
+        return key
+
+    def _commit(self, key: _Key) -> Tuple[Tuple[_Key, ...], int, int]:
+        """Get (parents, generation, commit time) for a walk key."""
+        info = self._info.get(key)
+        if info is None:
+            if isinstance(key, int):
+                parents, generation, timestamp = self._positions().commit_at(key)
+                info = (tuple(parents), generation, timestamp)
+            else:
+                commit = self.odb.read_commit(key)
+                if commit is None:
+                    # Beyond a shallow boundary or pruned: treat as a root
+                    info = ((), 0, 0)
+                else:
+                    info = (
+                        tuple(self._key(parent) for parent in commit.parents),
+                        GENERATION_INFINITY,
+                        commit_time(commit),
+                    )
+            self._info[key] = info
+        return info
+
+    def peel(self, oid: str) -> Optional[str]:
+        """
+        Peel an object id to a commit, following annotated tags.
+
+        Args:
+            oid: Hex id of a commit or tag
+
+        Returns:
+            Hex id of the commit, or None if oid does not lead to a commit
+        """
+        for _ in range(32):
+            if isinstance(self._key(oid), int):
+                return oid
+            obj = self.odb.read_object(oid)
+            if obj is None:
+                return None
+            if obj.type == "commit":
+                return oid
+            if obj.type != "tag" or not obj.data or not obj.data.startswith(b"object "):
+                return None
+            oid = obj.data[7 : obj.data.index(b"\n")].decode("ascii")
+        return None
+
+    def _paint(
+        self, left: Iterable[str], right: Iterable[str], find_bases: bool = False
+    ) -> Tuple[Dict[_Key, int], List[_Key]]:
+        """
+        Paint commits reachable from left and right, newest generation first.
+
+        The walk ends once every queued commit is stale, i.e. reachable from
+        both sides (or, when finding merge bases, below a found base).
+
+        Returns:
+            Tuple of (flags of every visited commit, merge bases found)
+        """
+        stale_mask = _STALE if find_bases else _BOTH
+
+        def is_stale(flag_value: int) -> bool:
+            return (flag_value & stale_mask) == stale_mask
+
+        flags: Dict[_Key, int] = {}
+        queued = set()
+        heap: List[Tuple[int, int, int, _Key]] = []
+        counter = 0
+        nonstale = 0
+        bases: List[_Key] = []
+
+        def push(key: _Key) -> None:
+            nonlocal counter, nonstale
+            _, generation, timestamp = self._commit(key)
+            heapq.heappush(heap, (-generation, -timestamp, counter, key))
+            counter += 1
+            queued.add(key)
+            if not is_stale(flags[key]):
+                nonstale += 1
+
+        def mark(key: _Key, new_flags: int) -> None:
+            nonlocal nonstale
+            old = flags.get(key, 0)
+            combined = old | new_flags
+            if combined == old:
+                return
+            flags[key] = combined
+            if key in queued:
+                if not is_stale(old) and is_stale(combined):
+                    nonstale -= 1
+            else:
+                push(key)
+
+        for side, oids in ((_LEFT, left), (_RIGHT, right)):
+            for oid in oids:
+                mark(self._key(oid), side)
+
+        while heap and nonstale > 0:
+            *_, key = heapq.heappop(heap)
+            if key not in queued:
+                continue
+            queued.discard(key)
+            current = flags[key]
+            if not is_stale(current):
+                nonstale -= 1
+            if find_bases and (current & _BOTH) == _BOTH and not current & _STALE:
+                bases.append(key)
+                current |= _STALE
+                flags[key] = current
+            for parent in self._commit(key)[0]:
+                mark(parent, current)
+        return flags, bases
+
+    def ahead_behind(self, left: str, right: str) -> Tuple[int, int]:
+        """
+        Count commits unique to each side, like ``git rev-list --count
+        --left-right left...right``.
+
+        Args:
+            left: Hex id of the first commit
+            right: Hex id of the second commit
+
+        Returns:
+            Tuple of (commits only in left, commits only in right)
+        """
+        with self._lock:
+            flags, _ = self._paint([left], [right])
+        ahead = sum(1 for value in flags.values() if value & _BOTH == _LEFT)
+        behind = sum(1 for value in flags.values() if value & _BOTH == _RIGHT)
+        return ahead, behind
+
+    def unique_commits(
+        self, tips: Iterable[str], exclude: Iterable[str], limit: Optional[int] = None
+    ) -> List[str]:
+        """
+        List commits reachable from tips but not from any excluded commit.
+
+        These are the commits that become unreachable when the tips are
+        deleted or overwritten and only the excluded commits remain.
+
+        Args:
+            tips: Hex ids whose history is at risk
+            exclude: Hex ids whose history is kept
+            limit: Maximum number of ids to return, newest first
+
+        Returns:
+            Hex ids of the unique commits, newest generation first
+        """
+        with self._lock:
+            flags, _ = self._paint(tips, exclude)
+            unique = [key for key, value in flags.items() if value & _BOTH == _LEFT]
+            unique.sort(key=lambda key: self._commit(key)[1:], reverse=True)
+            if limit is not None:
+                unique = unique[:limit]
+            return [self._hex(key) for key in unique]
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """
+        Check whether one commit is reachable from another.
+
+        Args:
+            ancestor: Hex id of the possible ancestor
+            descendant: Hex id of the possible descendant
+
+        Returns:
+            True if ancestor is reachable from descendant (or equal to it)
+        """
+        with self._lock:
+            return self._is_ancestor(self._key(ancestor), self._key(descendant))
+
+    def _is_ancestor(self, target: _Key, start: _Key) -> bool:
+        if target == start:
+            return True
+        min_generation = self._commit(target)[1]
+        if min_generation == GENERATION_INFINITY and isinstance(start, int):
+            # Graph commits never reach commits written after the graph
+            return False
+        seen = {start}
+        stack = [start]
+        while stack:
+            key = stack.pop()
+            for parent in self._commit(key)[0]:
+                if parent == target:
+                    return True
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                if self._commit(parent)[1] < min_generation:
+                    continue
+                stack.append(parent)
+        return False
+
+    def merge_bases(self, left: str, right: str) -> List[str]:
+        """
+        Find the best common ancestors of two commits, like
+        ``git merge-base --all``.
+
+        Args:
+            left: Hex id of the first commit
+            right: Hex id of the second commit
+
+        Returns:
+            Hex ids of the merge bases (empty for unrelated histories)
+        """
+        with self._lock:
+            _, candidates = self._paint([left], [right], find_bases=True)
+            bases = [
+                key
+                for key in candidates
+                if not any(
+                    other != key and self._is_ancestor(key, other)
+                    for other in candidates
+                )
+            ]
+            return [self._hex(key) for key in bases]
+
+
+_walkers: Dict[str, Tuple[Tuple, RevWalker]] = {}
+_walkers_lock = threading.Lock()
+
+
+def get_rev_walker(path: str = ".") -> Optional[RevWalker]:
+    """
+    Get a cached RevWalker for the repository containing path.
+
+    The walker is rebuilt when the commit-graph files change.
+
+    Args:
+        path: Directory inside the repository
+
+    Returns:
+        RevWalker, or None if path is not inside a repository
+    """
+    odb = get_object_database(path)
+    if odb is None:
+        return None
+    stamp = _graph_stamp(odb.objects_dir)
+    with _walkers_lock:
+        cached = _walkers.get(odb.objects_dir)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        walker = RevWalker(odb, load_commit_graph(odb.objects_dir, odb.oid_size))
+        _walkers[odb.objects_dir] = (stamp, walker)
+        return walker
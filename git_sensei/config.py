@@ -5,7 +5,7 @@ This module handles application configuration and settings management,
 providing extensibility for future features and customization.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from .safety import load_dangerous_patterns
 
@@ -23,6 +23,7 @@ def load_config() -> Dict[str, Any]:
         "require_confirmation": True,
         "verbose": False,
         "custom_dangerous_patterns": [],
+        "context_token_budget": 2000,
     }
 
     return config
@@ -68,6 +69,21 @@ def get_timeout() -> int:
         return 30
 
 
+def get_context_token_budget() -> int:
+    """
+    Get the approximate number of prompt tokens the repository context may use.
+
+    Returns:
+        Token budget for the repository context
+    """
+    try:
+        config = load_config()
+        budget: Optional[int] = config.get("context_token_budget", 2000)
+        return budget if budget is not None else 2000
+    except Exception:  # pylint: disable=broad-exception-caught
+        return 2000
+
+
 def should_require_confirmation() -> bool:
     """
     Check if dangerous operations should require confirmation.
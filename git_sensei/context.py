@@ -3,62 +3,1141 @@ Context module for Git sensei.
 
 This module gathers repository context information to provide AI with
 better understanding of the current Git state for smarter command generation.
+Each section of the context comes from a registered provider (see
+register_context_provider), and only the providers a phrase needs are run.
 """
 
-from .git_ops import execute_git_command
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from functools import partial
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 
+from .backends import get_in_process_backend
+from .config import get_context_token_budget
+from .git_ops import (
+    GitBackend,
+    GitCancellation,
+    execute_git_command,
+    get_runtime_cache_path,
+)
+from .intent import (
+    DEFAULT_PROVIDERS,
+    PROVIDER_BRANCH,
+    PROVIDER_COMMITS,
+    PROVIDER_OPERATION,
+    PROVIDER_REMOTES,
+    PROVIDER_STASHES,
+    PROVIDER_STATUS,
+    PROVIDER_SUBMODULES,
+    PROVIDER_UPSTREAM,
+    PROVIDER_WORKTREES,
+    plan_context,
+)
+from .odb import get_recent_commits
+from .refs import RefReader, get_current_branch, get_ref_reader
+from .repository import Repository, get_repository
+from .status import (
+    ENTRY_IGNORED,
+    ENTRY_UNMERGED,
+    ENTRY_UNTRACKED,
+    STATUS_COMMAND,
+    GitStatus,
+    status_from_result,
+)
 
-def get_git_context() -> str:
+# Seconds get_git_context waits for all of its queries together
+CONTEXT_TIMEOUT = 10.0
+
+# Number of recent commits included in the context
+RECENT_COMMITS = 5
+
+# Fixed log format, independent of the user's log configuration; commands
+# are split on whitespace, so the space is written as %x20
+LOG_COMMAND = f"git log -n {RECENT_COMMITS} --no-color --format=%h%x20%s"
+
+# Remotes with their fetch and push URLs
+REMOTE_COMMAND = "git remote -v"
+
+# Number of stash entries included in the context
+STASH_ENTRIES = 10
+
+# Stash entries as "stash@{n} <message>" lines
+STASH_COMMAND = f"git stash list -n {STASH_ENTRIES} --no-color --format=%gd%x20%gs"
+
+# Counts commits on each side of HEAD and the revision appended to it
+AHEAD_BEHIND_COMMAND = "git rev-list --left-right --count HEAD..."
+
+# Worktrees with their checked-out branches
+WORKTREE_COMMAND = "git worktree list --porcelain"
+
+# Submodules with their commits, prefixed "-" if not initialized, "+" if
+# the checked-out commit differs from the recorded one and "U" if conflicted
+SUBMODULE_COMMAND = "git submodule status"
+
+# Files in the git dir that mark an operation in progress, checked in the
+# order ``git status`` checks them
+_OPERATION_MARKERS = (
+    ("rebase-merge", "rebase"),
+    ("rebase-apply/applying", "am"),
+    ("rebase-apply", "rebase"),
+    ("MERGE_HEAD", "merge"),
+    ("CHERRY_PICK_HEAD", "cherry-pick"),
+    ("REVERT_HEAD", "revert"),
+    ("BISECT_LOG", "bisect"),
+)
+
+# Cost classes of context providers: reading a few files in-process,
+# running one Git command that does not depend on the size of the working
+# tree, and scanning the working tree
+COST_CHEAP = "cheap"
+COST_MODERATE = "moderate"
+COST_EXPENSIVE = "expensive"
+
+# Seconds a provider of each cost class may take by default
+COST_TIMEOUTS = {COST_CHEAP: 1.0, COST_MODERATE: 3.0, COST_EXPENSIVE: CONTEXT_TIMEOUT}
+
+# Problem recorded for a query that did not finish before the deadline
+TIMED_OUT = "timed out"
+
+# Rough number of characters per prompt token
+CHARS_PER_TOKEN = 4
+
+# Share of the status budget spent on exact entries once it is summarized
+_EXACT_SHARE = 0.5
+
+# Deepest directory level status entries are counted by
+_MAX_SUMMARY_DEPTH = 3
+
+# Seconds cached context sections are used while the fingerprint matches
+CONTEXT_CACHE_MAX_AGE = 60.0
+
+
+@dataclass
+class RepoSnapshot:
+    """
+    State of a repository that the context text is rendered from.
+
+    A snapshot is filled in by the registered context providers (see
+    register_context_provider) that the phrase being translated needs (see
+    intent.plan_context). The porcelain v2 status also carries the branch,
+    upstream, ahead/behind counts and stash count, so the branch and
+    upstream providers only run when the status is not queried.
+
+    Attributes:
+        status: Parsed status with branch headers, None if it could not be
+            read
+        branch: Current branch name, None if unknown or detached
+        detached: True if HEAD is detached
+        commits: Recent commits as "<abbreviated id> <subject>" lines, None
+            if they could not be read
+        upstream: Upstream branch with ahead/behind counts, "" if there is
+            none, None if not read
+        operation: Operation in progress ("merge", "rebase", "am",
+            "cherry-pick", "revert", "bisect"), "" if none, None if not
+            read
+        remotes: Remotes as "<name> <url>" lines, None if not read
+        stashes: Stash entries as "stash@{n} <message>" lines, None if not
+            read
+        worktrees: Worktrees as "<path> <branch>" lines, None if not read
+        submodules: Lines of ``git submodule status``, None if not read
+        extras: Data of providers without a field of their own, by name
+        problems: Why a query failed, by provider name; an empty string
+            when the reason is unknown
+        providers: Names of the providers the snapshot was taken with; the
+            sections of the others are left out of the context
+    """
+
+    status: Optional[GitStatus] = None
+    branch: Optional[str] = None
+    detached: bool = False
+    commits: Optional[List[str]] = None
+    upstream: Optional[str] = None
+    operation: Optional[str] = None
+    remotes: Optional[List[str]] = None
+    stashes: Optional[List[str]] = None
+    worktrees: Optional[List[str]] = None
+    submodules: Optional[List[str]] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+    problems: Dict[str, str] = field(default_factory=dict)
+    providers: FrozenSet[str] = DEFAULT_PROVIDERS
+
+    def unknown(self, label: str, query: str) -> str:
+        """
+        Context line for a query that failed.
+
+        Args:
+            label: Section label, e.g. "Remotes"
+            query: Name of the provider that failed
+
+        Returns:
+            Line saying the section is unknown, with the reason if known
+        """
+        problem = self.problems.get(query)
+        return f"{label}: Unable to determine" + (f" ({problem})" if problem else "")
+
+    def sections(self) -> Dict[str, str]:
+        """
+        Render the sections of the providers other than the status.
+
+        Returns:
+            Non-empty section texts by provider name, for the registered
+            providers the snapshot was taken with
+        """
+        sections = {}
+        for provider in get_context_providers():
+            if provider.name in self.providers and provider.section:
+                text = provider.section(self)
+                if text:
+                    sections[provider.name] = text
+        return sections
+
+    def render(
+        self,
+        token_budget: Optional[int] = None,
+        sections: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Render the snapshot as repository context text.
+
+        The status is listed entry by entry while the whole text stays
+        within the token budget; beyond that it is summarized (see
+        format_status).
+
+        Args:
+            token_budget: Approximate number of tokens the text may use,
+                by default the configured context_token_budget
+            sections: Rendered sections of other providers to include,
+                e.g. from the context cache, by provider name
+
+        Returns:
+            Sections of the registered providers the snapshot was taken
+            with, in registration order and separated by blank lines
+        """
+        if token_budget is None:
+            token_budget = get_context_token_budget()
+        sections = {**(sections or {}), **self.sections()}
+        if PROVIDER_STATUS in self.providers:
+            sections[PROVIDER_STATUS] = self._render_status(
+                token_budget, list(sections.values())
+            )
+        return "\n\n".join(
+            sections[provider.name]
+            for provider in get_context_providers()
+            if provider.name in sections
+        )
+
+    def _render_status(self, token_budget: int, others: List[str]) -> str:
+        """
+        Render the status and tracking section within what is left of a budget.
+
+        Args:
+            token_budget: Approximate number of tokens the whole text may use
+            others: Other sections of the text
+
+        Returns:
+            Status section followed by the upstream and stash lines
+        """
+        if self.status is None:
+            return self.unknown("Status", PROVIDER_STATUS)
+        parts = _describe_tracking(self.status)
+        if self.status.is_clean:
+            parts.insert(0, "Status: Working directory clean")
+        else:
+            used = estimate_tokens("Status:\n\n\n" + "\n\n".join(parts + others))
+            parts.insert(
+                0, "Status:\n" + format_status(self.status, token_budget - used)
+            )
+        return "\n\n".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of prompt tokens of a text.
+
+    Args:
+        text: Text sent to the model
+
+    Returns:
+        Approximate token count
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _entry_code(status: GitStatus, index: int) -> str:
+    """Two-letter porcelain v2 code of a status entry ("." = unchanged)."""
+    kind = status.types[index]
+    if kind in (ENTRY_UNTRACKED, ENTRY_IGNORED):
+        return chr(kind) * 2
+    return chr(status.index_codes[index]) + chr(status.worktree_codes[index])
+
+
+def _relevance(
+    status: GitStatus, index: int, crowding: Dict[str, int]
+) -> Tuple[int, int, int, str]:
+    """
+    Sort key putting the entries most worth listing exactly first.
+
+    Conflicts come first, then staged changes, other changes to tracked
+    files, untracked and ignored paths. Within each kind, entries from
+    directories with few changes (unlike e.g. a build output directory)
+    and shallower paths come first.
+
+    Args:
+        status: Parsed status
+        index: Position of the entry
+        crowding: Number of entries per directory
+    """
+    kind = status.types[index]
+    path = status.paths[index]
+    if kind == ENTRY_UNMERGED:
+        rank = 0
+    elif kind == ENTRY_UNTRACKED:
+        rank = 3
+    elif kind == ENTRY_IGNORED:
+        rank = 4
+    elif status.index_codes[index] != ord("."):
+        rank = 1
+    else:
+        rank = 2
+    directory = _directory(path, _MAX_SUMMARY_DEPTH)
+    return rank, crowding[directory], path.rstrip("/").count("/"), path
+
+
+def _directory(path: str, depth: int) -> str:
+    """Directory of path cut to at most depth levels, "./" at the top."""
+    parts = path.rstrip("/").split("/")[:-1][:depth]
+    return "/".join(parts) + "/" if parts else "./"
+
+
+def _summary_lines(status: GitStatus, indexes: List[int], max_chars: int) -> List[str]:
+    """
+    Count status entries per directory and status code.
+
+    Directories are as deep as the summary fits in max_chars, down to the
+    top level; if even that does not fit, the largest directories are
+    listed and the rest are counted together.
+
+    Args:
+        status: Parsed status
+        indexes: Positions of the entries to summarize
+        max_chars: Maximum length of the summary
+
+    Returns:
+        One line per directory, e.g. "build/gen/: ?? 80000, .M 12"
+    """
+    lines: List[str] = []
+    for depth in range(_MAX_SUMMARY_DEPTH, 0, -1):
+        groups: Dict[str, Counter] = {}
+        for index in indexes:
+            directory = _directory(status.paths[index], depth)
+            groups.setdefault(directory, Counter())[_entry_code(status, index)] += 1
+        lines = [
+            f"{directory}: "
+            + ", ".join(f"{code} {count}" for code, count in codes.most_common())
+            for directory, codes in sorted(groups.items())
+        ]
+        if sum(len(line) + 1 for line in lines) <= max_chars:
+            return lines
+
+    # Keep the directories with the most entries
+    sizes = {line: sum(groups[line.split(": ", 1)[0]].values()) for line in lines}
+    kept: List[str] = []
+    used = 0
+    for line in sorted(lines, key=lambda line: -sizes[line]):
+        if used + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    rest = len(indexes) - sum(sizes[line] for line in kept)
+    kept.sort()
+    kept.append(f"... {rest} more entries in {len(lines) - len(kept)} directories")
+    return kept
+
+
+def format_status(status: GitStatus, token_budget: int) -> str:
+    """
+    Format status entries like ``git status --short`` within a token budget.
+
+    Entries are listed one per line while they fit. When they do not, the
+    most relevant entries (see _relevance) are still listed exactly, using
+    part of the budget, and all others are counted per directory and
+    status code, so the text stays bounded however many files changed.
+
+    Args:
+        status: Parsed status with at least one entry
+        token_budget: Approximate number of tokens the text may use
+
+    Returns:
+        Status lines, followed by per-directory counts if summarized
+    """
+    max_chars = max(token_budget, 0) * CHARS_PER_TOKEN
+    lines = []
+    used = 0
+    for entry in status:
+        line = entry.short_format()
+        used += len(line) + 1
+        if used > max_chars:
+            break
+        lines.append(line)
+    else:
+        return "\n".join(lines)
+
+    header = f"{len(status)} entries; the most relevant are listed"
+    exact_chars = int(max_chars * _EXACT_SHARE) - len(header)
+    crowding = Counter(_directory(path, _MAX_SUMMARY_DEPTH) for path in status.paths)
+    ranked = sorted(range(len(status)), key=lambda i: _relevance(status, i, crowding))
+    listed = []
+    used = 0
+    for index in ranked:
+        used += len(status[index].short_format()) + 1
+        if used > exact_chars:
+            break
+        listed.append(index)
+    listed_set = set(listed)
+    rest = [index for index in range(len(status)) if index not in listed_set]
+
+    summary_header = "Other entries by directory (XY code, '.' = unchanged):"
+    summary_chars = max_chars - len(header) - len(summary_header) - 2
+    summary_chars -= sum(len(status[index].short_format()) + 1 for index in listed)
+    return "\n".join(
+        [header]
+        + [status[index].short_format() for index in sorted(listed)]
+        + [summary_header]
+        + _summary_lines(status, rest, summary_chars)
+    )
+
+
+# Fills in part of a snapshot; Git commands it runs must use the
+# cancellation handle so that they stop at the deadline
+_Query = Callable[[RepoSnapshot, GitCancellation], None]
+
+# Renders the section of a provider, None or "" to leave it out
+_Section = Callable[[RepoSnapshot], Optional[str]]
+
+
+@dataclass(frozen=True)
+class ContextProvider:
+    """
+    Source of one section of the repository context.
+
+    Attributes:
+        name: Provider name; the query fills in the RepoSnapshot field of
+            this name, or snapshot.extras[name] if there is no such field
+        query: Fills in the snapshot; Git commands it runs must use the
+            cancellation handle so that they stop at the provider's deadline
+        section: Renders the section, None if it has none of its own
+        cost: COST_CHEAP, COST_MODERATE or COST_EXPENSIVE
+        timeout: Seconds the query may take, by default that of its cost
+            class; the global deadline of the snapshot still applies
+        covered_by: Provider whose query fills in this one's field too; the
+            query is skipped when both are planned
+        intents: Intents (see intent.classify_intent) this provider is
+            gathered for, besides phrases planned to need it by name
+        cacheable: True if the section only depends on the refs and config
+            that context_fingerprint covers, so it may be served from the
+            context cache; other providers run on every call
+    """
+
+    name: str
+    query: _Query
+    section: Optional[_Section] = None
+    cost: str = COST_MODERATE
+    timeout: Optional[float] = None
+    covered_by: Optional[str] = None
+    intents: FrozenSet[str] = frozenset()
+    cacheable: bool = False
+
+    @property
+    def time_limit(self) -> float:
+        """Seconds the query may take."""
+        return self.timeout if self.timeout is not None else COST_TIMEOUTS[self.cost]
+
+
+_providers: Dict[str, ContextProvider] = {}
+
+
+def register_context_provider(provider: ContextProvider) -> None:
+    """
+    Add a provider to the repository context.
+
+    Sections are rendered in registration order; registering a provider
+    under the name of an existing one replaces it in place.
+
+    Args:
+        provider: Provider to add
+
+    Raises:
+        ValueError: If the provider's cost class is unknown
+    """
+    if provider.cost not in COST_TIMEOUTS:
+        raise ValueError(f"Unknown cost class: {provider.cost}")
+    _providers[provider.name] = provider
+
+
+def unregister_context_provider(name: str) -> None:
+    """
+    Remove a provider from the repository context.
+
+    Args:
+        name: Name of the provider, ignored if it is not registered
+    """
+    _providers.pop(name, None)
+
+
+def get_context_providers() -> List[ContextProvider]:
+    """
+    Get the registered context providers.
+
+    Returns:
+        Providers in registration order
+    """
+    return list(_providers.values())
+
+
+def get_git_context(
+    timeout: float = CONTEXT_TIMEOUT,
+    use_cache: bool = True,
+    token_budget: Optional[int] = None,
+    phrase: Optional[str] = None,
+) -> str:
     """
     Gather repository context information for AI-powered command generation.
 
+    Sections that only depend on refs and config, such as the branch and
+    recent commits, are cached on disk per repository, keyed by a
+    fingerprint of the files Git changes when they change (see
+    context_fingerprint), so repeated invocations skip their queries. The
+    status and the other sections that read the working tree are queried
+    on every call. Given the phrase being translated, only the providers
+    it needs are run, e.g. a question about history skips the status scan.
+
+    Args:
+        timeout: Maximum time to wait for all queries in seconds
+        use_cache: Use and update the on-disk context cache
+        token_budget: Approximate number of tokens the context may use, by
+            default the configured context_token_budget
+        phrase: Natural language request the context is gathered for, None
+            to gather the default status, branch, operation and commit
+            sections
+
     Returns:
         A formatted string containing current repository state information
         including status, current branch, and recent commit history.
     """
-    context_parts = []
+    if token_budget is None:
+        token_budget = get_context_token_budget()
+    repository = get_repository() if use_cache else None
+    plan = plan_context(phrase)
+    providers = plan.providers.union(
+        provider.name
+        for provider in get_context_providers()
+        if provider.intents.intersection(plan.intents)
+    )
+    # Other providers leave other sections in the cache
+    variant = ",".join(sorted(providers))
+    fingerprint = context_fingerprint(repository) if repository else None
+    if fingerprint is not None:
+        fingerprint = f"{fingerprint}:{variant}"
+    if repository is not None and fingerprint is not None:
+        cached = _read_cached_context(repository, fingerprint)
+        if cached is not None:
+            uncached = frozenset(
+                provider.name
+                for provider in get_context_providers()
+                if provider.name in providers and not provider.cacheable
+            )
+            return get_repo_snapshot(timeout, uncached).render(token_budget, cached)
+
+    snapshot = get_repo_snapshot(timeout, providers)
+    sections = snapshot.sections()
+    context = snapshot.render(token_budget, sections)
+    # Only complete snapshots of a repository that did not change while
+    # they were taken are cached
+    if (
+        repository is not None
+        and fingerprint is not None
+        and not snapshot.problems
+        and f"{context_fingerprint(repository)}:{variant}" == fingerprint
+    ):
+        _write_cached_context(
+            repository,
+            fingerprint,
+            {
+                provider.name: sections[provider.name]
+                for provider in get_context_providers()
+                if provider.cacheable and provider.name in sections
+            },
+        )
+    return context
+
+
+def get_context_cache_path(repository: Repository) -> str:
+    """
+    Get the location of the cached context sections of a repository.
 
-    # Get current status
+    Args:
+        repository: Repository the context describes
+
+    Returns:
+        Path of a JSON file next to the Git runtime cache
+    """
+    name = hashlib.sha256(repository.git_dir.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(
+        os.path.dirname(get_runtime_cache_path()), "context", f"{name}.json"
+    )
+
+
+def _stat_key(path: str) -> str:
+    """Inode, size and modification time of a file, "-" if it is missing."""
     try:
-        status_result = execute_git_command("git status --porcelain")
-        if status_result.success:
-            if status_result.stdout.strip():
-                context_parts.append(f"Status:\n{status_result.stdout.strip()}")
-            else:
-                context_parts.append("Status: Working directory clean")
-        else:
-            context_parts.append("Status: Unable to determine (not a git repository?)")
-    except Exception:  # pylint: disable=broad-exception-caught
-        context_parts.append("Status: Unable to determine")
+        info = os.stat(path)
+    except OSError:
+        return "-"
+    return f"{info.st_ino}:{info.st_size}:{info.st_mtime_ns}"
+
 
-    # Get current branch
+def context_fingerprint(repository: Repository) -> Optional[str]:
+    """
+    Fingerprint the repository state that the context is built from.
+
+    The fingerprint covers HEAD, packed-refs, the config and the files of
+    the current branch, its upstream and the stash, which committing,
+    checking out, fetching and stashing all change. The working tree and
+    the index are not covered; sections that read them are not cached
+    (see ContextProvider.cacheable).
+
+    Args:
+        repository: Repository to fingerprint
+
+    Returns:
+        Hex digest of the state, or None if HEAD cannot be read
+    """
+    reader = RefReader(repository.dirs)
     try:
-        branch_result = execute_git_command("git branch --show-current")
-        if branch_result.success and branch_result.stdout.strip():
-            context_parts.append(f"Current branch: {branch_result.stdout.strip()}")
-        else:
-            # Fallback to get branch info from git status
-            status_result = execute_git_command("git status")
-            if status_result.success and "On branch" in status_result.stdout:
-                for line in status_result.stdout.split("\n"):
-                    if line.startswith("On branch"):
-                        branch_name = line.replace("On branch ", "").strip()
-                        context_parts.append(f"Current branch: {branch_name}")
-                        break
-            else:
-                context_parts.append("Current branch: Unable to determine")
-    except Exception:  # pylint: disable=broad-exception-caught
-        context_parts.append("Current branch: Unable to determine")
-
-    # Get recent commit history
+        head = reader.read_head()
+        upstream = reader.upstream() if head.target else None
+    except (OSError, ValueError):
+        return None
+    git_dir, common_dir = repository.git_dir, repository.common_dir
+    paths = [
+        os.path.join(git_dir, "HEAD"),
+        os.path.join(common_dir, "packed-refs"),
+        os.path.join(common_dir, "config"),
+        os.path.join(common_dir, "refs", "stash"),
+        os.path.join(common_dir, "logs", "refs", "stash"),
+    ]
+    if head.target:
+        paths.append(os.path.join(common_dir, head.target))
+    if upstream:
+        paths.append(os.path.join(common_dir, "refs", "remotes", upstream))
+        paths.append(os.path.join(common_dir, "refs", "heads", upstream))
+
+    digest = hashlib.sha256(f"{head.target}:{head.oid}".encode("utf-8"))
+    for path in paths:
+        digest.update(f"\0{path}\0{_stat_key(path)}".encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+def _read_cached_context(
+    repository: Repository, fingerprint: str
+) -> Optional[Dict[str, str]]:
+    """
+    Read the cached context sections of a repository if they are still valid.
+
+    Args:
+        repository: Repository the sections describe
+        fingerprint: Current fingerprint of the repository
+
+    Returns:
+        Cached section texts by provider name, or None if missing, stale
+        or unreadable
+    """
     try:
-        log_result = execute_git_command("git log --oneline -n 5")
-        if log_result.success and log_result.stdout.strip():
-            context_parts.append(f"Recent commits:\n{log_result.stdout.strip()}")
+        with open(get_context_cache_path(repository), encoding="utf-8") as cache_file:
+            entry = json.load(cache_file)
+        if entry["fingerprint"] != fingerprint:
+            return None
+        if not 0 <= time.time() - entry["created"] <= CONTEXT_CACHE_MAX_AGE:
+            return None
+        sections = entry["sections"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(sections, dict) or not all(
+        isinstance(text, str) for text in sections.values()
+    ):
+        return None
+    return sections
+
+
+def _write_cached_context(
+    repository: Repository, fingerprint: str, sections: Dict[str, str]
+) -> None:
+    """
+    Store context sections of a repository, replacing the cache file atomically.
+
+    Args:
+        repository: Repository the sections describe
+        fingerprint: Fingerprint the sections were rendered at
+        sections: Section texts by provider name
+    """
+    cache_path = get_context_cache_path(repository)
+    entry = {"fingerprint": fingerprint, "created": time.time(), "sections": sections}
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(entry, cache_file)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def get_repo_snapshot(
+    timeout: float = CONTEXT_TIMEOUT, providers: FrozenSet[str] = DEFAULT_PROVIDERS
+) -> RepoSnapshot:
+    """
+    Take a snapshot of the repository in the current directory.
+
+    The queries of the planned providers run concurrently, so the time
+    taken is that of the slowest query rather than their sum. Each query
+    has until its provider's timeout or the global timeout, whichever comes
+    first; queries still running then are dropped and recorded as timed
+    out, and their Git commands are killed, so a slow provider never holds
+    up the others.
+
+    Args:
+        timeout: Maximum time to wait for all queries in seconds
+        providers: Names of the registered providers to run
+
+    Returns:
+        Snapshot of the repository
+    """
+    registry = get_context_providers()
+    queries = {provider.name: provider.query for provider in registry}
+    backend = get_in_process_backend()
+    if backend is not None:
+        queries.update(_backend_queries(backend))
+    planned = [
+        provider
+        for provider in registry
+        if provider.name in providers and provider.covered_by not in providers
+    ]
+    planned_names = {provider.name for provider in planned}
+
+    snapshot = RepoSnapshot(providers=frozenset(providers))
+    _gather(
+        snapshot,
+        [(p.name, queries[p.name], min(p.time_limit, timeout)) for p in planned],
+    )
+
+    status = snapshot.status
+    if status is not None and (status.head or status.oid):
+        snapshot.branch = status.head
+        snapshot.detached = status.head is None
+    elif PROVIDER_BRANCH in providers and PROVIDER_BRANCH not in planned_names:
+        # No branch headers, e.g. status failed: read HEAD directly
+        try:
+            queries[PROVIDER_BRANCH](snapshot, GitCancellation())
+        except Exception:  # pylint: disable=broad-exception-caught
+            snapshot.branch = None
+    return snapshot
+
+
+def _gather(snapshot: RepoSnapshot, queries: List[Tuple[str, _Query, float]]) -> None:
+    """
+    Run snapshot queries concurrently, each under its own deadline.
+
+    Each query fills in a private snapshot, and only the field named after
+    a query that finished in time is copied into the result, so a query
+    that is still running cannot change the snapshot later.
+
+    Args:
+        snapshot: Snapshot to fill in
+        queries: Triples of (provider name, query, seconds the query may
+            take)
+
+    Raises:
+        BaseException: Anything other than an Exception raised by a query,
+            e.g. GitInterrupted, is raised again here after the remaining
+            queries have been cancelled
+    """
+    if not queries:
+        return
+    start = time.monotonic()
+    parts = [RepoSnapshot() for _ in queries]
+    cancellations = [GitCancellation() for _ in queries]
+    failed = [False] * len(queries)
+    interrupted: List[Optional[BaseException]] = [None] * len(queries)
+    done: "queue.Queue[int]" = queue.Queue()
+
+    def run(index: int, query: _Query) -> None:
+        try:
+            query(parts[index], cancellations[index])
+        except Exception:  # pylint: disable=broad-exception-caught
+            failed[index] = True
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            interrupted[index] = e
+        finally:
+            done.put(index)
+
+    # Queries reading the repository in-process cannot be interrupted; daemon
+    # threads let them finish in the background without delaying the exit
+    for index, (name, query, _) in enumerate(queries):
+        threading.Thread(
+            target=run,
+            args=(index, query),
+            name=f"git-sensei-context-{name}",
+            daemon=True,
+        ).start()
+    deadlines = [start + limit for _, _, limit in queries]
+    pending = set(range(len(queries)))
+    finished = set()
+    try:
+        while pending:
+            now = time.monotonic()
+            for index in [i for i in pending if deadlines[i] <= now]:
+                cancellations[index].cancel()
+                pending.discard(index)
+            if not pending:
+                break
+            try:
+                index = done.get(timeout=min(deadlines[i] for i in pending) - now)
+            except queue.Empty:
+                continue
+            error = interrupted[index]
+            if error is not None:
+                raise error
+            if index in pending:
+                pending.discard(index)
+                finished.add(index)
+    except BaseException:
+        # Ctrl+C here or in a query stops every query still running
+        for cancellation in cancellations:
+            cancellation.cancel()
+        raise
+
+    for index, (part, (name, _, _)) in enumerate(zip(parts, queries)):
+        if index not in finished:
+            snapshot.problems[name] = TIMED_OUT
+        elif failed[index]:
+            snapshot.problems[name] = ""
         else:
-            context_parts.append("Recent commits: No commits found")
-    except Exception:  # pylint: disable=broad-exception-caught
-        context_parts.append("Recent commits: Unable to determine")
+            if name in _SNAPSHOT_FIELDS:
+                setattr(snapshot, name, getattr(part, name))
+            elif name in part.extras:
+                snapshot.extras[name] = part.extras[name]
+            snapshot.problems.update(part.problems)
+
+
+# Providers whose data has a RepoSnapshot field of its own
+_SNAPSHOT_FIELDS = frozenset(item.name for item in fields(RepoSnapshot))
+
+
+def _query_status(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    Read the status and branch headers with one ``git status`` call.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    status_result = execute_git_command(
+        STATUS_COMMAND, text=False, cancellation=cancellation
+    )
+    if not status_result.success:
+        snapshot.problems["status"] = "not a git repository?"
+        return
+    snapshot.status = status_from_result(status_result)
+
+
+def _query_commits(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    List recent commits, walking the object database before ``git log``.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    commits = get_recent_commits(RECENT_COMMITS)
+    if commits is None:
+        log_result = execute_git_command(LOG_COMMAND, cancellation=cancellation)
+        if not log_result.success:
+            return
+        commits = log_result.stdout.splitlines()
+    snapshot.commits = commits
+
+
+def _query_remotes(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    List remotes with their fetch URLs.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    result = execute_git_command(REMOTE_COMMAND, cancellation=cancellation)
+    if not result.success:
+        return
+    remotes = []
+    for line in result.stdout.splitlines():
+        name, _, url = line.partition("\t")
+        if url.endswith(" (fetch)"):
+            remotes.append(f"{name} {url[: -len(' (fetch)')]}")
+    snapshot.remotes = remotes
+
+
+def _query_stashes(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    List the most recent stash entries.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    result = execute_git_command(STASH_COMMAND, cancellation=cancellation)
+    if result.success:
+        snapshot.stashes = result.stdout.splitlines()
+
+
+def _query_branch(snapshot: RepoSnapshot, _cancellation: GitCancellation) -> None:
+    """
+    Read the checked-out branch from HEAD without running Git.
+
+    Args:
+        snapshot: Snapshot to fill in
+        _cancellation: Unused, no Git command is run
+    """
+    snapshot.branch = get_current_branch()
+
+
+def _query_upstream(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    Read the upstream of the current branch and count commits on each side.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    reader = get_ref_reader()
+    upstream = reader.upstream() if reader is not None else None
+    if upstream is None:
+        snapshot.upstream = ""
+        return
+    result = execute_git_command(
+        f"{AHEAD_BEHIND_COMMAND}{upstream} --", cancellation=cancellation
+    )
+    try:
+        ahead, behind = result.stdout.split()
+        upstream += f" (ahead {int(ahead)}, behind {int(behind)})"
+    except ValueError:
+        pass
+    snapshot.upstream = upstream
+
+
+def _query_operation(snapshot: RepoSnapshot, _cancellation: GitCancellation) -> None:
+    """
+    Detect a merge, rebase, cherry-pick, revert or bisect in progress.
+
+    Args:
+        snapshot: Snapshot to fill in
+        _cancellation: Unused, no Git command is run
+    """
+    repository = get_repository()
+    if repository is None:
+        return
+    snapshot.operation = next(
+        (
+            operation
+            for marker, operation in _OPERATION_MARKERS
+            if os.path.exists(os.path.join(repository.git_dir, marker))
+        ),
+        "",
+    )
+
+
+def _query_worktrees(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    List worktrees with the branch each one has checked out.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    result = execute_git_command(WORKTREE_COMMAND, cancellation=cancellation)
+    if not result.success:
+        return
+    worktrees = []
+    for block in result.stdout.strip().split("\n\n"):
+        attributes = dict(line.partition(" ")[::2] for line in block.splitlines())
+        if "worktree" not in attributes:
+            continue
+        branch = attributes.get("branch", "")
+        if branch.startswith("refs/heads/"):
+            branch = branch[len("refs/heads/") :]
+        elif "bare" in attributes:
+            branch = "(bare)"
+        elif "detached" in attributes:
+            branch = "(detached HEAD)"
+        worktrees.append(f"{attributes['worktree']} {branch}".rstrip())
+    snapshot.worktrees = worktrees
+
+
+def _query_submodules(snapshot: RepoSnapshot, cancellation: GitCancellation) -> None:
+    """
+    List submodules with their commits and state.
+
+    Args:
+        snapshot: Snapshot to fill in
+        cancellation: Handle that stops the Git command at the deadline
+    """
+    result = execute_git_command(SUBMODULE_COMMAND, cancellation=cancellation)
+    if result.success:
+        snapshot.submodules = [
+            line.strip() for line in result.stdout.splitlines() if line.strip()
+        ]
+
+
+def _branch_section(snapshot: RepoSnapshot) -> str:
+    """Render the current branch."""
+    if snapshot.branch:
+        return f"Current branch: {snapshot.branch}"
+    if snapshot.detached:
+        return "Current branch: (detached HEAD)"
+    return "Current branch: Unable to determine"
+
+
+def _upstream_section(snapshot: RepoSnapshot) -> Optional[str]:
+    """Render the upstream, unless the status section already does."""
+    if snapshot.status is not None:
+        return None
+    if snapshot.upstream is None:
+        return snapshot.unknown("Upstream", PROVIDER_UPSTREAM)
+    return f"Upstream: {snapshot.upstream}" if snapshot.upstream else None
+
+
+def _operation_section(snapshot: RepoSnapshot) -> Optional[str]:
+    """Render the operation in progress, if any."""
+    return f"In progress: {snapshot.operation}" if snapshot.operation else None
+
+
+def _lines_section(label: str, name: str, empty: str, snapshot: RepoSnapshot) -> str:
+    """Render a section listing the lines of a snapshot field."""
+    lines = getattr(snapshot, name)
+    if lines is None:
+        return snapshot.unknown(label, name)
+    if not lines:
+        return f"{label}: {empty}"
+    return f"{label}:\n" + "\n".join(lines)
+
+
+def _backend_queries(backend: GitBackend) -> List[Tuple[str, _Query]]:
+    """
+    Snapshot queries answered through a backend instead of Git commands.
+
+    Args:
+        backend: Backend reading the current repository
+
+    Returns:
+        Pairs of (query name, query)
+    """
+
+    def query_status(snapshot: RepoSnapshot, _cancellation: GitCancellation) -> None:
+        snapshot.status = backend.status()
+        if snapshot.status is None:
+            snapshot.problems["status"] = "not a git repository?"
+
+    def query_commits(snapshot: RepoSnapshot, _cancellation: GitCancellation) -> None:
+        commits = backend.recent_commits(RECENT_COMMITS)
+        if commits is not None:
+            snapshot.commits = [
+                f"{commit.oid[:7]} {commit.subject}" for commit in commits
+            ]
+
+    def query_branch(snapshot: RepoSnapshot, _cancellation: GitCancellation) -> None:
+        snapshot.branch = backend.current_branch()
+
+    return [
+        (PROVIDER_STATUS, query_status),
+        (PROVIDER_COMMITS, query_commits),
+        (PROVIDER_BRANCH, query_branch),
+    ]
+
+
+def _describe_tracking(status: GitStatus) -> List[str]:
+    """
+    Describe the upstream branch and stash from the status headers.
+
+    Args:
+        status: Parsed repository status
+
+    Returns:
+        Context lines for the upstream and stash, if any
+    """
+    lines = []
+    if status.upstream:
+        line = f"Upstream: {status.upstream}"
+        if status.ahead is not None:
+            line += f" (ahead {status.ahead}, behind {status.behind})"
+        lines.append(line)
+    if status.stash_count:
+        lines.append(f"Stash entries: {status.stash_count}")
+    return lines
+
 
-    # Combine all context information
-    return "\n\n".join(context_parts)
+for _provider in (
+    ContextProvider(PROVIDER_STATUS, _query_status, cost=COST_EXPENSIVE),
+    ContextProvider(
+        PROVIDER_UPSTREAM,
+        _query_upstream,
+        _upstream_section,
+        COST_MODERATE,
+        covered_by=PROVIDER_STATUS,
+        cacheable=True,
+    ),
+    ContextProvider(
+        PROVIDER_OPERATION, _query_operation, _operation_section, COST_CHEAP
+    ),
+    ContextProvider(
+        PROVIDER_BRANCH,
+        _query_branch,
+        _branch_section,
+        COST_CHEAP,
+        covered_by=PROVIDER_STATUS,
+        cacheable=True,
+    ),
+    ContextProvider(
+        PROVIDER_COMMITS,
+        _query_commits,
+        partial(_lines_section, "Recent commits", PROVIDER_COMMITS, "No commits found"),
+        cacheable=True,
+    ),
+    ContextProvider(
+        PROVIDER_REMOTES,
+        _query_remotes,
+        partial(_lines_section, "Remotes", PROVIDER_REMOTES, "None configured"),
+        cacheable=True,
+    ),
+    ContextProvider(
+        PROVIDER_STASHES,
+        _query_stashes,
+        partial(_lines_section, "Stash list", PROVIDER_STASHES, "Empty"),
+        cacheable=True,
+    ),
+    ContextProvider(
+        PROVIDER_WORKTREES,
+        _query_worktrees,
+        partial(_lines_section, "Worktrees", PROVIDER_WORKTREES, "None"),
+    ),
+    ContextProvider(
+        PROVIDER_SUBMODULES,
+        _query_submodules,
+        partial(_lines_section, "Submodules", PROVIDER_SUBMODULES, "None"),
+    ),
+):
+    register_context_provider(_provider)
@@ -5,81 +5,701 @@ This module provides an abstraction layer for Git command execution,
 handling subprocess calls and returning structured results.
 """
 
+import asyncio
+import atexit
+import contextlib
+import functools
+import io
+import json
+import locale
+import math
+import mmap
+import os
+import queue
+import re
+import select
 import shutil
+import signal
 import subprocess
-from dataclasses import dataclass
-from typing import Optional
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from .repository import Repository, get_repository
+
+if TYPE_CHECKING:
+    from .status import GitStatus
 
 
 @dataclass
+class ResourceUsage:
+    """
+    Resources consumed by one Git process.
+
+    CPU time and peak memory are taken from ``getrusage(RUSAGE_CHILDREN)``
+    before and after the process. Those totals cover every child of this
+    process, so they are only attributed to a command that ran while no
+    other Git process was alive; otherwise, and on platforms without the
+    ``resource`` module, they are None.
+
+    Attributes:
+        wall_time: Seconds from spawning the process until it exited
+        user_time: User CPU seconds used by the process
+        system_time: System CPU seconds used by the process
+        max_rss: Peak resident set size in bytes, known only when it exceeded
+            that of every earlier child process and of this process itself
+        stdout_bytes: Size of the standard output in bytes
+        stderr_bytes: Size of the standard error in bytes
+    """
+
+    wall_time: float
+    user_time: Optional[float] = None
+    system_time: Optional[float] = None
+    max_rss: Optional[int] = None
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+
+
+class SpilledOutput:
+    """
+    Command output stored in an anonymous temporary file.
+
+    The file is unlinked on creation, so it disappears when closed or when
+    the process exits. Contents are exposed through a lazily created
+    read-only memory map and through decoded head/tail previews.
+    """
+
+    def __init__(self) -> None:
+        self._file = tempfile.TemporaryFile(prefix="git-sensei-")
+        self._map: Optional[mmap.mmap] = None
+        self.size = 0
+        self._finalizer = weakref.finalize(self, SpilledOutput._release, self._file)
+
+    @staticmethod
+    def _release(spill_file: IO[bytes], spill_map: Optional[mmap.mmap] = None) -> None:
+        if spill_map is not None:
+            spill_map.close()
+        spill_file.close()
+
+    def write(self, data: bytes) -> None:
+        """Append output to the file."""
+        self._file.write(data)
+        self.size += len(data)
+
+    def view(self) -> Union[mmap.mmap, bytes]:
+        """
+        Get a read-only view of the whole output without copying it.
+
+        Returns:
+            Memory map of the file (empty bytes for empty output)
+        """
+        if self.size == 0:
+            return b""
+        if self._map is None:
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._finalizer.detach()
+            self._finalizer = weakref.finalize(
+                self, SpilledOutput._release, self._file, self._map
+            )
+        return self._map
+
+    def head(self, limit: int = 4096) -> str:
+        """
+        Decode the beginning of the output.
+
+        Args:
+            limit: Maximum number of bytes to decode
+
+        Returns:
+            Decoded text of at most limit bytes
+        """
+        return _decode_output(self.view()[:limit])
+
+    def tail(self, limit: int = 4096) -> str:
+        """
+        Decode the end of the output.
+
+        Args:
+            limit: Maximum number of bytes to decode
+
+        Returns:
+            Decoded text of at most limit bytes
+        """
+        return _decode_output(self.view()[max(0, self.size - limit) :])
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield the output line by line, including the trailing newline."""
+        view = self.view()
+        start = 0
+        while start < self.size:
+            end = view.find(b"\n", start)
+            end = self.size if end == -1 else end + 1
+            yield view[start:end]
+            start = end
+
+    def close(self) -> None:
+        """Release the memory map and delete the file."""
+        self._finalizer()
+
+    def __enter__(self) -> "SpilledOutput":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
 class GitResult:
     """
     Structured result from Git command execution.
 
     Attributes:
-        stdout: Standard output from the command
+        stdout: Standard output from the command, decoded from stdout_bytes
+            on first access when the command ran in bytes mode
         stderr: Standard error output
         exit_code: Process exit code
         command: Original command that was executed
         success: Boolean indicating if command succeeded (exit_code == 0)
+        usage: Resources used by the Git process, None if it never ran
+        spilled_stdout: Standard output that exceeded the spill threshold and
+            was written to disk; stdout is empty when this is set
+        stdout_bytes: Raw standard output, None if it was captured as text
+        decode_errors: Error handler used when decoding stdout_bytes
     """
 
-    stdout: str
-    stderr: str
-    exit_code: int
-    command: str
-    success: bool
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        stdout: Optional[str],
+        stderr: str,
+        exit_code: int,
+        command: str,
+        success: bool,
+        usage: Optional[ResourceUsage] = None,
+        spilled_stdout: Optional[SpilledOutput] = None,
+        stdout_bytes: Optional[bytes] = None,
+        decode_errors: str = "replace",
+    ):
+        self._stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.command = command
+        self.success = success
+        self.usage = usage
+        self.spilled_stdout = spilled_stdout
+        self.stdout_bytes = stdout_bytes
+        self.decode_errors = decode_errors
 
+    @property
+    def stdout(self) -> str:
+        """Standard output, decoded from stdout_bytes on first access."""
+        if self._stdout is None:
+            self._stdout = _decode_output(self.stdout_bytes, self.decode_errors)
+        return self._stdout
 
-def is_git_available() -> bool:
+    @stdout.setter
+    def stdout(self, value: Optional[str]) -> None:
+        """Set the text of stdout, None to decode it from stdout_bytes."""
+        self._stdout = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GitResult):
+            return NotImplemented
+        return (
+            self.stdout,
+            self.stderr,
+            self.exit_code,
+            self.command,
+            self.success,
+        ) == (
+            other.stdout,
+            other.stderr,
+            other.exit_code,
+            other.command,
+            other.success,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"GitResult(stdout={self.stdout!r}, stderr={self.stderr!r}, "
+            f"exit_code={self.exit_code!r}, command={self.command!r}, "
+            f"success={self.success!r})"
+        )
+
+
+class UsageReport:
     """
-    Check if Git is installed and accessible.
+    Collects the resource usage of every Git command run while it is active.
+
+    Use as a context manager or call start() and stop(); several reports may
+    be active at once.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Tuple[str, ResourceUsage]] = []
+        self._lock = threading.Lock()
+
+    def add(self, command: str, usage: ResourceUsage) -> None:
+        """Record the usage of one command."""
+        with self._lock:
+            self.records.append((command, usage))
+
+    def start(self) -> "UsageReport":
+        """Begin collecting usage of Git commands run from now on."""
+        with _usage_reports_lock:
+            _usage_reports.append(self)
+        return self
+
+    def stop(self) -> None:
+        """Stop collecting usage."""
+        with _usage_reports_lock:
+            if self in _usage_reports:
+                _usage_reports.remove(self)
+
+    def __enter__(self) -> "UsageReport":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @property
+    def wall_time(self) -> float:
+        """Sum of the wall-clock time of all commands."""
+        return sum(usage.wall_time for _, usage in self.records)
+
+    def format(self) -> str:
+        """
+        Render the report as a table, slowest command first.
+
+        Returns:
+            Multi-line report with one row per command and a total row
+        """
+
+        def seconds(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.3f}"
+
+        def size(value: Optional[float]) -> str:
+            if value is None:
+                return "-"
+            for unit in ("B", "KiB", "MiB"):
+                if value < 1024:
+                    return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+                value /= 1024
+            return f"{value:.1f}GiB"
+
+        def total(values: List[Optional[float]]) -> Optional[float]:
+            known = [value for value in values if value is not None]
+            return sum(known) if known else None
+
+        with self._lock:
+            records = sorted(self.records, key=lambda r: r[1].wall_time, reverse=True)
+        rows = [("wall", "user", "sys", "rss", "out", "err", "command")]
+        for command, usage in records:
+            rows.append(
+                (
+                    seconds(usage.wall_time),
+                    seconds(usage.user_time),
+                    seconds(usage.system_time),
+                    size(usage.max_rss),
+                    size(usage.stdout_bytes),
+                    size(usage.stderr_bytes),
+                    command,
+                )
+            )
+        usages = [usage for _, usage in records]
+        peaks = [usage.max_rss for usage in usages if usage.max_rss is not None]
+        rows.append(
+            (
+                seconds(self.wall_time),
+                seconds(total([u.user_time for u in usages])),
+                seconds(total([u.system_time for u in usages])),
+                size(max(peaks) if peaks else None),
+                size(sum(u.stdout_bytes for u in usages)),
+                size(sum(u.stderr_bytes for u in usages)),
+                f"total ({len(records)} git process"
+                f"{'' if len(records) == 1 else 'es'})",
+            )
+        )
+        widths = [max(len(row[i]) for row in rows) for i in range(6)]
+        return "\n".join(
+            "  ".join(cell.rjust(width) for cell, width in zip(row, widths))
+            + "  "
+            + row[6]
+            for row in rows
+        )
+
+
+_usage_reports: List[UsageReport] = []
+_usage_reports_lock = threading.Lock()
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+
+def _children_rusage() -> Optional[Tuple[float, float, int]]:
+    """Get (user CPU, system CPU, peak RSS in bytes) of reaped children."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime, usage.ru_stime, usage.ru_maxrss * _RSS_SCALE
+
+
+class _ProcessMeter:
+    """
+    Measures one Git process from spawn to exit.
+
+    Counts running processes so CPU deltas are only reported for a process
+    that had no other Git process alive at any point during its lifetime.
+    """
+
+    _lock = threading.Lock()
+    _running = 0
+    _started = 0
+
+    def __init__(self) -> None:
+        with _ProcessMeter._lock:
+            self._exclusive = _ProcessMeter._running == 0
+            _ProcessMeter._running += 1
+            _ProcessMeter._started += 1
+            self._start_count = _ProcessMeter._started
+        self._before = _children_rusage()
+        self._start = time.perf_counter()
+        self._finished = False
+
+    def finish(
+        self, command: str, stdout_bytes: int, stderr_bytes: int
+    ) -> ResourceUsage:
+        """
+        Stop measuring once the process has been reaped.
+
+        Args:
+            command: Command the process ran, for active UsageReports
+            stdout_bytes: Size of the standard output in bytes
+            stderr_bytes: Size of the standard error in bytes
+
+        Returns:
+            ResourceUsage of the process
+        """
+        wall_time = time.perf_counter() - self._start
+        after = _children_rusage()
+        with _ProcessMeter._lock:
+            if not self._finished:
+                _ProcessMeter._running -= 1
+                self._finished = True
+            exclusive = self._exclusive and _ProcessMeter._started == self._start_count
+
+        usage = ResourceUsage(
+            wall_time=wall_time, stdout_bytes=stdout_bytes, stderr_bytes=stderr_bytes
+        )
+        if exclusive and self._before is not None and after is not None:
+            usage.user_time = max(0.0, after[0] - self._before[0])
+            usage.system_time = max(0.0, after[1] - self._before[1])
+            # On Linux a child's peak includes the memory it inherited from
+            # this process before exec, so only larger peaks are Git's own
+            own_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_SCALE
+            if after[2] > max(self._before[2], own_rss):
+                usage.max_rss = after[2]
+
+        with _usage_reports_lock:
+            reports = list(_usage_reports)
+        for report in reports:
+            report.add(command, usage)
+        return usage
+
+    def abandon(self) -> None:
+        """Stop counting a process that failed to spawn."""
+        with _ProcessMeter._lock:
+            if not self._finished:
+                _ProcessMeter._running -= 1
+                self._finished = True
+
+
+# Minimum Git versions for optional features used by git-sensei
+FEATURE_PORCELAIN_V2 = (2, 11)
+FEATURE_BATCH_COMMAND = (2, 36)
+FEATURE_MERGE_TREE_WRITE_TREE = (2, 38)
+FEATURE_COMMIT_GRAPH = (2, 24)
+
+
+class GitRuntime:
+    """
+    Resolved Git installation shared by all execution paths.
+
+    The executable is located once; its version is probed lazily and
+    persisted in a cache file keyed by binary path, size and modification
+    time, so later invocations skip the ``git --version`` spawn entirely.
+
+    Attributes:
+        path: Absolute path of the git executable, None if Git is not installed
+    """
+
+    def __init__(self, path: Optional[str], version: Optional[str] = None):
+        self.path = path
+        self._version = version
+        self._version_probed = version is not None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """True if a git executable was found."""
+        return self.path is not None
+
+    @property
+    def executable(self) -> str:
+        """Executable to use as argv[0] when spawning Git."""
+        return self.path or "git"
+
+    @property
+    def version(self) -> Optional[str]:
+        """Output of ``git --version``, or None if it cannot be determined."""
+        if not self._version_probed:
+            with self._lock:
+                if not self._version_probed:
+                    self._version = _probe_git_version(self.path)
+                    self._version_probed = True
+        return self._version
+
+    @property
+    def version_info(self) -> Tuple[int, ...]:
+        """Numeric version, e.g. (2, 39, 5); empty if unknown."""
+        match = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?", self.version or "")
+        if not match:
+            return ()
+        return tuple(int(part) for part in match.groups() if part is not None)
+
+    def supports(self, minimum: Tuple[int, ...]) -> bool:
+        """
+        Check whether the installed Git is at least a given version.
+
+        Args:
+            minimum: Minimum version tuple, e.g. FEATURE_BATCH_COMMAND
+
+        Returns:
+            True if the version is known and not older than minimum
+        """
+        version_info = self.version_info
+        return bool(version_info) and version_info >= minimum
+
+    @property
+    def supports_porcelain_v2(self) -> bool:
+        """True if ``git status --porcelain=v2`` is available."""
+        return self.supports(FEATURE_PORCELAIN_V2)
+
+    @property
+    def supports_batch_command(self) -> bool:
+        """True if ``git cat-file --batch-command`` is available."""
+        return self.supports(FEATURE_BATCH_COMMAND)
+
+    @property
+    def supports_merge_tree_write_tree(self) -> bool:
+        """True if ``git merge-tree --write-tree`` is available."""
+        return self.supports(FEATURE_MERGE_TREE_WRITE_TREE)
+
+    @property
+    def supports_commit_graph(self) -> bool:
+        """True if Git reads commit-graph files by default."""
+        return self.supports(FEATURE_COMMIT_GRAPH)
+
+
+_runtime: Optional[GitRuntime] = None
+_runtime_path_env: Optional[str] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime_cache_path() -> str:
+    """
+    Get the location of the persisted Git runtime probe results.
 
     Returns:
-        True if Git is available, False otherwise
+        Path of the JSON cache file under the user cache directory
     """
-    return shutil.which("git") is not None
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "git-sensei", "runtime.json")
 
 
-def get_git_version() -> Optional[str]:
+def _binary_cache_key(path: str) -> Optional[str]:
+    """Build a cache key that changes whenever the git binary is replaced."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _probe_git_version(path: Optional[str]) -> Optional[str]:
     """
-    Get installed Git version.
+    Determine the version of a git binary, using the persistent cache.
+
+    Args:
+        path: Absolute path of the git executable
 
     Returns:
-        Git version string if available, None if Git is not installed
+        Output of ``git --version``, or None if it cannot be determined
     """
-    if not is_git_available():
+    if path is None:
         return None
 
+    cache_path = get_runtime_cache_path()
+    key = _binary_cache_key(path)
+    cache: Dict[str, str] = {}
+    if key is not None:
+        try:
+            with open(cache_path, encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+            if isinstance(cache.get(key), str):
+                return cache[key]
+        except (OSError, ValueError, AttributeError):
+            cache = {}
+
     try:
         result = subprocess.run(
-            ["git", "--version"],
+            [path, "--version"],
             capture_output=True,
             text=True,
             timeout=10,
             shell=False,
         )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-        pass
+        if result.returncode != 0:
+            return None
+        version = result.stdout.strip()
+    except (OSError, subprocess.TimeoutExpired, subprocess.SubprocessError):
+        return None
+
+    if key is not None:
+        # Drop entries for other versions of the same binary
+        cache = {k: v for k, v in cache.items() if not k.startswith(f"{path}:")}
+        cache[key] = version
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(cache, cache_file)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
 
-    return None
+    return version
 
 
-def execute_git_command(command: str, timeout: int = 30) -> GitResult:
+def get_git_runtime(refresh: bool = False) -> GitRuntime:
     """
-    Execute Git command and return structured result.
+    Get the shared Git runtime, resolving the git executable on first use.
+
+    The resolution is redone only when PATH changes or refresh is requested.
+
+    Args:
+        refresh: Force the executable to be looked up again
+
+    Returns:
+        GitRuntime describing the git executable on PATH
+    """
+    global _runtime, _runtime_path_env  # pylint: disable=global-statement
+    path_env = os.environ.get("PATH")
+    with _runtime_lock:
+        if refresh or _runtime is None or _runtime_path_env != path_env:
+            path = shutil.which("git")
+            _runtime = GitRuntime(os.path.abspath(path) if path else None)
+            _runtime_path_env = path_env
+        return _runtime
+
+
+def clear_git_runtime_cache() -> None:
+    """Forget the resolved Git runtime so the next use resolves it again."""
+    global _runtime, _runtime_path_env  # pylint: disable=global-statement
+    with _runtime_lock:
+        _runtime = None
+        _runtime_path_env = None
+
+
+def is_git_available() -> bool:
+    """
+    Check if Git is installed and accessible.
+
+    Returns:
+        True if Git is available, False otherwise
+    """
+    return get_git_runtime().available
+
+
+def get_git_version() -> Optional[str]:
+    """
+    Get installed Git version.
+
+    Returns:
+        Git version string if available, None if Git is not installed
+    """
+    if not is_git_available():
+        return None
+
+    return get_git_runtime().version
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_command(command: str) -> Tuple[str, ...]:
+    """
+    Split a Git command string into words, without the "git" prefix.
+
+    Commands are split on whitespace. The result is cached, since the same
+    command is split to build its argument vector, to classify it as
+    read-only and to decide where it is pinned.
+
+    Args:
+        command: Git command string, with or without the "git" prefix
+
+    Returns:
+        Words of the command
+    """
+    parts = tuple(command.split())
+    if parts and parts[0].lower() == "git":
+        parts = parts[1:]
+    return parts
+
+
+def _prepare_command(
+    command: str, runtime: Optional[GitRuntime] = None
+) -> Union[List[str], GitResult]:
+    """
+    Validate a Git command string and build its argument vector.
 
     Args:
         command: Git command string to execute
-        timeout: Maximum time to wait for command completion in seconds
+        runtime: Git runtime to use instead of the shared one
 
     Returns:
-        GitResult object with execution details
+        Full argument list starting with the git executable, or a failed
+        GitResult describing why the command cannot be executed
     """
     # Check if Git is available before attempting execution
-    if not is_git_available():
+    available = runtime.available if runtime is not None else is_git_available()
+    if not available:
         return GitResult(
             stdout="",
             stderr="Git is not installed or not available in PATH. Please install "
@@ -103,9 +723,7 @@ def execute_git_command(command: str, timeout: int = 30) -> GitResult:
     # Parse command string into list for subprocess
     # Remove 'git' prefix if present since we'll add it
     try:
-        cmd_parts = command.strip().split()
-        if cmd_parts and cmd_parts[0].lower() == "git":
-            cmd_parts = cmd_parts[1:]
+        cmd_parts = list(_split_command(command))
 
         # Validate that we have at least one command part
         if not cmd_parts:
@@ -119,7 +737,7 @@ def execute_git_command(command: str, timeout: int = 30) -> GitResult:
             )
 
         # Construct full command
-        full_command = ["git"] + cmd_parts
+        return [(runtime or get_git_runtime()).executable] + cmd_parts
 
     except Exception as e:  # pylint: disable=broad-exception-caught
         return GitResult(
@@ -130,33 +748,33 @@ def execute_git_command(command: str, timeout: int = 30) -> GitResult:
             success=False,
         )
 
-    try:
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            shell=False,
-        )
 
-        return GitResult(
-            stdout=result.stdout,
-            stderr=result.stderr,
-            exit_code=result.returncode,
-            command=command,
-            success=result.returncode == 0,
-        )
+# Exit code of a command that timed out, as reported by timeout(1)
+TIMEOUT_EXIT_CODE = 124
+
 
-    except subprocess.TimeoutExpired:
+def _exception_result(command: str, error: BaseException, timeout: float) -> GitResult:
+    """
+    Convert an exception raised while running Git into a failed GitResult.
+
+    Args:
+        command: Original command that was executed
+        error: Exception raised during execution
+        timeout: Timeout that was in effect, in seconds
+
+    Returns:
+        GitResult with a helpful error message and conventional exit code
+    """
+    if isinstance(error, (subprocess.TimeoutExpired, asyncio.TimeoutError)):
         return GitResult(
             stdout="",
             stderr=f"Command timed out after {timeout} seconds. The Git operation "
             "may be taking too long or may be waiting for input.",
-            exit_code=124,  # Standard timeout exit code
+            exit_code=TIMEOUT_EXIT_CODE,
             command=command,
             success=False,
         )
-    except FileNotFoundError:
+    if isinstance(error, FileNotFoundError):
         return GitResult(
             stdout="",
             stderr="Git executable not found. Please ensure Git is installed and "
@@ -165,7 +783,7 @@ def execute_git_command(command: str, timeout: int = 30) -> GitResult:
             command=command,
             success=False,
         )
-    except PermissionError:
+    if isinstance(error, PermissionError):
         return GitResult(
             stdout="",
             stderr="Permission denied when trying to execute Git command. Check "
@@ -174,28 +792,1732 @@ def execute_git_command(command: str, timeout: int = 30) -> GitResult:
             command=command,
             success=False,
         )
-    except OSError as e:
-        return GitResult(
-            stdout="",
-            stderr=f"System error occurred while executing Git command: " f"{str(e)}",
-            exit_code=1,
-            command=command,
-            success=False,
-        )
-    except subprocess.SubprocessError as e:
+    if isinstance(error, OSError):
         return GitResult(
             stdout="",
-            stderr=f"Subprocess error occurred: {str(e)}",
+            stderr=f"System error occurred while executing Git command: "
+            f"{str(error)}",
             exit_code=1,
             command=command,
             success=False,
         )
-    except Exception as e:  # pylint: disable=broad-exception-caught
+    if isinstance(error, subprocess.SubprocessError):
         return GitResult(
             stdout="",
-            stderr=f"Unexpected error occurred while executing Git command: "
-            f"{str(e)}",
+            stderr=f"Subprocess error occurred: {str(error)}",
             exit_code=1,
             command=command,
             success=False,
         )
+    return GitResult(
+        stdout="",
+        stderr=f"Unexpected error occurred while executing Git command: "
+        f"{str(error)}",
+        exit_code=1,
+        command=command,
+        success=False,
+    )
+
+
+def _decode_output(data: Optional[bytes], errors: str = "replace") -> str:
+    """
+    Decode process output the way ``subprocess.run(text=True)`` does.
+
+    Args:
+        data: Raw bytes produced by the process
+        errors: Codec error handler, e.g. "replace", "strict" or
+            "surrogateescape" to keep undecodable paths round-trippable
+
+    Returns:
+        Text decoded with the locale encoding and universal newlines
+    """
+    if not data:
+        return ""
+    text = data.decode(locale.getpreferredencoding(False), errors=errors)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+DEFAULT_SPILL_THRESHOLD = 16 * 1024 * 1024
+
+
+# Git is started as the leader of its own process group so that the helpers
+# it spawns (remote transports, hooks, pagers) can be killed together with
+# it. Unlike a new session, a new group keeps the controlling terminal, so
+# credential prompts still reach the user. Before Python 3.11 a new group
+# needs preexec_fn, which can deadlock the child if another thread holds a
+# lock when it forks. There, only foreground commands use preexec_fn, and
+# only once every other thread (e.g. a context query abandoned at its
+# deadline) has finished; otherwise, like background commands, they get a
+# new session and lose the terminal.
+_CREATE_NEW_PROCESS_GROUP: int = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+
+# Seconds a foreground command waits for other threads to finish before
+# starting without the terminal
+_THREAD_WAIT_TIMEOUT = 5
+
+# Seconds to wait for the pipes to close after killing a process group
+_KILL_GRACE_PERIOD = 5
+
+
+class GitInterrupted(KeyboardInterrupt):
+    """
+    Custom exception for Git commands interrupted with Ctrl+C.
+
+    The Git process group has already been killed when this is raised. As a
+    KeyboardInterrupt subclass it is handled wherever Ctrl+C already is.
+
+    Attributes:
+        stdout: Raw standard output written before the interrupt
+        stderr: Raw standard error written before the interrupt
+    """
+
+    def __init__(self, stdout: bytes = b"", stderr: bytes = b""):
+        super().__init__("Git command interrupted")
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+class GitCancellation:
+    """
+    Handle for cancelling Git commands from another thread.
+
+    Pass the handle to execute_git_command. cancel() kills the process group
+    of every command currently running with the handle, and commands given
+    the handle afterwards are not started. Cancelled commands return exit
+    code 130 with the output they produced so far.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._processes: Set[subprocess.Popen] = set()
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called."""
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Kill every command running with this handle."""
+        with self._lock:
+            self._cancelled = True
+            for process in self._processes:
+                _kill_process_group(process)
+
+    def _add(self, process: subprocess.Popen) -> bool:
+        """Track a started process; False if the handle is already cancelled."""
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._processes.add(process)
+            return True
+
+    def _discard(self, process: subprocess.Popen) -> None:
+        with self._lock:
+            self._processes.discard(process)
+
+
+# Mutating commands run one at a time per repository; read-only commands
+# never wait
+_mutating_lanes: Dict[Optional[str], threading.Lock] = {}
+_mutating_lanes_lock = threading.Lock()
+
+
+def _mutating_lane(repository: Optional[Repository]) -> threading.Lock:
+    """
+    Get the lock serializing mutating commands in one repository.
+
+    Args:
+        repository: Repository the command is pinned to; unpinned commands
+            share a single lane
+
+    Returns:
+        Lock to hold while the command runs
+    """
+    key = repository.common_dir if repository is not None else None
+    with _mutating_lanes_lock:
+        lane = _mutating_lanes.get(key)
+        if lane is None:
+            lane = threading.Lock()
+            _mutating_lanes[key] = lane
+        return lane
+
+
+def _command_env(
+    read_only: bool, repository: Optional[Repository] = None
+) -> Optional[Dict[str, str]]:
+    """
+    Environment for a Git command.
+
+    Read-only commands get GIT_OPTIONAL_LOCKS=0, which stops e.g.
+    ``git status`` from refreshing the index and taking index.lock. A
+    repository pins the command with GIT_DIR and GIT_WORK_TREE.
+
+    Args:
+        read_only: Whether the command only reads repository state
+        repository: Repository to run the command in, None to let Git
+            discover it
+
+    Returns:
+        Environment mapping, or None to inherit this process's environment
+    """
+    overrides = repository.environment if repository is not None else {}
+    if read_only:
+        overrides["GIT_OPTIONAL_LOCKS"] = "0"
+    if not overrides:
+        return None
+    return {**os.environ, **overrides}
+
+
+# Subcommands that create repositories and must not inherit GIT_DIR
+_UNPINNED_SUBCOMMANDS = {"init", "clone"}
+
+# Global options that choose a repository themselves
+_LOCATION_OPTIONS = {"-C", "--git-dir", "--work-tree", "--bare"}
+
+
+def _pinned_repository(
+    command: str, repository: Optional[Repository] = None
+) -> Optional[Repository]:
+    """
+    Choose the repository a command is pinned to.
+
+    Args:
+        command: Git command string
+        repository: Repository given by the caller
+
+    Returns:
+        repository if given; otherwise the cached repository of the current
+        directory, or None for commands that locate or create a repository
+        themselves
+    """
+    if repository is not None:
+        return repository
+    subcommand, _ = _split_subcommand(command)
+    if subcommand is None or subcommand in _UNPINNED_SUBCOMMANDS:
+        return None
+    parts = _split_command(command)
+    options = parts[: parts.index(subcommand)]
+    if any(option.split("=", 1)[0] in _LOCATION_OPTIONS for option in options):
+        return None
+    return get_repository()
+
+
+def _kill_process_group(
+    process: Union[subprocess.Popen, asyncio.subprocess.Process],
+) -> None:
+    """Kill a process started in its own process group and all of its helpers."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        # Every process in the group has already exited
+        pass
+
+
+# Only one command at a time can be the terminal's foreground group
+_terminal_lock = threading.Lock()
+
+
+def _give_terminal(pid: int) -> Optional[int]:
+    """
+    Make a process group the foreground group of the controlling terminal.
+
+    A background group that reads the terminal, e.g. to prompt for a
+    password, is stopped with SIGTTIN. The hand-off only happens when this
+    process is itself in the foreground and no other command holds the
+    terminal.
+
+    Args:
+        pid: Process group started with _start_process
+
+    Returns:
+        Terminal file descriptor to pass to _take_terminal, or None if the
+        terminal was not handed over
+    """
+    if not hasattr(os, "tcsetpgrp") or not _terminal_lock.acquire(blocking=False):
+        return None
+    try:
+        fd = os.open("/dev/tty", os.O_RDWR | os.O_NOCTTY)
+    except OSError:
+        # No controlling terminal
+        _terminal_lock.release()
+        return None
+    try:
+        if os.tcgetpgrp(fd) != os.getpgrp():
+            raise OSError("not the foreground process group")
+        os.tcsetpgrp(fd, pid)
+        # Resume the group if it was stopped reading the terminal already
+        os.killpg(pid, signal.SIGCONT)
+    except OSError:
+        os.close(fd)
+        _terminal_lock.release()
+        return None
+    return fd
+
+
+def _take_terminal(fd: Optional[int]) -> None:
+    """Return the terminal given away with _give_terminal to this process."""
+    if fd is None:
+        return
+    # A background group changing the foreground group gets SIGTTOU
+    blocked = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTTOU})
+    try:
+        os.tcsetpgrp(fd, os.getpgrp())
+    except OSError:
+        pass
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, blocked)
+        os.close(fd)
+        _terminal_lock.release()
+
+
+def _interrupted_in_foreground(terminal: Optional[int], returncode: int) -> bool:
+    """
+    Check whether Ctrl+C stopped a command holding the terminal.
+
+    While a command is the foreground group, Ctrl+C interrupts it instead
+    of this process.
+    """
+    return terminal is not None and returncode == -signal.SIGINT
+
+
+def _collect_output(process: subprocess.Popen) -> Tuple[bytes, bytes]:
+    """
+    Reap a killed process and return everything it wrote.
+
+    Args:
+        process: Process whose group has been killed
+
+    Returns:
+        Tuple of (stdout, stderr) bytes, including output read before the kill
+    """
+    try:
+        stdout, stderr = process.communicate(timeout=_KILL_GRACE_PERIOD)
+    except subprocess.TimeoutExpired as e:
+        # A helper that left the process group still holds the pipes open
+        stdout, stderr = e.output, e.stderr
+        for pipe in (process.stdout, process.stderr):
+            if pipe is not None:
+                pipe.close()
+        process.wait()
+    return stdout or b"", stderr or b""
+
+
+# pidfds let a timed wait sleep until the process exits (Linux 5.3+)
+_PIDFD_AVAILABLE = hasattr(os, "pidfd_open") and hasattr(select, "poll")
+
+
+class _GitProcess(subprocess.Popen):
+    """
+    Git process whose timed waits sleep until it exits.
+
+    ``Popen.wait`` with a timeout polls with sleeps of up to 50 ms, and
+    ``communicate`` waits that way after the pipes close, which added about
+    a millisecond to every command. Where pidfds are available the wait
+    blocks on one instead.
+    """
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """
+        Wait for the process to exit.
+
+        Args:
+            timeout: Maximum time to wait in seconds, or None for no limit
+
+        Returns:
+            Exit code of the process
+
+        Raises:
+            subprocess.TimeoutExpired: If the process is still running
+        """
+        if (
+            sys.version_info >= (3, 9)  # for mypy; os.pidfd_open is new in 3.9
+            and timeout is not None
+            and self.returncode is None
+            and _PIDFD_AVAILABLE
+        ):
+            try:
+                pidfd = os.pidfd_open(self.pid)
+            except OSError:
+                # Already reaped, or pidfds are not supported by the kernel
+                pass
+            else:
+                try:
+                    poller = select.poll()
+                    poller.register(pidfd, select.POLLIN)
+                    exited = poller.poll(math.ceil(max(timeout, 0) * 1000))
+                finally:
+                    os.close(pidfd)
+                if not exited:
+                    raise subprocess.TimeoutExpired(self.args, timeout)
+                timeout = None
+        return super().wait(timeout)
+
+
+def _wait_for_other_threads(timeout: float) -> bool:
+    """
+    Wait for every other thread of this process to finish.
+
+    Args:
+        timeout: Seconds to wait in total
+
+    Returns:
+        True if this is the only thread left running
+    """
+    deadline = time.monotonic() + timeout
+    for thread in threading.enumerate():
+        if thread is threading.current_thread():
+            continue
+        try:
+            thread.join(max(deadline - time.monotonic(), 0))
+        except RuntimeError:
+            # Threads not started by the threading module cannot be joined
+            return False
+        if thread.is_alive():
+            return False
+    return True
+
+
+def _start_process(
+    args: List[str], env: Optional[Dict[str, str]], foreground: bool = False
+) -> subprocess.Popen:
+    """
+    Start Git in a new process group.
+
+    Args:
+        args: Command line to run
+        env: Environment for the command, None to inherit this process's
+        foreground: Git will be handed the terminal, so it must stay in
+            this session
+
+    Returns:
+        Started process with stdout and stderr pipes
+    """
+    spawn = functools.partial(
+        _GitProcess,
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=False,
+        env=env,
+    )
+    if os.name != "posix":
+        return spawn(creationflags=_CREATE_NEW_PROCESS_GROUP)
+    if sys.version_info >= (3, 11):
+        return spawn(process_group=0)
+    if foreground and _wait_for_other_threads(_THREAD_WAIT_TIMEOUT):
+        # pylint: disable-next=subprocess-popen-preexec-fn
+        return spawn(preexec_fn=os.setpgrp)
+    return spawn(start_new_session=True)
+
+
+def _run_process_group(
+    args: List[str],
+    timeout: Optional[float] = None,
+    cancellation: Optional[GitCancellation] = None,
+    env: Optional[Dict[str, str]] = None,
+    foreground: bool = False,
+) -> subprocess.CompletedProcess:
+    """
+    Run a command in a new process group, capturing its output as bytes.
+
+    Unlike ``subprocess.run``, which only kills the direct child, a timeout,
+    cancellation or Ctrl+C kills the whole process group, and the output
+    written up to that point is kept.
+
+    Args:
+        args: Command line to run
+        timeout: Maximum time to wait in seconds, or None for no limit
+        cancellation: Handle through which another thread may kill the command
+        env: Environment for the command, None to inherit this process's
+        foreground: Make the command the terminal's foreground process group
+            while it runs (see _give_terminal)
+
+    Returns:
+        CompletedProcess with bytes output; a command killed through
+        cancellation has a negative returncode
+
+    Raises:
+        subprocess.TimeoutExpired: If the timeout expired; ``output`` and
+            ``stderr`` hold the partial output
+        GitInterrupted: If Ctrl+C was pressed while waiting
+    """
+    process = _start_process(args, env, foreground)
+    terminal = _give_terminal(process.pid) if foreground else None
+    # pylint: disable=protected-access
+    if cancellation is not None and not cancellation._add(process):
+        _kill_process_group(process)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        _kill_process_group(process)
+        stdout, stderr = _collect_output(process)
+        raise subprocess.TimeoutExpired(  # pylint: disable=raise-missing-from
+            args, e.timeout, output=stdout, stderr=stderr
+        )
+    except BaseException as e:
+        _kill_process_group(process)
+        stdout, stderr = _collect_output(process)
+        if isinstance(e, KeyboardInterrupt):
+            raise GitInterrupted(stdout, stderr) from e
+        raise
+    finally:
+        _take_terminal(terminal)
+        if cancellation is not None:
+            cancellation._discard(process)
+    if _interrupted_in_foreground(terminal, process.returncode):
+        _kill_process_group(process)
+        raise GitInterrupted(stdout, stderr)
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+def _cancelled_result(command: str, stdout: bytes, stderr: bytes) -> GitResult:
+    """Result for a command stopped through a GitCancellation handle."""
+    return GitResult(
+        stdout=None,
+        stderr=_decode_output(stderr) + "Command was cancelled before it finished.",
+        exit_code=130,
+        command=command,
+        success=False,
+        stdout_bytes=stdout,
+    )
+
+
+def execute_git_command(
+    command: str,
+    timeout: int = 30,
+    runtime: Optional[GitRuntime] = None,
+    spill_threshold: Optional[int] = None,
+    text: bool = True,
+    errors: str = "replace",
+    cancellation: Optional[GitCancellation] = None,
+    repository: Optional[Repository] = None,
+    foreground: bool = False,
+) -> GitResult:
+    """
+    Execute Git command and return structured result.
+
+    Git runs in its own process group. On a timeout the whole group is
+    killed and the result carries the output produced until then.
+
+    Read-only commands (see is_read_only_command) run with optional locks
+    disabled and never wait for other commands. Mutating commands run one
+    at a time per repository, so concurrent callers cannot contend for
+    index.lock with each other.
+
+    Commands run with GIT_DIR and GIT_WORK_TREE set to an already discovered
+    repository, so Git does not search for it on every call. Commands that
+    choose a repository themselves (``-C``, ``--git-dir``, ``init``,
+    ``clone``) are left alone.
+
+    Args:
+        command: Git command string to execute
+        timeout: Maximum time to wait for command completion in seconds
+        runtime: Git runtime to use instead of the shared one
+        spill_threshold: Bound memory use: stdout larger than this many bytes
+            is written to a temporary file and returned as
+            ``GitResult.spilled_stdout`` (e.g. DEFAULT_SPILL_THRESHOLD);
+            None keeps all output in memory
+        text: Decode stdout eagerly; when False, stdout is kept as
+            ``GitResult.stdout_bytes`` and only decoded if ``stdout`` is read
+        errors: Error handler for decoding stdout
+        cancellation: Handle that lets another thread stop the command; a
+            cancelled command returns exit code 130
+        repository: Repository to run in; by default the repository of the
+            current directory, discovered once and cached (see
+            get_repository)
+        foreground: Hand Git the terminal while it runs, so that it can
+            prompt and Ctrl+C reaches it; only for commands the user runs
+            in the foreground, never for background queries
+
+    Returns:
+        GitResult object with execution details
+
+    Raises:
+        GitInterrupted: If Ctrl+C was pressed; the Git process group has
+            been killed and the exception carries the partial output
+    """
+    if spill_threshold is not None:
+        return _execute_with_spill(
+            command,
+            timeout,
+            runtime,
+            spill_threshold,
+            errors,
+            repository,
+            foreground,
+            cancellation,
+        )
+
+    full_command = _prepare_command(command, runtime)
+    if isinstance(full_command, GitResult):
+        return full_command
+    if cancellation is not None and cancellation.cancelled:
+        return _cancelled_result(command, b"", b"")
+
+    read_only = is_read_only_command(command)
+    pinned = _pinned_repository(command, repository)
+    lane: ContextManager[object] = contextlib.nullcontext()
+    if not read_only:
+        lane = _mutating_lane(pinned)
+    with lane:
+        meter = _ProcessMeter()
+        try:
+            process = _run_process_group(
+                full_command,
+                timeout=timeout,
+                cancellation=cancellation,
+                env=_command_env(read_only, pinned),
+                foreground=foreground,
+            )
+        except subprocess.TimeoutExpired as e:
+            stdout, stderr = e.output or b"", e.stderr or b""
+            result = _exception_result(command, e, timeout)
+            result.stdout = _decode_output(stdout, errors)
+            result.stderr = _decode_output(stderr) + result.stderr
+            result.usage = meter.finish(command, len(stdout), len(stderr))
+            return result
+        except GitInterrupted as e:
+            meter.finish(command, len(e.stdout), len(e.stderr))
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            meter.abandon()
+            return _exception_result(command, e, timeout)
+        except BaseException:
+            meter.abandon()
+            raise
+
+        usage = meter.finish(command, len(process.stdout), len(process.stderr))
+        if (
+            cancellation is not None
+            and cancellation.cancelled
+            and process.returncode < 0
+        ):
+            result = _cancelled_result(command, process.stdout, process.stderr)
+            result.usage = usage
+            return result
+        if text:
+            stdout, stdout_bytes = _decode_output(process.stdout, errors), None
+        else:
+            stdout, stdout_bytes = None, process.stdout
+        return GitResult(
+            stdout=stdout,
+            stderr=_decode_output(process.stderr),
+            exit_code=process.returncode,
+            command=command,
+            success=process.returncode == 0,
+            usage=usage,
+            stdout_bytes=stdout_bytes,
+            decode_errors=errors,
+        )
+
+
+def _execute_with_spill(
+    command: str,
+    timeout: int,
+    runtime: Optional[GitRuntime],
+    threshold: int,
+    errors: str = "replace",
+    repository: Optional[Repository] = None,
+    foreground: bool = False,
+    cancellation: Optional[GitCancellation] = None,
+) -> GitResult:
+    """
+    Execute a Git command, moving stdout to disk once it exceeds threshold.
+
+    Args:
+        command: Git command string to execute
+        timeout: Maximum time to wait for command completion in seconds
+        runtime: Git runtime to use instead of the shared one
+        threshold: Largest stdout size in bytes kept in memory
+        errors: Error handler for decoding stdout kept in memory
+        repository: Repository to run in, None for the current one
+        foreground: Hand Git the terminal while it runs
+        cancellation: Handle that lets another thread stop the command
+
+    Returns:
+        GitResult with either stdout_bytes or spilled_stdout populated; on a
+        timeout or cancellation they hold the output produced until then
+    """
+    if cancellation is not None and cancellation.cancelled:
+        return _cancelled_result(command, b"", b"")
+
+    buffer = bytearray()
+    spill: Optional[SpilledOutput] = None
+    try:
+        with GitStream(
+            command,
+            timeout=timeout,
+            runtime=runtime,
+            repository=repository,
+            foreground=foreground,
+            cancellation=cancellation,
+        ) as stream:
+            for chunk in stream:
+                if spill is None and len(buffer) + len(chunk) <= threshold:
+                    buffer += chunk
+                    continue
+                if spill is None:
+                    spill = SpilledOutput()
+                    spill.write(bytes(buffer))
+                    buffer = bytearray()
+                spill.write(chunk)
+    except BaseException:
+        if spill is not None:
+            spill.close()
+        raise
+
+    result = stream.result
+    if spill is None:
+        result.stdout_bytes = bytes(buffer)
+        result.decode_errors = errors
+        result._stdout = None  # pylint: disable=protected-access
+    else:
+        result.spilled_stdout = spill
+    return result
+
+
+DEFAULT_ASYNC_CONCURRENCY = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_BATCH_WORKERS = DEFAULT_ASYNC_CONCURRENCY
+
+# Subcommands that never write the index, refs or working tree
+READ_ONLY_SUBCOMMANDS = frozenset(
+    {
+        "blame",
+        "cat-file",
+        "count-objects",
+        "describe",
+        "diff",
+        "diff-files",
+        "diff-index",
+        "diff-tree",
+        "for-each-ref",
+        "grep",
+        "help",
+        "log",
+        "ls-files",
+        "ls-remote",
+        "ls-tree",
+        "merge-base",
+        "name-rev",
+        "rev-list",
+        "rev-parse",
+        "shortlog",
+        "show",
+        "show-branch",
+        "show-ref",
+        "status",
+        "var",
+        "verify-commit",
+        "verify-tag",
+        "version",
+        "whatchanged",
+    }
+)
+
+# Subcommands that are read-only only in their listing forms
+_LISTING_SUBCOMMANDS = {
+    "branch": set(
+        "-a --all -r --remotes -l --list -v -vv --verbose --show-current "
+        "--contains --no-contains --merged --no-merged --points-at --sort "
+        "--format --color --no-color --column --no-column -i --ignore-case "
+        "--abbrev --no-abbrev".split()
+    ),
+    "tag": set(
+        "-l --list -n --contains --no-contains --merged --no-merged --points-at "
+        "--sort --format --color --column --no-column -i --ignore-case".split()
+    ),
+}
+_READ_ONLY_ACTIONS = {
+    "config": {"--get", "--get-all", "--get-regexp", "--get-urlmatch", "-l", "--list"},
+    "remote": {"-v", "--verbose", "show", "get-url"},
+    "stash": {"list", "show"},
+    "worktree": {"list"},
+    "notes": {"list", "show"},
+}
+
+# Git options that take a separate value before the subcommand
+_GLOBAL_OPTIONS_WITH_VALUE = {"-C", "-c", "--git-dir", "--work-tree", "--namespace"}
+
+
+def _split_subcommand(command: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Find the subcommand of a Git command string.
+
+    Args:
+        command: Git command string, with or without the "git" prefix
+
+    Returns:
+        Tuple of (subcommand or None, arguments following it)
+    """
+    parts = _split_command(command)
+    i = 0
+    while i < len(parts) and parts[i].startswith("-"):
+        i += 2 if parts[i] in _GLOBAL_OPTIONS_WITH_VALUE else 1
+    if i >= len(parts):
+        return None, []
+    return parts[i], list(parts[i + 1 :])
+
+
+def is_read_only_command(command: str) -> bool:
+    """
+    Check whether a Git command can safely run concurrently with others.
+
+    Commands are read-only when they never take the index lock or update
+    refs. Unknown subcommands are treated as mutating.
+
+    Args:
+        command: Git command string
+
+    Returns:
+        True if the command only reads repository state
+    """
+    subcommand, args = _split_subcommand(command)
+    if subcommand is None:
+        return False
+    if subcommand in READ_ONLY_SUBCOMMANDS:
+        return True
+    if subcommand in _LISTING_SUBCOMMANDS:
+        allowed = _LISTING_SUBCOMMANDS[subcommand]
+        options = [arg.split("=", 1)[0] for arg in args if arg.startswith("-")]
+        if any(option not in allowed for option in options):
+            return False
+        # Positional arguments name things to create unless listing
+        has_operands = any(not arg.startswith("-") for arg in args)
+        return not has_operands or bool(
+            set(options) & {"-l", "--list", "--contains", "--merged", "--points-at"}
+        )
+    if subcommand in _READ_ONLY_ACTIONS:
+        if subcommand == "remote" and not args:
+            return True
+        return bool(args) and args[0] in _READ_ONLY_ACTIONS[subcommand]
+    return False
+
+
+def _skipped_result(command: str) -> GitResult:
+    """Result for a batch command that was not run after an earlier failure."""
+    return GitResult(
+        stdout="",
+        stderr="Command not executed because an earlier command in the batch "
+        "failed.",
+        exit_code=1,
+        command=command,
+        success=False,
+    )
+
+
+def execute_git_commands(
+    commands: Iterable[str],
+    max_workers: Optional[int] = None,
+    stop_on_error: bool = False,
+    timeout: int = 30,
+    runtime: Optional[GitRuntime] = None,
+) -> List[GitResult]:
+    """
+    Execute several Git commands, running read-only ones in parallel.
+
+    Consecutive read-only commands (see is_read_only_command) run on a
+    thread pool. Any other command acts as a barrier: it starts only after
+    every earlier command has finished and runs alone, so commands that take
+    the index lock never overlap and later commands observe their effects.
+
+    Args:
+        commands: Git command strings to execute
+        max_workers: Maximum number of commands running at once
+        stop_on_error: Skip commands not yet started once any command fails
+        timeout: Maximum time to wait for each command in seconds
+        runtime: Git runtime to use instead of the shared one
+
+    Returns:
+        GitResult objects in the same order as commands; skipped commands
+        get a failed result explaining why they did not run
+    """
+    commands = list(commands)
+    workers = max_workers or DEFAULT_BATCH_WORKERS
+    if workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    results: List[Optional[GitResult]] = [None] * len(commands)
+    failed = threading.Event()
+
+    def run(i: int) -> None:
+        if stop_on_error and failed.is_set():
+            return
+        result = execute_git_command(commands[i], timeout=timeout, runtime=runtime)
+        results[i] = result
+        if not result.success:
+            failed.set()
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="git-sensei-batch"
+    ) as pool:
+        start = 0
+        while start < len(commands):
+            if stop_on_error and failed.is_set():
+                break
+            if not is_read_only_command(commands[start]):
+                run(start)
+                start += 1
+                continue
+            end = start + 1
+            while end < len(commands) and is_read_only_command(commands[end]):
+                end += 1
+            if end - start == 1:
+                run(start)
+            else:
+                list(pool.map(run, range(start, end)))
+            start = end
+
+    return [
+        result if result is not None else _skipped_result(command)
+        for command, result in zip(commands, results)
+    ]
+
+
+_async_concurrency_limit = DEFAULT_ASYNC_CONCURRENCY
+# One semaphore per event loop, since asyncio primitives are bound to a loop
+_async_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_async_mutating_lanes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def set_async_concurrency_limit(limit: int) -> None:
+    """
+    Configure how many Git processes async callers may run at once.
+
+    Args:
+        limit: Maximum number of concurrent Git processes per event loop
+    """
+    global _async_concurrency_limit  # pylint: disable=global-statement
+    if limit < 1:
+        raise ValueError("Concurrency limit must be at least 1")
+    _async_concurrency_limit = limit
+    _async_semaphores.clear()
+
+
+def get_async_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore shared by async Git calls on the running event loop.
+
+    Returns:
+        Semaphore limiting concurrent Git processes on the current loop
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_async_concurrency_limit)
+        _async_semaphores[loop] = semaphore
+    return semaphore
+
+
+def _get_async_mutating_lane() -> asyncio.Lock:
+    """Get the lock serializing mutating async Git calls on the running loop."""
+    loop = asyncio.get_running_loop()
+    lane = _async_mutating_lanes.get(loop)
+    if lane is None:
+        lane = asyncio.Lock()
+        _async_mutating_lanes[loop] = lane
+    return lane
+
+
+async def execute_git_command_async(
+    command: str,
+    timeout: int = 30,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    runtime: Optional[GitRuntime] = None,
+    repository: Optional[Repository] = None,
+) -> GitResult:
+    """
+    Execute Git command without blocking the event loop.
+
+    The number of Git processes running at once is bounded by a semaphore
+    shared by all async callers (see set_async_concurrency_limit). As with
+    execute_git_command, read-only commands run with optional locks
+    disabled and mutating commands on the same event loop run one at a
+    time. If the calling task is cancelled, the Git process is killed
+    before the cancellation propagates.
+
+    Args:
+        command: Git command string to execute
+        timeout: Maximum time to wait for command completion in seconds
+        semaphore: Semaphore to use instead of the shared one
+        runtime: Git runtime to use instead of the shared one
+        repository: Repository to run in, None for the current one
+
+    Returns:
+        GitResult object with execution details
+    """
+    full_command = _prepare_command(command, runtime)
+    if isinstance(full_command, GitResult):
+        return full_command
+
+    read_only = is_read_only_command(command)
+    env = _command_env(read_only, _pinned_repository(command, repository))
+    if read_only:
+        return await _run_async(command, full_command, timeout, semaphore, env)
+    async with _get_async_mutating_lane():
+        return await _run_async(command, full_command, timeout, semaphore, env)
+
+
+async def _run_async(
+    command: str,
+    full_command: List[str],
+    timeout: int,
+    semaphore: Optional[asyncio.Semaphore],
+    env: Optional[Dict[str, str]],
+) -> GitResult:
+    """
+    Run a prepared Git command for execute_git_command_async.
+
+    Args:
+        command: Original command string
+        full_command: Argument list starting with the git executable
+        timeout: Maximum time to wait for command completion in seconds
+        semaphore: Semaphore to use instead of the shared one
+        env: Environment of the Git process, None to inherit this one
+
+    Returns:
+        GitResult object with execution details
+    """
+    async with semaphore or get_async_semaphore():
+        process = None
+        meter = _ProcessMeter()
+        try:
+            process = await _start_async_process(full_command, env)
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=timeout
+            )
+            exit_code = await process.wait()
+
+            return GitResult(
+                stdout=None,
+                stderr=_decode_output(stderr),
+                exit_code=exit_code,
+                command=command,
+                success=exit_code == 0,
+                usage=meter.finish(command, len(stdout or b""), len(stderr or b"")),
+                stdout_bytes=stdout or b"",
+            )
+
+        except asyncio.CancelledError:
+            await _kill_async_process(process)
+            meter.abandon()
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            await _kill_async_process(process)
+            result = _exception_result(command, e, timeout)
+            if process is None:
+                meter.abandon()
+            else:
+                result.usage = meter.finish(command, 0, 0)
+            return result
+
+
+async def _start_async_process(
+    args: List[str], env: Optional[Dict[str, str]]
+) -> asyncio.subprocess.Process:
+    """Start Git in a new process group (or session) for the event loop."""
+    spawn = functools.partial(
+        asyncio.create_subprocess_exec,
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    if os.name != "posix":
+        return await spawn(creationflags=_CREATE_NEW_PROCESS_GROUP)
+    if sys.version_info >= (3, 11):
+        return await spawn(process_group=0)
+    return await spawn(start_new_session=True)
+
+
+async def _kill_async_process(process: Optional[asyncio.subprocess.Process]) -> None:
+    """Kill the process group of an asyncio subprocess and reap it."""
+    if process is None or process.returncode is not None:
+        return
+    _kill_process_group(process)
+    await process.wait()
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_STDERR_LIMIT = 1024 * 1024
+
+
+def _reader(pipe: Optional[IO[Any]]) -> io.BufferedReader:
+    """Output pipe of a process started with stdout/stderr=PIPE."""
+    return cast(io.BufferedReader, pipe)
+
+
+def _writer(pipe: Optional[IO[Any]]) -> io.BufferedWriter:
+    """Input pipe of a process started with stdin=PIPE."""
+    return cast(io.BufferedWriter, pipe)
+
+
+class GitStream:
+    """
+    Running Git command whose standard output is consumed incrementally.
+
+    Iterating over the stream yields stdout as byte chunks as soon as Git
+    produces them, so memory use stays bounded regardless of output size.
+    Standard error is drained in the background and kept up to
+    STREAM_STDERR_LIMIT bytes. Once the output is exhausted, ``result``
+    holds a GitResult with the exit code and stderr (stdout is not retained).
+
+    With ``foreground`` set, Git is the terminal's foreground process group
+    until the stream is closed. With ``cancellation`` set, cancelling the
+    handle kills Git and ``result`` reports exit code 130.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        timeout: Optional[float] = 30,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        runtime: Optional[GitRuntime] = None,
+        repository: Optional[Repository] = None,
+        foreground: bool = False,
+        cancellation: Optional[GitCancellation] = None,
+    ):
+        self.command = command
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.runtime = runtime
+        self.repository = repository
+        self.foreground = foreground
+        self.cancellation = cancellation
+        self._process: Optional[subprocess.Popen] = None
+        self._terminal: Optional[int] = None
+        self._result: Optional[GitResult] = None
+        self._stderr_chunks: Deque[bytes] = deque()
+        self._stderr_size = 0
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._timer: Optional[threading.Timer] = None
+        self._timed_out = False
+        self._eof = False
+        self._stdout_bytes = 0
+        self._stderr_bytes = 0
+        self._meter: Optional[_ProcessMeter] = None
+        self._start()
+
+    def _start(self) -> None:
+        full_command = _prepare_command(self.command, self.runtime)
+        if isinstance(full_command, GitResult):
+            self._result = full_command
+            return
+
+        self._meter = _ProcessMeter()
+        try:
+            self._process = _start_process(
+                full_command,
+                _command_env(
+                    is_read_only_command(self.command),
+                    _pinned_repository(self.command, self.repository),
+                ),
+                self.foreground,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._meter.abandon()
+            self._result = _exception_result(self.command, e, self.timeout or 0)
+            return
+        process = self._process
+        if self.foreground:
+            self._terminal = _give_terminal(process.pid)
+        cancellation = self.cancellation
+        # pylint: disable-next=protected-access
+        if cancellation is not None and not cancellation._add(process):
+            _kill_process_group(process)
+
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, args=(_reader(process.stderr),), daemon=True
+        )
+        self._stderr_thread.start()
+        if self.timeout is not None:
+            self._timer = threading.Timer(self.timeout, self._expire, args=(process,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _drain_stderr(self, stderr: io.BufferedReader) -> None:
+        for chunk in iter(lambda: stderr.read1(self.chunk_size), b""):
+            self._stderr_chunks.append(chunk)
+            self._stderr_size += len(chunk)
+            self._stderr_bytes += len(chunk)
+            while self._stderr_size > STREAM_STDERR_LIMIT and self._stderr_chunks:
+                self._stderr_size -= len(self._stderr_chunks.popleft())
+
+    def _expire(self, process: subprocess.Popen) -> None:
+        self._timed_out = True
+        _kill_process_group(process)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield stdout chunks until Git closes its output."""
+        if self._process is None:
+            return
+        stdout = _reader(self._process.stdout)
+        try:
+            for chunk in iter(lambda: stdout.read1(self.chunk_size), b""):
+                self._stdout_bytes += len(chunk)
+                yield chunk
+            self._eof = True
+        finally:
+            self.close()
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield stdout line by line, including the trailing newline."""
+        if self._process is None:
+            return
+        try:
+            for line in _reader(self._process.stdout):
+                self._stdout_bytes += len(line)
+                yield line
+            self._eof = True
+        finally:
+            self.close()
+
+    @property
+    def result(self) -> GitResult:
+        """GitResult for the finished command, waiting for it if necessary."""
+        if self._result is None:
+            for _ in self:
+                pass
+        # close() has set it
+        return cast(GitResult, self._result)
+
+    def close(self) -> None:
+        """
+        Stop the command if it is still running and collect its result.
+
+        Raises:
+            GitInterrupted: If Ctrl+C was pressed while Git held the terminal;
+                ``result`` is set all the same
+        """
+        process, thread, meter = self._process, self._stderr_thread, self._meter
+        if process is None or thread is None or meter is None:
+            return
+        if self._result is not None:
+            return
+        if not self._eof and process.poll() is None:
+            # The consumer stopped early; Git would block on a full pipe
+            _kill_process_group(process)
+        exit_code = process.wait()
+        _take_terminal(self._terminal)
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.cancellation is not None:
+            self.cancellation._discard(process)  # pylint: disable=protected-access
+        interrupted = _interrupted_in_foreground(self._terminal, exit_code)
+        self._terminal = None
+        if interrupted:
+            _kill_process_group(process)
+        thread.join()
+        _reader(process.stdout).close()
+        _reader(process.stderr).close()
+        usage = meter.finish(self.command, self._stdout_bytes, self._stderr_bytes)
+        stderr = b"".join(self._stderr_chunks)
+
+        if self._timed_out:
+            timeout = self.timeout or 0
+            self._result = _exception_result(
+                self.command, subprocess.TimeoutExpired(process.args, timeout), timeout
+            )
+            self._result.usage = usage
+            return
+        cancelled = self.cancellation is not None and self.cancellation.cancelled
+        if cancelled and exit_code < 0:
+            self._result = _cancelled_result(self.command, b"", stderr)
+            self._result.stdout = ""
+            self._result.usage = usage
+            return
+        self._result = GitResult(
+            stdout="",
+            stderr=_decode_output(stderr),
+            exit_code=exit_code,
+            command=self.command,
+            success=exit_code == 0,
+            usage=usage,
+        )
+        if interrupted:
+            raise GitInterrupted(b"", stderr)
+
+    def __enter__(self) -> "GitStream":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def stream_git_command(
+    command: str,
+    timeout: Optional[float] = 30,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    runtime: Optional[GitRuntime] = None,
+    repository: Optional[Repository] = None,
+    foreground: bool = False,
+    cancellation: Optional[GitCancellation] = None,
+) -> GitStream:
+    """
+    Start a Git command and stream its output instead of buffering it.
+
+    Args:
+        command: Git command string to execute
+        timeout: Maximum run time in seconds, or None for no limit
+        chunk_size: Maximum size of each yielded stdout chunk in bytes
+        runtime: Git runtime to use instead of the shared one
+        repository: Repository to run in, None for the current one
+        foreground: Hand Git the terminal until the stream is closed; only
+            for commands the user runs in the foreground
+        cancellation: Handle that lets another thread stop the command
+
+    Returns:
+        GitStream to iterate over; its ``result`` is available afterwards
+    """
+    return GitStream(
+        command,
+        timeout=timeout,
+        chunk_size=chunk_size,
+        runtime=runtime,
+        repository=repository,
+        foreground=foreground,
+        cancellation=cancellation,
+    )
+
+
+class GitObjectServerError(Exception):
+    """Custom exception for Git object server failures."""
+
+
+@dataclass
+class GitObject:
+    """
+    Object returned by the Git object server.
+
+    Attributes:
+        oid: Full object id
+        type: Object type ("blob", "tree", "commit" or "tag")
+        size: Object size in bytes
+        data: Raw object contents, or None for info-only requests
+    """
+
+    oid: str
+    type: str
+    size: int
+    data: Optional[bytes] = None
+
+
+@dataclass
+class GitCommit:
+    """
+    Parsed commit object.
+
+    Attributes:
+        oid: Commit object id
+        tree: Root tree object id
+        parents: Parent commit ids in order
+        author: Raw author line (name, email, timestamp and timezone)
+        committer: Raw committer line
+        message: Full commit message
+    """
+
+    oid: str
+    tree: str
+    parents: List[str] = field(default_factory=list)
+    author: str = ""
+    committer: str = ""
+    message: str = ""
+
+    @property
+    def subject(self) -> str:
+        """First line of the commit message."""
+        return self.message.split("\n", 1)[0]
+
+
+@dataclass
+class GitTreeEntry:
+    """
+    Single entry of a tree object.
+
+    Attributes:
+        mode: File mode as an octal string (e.g. "100644")
+        name: Entry name
+        oid: Object id of the entry
+    """
+
+    mode: str
+    name: str
+    oid: str
+
+
+def parse_commit(oid: str, data: bytes) -> GitCommit:
+    """
+    Parse raw commit object contents.
+
+    Args:
+        oid: Object id of the commit
+        data: Raw commit object contents
+
+    Returns:
+        GitCommit with headers and message
+    """
+    header, _, message = data.partition(b"\n\n")
+    commit = GitCommit(oid=oid, tree="")
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        if key == b"tree":
+            commit.tree = value.decode("ascii")
+        elif key == b"parent":
+            commit.parents.append(value.decode("ascii"))
+        elif key == b"author":
+            commit.author = value.decode("utf-8", errors="replace")
+        elif key == b"committer":
+            commit.committer = value.decode("utf-8", errors="replace")
+    commit.message = message.decode("utf-8", errors="replace")
+    return commit
+
+
+def parse_tree(data: bytes, oid_size: int = 20) -> List[GitTreeEntry]:
+    """
+    Parse raw tree object contents.
+
+    Args:
+        data: Raw tree object contents
+        oid_size: Binary object id length (20 for SHA-1, 32 for SHA-256)
+
+    Returns:
+        List of GitTreeEntry objects in tree order
+    """
+    entries = []
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        mode = data[pos:space].decode("ascii")
+        name = data[space + 1 : nul].decode("utf-8", errors="surrogateescape")
+        oid = data[nul + 1 : nul + 1 + oid_size].hex()
+        entries.append(GitTreeEntry(mode=mode, name=name, oid=oid))
+        pos = nul + 1 + oid_size
+    return entries
+
+
+class _CatFileProcess:
+    """A single ``git cat-file --batch-command --buffer`` child process."""
+
+    def __init__(self, repo_path: str, runtime: GitRuntime):
+        self.repo_path = repo_path
+        self.runtime = runtime
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self) -> subprocess.Popen:
+        """Spawn the cat-file process and return it."""
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [self.runtime.executable, "cat-file", "--batch-command", "--buffer"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            shell=False,
+        )
+        return self.process
+
+    def close(self) -> None:
+        """Terminate the process and release its pipes."""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            _writer(process.stdin).close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            _reader(process.stdout).close()
+
+    def request(self, requests: List[str]) -> List[Optional[GitObject]]:
+        """
+        Send a batch of requests and read one response per request.
+
+        Args:
+            requests: Lines of the form "info <rev>" or "contents <rev>"
+
+        Returns:
+            GitObject per request, or None when the object is missing
+        """
+        process = self.process
+        if process is None or process.poll() is not None:
+            self.close()
+            process = self.start()
+
+        payload = "".join(f"{line}\n" for line in requests) + "flush\n"
+        stdin = _writer(process.stdin)
+        stdin.write(payload.encode("utf-8"))
+        stdin.flush()
+
+        stdout = _reader(process.stdout)
+        results: List[Optional[GitObject]] = []
+        for line in requests:
+            header = stdout.readline()
+            if not header:
+                raise EOFError("git cat-file exited unexpectedly")
+            header = header.rstrip(b"\n")
+            if header.endswith((b" missing", b" ambiguous")):
+                results.append(None)
+                continue
+            parts = header.decode("ascii").split()
+            oid, obj_type, size = parts[0], parts[1], int(parts[2])
+            data = None
+            if line.startswith("contents "):
+                data = stdout.read(size + 1)[:-1]
+                if len(data) != size:
+                    raise EOFError("git cat-file exited unexpectedly")
+            results.append(GitObject(oid=oid, type=obj_type, size=size, data=data))
+        return results
+
+
+class GitObjectServer:
+    """
+    Long-lived object reader backed by ``git cat-file --batch-command``.
+
+    Keeps a small pool of cat-file processes for one repository so that many
+    object reads cost a single process spawn. Requests are batched and sent
+    with one flush per batch; a crashed process is restarted and the batch is
+    retried once. Instances are safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        repo_path: str = ".",
+        processes: int = 1,
+        runtime: Optional[GitRuntime] = None,
+    ):
+        self.repo_path = os.path.abspath(repo_path)
+        self.runtime = runtime or get_git_runtime()
+        self._idle: "queue.LifoQueue[_CatFileProcess]" = queue.LifoQueue()
+        self._all: List[_CatFileProcess] = []
+        for _ in range(max(1, processes)):
+            worker = _CatFileProcess(self.repo_path, self.runtime)
+            self._all.append(worker)
+            self._idle.put(worker)
+        self._closed = False
+
+    def _request(self, requests: List[str]) -> List[Optional[GitObject]]:
+        if self._closed:
+            raise GitObjectServerError("Object server has been closed")
+        if not requests:
+            return []
+        if not self.runtime.available:
+            raise GitObjectServerError("Git is not installed or not available in PATH.")
+        if not self.runtime.supports_batch_command:
+            raise GitObjectServerError(
+                "git cat-file --batch-command requires Git 2.36 or newer "
+                f"(found {self.runtime.version or 'unknown version'})."
+            )
+
+        worker = self._idle.get()
+        try:
+            try:
+                return worker.request(requests)
+            except (BrokenPipeError, EOFError, OSError, ValueError):
+                # The process crashed or was killed; restart it and retry once
+                worker.close()
+                try:
+                    return worker.request(requests)
+                except (BrokenPipeError, EOFError, OSError, ValueError) as e:
+                    worker.close()
+                    raise GitObjectServerError(
+                        f"git cat-file failed in {self.repo_path}: {str(e)}"
+                    ) from e
+        finally:
+            self._idle.put(worker)
+
+    def object_infos(self, revs: Iterable[str]) -> List[Optional[GitObject]]:
+        """
+        Look up type and size of several objects in one batch.
+
+        Args:
+            revs: Object ids or revision expressions
+
+        Returns:
+            GitObject without data per revision, None for missing objects
+        """
+        return self._request([f"info {rev}" for rev in revs])
+
+    def object_info(self, rev: str) -> Optional[GitObject]:
+        """Look up type and size of a single object."""
+        return self.object_infos([rev])[0]
+
+    def read_objects(self, revs: Iterable[str]) -> List[Optional[GitObject]]:
+        """
+        Read the contents of several objects in one batch.
+
+        Args:
+            revs: Object ids or revision expressions
+
+        Returns:
+            GitObject with data per revision, None for missing objects
+        """
+        return self._request([f"contents {rev}" for rev in revs])
+
+    def read_object(self, rev: str) -> Optional[GitObject]:
+        """Read the contents of a single object."""
+        return self.read_objects([rev])[0]
+
+    def read_blob(self, rev: str) -> Optional[bytes]:
+        """
+        Read a blob.
+
+        Args:
+            rev: Blob id or expression such as "HEAD:README.md"
+
+        Returns:
+            Blob contents, or None if the object is missing or not a blob
+        """
+        obj = self.read_object(rev)
+        if obj is None or obj.type != "blob":
+            return None
+        return obj.data
+
+    def read_commits(self, revs: Iterable[str]) -> List[Optional[GitCommit]]:
+        """
+        Read and parse several commits in one batch.
+
+        Args:
+            revs: Commit ids or revision expressions
+
+        Returns:
+            GitCommit per revision, None for missing or non-commit objects
+        """
+        commits: List[Optional[GitCommit]] = []
+        for obj in self.read_objects(revs):
+            if obj is None or obj.type != "commit":
+                commits.append(None)
+            else:
+                commits.append(parse_commit(obj.oid, obj.data or b""))
+        return commits
+
+    def read_commit(self, rev: str) -> Optional[GitCommit]:
+        """Read and parse a single commit."""
+        return self.read_commits([rev])[0]
+
+    def read_tree(self, rev: str) -> Optional[List[GitTreeEntry]]:
+        """
+        Read and parse a tree.
+
+        Args:
+            rev: Tree id or tree-ish expression such as "HEAD^{tree}"
+
+        Returns:
+            List of tree entries, or None if the object is missing or not a tree
+        """
+        obj = self.read_object(rev)
+        if obj is None or obj.type != "tree":
+            return None
+        return parse_tree(obj.data or b"", oid_size=len(obj.oid) // 2)
+
+    def close(self) -> None:
+        """Stop all cat-file processes owned by this server."""
+        self._closed = True
+        for worker in self._all:
+            worker.close()
+
+    def __enter__(self) -> "GitObjectServer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_object_servers: Dict[str, GitObjectServer] = {}
+_object_servers_lock = threading.Lock()
+
+
+def get_object_server(repo_path: str = ".", processes: int = 1) -> GitObjectServer:
+    """
+    Get the shared object server for a repository, starting it if needed.
+
+    Args:
+        repo_path: Path inside the repository
+        processes: Number of cat-file processes for a newly created server
+
+    Returns:
+        GitObjectServer shared by all callers for this repository
+    """
+    key = os.path.realpath(repo_path)
+    with _object_servers_lock:
+        server = _object_servers.get(key)
+        if server is None or server._closed:  # pylint: disable=protected-access
+            server = GitObjectServer(key, processes=processes)
+            _object_servers[key] = server
+        return server
+
+
+@atexit.register
+def close_object_servers() -> None:
+    """Stop all shared object servers."""
+    with _object_servers_lock:
+        servers = list(_object_servers.values())
+        _object_servers.clear()
+    for server in servers:
+        server.close()
+
+
+class GitBackend(Protocol):
+    """
+    Repository reads git-sensei performs for itself.
+
+    Context gathering and safety analysis go through a backend, so they can
+    run in-process (see git_sensei.backends) instead of spawning Git for
+    every query. Commands typed by the user always run through real Git
+    with execute_git_command. Every method returns None when the answer
+    cannot be determined, e.g. outside a repository.
+
+    Attributes:
+        name: Short backend name, e.g. "subprocess" or "libgit2"
+    """
+
+    name: str
+
+    def status(self, untracked_files: str = "normal") -> Optional["GitStatus"]:
+        """
+        Status of the index and working tree, with branch headers.
+
+        Args:
+            untracked_files: "no", "normal" or "all", as for ``git status``
+        """
+
+    def current_branch(self) -> Optional[str]:
+        """Short name of the checked-out branch, None if HEAD is detached."""
+
+    def recent_commits(self, limit: int = 5) -> Optional[List[GitCommit]]:
+        """
+        Commits reachable from HEAD, newest first, like ``git log``.
+
+        Args:
+            limit: Maximum number of commits
+        """
+
+    def list_refs(self, prefix: str = "refs/") -> Optional[Dict[str, str]]:
+        """
+        Refs under a prefix, mapped to the object ids they resolve to.
+
+        Args:
+            prefix: Ref name prefix, e.g. "refs/heads/"
+        """
+
+    def ahead_behind(self, left: str, right: str) -> Optional[Tuple[int, int]]:
+        """
+        Commits only in left and only in right, like ``git rev-list --count
+        --left-right left...right``.
+
+        Args:
+            left: First revision
+            right: Second revision
+        """
+
+    def read_object(self, oid: str) -> Optional[GitObject]:
+        """
+        Object contents by full id.
+
+        Args:
+            oid: Full hexadecimal object id
+        """
@@ -0,0 +1,565 @@
+"""
+Index reading module for Git sensei.
+
+This module parses ``.git/index`` (versions 2 to 4, including split
+indexes) and compares the cached stat data against the working tree to find
+modified and deleted tracked files without running ``git status``. Staged
+changes are found by comparing the entries with the tree of HEAD.
+"""
+
+import hashlib
+import mmap
+import os
+import stat
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .git_ops import execute_git_command
+from .odb import ObjectDatabase, ObjectDatabaseError, get_object_database
+from .refs import _parse_config, discover_git_dirs, get_ref_reader
+from .status import STATUS_COMMAND, StatusParseError, status_from_result
+
+# Entry flag bits
+_FLAG_ASSUME_VALID = 0x8000
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+_XFLAG_SKIP_WORKTREE = 0x4000
+_XFLAG_INTENT_TO_ADD = 0x2000
+
+_ENTRY_STAT = struct.Struct(">10I")
+
+# Optional extensions we can safely ignore (Git marks them with an upper
+# case first letter); "link" is handled explicitly
+_SUPPORTED_MANDATORY_EXTENSIONS = {b"link"}
+
+_MODE_GITLINK = 0o160000
+_MODE_SYMLINK = 0o120000
+_MODE_TREE = 0o040000
+
+# Index data, memory mapped or read into memory
+_Buffer = Union[bytes, mmap.mmap]
+
+
+class UnsupportedIndexError(Exception):
+    """Raised when the index uses a format or extension this reader lacks."""
+
+
+@dataclass
+class IndexEntry:
+    """
+    Single entry of the index.
+
+    Attributes:
+        path: Path relative to the top of the working tree
+        oid: Object id of the staged blob
+        mode: File mode (e.g. 0o100644)
+        stage: Merge stage, 0 for normal entries
+        ctime: Change time as (seconds, nanoseconds), truncated to 32 bits
+        mtime: Modification time as (seconds, nanoseconds)
+        dev: Device number, truncated to 32 bits
+        ino: Inode number, truncated to 32 bits
+        uid: Owner user id
+        gid: Owner group id
+        size: File size, truncated to 32 bits
+        assume_valid: Entry is marked "assume unchanged"
+        skip_worktree: Entry is excluded from the working tree
+        intent_to_add: Entry was added with ``git add -N``
+    """
+
+    path: str
+    oid: str
+    mode: int
+    stage: int = 0
+    ctime: Tuple[int, int] = (0, 0)
+    mtime: Tuple[int, int] = (0, 0)
+    dev: int = 0
+    ino: int = 0
+    uid: int = 0
+    gid: int = 0
+    size: int = 0
+    assume_valid: bool = False
+    skip_worktree: bool = False
+    intent_to_add: bool = False
+
+
+@dataclass
+class WorktreeChanges:
+    """
+    Differences between the working tree, the index and HEAD.
+
+    Attributes:
+        modified: Tracked files whose contents or mode changed
+        deleted: Tracked files missing from the working tree
+        unmerged: Paths with unresolved merge conflicts
+        staged: Paths whose index entry was added, changed or removed
+            relative to HEAD
+    """
+
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unmerged: List[str] = field(default_factory=list)
+    staged: List[str] = field(default_factory=list)
+
+    @property
+    def dirty(self) -> bool:
+        """True if any tracked file differs from the index or HEAD."""
+        return bool(self.modified or self.deleted or self.unmerged or self.staged)
+
+
+def _read_varint(buf: _Buffer, pos: int) -> Tuple[int, int]:
+    """Decode Git's offset varint; returns (value, new position)."""
+    byte = buf[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        value += 1
+        byte = buf[pos]
+        pos += 1
+        value = (value << 7) + (byte & 0x7F)
+    return value, pos
+
+
+def read_ewah_bitmap(buf: _Buffer, pos: int) -> Tuple[Set[int], int]:
+    """
+    Decode an EWAH compressed bitmap as used by split indexes.
+
+    Args:
+        buf: Buffer containing the bitmap
+        pos: Offset of the bitmap
+
+    Returns:
+        Tuple of (set of bit positions, offset after the bitmap)
+    """
+    _bit_count, word_count = struct.unpack_from(">II", buf, pos)
+    pos += 8
+    words = struct.unpack_from(f">{word_count}Q", buf, pos)
+    pos += 8 * word_count + 4  # trailing position of the last RLW
+
+    bits: Set[int] = set()
+    bit_pos = 0
+    i = 0
+    while i < word_count:
+        rlw = words[i]
+        i += 1
+        run_bit = rlw & 1
+        run_len = (rlw >> 1) & 0xFFFFFFFF
+        literal_count = rlw >> 33
+        if run_bit:
+            bits.update(range(bit_pos, bit_pos + run_len * 64))
+        bit_pos += run_len * 64
+        for _ in range(literal_count):
+            word = words[i]
+            i += 1
+            while word:
+                low = word & -word
+                bits.add(bit_pos + low.bit_length() - 1)
+                word ^= low
+            bit_pos += 64
+    return bits, pos
+
+
+class GitIndex:
+    """
+    Parsed Git index file.
+
+    Args:
+        path: Path of the index file
+        oid_size: Binary object id length (20 for SHA-1, 32 for SHA-256)
+
+    Raises:
+        UnsupportedIndexError: If the file uses an unsupported version or a
+            mandatory extension this reader does not understand
+    """
+
+    def __init__(self, path: str, oid_size: int = 20):
+        self.path = path
+        self.oid_size = oid_size
+        self.version = 0
+        self.entries: List[IndexEntry] = []
+        self.extensions: List[str] = []
+        self.shared_index: Optional[str] = None
+        self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as index_file:
+            size = os.fstat(index_file.fileno()).st_size
+            if size < 12:
+                raise UnsupportedIndexError("Index file is truncated")
+            with mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                self._parse(buf)
+
+    def _parse(self, buf: mmap.mmap) -> None:
+        signature, version, count = struct.unpack_from(">4sII", buf, 0)
+        if signature != b"DIRC":
+            raise UnsupportedIndexError("Not a Git index file")
+        if version not in (2, 3, 4):
+            raise UnsupportedIndexError(f"Unsupported index version {version}")
+        self.version = version
+
+        pos = 12
+        previous = b""
+        entries = []
+        for _ in range(count):
+            entry, pos, previous = self._parse_entry(buf, pos, previous)
+            entries.append(entry)
+
+        end = len(buf) - self.oid_size
+        delete_bits: Set[int] = set()
+        replace_bits: Set[int] = set()
+        while pos + 8 <= end:
+            signature, ext_size = struct.unpack_from(">4sI", buf, pos)
+            data_start = pos + 8
+            name = signature.decode("ascii", errors="replace")
+            self.extensions.append(name)
+            if signature == b"link":
+                self.shared_index = buf[data_start : data_start + self.oid_size].hex()
+                bitmap_pos = data_start + self.oid_size
+                if bitmap_pos < data_start + ext_size:
+                    delete_bits, bitmap_pos = read_ewah_bitmap(buf, bitmap_pos)
+                    replace_bits, bitmap_pos = read_ewah_bitmap(buf, bitmap_pos)
+            elif not signature[:1].isupper() and (
+                signature not in _SUPPORTED_MANDATORY_EXTENSIONS
+            ):
+                raise UnsupportedIndexError(f"Unsupported index extension '{name}'")
+            pos = data_start + ext_size
+
+        if self.shared_index and not all(c == "0" for c in self.shared_index):
+            entries = self._merge_shared(entries, delete_bits, replace_bits)
+        self.entries = entries
+
+    def _parse_entry(
+        self, buf: mmap.mmap, pos: int, previous: bytes
+    ) -> Tuple[IndexEntry, int, bytes]:
+        start = pos
+        (
+            ctime_s,
+            ctime_ns,
+            mtime_s,
+            mtime_ns,
+            dev,
+            ino,
+            mode,
+            uid,
+            gid,
+            size,
+        ) = _ENTRY_STAT.unpack_from(buf, pos)
+        pos += _ENTRY_STAT.size
+        oid = buf[pos : pos + self.oid_size].hex()
+        pos += self.oid_size
+        (flags,) = struct.unpack_from(">H", buf, pos)
+        pos += 2
+        xflags = 0
+        if flags & _FLAG_EXTENDED and self.version >= 3:
+            (xflags,) = struct.unpack_from(">H", buf, pos)
+            pos += 2
+
+        if self.version == 4:
+            strip, pos = _read_varint(buf, pos)
+            nul = buf.find(b"\0", pos)
+            name = previous[: len(previous) - strip] + buf[pos:nul]
+            pos = nul + 1
+        else:
+            name_length = flags & _FLAG_NAME_MASK
+            if name_length < _FLAG_NAME_MASK:
+                nul = pos + name_length
+            else:
+                nul = buf.find(b"\0", pos)
+            name = buf[pos:nul]
+            # Entries are NUL padded to a multiple of eight bytes
+            pos = start + ((nul - start) // 8 + 1) * 8
+
+        entry = IndexEntry(
+            path=name.decode("utf-8", errors="surrogateescape"),
+            oid=oid,
+            mode=mode,
+            stage=(flags & _FLAG_STAGE_MASK) >> 12,
+            ctime=(ctime_s, ctime_ns),
+            mtime=(mtime_s, mtime_ns),
+            dev=dev,
+            ino=ino,
+            uid=uid,
+            gid=gid,
+            size=size,
+            assume_valid=bool(flags & _FLAG_ASSUME_VALID),
+            skip_worktree=bool(xflags & _XFLAG_SKIP_WORKTREE),
+            intent_to_add=bool(xflags & _XFLAG_INTENT_TO_ADD),
+        )
+        return entry, pos, name
+
+    def _merge_shared(
+        self,
+        entries: List[IndexEntry],
+        delete_bits: Set[int],
+        replace_bits: Set[int],
+    ) -> List[IndexEntry]:
+        shared_path = os.path.join(
+            os.path.dirname(self.path), f"sharedindex.{self.shared_index}"
+        )
+        try:
+            shared = GitIndex(shared_path, oid_size=self.oid_size)
+        except OSError as e:
+            raise UnsupportedIndexError(f"Shared index is missing: {str(e)}") from e
+
+        merged = list(shared.entries)
+        replacements = iter(entries)
+        for bit in sorted(replace_bits):
+            replacement = next(replacements, None)
+            if replacement is None or bit >= len(merged):
+                raise UnsupportedIndexError("Corrupt split index replace bitmap")
+            # Replaced entries are stored without a name
+            replacement.path = merged[bit].path
+            merged[bit] = replacement
+        kept = [e for i, e in enumerate(merged) if i not in delete_bits]
+        kept.extend(replacements)
+        kept.sort(key=lambda e: (e.path.encode("utf-8", "surrogateescape"), e.stage))
+        return kept
+
+    def detect_changes(
+        self, work_tree: str, verify_content: bool = True
+    ) -> WorktreeChanges:
+        """
+        Compare index entries against the working tree.
+
+        Entries whose cached stat data still matches the file are considered
+        unchanged. Otherwise the file is reported as modified when its size
+        or type differs, or (with verify_content) when its hashed contents
+        differ from the staged blob. Content filters such as CRLF conversion
+        are not applied, so filtered files may be reported as modified.
+
+        Args:
+            work_tree: Top-level directory of the working tree
+            verify_content: Hash files whose stat data changed but whose size
+                did not, instead of reporting them as modified outright
+
+        Returns:
+            WorktreeChanges with modified, deleted and unmerged paths
+        """
+        changes = WorktreeChanges()
+        index_mtime_ns = os.stat(self.path).st_mtime_ns
+        seen_unmerged: Set[str] = set()
+        for entry in self.entries:
+            if entry.stage:
+                if entry.path not in seen_unmerged:
+                    seen_unmerged.add(entry.path)
+                    changes.unmerged.append(entry.path)
+                continue
+            if entry.assume_valid or entry.skip_worktree:
+                continue
+            if entry.mode == _MODE_GITLINK:
+                continue
+
+            full_path = os.path.join(work_tree, entry.path)
+            try:
+                st = os.lstat(full_path)
+            except (FileNotFoundError, NotADirectoryError):
+                changes.deleted.append(entry.path)
+                continue
+
+            if _type_changed(entry, st):
+                changes.modified.append(entry.path)
+                continue
+            if _stat_matches(entry, st) and not _is_racy(entry, index_mtime_ns):
+                continue
+            if entry.intent_to_add or (st.st_size & 0xFFFFFFFF) != entry.size:
+                changes.modified.append(entry.path)
+                continue
+            if not verify_content or not _content_matches(entry, full_path, st):
+                changes.modified.append(entry.path)
+        return changes
+
+    def staged_changes(self, head_files: Dict[str, Tuple[int, str]]) -> List[str]:
+        """
+        Compare stage 0 entries against the files of HEAD's tree.
+
+        Args:
+            head_files: Mapping of path to (mode, object id) for every file
+                in HEAD's tree, empty on an unborn branch
+
+        Returns:
+            Paths added, changed or removed in the index, in index order
+            followed by removals
+        """
+        staged = []
+        indexed: Set[str] = set()
+        for entry in self.entries:
+            indexed.add(entry.path)
+            # Conflicts are reported as unmerged and intent-to-add entries
+            # hold no staged contents
+            if entry.stage or entry.intent_to_add:
+                continue
+            if head_files.get(entry.path) != (entry.mode, entry.oid):
+                staged.append(entry.path)
+        staged.extend(path for path in head_files if path not in indexed)
+        return staged
+
+
+def _type_changed(entry: IndexEntry, st: os.stat_result) -> bool:
+    """Check whether the file type or executable bit differs from the entry."""
+    entry_type = entry.mode & 0o170000
+    if stat.S_ISLNK(st.st_mode):
+        return entry_type != _MODE_SYMLINK
+    if not stat.S_ISREG(st.st_mode) or entry_type == _MODE_SYMLINK:
+        return True
+    if os.name == "nt":
+        return False
+    return bool(st.st_mode & 0o100) != bool(entry.mode & 0o100)
+
+
+def _stat_matches(entry: IndexEntry, st: os.stat_result) -> bool:
+    """Compare cached stat data the way Git does (truncated to 32 bits)."""
+    mtime = (int(st.st_mtime) & 0xFFFFFFFF, st.st_mtime_ns % 1_000_000_000)
+    ctime = (int(st.st_ctime) & 0xFFFFFFFF, st.st_ctime_ns % 1_000_000_000)
+    if entry.mtime != mtime or entry.ctime != ctime:
+        return False
+    if (st.st_size & 0xFFFFFFFF) != entry.size:
+        return False
+    if os.name != "nt":
+        if (st.st_ino & 0xFFFFFFFF) != entry.ino:
+            return False
+        if st.st_uid != entry.uid or st.st_gid != entry.gid:
+            return False
+    return True
+
+
+def _is_racy(entry: IndexEntry, index_mtime_ns: int) -> bool:
+    """Entries modified no earlier than the index itself cannot be trusted."""
+    entry_ns = entry.mtime[0] * 1_000_000_000 + entry.mtime[1]
+    return entry_ns >= index_mtime_ns
+
+
+def _content_matches(entry: IndexEntry, full_path: str, st: os.stat_result) -> bool:
+    """Hash the working tree file as a blob and compare it with the entry."""
+    try:
+        if stat.S_ISLNK(st.st_mode):
+            data = os.fsencode(os.readlink(full_path))
+        else:
+            with open(full_path, "rb") as work_file:
+                data = work_file.read()
+    except OSError:
+        return False
+    digest = hashlib.sha256() if len(entry.oid) == 64 else hashlib.sha1()
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest() == entry.oid
+
+
+def _canonical_mode(mode: int) -> int:
+    """Normalize a tree entry mode the way Git does when reading the index."""
+    if mode & 0o170000 == 0o100000:
+        return 0o100755 if mode & 0o100 else 0o100644
+    return mode
+
+
+def _read_tree(
+    odb: ObjectDatabase,
+    oid: str,
+    files: Dict[str, Tuple[int, str]],
+    prefix: str = "",
+) -> None:
+    """Add every file below a tree to files, keyed by path."""
+    obj = odb.read_object(oid)
+    if obj is None or obj.type != "tree":
+        raise ObjectDatabaseError(f"Missing tree {oid}")
+    data = obj.data or b""
+    oid_size = len(oid) // 2
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        mode = int(data[pos:space], 8)
+        name = data[space + 1 : nul].decode("utf-8", errors="surrogateescape")
+        entry_oid = data[nul + 1 : nul + 1 + oid_size].hex()
+        pos = nul + 1 + oid_size
+        if mode == _MODE_TREE:
+            _read_tree(odb, entry_oid, files, f"{prefix}{name}/")
+        else:
+            files[prefix + name] = (_canonical_mode(mode), entry_oid)
+
+
+def _head_files() -> Optional[Dict[str, Tuple[int, str]]]:
+    """
+    List the files in HEAD's tree for the current repository.
+
+    Returns:
+        Mapping of path to (mode, object id), empty on an unborn branch, or
+        None if the refs or objects cannot be read
+
+    Raises:
+        ObjectDatabaseError: If a tree object is missing or corrupt
+    """
+    reader = get_ref_reader()
+    odb = get_object_database()
+    if reader is None or odb is None:
+        return None
+    files: Dict[str, Tuple[int, str]] = {}
+    head = reader.read_head().oid
+    if head is None:
+        return files
+    commit = odb.read_commit(head)
+    if commit is None:
+        return None
+    _read_tree(odb, commit.tree, files)
+    return files
+
+
+def _changes_from_git() -> Optional[WorktreeChanges]:
+    """Ask Git for tracked changes in the index and working tree."""
+    result = execute_git_command(f"{STATUS_COMMAND} --untracked-files=no", text=False)
+    if not result.success:
+        return None
+    try:
+        status = status_from_result(result)
+    except StatusParseError:
+        return None
+    changes = WorktreeChanges()
+    for entry in status:
+        if entry.type == "u":
+            changes.unmerged.append(entry.path)
+            continue
+        if entry.index_status != ".":
+            changes.staged.append(entry.path)
+        if entry.worktree_status == "D":
+            changes.deleted.append(entry.path)
+        elif entry.worktree_status != ".":
+            changes.modified.append(entry.path)
+    return changes
+
+
+def get_worktree_changes() -> Optional[WorktreeChanges]:
+    """
+    Find tracked files in the current repository with uncommitted changes.
+
+    Reads the index and HEAD's tree directly and falls back to
+    ``git status`` when either cannot be read.
+
+    Returns:
+        WorktreeChanges, or None if not inside a repository with a work tree
+    """
+    dirs = discover_git_dirs(".")
+    if dirs is None or dirs.work_tree is None:
+        return None
+
+    index_path = os.path.join(dirs.git_dir, "index")
+    if not os.path.exists(index_path):
+        return WorktreeChanges()
+    config = _parse_config(os.path.join(dirs.common_dir, "config"))
+    object_format = config.get(("extensions", "objectformat"), "sha1")
+    oid_size = 32 if object_format.lower() == "sha256" else 20
+    try:
+        index = GitIndex(index_path, oid_size=oid_size)
+        changes = index.detect_changes(dirs.work_tree)
+        head_files = _head_files()
+    except (
+        UnsupportedIndexError,
+        ObjectDatabaseError,
+        OSError,
+        struct.error,
+        ValueError,
+    ):
+        return _changes_from_git()
+    if head_files is None:
+        return _changes_from_git()
+    changes.staged = index.staged_changes(head_files)
+    return changes
@@ -0,0 +1,151 @@
+"""
+Intent module for Git sensei.
+
+Gathering the full repository context for every phrase wastes time on
+large repositories: the status scan walks the whole working tree even when
+the phrase only asks about history. This module classifies a phrase with
+local keyword rules and picks the context providers it needs; what each
+provider costs to run is its cost class in the context module.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Pattern, Tuple
+
+# Built-in context providers, named after the RepoSnapshot field each one
+# fills in
+PROVIDER_STATUS = "status"
+PROVIDER_BRANCH = "branch"
+PROVIDER_UPSTREAM = "upstream"
+PROVIDER_OPERATION = "operation"
+PROVIDER_COMMITS = "commits"
+PROVIDER_REMOTES = "remotes"
+PROVIDER_STASHES = "stashes"
+PROVIDER_WORKTREES = "worktrees"
+PROVIDER_SUBMODULES = "submodules"
+PROVIDERS = (
+    PROVIDER_STATUS,
+    PROVIDER_BRANCH,
+    PROVIDER_UPSTREAM,
+    PROVIDER_OPERATION,
+    PROVIDER_COMMITS,
+    PROVIDER_REMOTES,
+    PROVIDER_STASHES,
+    PROVIDER_WORKTREES,
+    PROVIDER_SUBMODULES,
+)
+
+# Providers in every plan
+ALWAYS_PROVIDERS = frozenset({PROVIDER_BRANCH, PROVIDER_OPERATION})
+
+# Providers gathered when a phrase matches no rule, or none is given
+DEFAULT_PROVIDERS = ALWAYS_PROVIDERS | {PROVIDER_STATUS, PROVIDER_COMMITS}
+
+
+def _rule(pattern: str) -> Pattern[str]:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+# (intent, pattern, providers) in the order intents are reported
+_RULES: List[Tuple[str, Pattern[str], FrozenSet[str]]] = [
+    (
+        "history",
+        _rule(
+            r"\b(log|history|blame|commits|(last|recent|previous) \d* ?commit)\b"
+            r"|\bwho (changed|wrote|modified)\b"
+        ),
+        frozenset({PROVIDER_COMMITS}),
+    ),
+    (
+        "working_tree",
+        _rule(
+            r"\b(commit|add|stage|unstage|staged|changes?|changed files|diff|"
+            r"modified|untracked|status|reset|restore|discard|clean|amend|"
+            r"revert|checkout|switch|merge|rebase|conflicts?|"
+            r"cherry-?pick|continue|abort)\b"
+        ),
+        frozenset({PROVIDER_STATUS, PROVIDER_COMMITS}),
+    ),
+    (
+        "branch",
+        _rule(r"\b(branch|branches)\b"),
+        frozenset({PROVIDER_BRANCH}),
+    ),
+    (
+        "remote",
+        _rule(r"\b(push|pull|fetch|remotes?|upstream|origin|sync|publish|clone)\b"),
+        frozenset({PROVIDER_STATUS, PROVIDER_REMOTES, PROVIDER_UPSTREAM}),
+    ),
+    (
+        "tracking",
+        _rule(r"\b(ahead|behind|unpushed|unpulled|upstream|tracking)\b"),
+        frozenset({PROVIDER_UPSTREAM}),
+    ),
+    (
+        "stash",
+        _rule(r"\b(stash|stashes|stashed|shelve)\b"),
+        frozenset({PROVIDER_STATUS, PROVIDER_STASHES}),
+    ),
+    (
+        "worktree",
+        _rule(r"\b(worktrees?|work trees?)\b"),
+        frozenset({PROVIDER_WORKTREES}),
+    ),
+    (
+        "submodule",
+        _rule(r"\b(submodules?)\b"),
+        frozenset({PROVIDER_STATUS, PROVIDER_SUBMODULES}),
+    ),
+]
+
+
+@dataclass(frozen=True)
+class ContextPlan:
+    """
+    Context providers selected for a phrase.
+
+    Attributes:
+        intents: Intents recognized in the phrase, empty if none was
+        providers: Providers to run
+    """
+
+    intents: Tuple[str, ...]
+    providers: FrozenSet[str]
+
+
+def classify_intent(phrase: str) -> Tuple[str, ...]:
+    """
+    Recognize what a phrase asks Git to do.
+
+    Args:
+        phrase: Natural language request
+
+    Returns:
+        Names of the matching intents ("history", "working_tree", "branch",
+        "remote", "tracking", "stash", "worktree", "submodule"), empty if
+        none matches
+    """
+    return tuple(intent for intent, pattern, _ in _RULES if pattern.search(phrase))
+
+
+def plan_context(phrase: Optional[str]) -> ContextPlan:
+    """
+    Select the context providers a phrase needs.
+
+    Phrases that match no rule get the default providers, so an
+    unrecognized request is never answered with less context than before.
+    The branch and any operation in progress are part of every plan.
+
+    Args:
+        phrase: Natural language request, None for the default providers
+
+    Returns:
+        Plan naming the intents and providers
+    """
+    intents = classify_intent(phrase) if phrase else ()
+    providers = DEFAULT_PROVIDERS
+    if intents:
+        providers = ALWAYS_PROVIDERS.union(
+            *(needed for intent, _, needed in _RULES if intent in intents)
+        )
+    return ContextPlan(intents=intents, providers=providers)
@@ -0,0 +1,640 @@
+"""
+Object database module for Git sensei.
+
+This module reads commits and other objects directly from a repository's
+packfiles and loose objects, so history can be walked in-process instead of
+spawning ``git log``. Pack indexes and packs are memory-mapped, deltas are
+resolved with a bounded LRU cache of delta bases, and loose objects are
+inflated with zlib.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .git_ops import GitCommit, GitObject, parse_commit
+from .refs import _parse_config, discover_git_dirs, get_ref_reader
+
+# Pack object type numbers
+_OBJ_COMMIT = 1
+_OBJ_TREE = 2
+_OBJ_BLOB = 3
+_OBJ_TAG = 4
+_OBJ_OFS_DELTA = 6
+_OBJ_REF_DELTA = 7
+
+_TYPE_NAMES = {
+    _OBJ_COMMIT: "commit",
+    _OBJ_TREE: "tree",
+    _OBJ_BLOB: "blob",
+    _OBJ_TAG: "tag",
+}
+
+DELTA_BASE_CACHE_SIZE = 32 * 1024 * 1024
+_MAX_DELTA_CHAIN = 10000
+
+
+class ObjectDatabaseError(Exception):
+    """Custom exception for corrupt or unreadable packfiles and loose objects."""
+
+
+def _inflate(buf: mmap.mmap, pos: int, size: int) -> bytes:
+    """Inflate a zlib stream starting at pos whose output is size bytes."""
+    decompressor = zlib.decompressobj()
+    out = []
+    chunk = max(size + 64, 4096)
+    end = len(buf)
+    while not decompressor.eof:
+        if pos >= end:
+            raise ObjectDatabaseError("Truncated zlib stream")
+        out.append(decompressor.decompress(buf[pos : pos + chunk]))
+        pos += chunk
+        chunk *= 2
+    data = b"".join(out)
+    if len(data) != size:
+        raise ObjectDatabaseError("Inflated object has the wrong size")
+    return data
+
+
+def _delta_header_size(delta: bytes, pos: int) -> Tuple[int, int]:
+    """Read a little-endian base-128 size from a delta header."""
+    size = 0
+    shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """
+    Apply a Git delta to a base object.
+
+    Args:
+        base: Contents of the base object
+        delta: Delta instructions
+
+    Returns:
+        Contents of the reconstructed object
+    """
+    src_size, pos = _delta_header_size(delta, 0)
+    dst_size, pos = _delta_header_size(delta, pos)
+    if src_size != len(base):
+        raise ObjectDatabaseError("Delta base has the wrong size")
+
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            offset = 0
+            for shift in range(4):
+                if opcode & (1 << shift):
+                    offset |= delta[pos] << (8 * shift)
+                    pos += 1
+            length = 0
+            for shift in range(3):
+                if opcode & (0x10 << shift):
+                    length |= delta[pos] << (8 * shift)
+                    pos += 1
+            if length == 0:
+                length = 0x10000
+            out += base[offset : offset + length]
+        elif opcode:
+            out += delta[pos : pos + opcode]
+            pos += opcode
+        else:
+            raise ObjectDatabaseError("Invalid delta opcode")
+    if len(out) != dst_size:
+        raise ObjectDatabaseError("Delta result has the wrong size")
+    return bytes(out)
+
+
+class PackIndex:
+    """
+    Memory-mapped pack index (``.idx``), versions 1 and 2.
+
+    Args:
+        path: Path of the index file
+        oid_size: Binary object id length (20 for SHA-1, 32 for SHA-256)
+    """
+
+    def __init__(self, path: str, oid_size: int = 20):
+        self.path = path
+        self.oid_size = oid_size
+        with open(path, "rb") as idx_file:
+            self._map = mmap.mmap(idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] == b"\377tOc":
+            (self.version,) = struct.unpack_from(">I", self._map, 4)
+            if self.version != 2:
+                raise ObjectDatabaseError(
+                    f"Unsupported pack index version {self.version}"
+                )
+            fanout_start = 8
+        else:
+            self.version = 1
+            fanout_start = 0
+        self._fanout = struct.unpack_from(">256I", self._map, fanout_start)
+        self.count = self._fanout[255]
+        if self.version == 2:
+            self._names = fanout_start + 1024
+            self._crcs = self._names + self.count * oid_size
+            self._offsets = self._crcs + self.count * 4
+            self._large_offsets = self._offsets + self.count * 4
+            self._stride = oid_size
+        else:
+            # Version 1 stores (4-byte offset, object id) pairs
+            self._names = fanout_start + 1024 + 4
+            self._offsets = fanout_start + 1024
+            self._stride = oid_size + 4
+
+    def _name_at(self, i: int) -> bytes:
+        start = self._names + i * self._stride
+        return self._map[start : start + self.oid_size]
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """
+        Find the pack offset of an object.
+
+        Args:
+            oid: Binary object id
+
+        Returns:
+            Offset of the object in the pack, or None if not present
+        """
+        first = oid[0]
+        lo = self._fanout[first - 1] if first else 0
+        hi = self._fanout[first]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self._name_at(mid)
+            if name == oid:
+                return self._offset_at(mid)
+            if name < oid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _offset_at(self, i: int) -> int:
+        offset: int
+        if self.version == 1:
+            (offset,) = struct.unpack_from(
+                ">I", self._map, self._offsets + i * self._stride
+            )
+            return offset
+        (offset,) = struct.unpack_from(">I", self._map, self._offsets + i * 4)
+        if offset & 0x80000000:
+            large = self._large_offsets + (offset & 0x7FFFFFFF) * 8
+            (offset,) = struct.unpack_from(">Q", self._map, large)
+        return offset
+
+    def close(self) -> None:
+        """Release the memory mapping."""
+        self._map.close()
+
+
+class PackFile:
+    """
+    Memory-mapped packfile together with its index.
+
+    Args:
+        idx_path: Path of the ``.idx`` file; the ``.pack`` is found next to it
+        odb: Object database used to resolve REF_DELTA bases
+    """
+
+    def __init__(self, idx_path: str, odb: "ObjectDatabase"):
+        self.index = PackIndex(idx_path, odb.oid_size)
+        self.path = idx_path[: -len(".idx")] + ".pack"
+        self.odb = odb
+        with open(self.path, "rb") as pack_file:
+            self._map = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != b"PACK":
+            raise ObjectDatabaseError(f"{self.path} is not a packfile")
+
+    def _header(self, offset: int) -> Tuple[int, int, int]:
+        """Parse an object header; returns (type, inflated size, data offset)."""
+        buf = self._map
+        byte = buf[offset]
+        offset += 1
+        obj_type = (byte >> 4) & 0x7
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = buf[offset]
+            offset += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return obj_type, size, offset
+
+    def _ofs_base(self, offset: int, pos: int) -> Tuple[int, int]:
+        """Decode an OFS_DELTA base offset; returns (base offset, data offset)."""
+        buf = self._map
+        byte = buf[pos]
+        pos += 1
+        distance = byte & 0x7F
+        while byte & 0x80:
+            distance += 1
+            byte = buf[pos]
+            pos += 1
+            distance = (distance << 7) + (byte & 0x7F)
+        return offset - distance, pos
+
+    def read_at(self, offset: int) -> Tuple[str, bytes]:
+        """
+        Read and fully resolve the object at a pack offset.
+
+        Args:
+            offset: Offset of the object header in the pack
+
+        Returns:
+            Tuple of (type name, contents)
+        """
+        deltas: List[bytes] = []
+        base: Optional[Tuple[str, bytes]] = None
+        chain_offsets: List[int] = []
+        current = offset
+        for _ in range(_MAX_DELTA_CHAIN):
+            cached = self.odb.delta_cache.get((self.path, current))
+            if cached is not None:
+                base = cached
+                break
+            obj_type, size, pos = self._header(current)
+            if obj_type == _OBJ_OFS_DELTA:
+                base_offset, pos = self._ofs_base(current, pos)
+                deltas.append(_inflate(self._map, pos, size))
+                chain_offsets.append(current)
+                current = base_offset
+            elif obj_type == _OBJ_REF_DELTA:
+                base_oid = self._map[pos : pos + self.odb.oid_size]
+                pos += self.odb.oid_size
+                deltas.append(_inflate(self._map, pos, size))
+                chain_offsets.append(current)
+                ref_base = self.odb.read_raw(base_oid)
+                if ref_base is None:
+                    raise ObjectDatabaseError(f"Missing delta base {base_oid.hex()}")
+                base = ref_base
+                break
+            elif obj_type in _TYPE_NAMES:
+                base = (_TYPE_NAMES[obj_type], _inflate(self._map, pos, size))
+                if deltas:
+                    self.odb.delta_cache.put((self.path, current), base)
+                break
+            else:
+                raise ObjectDatabaseError(f"Unknown pack object type {obj_type}")
+        else:
+            raise ObjectDatabaseError("Delta chain is too long")
+
+        type_name, data = base
+        while deltas:
+            data = apply_delta(data, deltas.pop())
+            current = chain_offsets.pop()
+            if deltas:
+                # Intermediate results are bases of the remaining chain
+                self.odb.delta_cache.put((self.path, current), (type_name, data))
+        return type_name, data
+
+    def close(self) -> None:
+        """Release the memory mappings."""
+        self.index.close()
+        self._map.close()
+
+
+class DeltaBaseCache:
+    """
+    LRU cache of resolved delta bases, bounded by total size in bytes.
+
+    Args:
+        max_bytes: Maximum combined size of cached objects
+    """
+
+    def __init__(self, max_bytes: int = DELTA_BASE_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[str, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[Tuple[str, bytes]]:
+        """Look up a cached object, marking it as recently used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, int], value: Tuple[str, bytes]) -> None:
+        """Cache an object, evicting the least recently used ones if needed."""
+        size = len(value[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            self._entries[key] = value
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ObjectDatabase:
+    """
+    Reader for a repository's object store (packs, loose objects, alternates).
+
+    Args:
+        objects_dir: Path of the ``objects`` directory
+        oid_size: Binary object id length (20 for SHA-1, 32 for SHA-256)
+        delta_cache_size: Size limit of the delta base cache in bytes
+    """
+
+    def __init__(
+        self,
+        objects_dir: str,
+        oid_size: int = 20,
+        delta_cache_size: int = DELTA_BASE_CACHE_SIZE,
+    ):
+        self.objects_dir = objects_dir
+        self.oid_size = oid_size
+        self.delta_cache = DeltaBaseCache(delta_cache_size)
+        self._packs: Dict[str, PackFile] = {}
+        self._pack_dir_mtime: Optional[int] = None
+        self._lock = threading.RLock()
+        self._alternates = [
+            ObjectDatabase(path, oid_size, delta_cache_size)
+            for path in self._read_alternates()
+        ]
+
+    def _read_alternates(self) -> List[str]:
+        path = os.path.join(self.objects_dir, "info", "alternates")
+        try:
+            with open(path, encoding="utf-8") as alternates:
+                lines = alternates.read().splitlines()
+        except OSError:
+            return []
+        return [
+            os.path.normpath(os.path.join(self.objects_dir, line.strip()))
+            for line in lines
+            if line.strip() and not line.startswith("#")
+        ]
+
+    def _refresh_packs(self) -> None:
+        pack_dir = os.path.join(self.objects_dir, "pack")
+        try:
+            mtime = os.stat(pack_dir).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._pack_dir_mtime:
+            return
+        self._pack_dir_mtime = mtime
+        for name in sorted(os.listdir(pack_dir)):
+            if not name.endswith(".idx"):
+                continue
+            idx_path = os.path.join(pack_dir, name)
+            if idx_path in self._packs:
+                continue
+            if not os.path.exists(idx_path[: -len(".idx")] + ".pack"):
+                continue
+            try:
+                self._packs[idx_path] = PackFile(idx_path, self)
+            except (OSError, ValueError, ObjectDatabaseError):
+                continue
+
+    @property
+    def object_count(self) -> int:
+        """Number of packed objects, used to size abbreviated ids."""
+        with self._lock:
+            self._refresh_packs()
+            return sum(pack.index.count for pack in self._packs.values())
+
+    def _read_loose(self, oid: bytes) -> Optional[Tuple[str, bytes]]:
+        hex_oid = oid.hex()
+        path = os.path.join(self.objects_dir, hex_oid[:2], hex_oid[2:])
+        try:
+            with open(path, "rb") as loose:
+                raw = zlib.decompress(loose.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error) as e:
+            raise ObjectDatabaseError(f"Corrupt loose object {hex_oid}") from e
+        header, _, data = raw.partition(b"\0")
+        type_name, _, size = header.decode("ascii").partition(" ")
+        if int(size) != len(data):
+            raise ObjectDatabaseError(f"Corrupt loose object {hex_oid}")
+        return type_name, data
+
+    def _read_packed(self, oid: bytes) -> Optional[Tuple[str, bytes]]:
+        for pack in self._packs.values():
+            offset = pack.index.find(oid)
+            if offset is not None:
+                return pack.read_at(offset)
+        return None
+
+    def read_raw(self, oid: bytes) -> Optional[Tuple[str, bytes]]:
+        """
+        Read an object by binary id.
+
+        Args:
+            oid: Binary object id
+
+        Returns:
+            Tuple of (type name, contents), or None if the object is absent
+        """
+        with self._lock:
+            if self._pack_dir_mtime is None:
+                self._refresh_packs()
+            found = self._read_packed(oid) or self._read_loose(oid)
+            if found is None:
+                # The object may live in a pack written since the last scan
+                previous = len(self._packs)
+                self._refresh_packs()
+                if len(self._packs) != previous:
+                    found = self._read_packed(oid)
+            if found is not None:
+                return found
+        for alternate in self._alternates:
+            found = alternate.read_raw(oid)
+            if found is not None:
+                return found
+        return None
+
+    def read_object(self, oid: str) -> Optional[GitObject]:
+        """
+        Read an object by hex id.
+
+        Args:
+            oid: Full hexadecimal object id
+
+        Returns:
+            GitObject with contents, or None if the object is absent
+        """
+        found = self.read_raw(bytes.fromhex(oid))
+        if found is None:
+            return None
+        type_name, data = found
+        return GitObject(oid=oid, type=type_name, size=len(data), data=data)
+
+    def read_commit(self, oid: str) -> Optional[GitCommit]:
+        """
+        Read and parse a commit.
+
+        Args:
+            oid: Full hexadecimal commit id
+
+        Returns:
+            GitCommit, or None if the object is absent or not a commit
+        """
+        obj = self.read_object(oid)
+        if obj is None or obj.type != "commit":
+            return None
+        return parse_commit(oid, obj.data or b"")
+
+    def iter_commits(self, starts: List[str]) -> Iterator[GitCommit]:
+        """
+        Walk history from one or more commits, newest committer date first.
+
+        This matches the default ordering of ``git log``. Commits whose
+        objects are missing (e.g. beyond a shallow boundary) end the walk
+        along that line of history.
+
+        Args:
+            starts: Commit ids to start from
+
+        Yields:
+            GitCommit objects, each exactly once
+        """
+        seen = set()
+        heap: List[Tuple[int, int, GitCommit]] = []
+        counter = 0
+        for oid in starts:
+            if oid in seen:
+                continue
+            seen.add(oid)
+            commit = self.read_commit(oid)
+            if commit is not None:
+                heapq.heappush(heap, (-commit_time(commit), counter, commit))
+                counter += 1
+        while heap:
+            _, _, commit = heapq.heappop(heap)
+            yield commit
+            for parent in commit.parents:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                parent_commit = self.read_commit(parent)
+                if parent_commit is not None:
+                    heapq.heappush(
+                        heap, (-commit_time(parent_commit), counter, parent_commit)
+                    )
+                    counter += 1
+
+    def abbrev_length(self) -> int:
+        """
+        Length of abbreviated object ids, following Git's core.abbrev=auto.
+
+        Returns:
+            Number of hex digits (at least 7)
+        """
+        count = self.object_count
+        return max(7, (count.bit_length() + 2) // 2)
+
+    def close(self) -> None:
+        """Release all memory mappings."""
+        with self._lock:
+            for pack in self._packs.values():
+                pack.close()
+            self._packs.clear()
+            self._pack_dir_mtime = None
+        for alternate in self._alternates:
+            alternate.close()
+
+
+def commit_time(commit: GitCommit) -> int:
+    """
+    Get the committer timestamp of a commit.
+
+    Args:
+        commit: Parsed commit
+
+    Returns:
+        Seconds since the epoch, or 0 if the committer line is malformed
+    """
+    parts = commit.committer.rsplit(" ", 2)
+    try:
+        return int(parts[-2])
+    except (IndexError, ValueError):
+        return 0
+
+
+_databases: Dict[str, ObjectDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_object_database(path: str = ".") -> Optional[ObjectDatabase]:
+    """
+    Get a cached ObjectDatabase for the repository containing path.
+
+    Args:
+        path: Directory inside the repository
+
+    Returns:
+        ObjectDatabase, or None if path is not inside a repository
+    """
+    dirs = discover_git_dirs(path)
+    if dirs is None:
+        return None
+    objects_dir = os.environ.get("GIT_OBJECT_DIRECTORY") or os.path.join(
+        dirs.common_dir, "objects"
+    )
+    with _databases_lock:
+        odb = _databases.get(objects_dir)
+        if odb is None:
+            config = _parse_config(os.path.join(dirs.common_dir, "config"))
+            object_format = config.get(("extensions", "objectformat"), "sha1")
+            oid_size = 32 if object_format.lower() == "sha256" else 20
+            odb = ObjectDatabase(objects_dir, oid_size=oid_size)
+            _databases[objects_dir] = odb
+        return odb
+
+
+def get_recent_commits(limit: int = 5, path: str = ".") -> Optional[List[str]]:
+    """
+    List recent commits like ``git log --oneline -n <limit>``.
+
+    Args:
+        limit: Maximum number of commits
+        path: Directory inside the repository
+
+    Returns:
+        Lines of "<abbreviated id> <subject>", an empty list for a repository
+        without commits, or None if history cannot be read in-process
+    """
+    try:
+        reader = get_ref_reader(path)
+        odb = get_object_database(path)
+        if reader is None or odb is None:
+            return None
+        head = reader.read_head().oid
+        if head is None:
+            return []
+        abbrev = odb.abbrev_length()
+        lines = []
+        for commit in odb.iter_commits([head]):
+            lines.append(f"{commit.oid[:abbrev]} {commit.subject}")
+            if len(lines) >= limit:
+                break
+        return lines if lines else None
+    except (OSError, ValueError, ObjectDatabaseError):
+        return None
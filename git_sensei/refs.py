@@ -0,0 +1,539 @@
+"""
+Reference reading module for Git sensei.
+
+This module reads HEAD, loose refs and packed-refs straight from the
+repository's git directory, so branch and tag lookups do not need to spawn
+a Git process. Linked worktrees (``.git`` files and ``commondir``) are
+supported, and sorted packed-refs files are searched in place through mmap.
+"""
+
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Refs that live in the per-worktree git directory rather than the common one
+_PER_WORKTREE_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+
+_MAX_SYMREF_DEPTH = 5
+
+
+@dataclass
+class GitDirs:
+    """
+    Locations that make up a repository.
+
+    Attributes:
+        git_dir: Per-worktree git directory (holds HEAD and the index)
+        common_dir: Directory shared by all worktrees (holds refs and objects)
+        work_tree: Top-level directory of the working tree, None if bare
+    """
+
+    git_dir: str
+    common_dir: str
+    work_tree: Optional[str]
+
+
+@dataclass
+class Head:
+    """
+    Parsed contents of HEAD.
+
+    Attributes:
+        target: Full ref name HEAD points to, None if HEAD is detached
+        oid: Commit id HEAD resolves to, None for an unborn branch
+    """
+
+    target: Optional[str]
+    oid: Optional[str]
+
+    @property
+    def detached(self) -> bool:
+        """True if HEAD points directly at a commit."""
+        return self.target is None
+
+
+def _read_git_file(path: str) -> Optional[str]:
+    """Read the target of a ``.git`` file ("gitdir: <path>")."""
+    try:
+        with open(path, encoding="utf-8") as git_file:
+            content = git_file.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    target = content[len("gitdir:") :].strip()
+    return os.path.normpath(os.path.join(os.path.dirname(path), target))
+
+
+def _common_dir(git_dir: str) -> str:
+    """Resolve the common directory of a (possibly linked) git directory."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as f:
+            common = f.read().strip()
+    except OSError:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, common))
+
+
+def discover_git_dirs(start: str = ".") -> Optional[GitDirs]:
+    """
+    Find the repository containing a directory.
+
+    Walks up from start looking for a ``.git`` directory or file. The
+    GIT_DIR and GIT_WORK_TREE environment variables take precedence, as
+    they do for Git itself.
+
+    Args:
+        start: Directory to start searching from
+
+    Returns:
+        GitDirs for the enclosing repository, or None if there is none
+    """
+    env_git_dir = os.environ.get("GIT_DIR")
+    if env_git_dir:
+        git_dir = os.path.abspath(env_git_dir)
+        if not os.path.isfile(os.path.join(git_dir, "HEAD")):
+            return None
+        work_tree = os.environ.get("GIT_WORK_TREE")
+        return GitDirs(
+            git_dir=git_dir,
+            common_dir=_common_dir(git_dir),
+            work_tree=os.path.abspath(work_tree) if work_tree else None,
+        )
+
+    current = os.path.abspath(start)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        found: Optional[str] = None
+        if os.path.isdir(dot_git):
+            found = dot_git
+        elif os.path.isfile(dot_git):
+            found = _read_git_file(dot_git)
+        if found and os.path.isfile(os.path.join(found, "HEAD")):
+            return GitDirs(
+                git_dir=found, common_dir=_common_dir(found), work_tree=current
+            )
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class PackedRefs:
+    """
+    Memory-mapped ``packed-refs`` file.
+
+    Lookups use binary search when the file declares the "sorted" trait (as
+    every Git since 2.15 writes it) and fall back to a one-time linear scan
+    otherwise. The mapping is reopened automatically when the file changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._map: Optional[mmap.mmap] = None
+        self._start = 0
+        self._sorted = False
+        self._index: Optional[Dict[bytes, Tuple[str, Optional[str]]]] = None
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._close_map()
+            self._stamp = None
+            return
+        stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if stamp == self._stamp:
+            return
+
+        self._close_map()
+        self._stamp = stamp
+        self._index = None
+        self._start = 0
+        self._sorted = False
+        if stat.st_size == 0:
+            return
+        with open(self.path, "rb") as packed_file:
+            buf = mmap.mmap(packed_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map = buf
+        if buf[:1] == b"#":
+            header_end = buf.find(b"\n")
+            header = buf[: header_end if header_end >= 0 else len(buf)]
+            self._sorted = b" sorted" in header
+            self._start = header_end + 1 if header_end >= 0 else len(buf)
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    @staticmethod
+    def _record_at(
+        buf: mmap.mmap, start: int
+    ) -> Tuple[bytes, bytes, Optional[bytes], int]:
+        """Parse the record starting at start; returns (name, oid, peeled, next)."""
+        end = buf.find(b"\n", start)
+        if end < 0:
+            end = len(buf)
+        oid, _, name = buf[start:end].partition(b" ")
+        peeled = None
+        next_start = end + 1
+        if buf[next_start : next_start + 1] == b"^":
+            peel_end = buf.find(b"\n", next_start)
+            if peel_end < 0:
+                peel_end = len(buf)
+            peeled = buf[next_start + 1 : peel_end]
+            next_start = peel_end + 1
+        return name, oid, peeled, next_start
+
+    def _binary_search(
+        self, buf: mmap.mmap, refname: bytes
+    ) -> Optional[Tuple[bytes, Optional[bytes]]]:
+        lo, hi = self._start, len(buf)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = buf.rfind(b"\n", lo, mid) + 1
+            start = max(start, lo)
+            if buf[start : start + 1] == b"^":
+                # Landed on a peel line; back up to the record it belongs to
+                start = max(buf.rfind(b"\n", lo, start - 1) + 1, lo)
+            name, oid, peeled, next_start = self._record_at(buf, start)
+            if name == refname:
+                return oid, peeled
+            if name < refname:
+                lo = next_start
+            else:
+                hi = start
+        return None
+
+    def _build_index(self, buf: mmap.mmap) -> Dict[bytes, Tuple[str, Optional[str]]]:
+        index: Dict[bytes, Tuple[str, Optional[str]]] = {}
+        pos = self._start
+        while pos < len(buf):
+            if buf[pos : pos + 1] in (b"#", b"^", b"\n"):
+                pos = buf.find(b"\n", pos) + 1 or len(buf)
+                continue
+            name, oid, peeled, pos = self._record_at(buf, pos)
+            index[name] = (
+                oid.decode("ascii"),
+                peeled.decode("ascii") if peeled else None,
+            )
+        return index
+
+    def lookup(self, refname: str) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Find a ref in packed-refs.
+
+        Args:
+            refname: Full ref name, e.g. "refs/heads/main"
+
+        Returns:
+            Tuple of (object id, peeled object id or None), or None if absent
+        """
+        with self._lock:
+            self._refresh()
+            buf = self._map
+            if buf is None:
+                return None
+            key = refname.encode("utf-8")
+            if self._sorted:
+                found = self._binary_search(buf, key)
+                if found is None:
+                    return None
+                oid, peeled = found
+                return oid.decode("ascii"), peeled.decode("ascii") if peeled else None
+            if self._index is None:
+                self._index = self._build_index(buf)
+            return self._index.get(key)
+
+    def names(self, prefix: str = "") -> List[str]:
+        """List packed ref names starting with prefix."""
+        with self._lock:
+            self._refresh()
+            buf = self._map
+            if buf is None:
+                return []
+            if self._index is None:
+                self._index = self._build_index(buf)
+            raw = prefix.encode("utf-8")
+            return [
+                name.decode("utf-8") for name in self._index if name.startswith(raw)
+            ]
+
+    def close(self) -> None:
+        """Release the memory mapping."""
+        with self._lock:
+            self._close_map()
+            self._stamp = None
+
+
+def _parse_config(path: str) -> Dict[Tuple[str, str], str]:
+    """
+    Read ``section.subsection.key`` values from a Git config file.
+
+    Only the subset of the format needed for branch tracking lookups is
+    supported; later values override earlier ones.
+
+    Args:
+        path: Path of the config file
+
+    Returns:
+        Mapping of ("section.subsection", key) to value
+    """
+    values: Dict[Tuple[str, str], str] = {}
+    try:
+        with open(path, encoding="utf-8", errors="surrogateescape") as config:
+            lines = config.read().splitlines()
+    except OSError:
+        return values
+
+    section = ""
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1 : line.index("]")] if "]" in line else line[1:]
+            name, _, sub = header.partition(" ")
+            sub = sub.strip()
+            if sub.startswith('"') and sub.endswith('"'):
+                sub = sub[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+            section = f"{name.lower()}.{sub}" if sub else name.lower()
+            continue
+        key, sep, value = line.partition("=")
+        value = value.strip() if sep else "true"
+        if value.startswith('"') and value.endswith('"') and len(value) > 1:
+            value = value[1:-1]
+        values[(section, key.strip().lower())] = value
+    return values
+
+
+class RefReader:
+    """
+    Reads references of one repository without spawning Git.
+
+    Args:
+        dirs: Repository locations, usually from discover_git_dirs()
+    """
+
+    def __init__(self, dirs: GitDirs):
+        self.dirs = dirs
+        self.packed = PackedRefs(os.path.join(dirs.common_dir, "packed-refs"))
+
+    def _ref_path(self, refname: str) -> str:
+        if refname.startswith(_PER_WORKTREE_PREFIXES) or not refname.startswith(
+            "refs/"
+        ):
+            return os.path.join(self.dirs.git_dir, refname)
+        return os.path.join(self.dirs.common_dir, refname)
+
+    def _read_loose(self, refname: str) -> Optional[str]:
+        try:
+            with open(self._ref_path(refname), encoding="utf-8") as ref_file:
+                return ref_file.read().strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def read_ref(self, refname: str) -> Optional[str]:
+        """
+        Read a ref without following symbolic refs.
+
+        Args:
+            refname: Full ref name, e.g. "refs/heads/main" or "HEAD"
+
+        Returns:
+            "ref: <target>" for symbolic refs, the object id otherwise, or
+            None if the ref does not exist
+        """
+        loose = self._read_loose(refname)
+        if loose:
+            return loose
+        if refname.startswith("refs/"):
+            packed = self.packed.lookup(refname)
+            if packed is not None:
+                return packed[0]
+        return None
+
+    def resolve_ref(self, refname: str) -> Optional[str]:
+        """
+        Resolve a ref to an object id, following symbolic refs.
+
+        Args:
+            refname: Full ref name
+
+        Returns:
+            Object id, or None if the ref (or its target) does not exist
+        """
+        for _ in range(_MAX_SYMREF_DEPTH):
+            value = self.read_ref(refname)
+            if value is None:
+                return None
+            if not value.startswith("ref:"):
+                return value
+            refname = value[len("ref:") :].strip()
+        return None
+
+    def read_head(self) -> Head:
+        """
+        Read HEAD.
+
+        Returns:
+            Head with the branch HEAD points to and the commit it resolves to
+        """
+        value = self.read_ref("HEAD") or ""
+        if value.startswith("ref:"):
+            target = value[len("ref:") :].strip()
+            return Head(target=target, oid=self.resolve_ref(target))
+        return Head(target=None, oid=value or None)
+
+    def current_branch(self) -> Optional[str]:
+        """
+        Get the checked-out branch name, like ``git branch --show-current``.
+
+        Returns:
+            Short branch name (also for unborn branches), None if detached
+        """
+        head = self.read_head()
+        if head.target and head.target.startswith("refs/heads/"):
+            return head.target[len("refs/heads/") :]
+        return None
+
+    def is_detached(self) -> bool:
+        """True if HEAD points directly at a commit."""
+        return self.read_head().detached
+
+    def upstream(self, branch: Optional[str] = None) -> Optional[str]:
+        """
+        Get the upstream of a branch, like ``git rev-parse --abbrev-ref @{u}``.
+
+        Args:
+            branch: Short branch name, defaults to the current branch
+
+        Returns:
+            Short upstream name such as "origin/main", or None if not set
+        """
+        branch = branch or self.current_branch()
+        if not branch:
+            return None
+        config = _parse_config(os.path.join(self.dirs.common_dir, "config"))
+        remote = config.get((f"branch.{branch}", "remote"))
+        merge = config.get((f"branch.{branch}", "merge"))
+        if not remote or not merge:
+            return None
+        merge_branch = (
+            merge[len("refs/heads/") :] if merge.startswith("refs/heads/") else merge
+        )
+        if remote == ".":
+            return merge_branch
+        return f"{remote}/{merge_branch}"
+
+    def lookup_tag(self, name: str, peel: bool = False) -> Optional[str]:
+        """
+        Look up a tag.
+
+        Args:
+            name: Tag name without the "refs/tags/" prefix
+            peel: Return the object an annotated tag points to when known
+
+        Returns:
+            Object id of the tag (or its peeled target), None if absent
+        """
+        refname = f"refs/tags/{name}"
+        loose = self._read_loose(refname)
+        if loose:
+            return loose
+        packed = self.packed.lookup(refname)
+        if packed is None:
+            return None
+        oid, peeled = packed
+        return peeled if peel and peeled else oid
+
+    def list_refs(self, prefix: str = "refs/") -> List[str]:
+        """
+        List ref names below a prefix, merging loose and packed refs.
+
+        Args:
+            prefix: Ref name prefix, e.g. "refs/heads/"
+
+        Returns:
+            Sorted list of full ref names
+        """
+        names = set(self.packed.names(prefix))
+        # Shared refs live in the common directory; in a linked worktree the
+        # per-worktree namespaces there belong to the main worktree
+        for refname in self._walk_loose(self.dirs.common_dir, prefix):
+            if not refname.startswith(_PER_WORKTREE_PREFIXES):
+                names.add(refname)
+        for namespace in _PER_WORKTREE_PREFIXES:
+            if namespace.startswith(prefix) or prefix.startswith(namespace):
+                names.update(self._walk_loose(self.dirs.git_dir, prefix, namespace))
+        return sorted(names)
+
+    @staticmethod
+    def _walk_loose(directory: str, prefix: str, namespace: str = "refs/") -> List[str]:
+        """List the loose refs below prefix and namespace in one directory."""
+        start = prefix if prefix.startswith(namespace) else namespace
+        # A prefix may end inside a ref name ("refs/heads/ma"); walk the
+        # directory holding it and let the startswith filter do the rest
+        start = start[: start.rfind("/") + 1]
+        base = os.path.join(directory, start.rstrip("/") or "refs")
+        refs = os.path.join(directory, "refs")
+        names = []
+        for root, _dirs, files in os.walk(base):
+            for filename in files:
+                full = os.path.join(root, filename)
+                refname = "refs/" + os.path.relpath(full, refs).replace(os.sep, "/")
+                if refname.startswith(prefix) and not filename.endswith(".lock"):
+                    names.append(refname)
+        return names
+
+    def close(self) -> None:
+        """Release resources held by the reader."""
+        self.packed.close()
+
+
+_readers: Dict[str, RefReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_ref_reader(path: str = ".") -> Optional[RefReader]:
+    """
+    Get a cached RefReader for the repository containing path.
+
+    Args:
+        path: Directory inside the repository
+
+    Returns:
+        RefReader, or None if path is not inside a repository
+    """
+    dirs = discover_git_dirs(path)
+    if dirs is None:
+        return None
+    with _readers_lock:
+        reader = _readers.get(dirs.git_dir)
+        if reader is None:
+            reader = RefReader(dirs)
+            _readers[dirs.git_dir] = reader
+        return reader
+
+
+def get_current_branch(path: str = ".") -> Optional[str]:
+    """
+    Get the checked-out branch of the repository containing path.
+
+    Args:
+        path: Directory inside the repository
+
+    Returns:
+        Short branch name, or None if detached, unreadable or not a repository
+    """
+    try:
+        reader = get_ref_reader(path)
+        return reader.current_branch() if reader else None
+    except (OSError, ValueError):
+        return None
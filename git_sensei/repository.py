@@ -0,0 +1,146 @@
+"""
+Repository handle module for Git sensei.
+
+Git finds the repository of every command by walking up from the current
+directory, which costs a burst of stat calls per process and is slow on
+network filesystems. This module discovers the work tree, git dir and
+common dir once per directory and exposes them as the ``GIT_DIR`` and
+``GIT_WORK_TREE`` environment, so later Git processes skip discovery.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from .refs import GitDirs, discover_git_dirs
+
+
+class UnsafeRepositoryError(Exception):
+    """Custom exception for repositories not owned by the current user."""
+
+
+class Repository:
+    """
+    Repository whose locations have already been discovered.
+
+    Attributes:
+        dirs: Git, common and work tree directories of the repository
+    """
+
+    def __init__(self, dirs: GitDirs):
+        self.dirs = dirs
+
+    @property
+    def git_dir(self) -> str:
+        """Per-worktree git directory."""
+        return self.dirs.git_dir
+
+    @property
+    def common_dir(self) -> str:
+        """Directory shared by all worktrees."""
+        return self.dirs.common_dir
+
+    @property
+    def work_tree(self) -> Optional[str]:
+        """Top-level directory of the working tree, None if bare."""
+        return self.dirs.work_tree
+
+    @property
+    def environment(self) -> Dict[str, str]:
+        """Variables that point Git at this repository without discovery."""
+        env = {"GIT_DIR": self.git_dir}
+        if self.work_tree is not None:
+            env["GIT_WORK_TREE"] = self.work_tree
+        return env
+
+    def __repr__(self) -> str:
+        return f"Repository(git_dir={self.git_dir!r}, work_tree={self.work_tree!r})"
+
+
+_CacheKey = Tuple[str, int, int, Optional[str], Optional[str]]
+
+_repositories: Dict[_CacheKey, Repository] = {}
+_repositories_lock = threading.Lock()
+
+
+def _ownership_problem(dirs: GitDirs) -> Optional[str]:
+    """
+    Check that the repository passes Git's ``safe.directory`` ownership rule.
+
+    Git skips that check for an explicit GIT_DIR, so only repositories it
+    would accept anyway are pinned. Where ownership cannot be checked
+    (e.g. Windows) nothing is pinned.
+
+    Returns:
+        Why the repository fails the rule, None if it is owned by the
+        current user
+    """
+    if not hasattr(os, "geteuid"):
+        return "ownership cannot be checked on this platform"
+    uid = os.geteuid()
+    paths = [dirs.git_dir] if dirs.work_tree is None else [dirs.git_dir, dirs.work_tree]
+    for path in paths:
+        try:
+            owner = os.stat(path).st_uid
+        except OSError as e:
+            return f"cannot check the owner of {path}: {e.strerror}"
+        if owner != uid:
+            return f"{path} is not owned by the current user"
+    return None
+
+
+def get_repository(path: str = ".", strict: bool = False) -> Optional[Repository]:
+    """
+    Get a cached handle for the repository containing path.
+
+    Handles are cached by directory path and inode, so a directory that is
+    removed and recreated under the same name is discovered again. Only
+    found repositories are cached; a directory that is not (yet) inside a
+    repository is searched again on the next call.
+
+    Args:
+        path: Directory inside the repository
+        strict: Raise UnsafeRepositoryError for a repository that is not
+            owned by the current user instead of returning None
+
+    Returns:
+        Repository, or None if path is not inside a repository owned by
+        the current user
+
+    Raises:
+        UnsafeRepositoryError: If strict is True and the repository fails
+            Git's safe.directory ownership rule
+    """
+    try:
+        directory = os.path.abspath(path)
+        info = os.stat(directory)
+    except OSError:
+        return None
+    key = (
+        directory,
+        info.st_dev,
+        info.st_ino,
+        os.environ.get("GIT_DIR"),
+        os.environ.get("GIT_WORK_TREE"),
+    )
+    with _repositories_lock:
+        repository = _repositories.get(key)
+    if repository is not None:
+        return repository
+
+    dirs = discover_git_dirs(directory)
+    if dirs is None:
+        return None
+    problem = _ownership_problem(dirs)
+    if problem is not None:
+        if strict:
+            raise UnsafeRepositoryError(f"Unsafe repository ownership: {problem}")
+        return None
+    with _repositories_lock:
+        return _repositories.setdefault(key, Repository(dirs))
+
+
+def clear_repository_cache() -> None:
+    """Forget all discovered repositories (e.g. after moving a .git directory)."""
+    with _repositories_lock:
+        _repositories.clear()
@@ -6,11 +6,17 @@ It analyzes Git commands for potentially destructive patterns and manages user c
 """
 
 import re
+import shlex
+from collections import Counter
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import typer
 
+from .commit_graph import RevWalker, get_rev_walker
+from .index import get_worktree_changes
+from .refs import RefReader, get_ref_reader
+
 
 @dataclass
 class SafetyCheck:
@@ -52,12 +58,14 @@ def load_dangerous_patterns() -> List[str]:
     ]
 
 
-def check_command_safety(command: str) -> SafetyCheck:
+def check_command_safety(command: str, describe_repository: bool = True) -> SafetyCheck:
     """
     Analyze command for dangerous patterns.
 
     Args:
         command: Git command string to analyze
+        describe_repository: Add what the command would lose in the current
+            repository (uncommitted files, unreachable commits) to the warning
 
     Returns:
         SafetyCheck object with analysis results
@@ -73,10 +81,13 @@ def check_command_safety(command: str) -> SafetyCheck:
         # Normalize command for pattern matching
         normalized_command = command.lower().strip()
 
-        # Check each dangerous pattern
+        # Check each dangerous pattern; case-sensitive flags such as
+        # "branch -D" are matched against the original command
         for pattern in dangerous_patterns:
             try:
-                if re.search(pattern, normalized_command):
+                if re.search(pattern, normalized_command) or re.search(
+                    pattern, command.strip()
+                ):
                     found_patterns.append(pattern)
             except Exception:  # pylint: disable=broad-exception-caught
                 # If regex fails for this pattern, skip it and continue
@@ -84,6 +95,8 @@ def check_command_safety(command: str) -> SafetyCheck:
 
         if found_patterns:
             warning_message = _generate_warning_message(found_patterns)
+            if describe_repository:
+                warning_message += _describe_repository(command, found_patterns)
             return SafetyCheck(
                 is_safe=False,
                 dangerous_patterns=found_patterns,
@@ -148,6 +161,212 @@ def _generate_warning_message(patterns: List[str]) -> str:
     )
 
 
+def _describe_repository(command: str, patterns: List[str]) -> str:
+    """
+    Describe what the matched patterns would lose in the current repository.
+
+    Args:
+        command: Git command string being checked
+        patterns: Dangerous patterns found in the command
+
+    Returns:
+        Sentences to append to the warning message, possibly empty
+    """
+    details = ""
+    if r"reset\s+--hard" in patterns:
+        details += _describe_uncommitted_changes()
+    if r"push\s+(-f|--force)" in patterns:
+        details += _describe_force_push(command)
+    if r"branch\s+(-D|--delete\s+--force)" in patterns:
+        details += _describe_branch_delete(command)
+    return details
+
+
+def _describe_uncommitted_changes(limit: int = 5) -> str:
+    """
+    Describe staged and unstaged changes in the current repository.
+
+    Args:
+        limit: Maximum number of paths to name
+
+    Returns:
+        Sentence listing the affected files, or an empty string if the
+        index and working tree are clean or their state cannot be determined
+    """
+    try:
+        changes = get_worktree_changes()
+    except Exception:  # pylint: disable=broad-exception-caught
+        return ""
+    if changes is None or not changes.dirty:
+        return ""
+
+    paths = list(
+        dict.fromkeys(
+            changes.modified + changes.deleted + changes.unmerged + changes.staged
+        )
+    )
+    listed = ", ".join(paths[:limit])
+    if len(paths) > limit:
+        listed += f" and {len(paths) - limit} more"
+    noun = "file" if len(paths) == 1 else "files"
+    return (
+        f" Uncommitted changes to {len(paths)} tracked {noun} will be lost: {listed}."
+    )
+
+
+def _subcommand_args(command: str, subcommand: str) -> Tuple[List[str], List[str]]:
+    """
+    Split the arguments following a Git subcommand into options and operands.
+
+    Args:
+        command: Full command string, with or without the "git" prefix
+        subcommand: Subcommand whose arguments to return
+
+    Returns:
+        Tuple of (options, positional arguments)
+    """
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        tokens = command.split()
+    if subcommand not in tokens:
+        return [], []
+    args = tokens[tokens.index(subcommand) + 1 :]
+    options = [arg for arg in args if arg.startswith("-")]
+    operands = [arg for arg in args if not arg.startswith("-")]
+    return options, operands
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+
+def _describe_force_push(command: str) -> str:
+    """
+    Describe remote commits that a force push would discard.
+
+    Compares the remote-tracking branch being overwritten with the commit
+    being pushed, using the commit-graph when one is available.
+
+    Args:
+        command: Force push command string
+
+    Returns:
+        Sentence naming the number of commits lost, or an empty string if
+        nothing would be lost or it cannot be determined
+    """
+    try:
+        reader = get_ref_reader()
+        walker = get_rev_walker()
+        if reader is None or walker is None:
+            return ""
+        _, operands = _subcommand_args(command, "push")
+        branch = reader.current_branch()
+        if len(operands) >= 2:
+            source, _, destination = operands[1].lstrip("+").partition(":")
+            destination = destination or source
+            tracking = f"{operands[0]}/{_short_branch(destination)}"
+        elif operands:
+            if branch is None:
+                return ""
+            source = branch
+            tracking = f"{operands[0]}/{branch}"
+        else:
+            if branch is None:
+                return ""
+            source = branch
+            upstream = reader.upstream(branch)
+            if upstream is None or "/" not in upstream:
+                return ""
+            tracking = upstream
+
+        old = _resolve_commit(reader, walker, f"refs/remotes/{tracking}")
+        new = _resolve_commit(reader, walker, source)
+        if old is None or new is None:
+            return ""
+        lost = len(walker.unique_commits([old], [new]))
+    except Exception:  # pylint: disable=broad-exception-caught
+        return ""
+    if not lost:
+        return ""
+    return (
+        f" {_plural(lost, 'commit')} on {tracking} not contained in {source} "
+        "would be removed from the remote."
+    )
+
+
+def _describe_branch_delete(command: str) -> str:
+    """
+    Describe commits that force-deleting branches would leave unreachable.
+
+    Args:
+        command: Branch deletion command string
+
+    Returns:
+        Sentence per branch naming the number of commits not reachable from
+        any other ref, or an empty string if none would be lost or the refs
+        cannot all be read
+    """
+    try:
+        reader = get_ref_reader()
+        walker = get_rev_walker()
+        if reader is None or walker is None:
+            return ""
+        _, names = _subcommand_args(command, "branch")
+        refs = reader.list_refs("refs/")
+        head = reader.read_head()
+        if head.oid is not None and head.target and head.target not in refs:
+            # A ref list missing the checked-out branch would report commits
+            # that other refs still hold as lost
+            return ""
+        # Resolve every ref once; each branch is then checked against the
+        # tips of all the others
+        tips: Dict[str, str] = {}
+        for other in refs:
+            oid = _resolve_commit(reader, walker, other)
+            if oid is not None:
+                tips[other] = oid
+        if head.oid is not None and head.target is None:
+            tips["HEAD"] = head.oid
+        holders = Counter(tips.values())
+        keep = set(holders)
+        descriptions = []
+        for name in names:
+            refname = f"refs/heads/{_short_branch(name)}"
+            if refname not in refs:
+                if _resolve_commit(reader, walker, refname) is None:
+                    continue
+                return ""
+            tip = tips.get(refname)
+            if tip is None:
+                continue
+            others = keep if holders[tip] > 1 else keep - {tip}
+            lost = len(walker.unique_commits([tip], others))
+            if lost:
+                descriptions.append(
+                    f" Branch '{name}' has {_plural(lost, 'commit')} not reachable "
+                    "from any other branch or tag."
+                )
+        return "".join(descriptions)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return ""
+
+
+def _short_branch(name: str) -> str:
+    return name[len("refs/heads/") :] if name.startswith("refs/heads/") else name
+
+
+def _resolve_commit(reader: RefReader, walker: RevWalker, name: str) -> Optional[str]:
+    """Resolve a ref name, branch name or HEAD to a commit id."""
+    if name == "HEAD":
+        oid = reader.read_head().oid
+    elif name.startswith("refs/"):
+        oid = reader.resolve_ref(name)
+    else:
+        oid = reader.resolve_ref(f"refs/heads/{name}")
+    return walker.peel(oid) if oid else None
+
+
 def get_user_confirmation(warning_message: str) -> bool:
     """
     Prompt user for confirmation of dangerous operation.
@@ -0,0 +1,384 @@
+"""
+Status parsing module for Git sensei.
+
+This module parses the output of ``git status --porcelain=v2 -z --branch
+--show-stash`` into a compact, column-oriented model shared by the context,
+safety and CLI code. Entry types and status letters are stored as single
+bytes in ``array`` columns, paths are interned strings, and individual
+entries are exposed through lightweight views.
+"""
+
+import sys
+from array import array
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .git_ops import GitResult, execute_git_command
+
+STATUS_COMMAND = "git status --porcelain=v2 -z --branch --show-stash"
+
+# Entry types, stored as the byte that starts each record
+ENTRY_ORDINARY = ord("1")
+ENTRY_RENAMED = ord("2")
+ENTRY_UNMERGED = ord("u")
+ENTRY_UNTRACKED = ord("?")
+ENTRY_IGNORED = ord("!")
+
+_TRACKED_TYPES = b"12u"
+_UNTRACKED_TYPES = b"?!"
+
+# Number of space separated fields before the path of each tracked type
+_PATH_FIELDS = {ENTRY_ORDINARY: 8, ENTRY_RENAMED: 9, ENTRY_UNMERGED: 10}
+
+
+class StatusParseError(Exception):
+    """Custom exception for malformed porcelain v2 status output."""
+
+
+class StatusEntry:
+    """
+    View of one entry of a GitStatus.
+
+    Entries are created on demand and read from the columns of the status
+    they belong to, so iterating over a large status allocates no per-entry
+    state beyond the view itself.
+    """
+
+    __slots__ = ("_status", "_index")
+
+    def __init__(self, status: "GitStatus", index: int):
+        self._status = status
+        self._index = index
+
+    @property
+    def type(self) -> str:
+        """Record type: "1", "2", "u", "?" or "!"."""
+        return chr(self._status.types[self._index])
+
+    @property
+    def index_status(self) -> str:
+        """Status letter of the index ("." if unchanged)."""
+        return chr(self._status.index_codes[self._index])
+
+    @property
+    def worktree_status(self) -> str:
+        """Status letter of the working tree ("." if unchanged)."""
+        return chr(self._status.worktree_codes[self._index])
+
+    @property
+    def path(self) -> str:
+        """Path relative to the top of the working tree."""
+        return self._status.paths[self._index]
+
+    @property
+    def orig_path(self) -> Optional[str]:
+        """Path before a rename or copy, None for other entries."""
+        return self._status.orig_paths.get(self._index)
+
+    @property
+    def staged(self) -> bool:
+        """True if the index differs from HEAD for this tracked path."""
+        return self._status.types[self._index] in (
+            ENTRY_ORDINARY,
+            ENTRY_RENAMED,
+        ) and self._status.index_codes[self._index] != ord(".")
+
+    @property
+    def unstaged(self) -> bool:
+        """True if the working tree differs from the index for this path."""
+        return self._status.types[self._index] in (
+            ENTRY_ORDINARY,
+            ENTRY_RENAMED,
+        ) and self._status.worktree_codes[self._index] != ord(".")
+
+    def short_format(self) -> str:
+        """Format the entry like a line of ``git status --short``."""
+        kind = self._status.types[self._index]
+        if kind in (ENTRY_UNTRACKED, ENTRY_IGNORED):
+            return f"{chr(kind) * 2} {self.path}"
+        codes = (self.index_status + self.worktree_status).replace(".", " ")
+        if self.orig_path is not None:
+            return f"{codes} {self.orig_path} -> {self.path}"
+        return f"{codes} {self.path}"
+
+    def __repr__(self) -> str:
+        return (
+            f"StatusEntry(type={self.type!r}, index_status={self.index_status!r}, "
+            f"worktree_status={self.worktree_status!r}, path={self.path!r})"
+        )
+
+
+class GitStatus:
+    """
+    Parsed ``git status --porcelain=v2`` output.
+
+    Entries are stored column by column; index them or iterate to get
+    StatusEntry views.
+
+    Attributes:
+        oid: Commit id of HEAD, None on an unborn branch
+        head: Current branch name, None when HEAD is detached
+        upstream: Upstream branch (e.g. "origin/main"), None if not set
+        ahead: Commits on the branch not on its upstream, None if unknown
+        behind: Commits on the upstream not on the branch, None if unknown
+        stash_count: Number of stash entries, 0 if not reported
+        types: Record type of each entry (ENTRY_* values)
+        index_codes: Index status letter of each entry as a byte value
+        worktree_codes: Working tree status letter of each entry as a byte value
+        paths: Interned path of each entry
+        orig_paths: Original path of renamed or copied entries, by position
+    """
+
+    __slots__ = (
+        "oid",
+        "head",
+        "upstream",
+        "ahead",
+        "behind",
+        "stash_count",
+        "types",
+        "index_codes",
+        "worktree_codes",
+        "paths",
+        "orig_paths",
+    )
+
+    def __init__(self) -> None:
+        self.oid: Optional[str] = None
+        self.head: Optional[str] = None
+        self.upstream: Optional[str] = None
+        self.ahead: Optional[int] = None
+        self.behind: Optional[int] = None
+        self.stash_count = 0
+        self.types = array("B")
+        self.index_codes = array("B")
+        self.worktree_codes = array("B")
+        self.paths: List[str] = []
+        self.orig_paths: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, index: int) -> StatusEntry:
+        if index < 0:
+            index += len(self.paths)
+        if not 0 <= index < len(self.paths):
+            raise IndexError("status entry index out of range")
+        return StatusEntry(self, index)
+
+    def __iter__(self) -> Iterator[StatusEntry]:
+        for index in range(len(self.paths)):
+            yield StatusEntry(self, index)
+
+    def count(self, entry_type: int) -> int:
+        """Number of entries of one ENTRY_* type."""
+        return self.types.count(entry_type)
+
+    @property
+    def is_clean(self) -> bool:
+        """True if there are no tracked changes, conflicts or untracked files."""
+        return self.types.count(ENTRY_IGNORED) == len(self.types)
+
+    def short_format(self) -> str:
+        """Format the entries like ``git status --short``, one per line."""
+        return "\n".join(entry.short_format() for entry in self)
+
+    def _read_header(self, record: bytes) -> None:
+        """Apply one "# name value" header record."""
+        name, _, value = record[2:].decode("utf-8", "surrogateescape").partition(" ")
+        if name == "branch.oid":
+            self.oid = None if value == "(initial)" else value
+        elif name == "branch.head":
+            self.head = None if value == "(detached)" else value
+        elif name == "branch.upstream":
+            self.upstream = value
+        elif name == "branch.ab":
+            ahead, _, behind = value.partition(" ")
+            try:
+                self.ahead = int(ahead.lstrip("+"))
+                self.behind = int(behind.lstrip("-"))
+            except ValueError as e:
+                raise StatusParseError(f"Invalid branch.ab header: {value}") from e
+        elif name == "stash":
+            try:
+                self.stash_count = int(value)
+            except ValueError as e:
+                raise StatusParseError(f"Invalid stash header: {value}") from e
+
+
+def parse_status(data: Union[bytes, bytearray, memoryview, str]) -> GitStatus:
+    """
+    Parse ``git status --porcelain=v2 -z --branch --show-stash`` output.
+
+    Each step works on the whole buffer at once: one split on NUL, then
+    column extraction with ``map``/``itemgetter`` and a single decode of all
+    paths. Git prints tracked entries before untracked and ignored ones,
+    and type-1 records put the path at a fixed offset, so only renames and
+    conflicts need handling one by one.
+
+    Args:
+        data: Raw output; memoryviews and mmaps are accepted, and text is
+            encoded back as UTF-8
+
+    Returns:
+        GitStatus with headers and entries
+
+    Raises:
+        StatusParseError: If the output is not porcelain v2 with -z
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogateescape")
+    elif not isinstance(data, bytes):
+        data = memoryview(data).tobytes()
+    status = GitStatus()
+    records = data.split(b"\0")
+    if records and not records[-1]:
+        records.pop()
+
+    start = 0
+    while start < len(records) and records[start][:2] == b"# ":
+        status._read_header(records[start])  # pylint: disable=protected-access
+        start += 1
+    if start:
+        del records[:start]
+    if not records:
+        return status
+
+    try:
+        types = bytes(map(itemgetter(0), records))
+    except IndexError as e:
+        raise StatusParseError("Empty status record") from e
+
+    orig_records: Dict[int, bytes] = {}
+    if b"2" in types:
+        records, types = _fold_renames(records, types, orig_records)
+
+    # Tracked entries come first, then untracked, then ignored ones
+    split = len(types)
+    for kind in _UNTRACKED_TYPES:
+        position = types.find(bytes([kind]))
+        if position != -1:
+            split = min(split, position)
+    if types[:split].translate(None, _TRACKED_TYPES) or types[split:].translate(
+        None, _UNTRACKED_TYPES
+    ):
+        raise StatusParseError("Unexpected status record type or order")
+
+    try:
+        index_codes = bytes(map(itemgetter(2), islice(records, split))) + types[split:]
+        worktree_codes = (
+            bytes(map(itemgetter(3), islice(records, split))) + types[split:]
+        )
+        raw_paths = _tracked_paths(records, types, split)
+    except (IndexError, ValueError) as e:
+        raise StatusParseError("Truncated status record") from e
+    raw_paths.extend(map(itemgetter(slice(2, None)), islice(records, split, None)))
+
+    text = b"\0".join(raw_paths).decode("utf-8", "surrogateescape")
+    status.paths = list(map(sys.intern, text.split("\0")))
+    status.types = array("B", types)
+    status.index_codes = array("B", index_codes)
+    status.worktree_codes = array("B", worktree_codes)
+    status.orig_paths = {
+        i: sys.intern(path.decode("utf-8", "surrogateescape"))
+        for i, path in orig_records.items()
+    }
+    return status
+
+
+def _fold_renames(
+    records: List[bytes], types: bytes, orig_records: Dict[int, bytes]
+) -> Tuple[List[bytes], bytes]:
+    """
+    Remove the original-path records that follow each rename record.
+
+    Args:
+        records: Entry records after the headers
+        types: First byte of every record
+        orig_records: Filled with the original path of each rename, keyed by
+            entry position after folding
+
+    Returns:
+        Tuple of (records, types) without the original-path records
+    """
+    kept: List[bytes] = []
+    kept_types = bytearray()
+    previous = 0
+    position = types.find(b"2")
+    while position != -1:
+        if position + 1 >= len(records):
+            raise StatusParseError("Rename record without original path")
+        kept.extend(islice(records, previous, position + 1))
+        kept_types += types[previous : position + 1]
+        orig_records[len(kept) - 1] = records[position + 1]
+        previous = position + 2
+        position = types.find(b"2", previous)
+    kept.extend(islice(records, previous, None))
+    kept_types += types[previous:]
+    return kept, bytes(kept_types)
+
+
+def _tracked_paths(records: List[bytes], types: bytes, count: int) -> List[bytes]:
+    """
+    Extract the raw paths of the first count (tracked) records.
+
+    Args:
+        records: Entry records
+        types: First byte of every record
+        count: Number of tracked records at the start of records
+
+    Returns:
+        Path bytes of each tracked record
+    """
+    tracked = types[:count]
+    first = tracked.find(b"1")
+    if first == -1:
+        paths = [b""] * count
+    else:
+        # Modes and object ids have fixed widths, so every type-1 path
+        # starts where the first one does
+        sample = records[first]
+        offset = len(sample) - len(sample.split(b" ", 8)[8])
+        paths = list(map(itemgetter(slice(offset, None)), islice(records, count)))
+    for kind in (ENTRY_RENAMED, ENTRY_UNMERGED):
+        fields = _PATH_FIELDS[kind]
+        position = tracked.find(bytes([kind]))
+        while position != -1:
+            paths[position] = records[position].split(b" ", fields)[fields]
+            position = tracked.find(bytes([kind]), position + 1)
+    return paths
+
+
+def status_from_result(result: GitResult) -> GitStatus:
+    """
+    Parse the output of STATUS_COMMAND from a GitResult.
+
+    Args:
+        result: Successful result, captured in either text or bytes mode
+
+    Returns:
+        Parsed GitStatus
+    """
+    if result.stdout_bytes is not None:
+        return parse_status(result.stdout_bytes)
+    return parse_status(result.stdout)
+
+
+def get_status(untracked_files: str = "normal") -> Optional[GitStatus]:
+    """
+    Run ``git status`` in the current repository and parse its output.
+
+    Args:
+        untracked_files: Value for ``--untracked-files`` ("no", "normal"
+            or "all")
+
+    Returns:
+        GitStatus, or None if Git failed (e.g. outside a repository)
+    """
+    result = execute_git_command(
+        f"{STATUS_COMMAND} --untracked-files={untracked_files}", text=False
+    )
+    if not result.success:
+        return None
+    return status_from_result(result)
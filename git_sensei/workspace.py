@@ -0,0 +1,272 @@
+"""
+Workspace module for Git sensei.
+
+This module runs one Git command across many repositories at once. The
+repositories come from paths and glob patterns, given directly or listed
+in a workspace file; the command's safety is checked once and it then runs
+in every repository on a bounded thread pool, with results collected into
+a per-repository summary.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from glob import glob
+from typing import Any, Dict, Iterable, List, Optional
+
+from .git_ops import (
+    DEFAULT_BATCH_WORKERS,
+    GitCancellation,
+    GitResult,
+    execute_git_command,
+)
+from .repository import Repository, UnsafeRepositoryError, get_repository
+from .safety import check_command_safety
+
+# Characters that make a repository entry a glob pattern
+_GLOB_CHARACTERS = "*?["
+
+# Longest command output shown in a summary table cell
+_SUMMARY_WIDTH = 72
+
+
+class WorkspaceError(Exception):
+    """Custom exception for invalid repository lists and workspace commands."""
+
+
+@dataclass
+class RepoResult:
+    """
+    Outcome of running a command in one repository of a workspace.
+
+    Attributes:
+        path: Top-level directory (or git directory, if bare) of the repository
+        result: Result of the Git command in that repository
+    """
+
+    path: str
+    result: GitResult
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "repository": self.path,
+            "command": self.result.command,
+            "exit_code": self.result.exit_code,
+            "success": self.result.success,
+            "stdout": self.result.stdout,
+            "stderr": self.result.stderr,
+        }
+
+
+def load_workspace_file(path: str) -> List[str]:
+    """
+    Read the repository entries of a workspace file.
+
+    The file lists one repository path or glob pattern per line. Blank
+    lines and lines starting with "#" are ignored, and relative entries are
+    taken relative to the directory containing the file.
+
+    Args:
+        path: Path of the workspace file
+
+    Returns:
+        Repository paths and patterns in file order
+
+    Raises:
+        WorkspaceError: If the file cannot be read
+    """
+    try:
+        with open(path, encoding="utf-8") as workspace_file:
+            lines = workspace_file.read().splitlines()
+    except (OSError, UnicodeDecodeError) as e:
+        raise WorkspaceError(f"Cannot read workspace file {path}: {e}") from e
+
+    base = os.path.dirname(os.path.abspath(path))
+    return [
+        os.path.join(base, os.path.expanduser(entry))
+        for entry in (line.strip() for line in lines)
+        if entry and not entry.startswith("#")
+    ]
+
+
+def _top_level(repository: Repository) -> str:
+    """Directory that names a repository in a workspace."""
+    return repository.work_tree or repository.git_dir
+
+
+def resolve_repositories(entries: Iterable[str]) -> List[Repository]:
+    """
+    Turn repository paths and glob patterns into repository handles.
+
+    Patterns may use ``**`` to match nested directories. Directories a
+    pattern matches that are not the top of a repository are skipped,
+    while a literal path that is not one is an error. A repository that
+    is not owned by the current user, which Git refuses to work in, is an
+    error either way. A repository listed more than once is returned once,
+    at its first position.
+
+    Args:
+        entries: Repository paths and glob patterns
+
+    Returns:
+        Repositories in the order they were listed
+
+    Raises:
+        WorkspaceError: If a literal path is not the top of a repository,
+            or a repository is not owned by the current user
+    """
+    repositories: List[Repository] = []
+    seen = set()
+    for entry in entries:
+        entry = os.path.expanduser(entry)
+        is_pattern = any(char in entry for char in _GLOB_CHARACTERS)
+        paths = sorted(glob(entry, recursive=True)) if is_pattern else [entry]
+        for path in paths:
+            directory = os.path.realpath(path)
+            try:
+                repository = (
+                    get_repository(directory, strict=True)
+                    if os.path.isdir(directory)
+                    else None
+                )
+            except UnsafeRepositoryError as e:
+                raise WorkspaceError(f"{e} (listed as {entry})") from e
+            if repository is None or _top_level(repository) != directory:
+                if is_pattern:
+                    continue
+                raise WorkspaceError(f"Not the top of a Git repository: {entry}")
+            if repository.git_dir not in seen:
+                seen.add(repository.git_dir)
+                repositories.append(repository)
+    return repositories
+
+
+def run_in_repositories(
+    command: str,
+    repositories: Iterable[Repository],
+    max_workers: Optional[int] = None,
+    timeout: int = 30,
+    allow_dangerous: bool = False,
+) -> List[RepoResult]:
+    """
+    Run one Git command in every repository of a workspace.
+
+    The command's safety is checked once rather than once per repository.
+    Each repository is pinned explicitly, so the current directory does not
+    matter, and mutating commands in different repositories run in
+    parallel. If the caller is interrupted (e.g. by Ctrl+C), the commands
+    still running are killed and the rest are not started.
+
+    Args:
+        command: Git command string to execute
+        repositories: Repositories to run the command in
+        max_workers: Maximum number of repositories processed at once
+        timeout: Maximum time to wait for the command in each repository
+        allow_dangerous: Run the command even if the safety check flags it
+            (e.g. after the user confirmed it)
+
+    Returns:
+        RepoResult objects in the same order as repositories
+
+    Raises:
+        WorkspaceError: If the command is dangerous and allow_dangerous is
+            False
+        ValueError: If max_workers is less than 1
+    """
+    repositories = list(repositories)
+    workers = max_workers or DEFAULT_BATCH_WORKERS
+    if workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if not allow_dangerous:
+        safety_check = check_command_safety(command)
+        if not safety_check.is_safe:
+            raise WorkspaceError(safety_check.warning_message)
+
+    cancellation = GitCancellation()
+
+    def run(repository: Repository) -> RepoResult:
+        result = execute_git_command(
+            command,
+            timeout=timeout,
+            cancellation=cancellation,
+            repository=repository,
+        )
+        return RepoResult(path=_top_level(repository), result=result)
+
+    with ThreadPoolExecutor(
+        max_workers=min(workers, max(len(repositories), 1)),
+        thread_name_prefix="git-sensei-workspace",
+    ) as pool:
+        try:
+            return list(pool.map(run, repositories))
+        except BaseException:
+            cancellation.cancel()
+            raise
+
+
+def _summary(result: GitResult) -> str:
+    """First line of a command's output, preferring stderr for failures."""
+    streams = (
+        (result.stdout, result.stderr)
+        if result.success
+        else (result.stderr, result.stdout)
+    )
+    for stream in streams:
+        for line in stream.splitlines():
+            if line.strip():
+                line = line.strip()
+                if len(line) > _SUMMARY_WIDTH:
+                    return line[: _SUMMARY_WIDTH - 3] + "..."
+                return line
+    return ""
+
+
+def format_results_table(results: List[RepoResult]) -> str:
+    """
+    Render workspace results as a table, one row per repository.
+
+    Args:
+        results: Results from run_in_repositories
+
+    Returns:
+        Multi-line table followed by a success/failure count
+    """
+    cwd = os.getcwd()
+    rows = [("repository", "exit", "output")]
+    for repo_result in results:
+        path = os.path.relpath(repo_result.path, cwd)
+        if path.startswith(os.pardir):
+            path = repo_result.path
+        rows.append(
+            (
+                path,
+                str(repo_result.result.exit_code),
+                _summary(repo_result.result),
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(2)]
+    lines = [
+        f"{row[0].ljust(widths[0])}  {row[1].rjust(widths[1])}  {row[2]}".rstrip()
+        for row in rows
+    ]
+    failed = sum(1 for repo_result in results if not repo_result.result.success)
+    lines.append(
+        f"{len(results)} repositor{'y' if len(results) == 1 else 'ies'}: "
+        f"{len(results) - failed} succeeded, {failed} failed"
+    )
+    return "\n".join(lines)
+
+
+def format_results_json(results: List[RepoResult]) -> str:
+    """
+    Render workspace results as a JSON array.
+
+    Args:
+        results: Results from run_in_repositories
+
+    Returns:
+        JSON text with one object per repository
+    """
+    return json.dumps([repo_result.to_dict() for repo_result in results], indent=2)
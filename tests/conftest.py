@@ -0,0 +1,39 @@
+"""
+Shared helpers for the test suite.
+"""
+
+import subprocess
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """
+    Point the user cache directory at a temporary one for every test.
+
+    The runtime probe and the context cache are written under it, so tests
+    never read or write the developer's own cache.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def run_git(repo, *args, text=True):
+    """
+    Run a git command in a test repository.
+
+    Args:
+        repo: Directory of the repository
+        *args: Git arguments
+        text: Return stripped text; False returns the raw stdout bytes
+
+    Returns:
+        Standard output of the command
+    """
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        capture_output=True,
+        text=text,
+    )
+    return result.stdout.strip() if text else result.stdout
@@ -0,0 +1,213 @@
+"""
+Tests for the backends module.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei import backends
+from git_sensei.backends import (
+    Pygit2Backend,
+    SubprocessBackend,
+    _status_from_flags,
+    clear_backend_cache,
+    get_backend,
+    get_in_process_backend,
+)
+from git_sensei.refs import GitDirs
+from git_sensei.repository import Repository, clear_repository_cache, get_repository
+from git_sensei.status import ENTRY_UNMERGED
+from tests.conftest import run_git
+
+BACKENDS = [
+    SubprocessBackend,
+    pytest.param(
+        Pygit2Backend,
+        marks=pytest.mark.skipif(
+            not backends.is_libgit2_available(), reason="pygit2 not installed"
+        ),
+    ),
+]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+@pytest.mark.parametrize("backend_class", BACKENDS)
+class TestBackendContract:  # pylint: disable=attribute-defined-outside-init
+    """Test cases every backend must pass against a real repository."""
+
+    def setup_method(self):
+        """Create a repository with two commits, an upstream and a change."""
+        clear_repository_cache()
+        self.temp_dir = Path(tempfile.mkdtemp()).resolve()
+        self.repo = self.temp_dir / "repo"
+        self.repo.mkdir()
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        (self.repo / "a.txt").write_text("one\n", encoding="utf-8")
+        run_git(self.repo, "add", "a.txt")
+        run_git(self.repo, "commit", "-q", "-m", "First commit")
+        run_git(self.repo, "update-ref", "refs/remotes/origin/main", "HEAD")
+        run_git(self.repo, "config", "remote.origin.url", str(self.repo))
+        run_git(
+            self.repo,
+            "config",
+            "remote.origin.fetch",
+            "+refs/heads/*:refs/remotes/origin/*",
+        )
+        run_git(self.repo, "config", "branch.main.remote", "origin")
+        run_git(self.repo, "config", "branch.main.merge", "refs/heads/main")
+        (self.repo / "a.txt").write_text("two\n", encoding="utf-8")
+        run_git(self.repo, "commit", "-q", "-am", "Second commit\n\nWith a body")
+        (self.repo / "a.txt").write_text("three\n", encoding="utf-8")
+        (self.repo / "new.txt").write_text("new\n", encoding="utf-8")
+        self.head = run_git(self.repo, "rev-parse", "HEAD")
+
+    def teardown_method(self):
+        """Remove the repository."""
+        clear_repository_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _backend(self, backend_class):
+        return backend_class(get_repository(str(self.repo)))
+
+    def test_status(self, backend_class):
+        """Test status entries and branch headers."""
+        status = self._backend(backend_class).status()
+
+        assert status.short_format().splitlines() == [" M a.txt", "?? new.txt"]
+        assert status.oid == self.head
+        assert status.head == "main"
+        assert status.upstream == "origin/main"
+        assert (status.ahead, status.behind) == (1, 0)
+
+    def test_status_removed_from_index(self, backend_class):
+        """Test that a file removed from the index is deleted and untracked."""
+        run_git(self.repo, "rm", "-q", "--cached", "a.txt")
+
+        status = self._backend(backend_class).status()
+
+        assert status.short_format().splitlines() == [
+            "D  a.txt",
+            "?? a.txt",
+            "?? new.txt",
+        ]
+
+    def test_current_branch(self, backend_class):
+        """Test the branch name, and None once HEAD is detached."""
+        backend = self._backend(backend_class)
+        assert backend.current_branch() == "main"
+
+        run_git(self.repo, "checkout", "-q", "--detach")
+        assert backend.current_branch() is None
+
+    def test_recent_commits(self, backend_class):
+        """Test that commits match their objects, newest first."""
+        commits = self._backend(backend_class).recent_commits(5)
+
+        assert [commit.subject for commit in commits] == [
+            "Second commit",
+            "First commit",
+        ]
+        latest = commits[0]
+        assert latest.oid == self.head
+        assert latest.tree == run_git(self.repo, "rev-parse", "HEAD^{tree}")
+        assert latest.parents == [run_git(self.repo, "rev-parse", "HEAD~1")]
+        assert latest.message == "Second commit\n\nWith a body\n"
+        raw = run_git(self.repo, "cat-file", "commit", "HEAD").splitlines()
+        assert f"author {latest.author}" in raw
+        assert f"committer {latest.committer}" in raw
+
+    def test_list_refs(self, backend_class):
+        """Test refs under a prefix and their targets."""
+        refs = self._backend(backend_class).list_refs("refs/remotes/")
+
+        assert refs == {
+            "refs/remotes/origin/main": run_git(self.repo, "rev-parse", "HEAD~1")
+        }
+
+    def test_ahead_behind(self, backend_class):
+        """Test counting commits on each side."""
+        backend = self._backend(backend_class)
+
+        assert backend.ahead_behind("main", "origin/main") == (1, 0)
+        assert backend.ahead_behind("main", "no-such-ref") is None
+
+    def test_read_object(self, backend_class):
+        """Test reading a blob by id."""
+        oid = run_git(self.repo, "rev-parse", "HEAD:a.txt")
+
+        obj = self._backend(backend_class).read_object(oid)
+
+        assert (obj.type, obj.size, obj.data) == ("blob", 4, b"two\n")
+
+
+class TestStatusFromFlags:
+    """Test cases for converting libgit2 status flags."""
+
+    def test_entries_ordered_like_porcelain(self):
+        """Test codes of each kind of entry and their order."""
+        status = _status_from_flags(
+            [
+                ("z-untracked.txt", 128),
+                ("ignored/", 16384),
+                ("staged.txt", 1 | 256),
+                ("conflict.txt", 32768 | 2),
+                ("deleted.txt", 512),
+                ("unchanged.txt", 0),
+                ("removed.txt", 4 | 128),
+            ]
+        )
+
+        assert status.short_format().splitlines() == [
+            "UU conflict.txt",
+            " D deleted.txt",
+            "D  removed.txt",
+            "AM staged.txt",
+            "?? removed.txt",
+            "?? z-untracked.txt",
+            "!! ignored/",
+        ]
+        assert status[0].type == chr(ENTRY_UNMERGED)
+
+
+class TestGetBackend:
+    """Test cases for backend selection."""
+
+    repository = Repository(GitDirs("/repo/.git", "/repo/.git", "/repo"))
+
+    def setup_method(self):
+        """Start from an empty cache."""
+        clear_backend_cache()
+
+    def teardown_method(self):
+        """Do not leak backends into other tests."""
+        clear_backend_cache()
+
+    def test_subprocess_without_pygit2(self):
+        """Test that Git subprocesses are used when pygit2 is missing."""
+        with patch("git_sensei.backends.pygit2", None):
+            backend = get_backend(self.repository)
+
+            assert isinstance(backend, SubprocessBackend)
+            assert backend.repository is self.repository
+            assert get_backend(self.repository) is backend
+            assert get_in_process_backend(self.repository) is None
+
+    def test_prefer_subprocess(self):
+        """Test that libgit2 can be turned off."""
+        backend = get_backend(self.repository, prefer="subprocess")
+
+        assert backend.name == "subprocess"
+
+    def test_outside_repository(self):
+        """Test that an unpinned subprocess backend is used outside repositories."""
+        with patch("git_sensei.backends.get_repository", return_value=None):
+            backend = get_backend()
+
+        assert isinstance(backend, SubprocessBackend)
+        assert backend.repository is None
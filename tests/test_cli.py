@@ -4,6 +4,7 @@ Unit tests for the CLI module.
 Tests the command-line interface, argument parsing, and command execution workflow.
 """
 
+import io
 from unittest.mock import patch
 
 import pytest
@@ -13,6 +14,7 @@ from typer.testing import CliRunner
 from git_sensei.cli import app, execute_command
 from git_sensei.git_ops import GitResult
 from git_sensei.safety import SafetyCheck
+from git_sensei.workspace import RepoResult
 
 
 class TestCLI:  # pylint: disable=attribute-defined-outside-init
@@ -35,7 +37,7 @@ class TestCLI:  # pylint: disable=attribute-defined-outside-init
         result = self.runner.invoke(app, ["--help"])
         assert result.exit_code == 0
         # Remove ANSI color codes for testing
-        clean_output = result.output.encode('ascii', 'ignore').decode('ascii')
+        clean_output = result.output.encode("ascii", "ignore").decode("ascii")
         assert "--execute" in clean_output or "-e" in clean_output
         assert "Git command" in clean_output
 
@@ -74,7 +76,7 @@ class TestCLI:  # pylint: disable=attribute-defined-outside-init
         assert "On branch main" in result.stdout
         mock_git_available.assert_called_once()
         mock_safety.assert_called_once_with("git status")
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     def test_execute_command_git_not_available(self, mock_git_available):
@@ -173,12 +175,13 @@ class TestCLI:  # pylint: disable=attribute-defined-outside-init
 class TestExecuteCommandFunction:
     """Test cases for the execute_command function directly."""
 
+    @patch("git_sensei.cli._can_stream_output", return_value=False)
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.check_command_safety")
     @patch("git_sensei.cli.execute_git_command")
     @patch("typer.echo")
     def test_execute_command_safe_success(
-        self, mock_echo, mock_execute, mock_safety, mock_git_available
+        self, mock_echo, mock_execute, mock_safety, mock_git_available, _mock_stream
     ):
         """Test execute_command function with safe command."""
         # Setup mocks
@@ -198,7 +201,7 @@ class TestExecuteCommandFunction:
 
         mock_git_available.assert_called_once()
         mock_safety.assert_called_once_with("git branch")
-        mock_execute.assert_called_once_with("git branch")
+        mock_execute.assert_called_once_with("git branch", text=False, foreground=True)
         mock_echo.assert_called_once_with("branch info")
 
     @patch("git_sensei.cli.is_git_available")
@@ -250,6 +253,227 @@ class TestExecuteCommandFunction:
         assert len(warning_calls) >= 2  # Warning message and patterns
         assert any("WARNING" in str(call) for call in warning_calls)
 
+    @patch("git_sensei.cli._can_stream_output", return_value=True)
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.check_command_safety")
+    @patch("git_sensei.cli.execute_git_command")
+    @patch("git_sensei.cli.stream_git_command")
+    def test_execute_command_streams_output(
+        self, mock_stream, mock_execute, mock_safety, _mock_available, _mock_can
+    ):
+        """Test that output is copied to stdout chunk by chunk when possible."""
+        mock_safety.return_value = SafetyCheck(
+            is_safe=True, dangerous_patterns=[], warning_message=""
+        )
+        stream = mock_stream.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter([b"abc123 First\n", b"def456 Second\n"])
+        stream.result = GitResult(
+            stdout="", stderr="", exit_code=0, command="git log", success=True
+        )
+        stdout = io.TextIOWrapper(io.BytesIO())
+
+        with patch("sys.stdout", stdout):
+            execute_command("git log")
+
+        assert stdout.buffer.getvalue() == b"abc123 First\ndef456 Second\n"
+        mock_stream.assert_called_once_with("git log", foreground=True)
+        mock_execute.assert_not_called()
+
+    @patch("git_sensei.cli._can_stream_output", return_value=True)
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.check_command_safety")
+    @patch("git_sensei.cli.stream_git_command")
+    def test_execute_command_streamed_failure(
+        self, mock_stream, mock_safety, _mock_available, _mock_can
+    ):
+        """Test that a failing streamed command still reports its exit code."""
+        mock_safety.return_value = SafetyCheck(
+            is_safe=True, dangerous_patterns=[], warning_message=""
+        )
+        stream = mock_stream.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter([])
+        stream.result = GitResult(
+            stdout="",
+            stderr="fatal: not a git repository",
+            exit_code=128,
+            command="git log",
+            success=False,
+        )
+
+        with patch("sys.stdout", io.TextIOWrapper(io.BytesIO())):
+            with pytest.raises(Exit) as exc_info:
+                execute_command("git log")
+
+        assert exc_info.value.exit_code == 128
+
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.check_command_safety")
+    def test_stats_reports_git_processes(self, mock_safety, _mock_available):
+        """Test that --stats prints the usage of git processes that ran."""
+        mock_safety.return_value = SafetyCheck(
+            is_safe=True, dangerous_patterns=[], warning_message=""
+        )
+
+        result = CliRunner().invoke(app, ["--stats", "--execute", "git --version"])
+
+        assert result.exit_code == 0
+        assert "Git process statistics:" in result.output
+        assert "git --version" in result.output
+        assert "total (1 git process)" in result.output
+
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.check_command_safety")
+    @patch("git_sensei.cli.execute_git_command")
+    def test_stats_without_git_processes(
+        self, mock_execute, mock_safety, _mock_available
+    ):
+        """Test the report when no git process was spawned."""
+        mock_safety.return_value = SafetyCheck(
+            is_safe=True, dangerous_patterns=[], warning_message=""
+        )
+        mock_execute.return_value = GitResult(
+            stdout="", stderr="", exit_code=0, command="git status", success=True
+        )
+
+        result = CliRunner().invoke(app, ["--stats", "--execute", "git status"])
+
+        assert result.exit_code == 0
+        assert "No git processes were run." in result.output
+
+    @patch("git_sensei.cli._can_stream_output", return_value=False)
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.check_command_safety")
+    @patch("git_sensei.cli.execute_git_command")
+    def test_bytes_output_written_unchanged(
+        self, mock_execute, mock_safety, _mock_available, _mock_stream
+    ):
+        """Test that captured bytes reach stdout without being decoded."""
+        mock_safety.return_value = SafetyCheck(
+            is_safe=True, dangerous_patterns=[], warning_message=""
+        )
+        mock_execute.return_value = GitResult(
+            stdout=None,
+            stderr="",
+            exit_code=0,
+            command="git ls-files",
+            success=True,
+            stdout_bytes=b"caf\xe9.txt\n",
+            decode_errors="strict",
+        )
+
+        result = CliRunner().invoke(app, ["--execute", "git ls-files"])
+
+        assert result.exit_code == 0
+        assert result.stdout_bytes == b"caf\xe9.txt\n"
+        mock_execute.assert_called_once_with(
+            "git ls-files", text=False, foreground=True
+        )
+
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.resolve_repositories")
+    @patch("git_sensei.cli.check_command_safety")
+    @patch("git_sensei.cli.get_user_confirmation", return_value=True)
+    @patch("git_sensei.cli.run_in_repositories")
+    def test_repos_checks_safety_once(
+        self, mock_run, mock_confirm, mock_safety, mock_resolve, _mock_available
+    ):
+        """Test that --repos confirms once and runs the command everywhere."""
+        mock_resolve.return_value = ["repo-a", "repo-b", "repo-c"]
+        mock_safety.return_value = SafetyCheck(
+            is_safe=False,
+            dangerous_patterns=["reset --hard"],
+            warning_message="This command will discard changes",
+        )
+        mock_run.return_value = [
+            RepoResult(
+                path,
+                GitResult(stdout="", stderr="", exit_code=0, command="c", success=True),
+            )
+            for path in ("/ws/a", "/ws/b", "/ws/c")
+        ]
+
+        result = CliRunner().invoke(
+            app,
+            [
+                "--repos",
+                "a,b",
+                "--repos",
+                "c",
+                "-j",
+                "2",
+                "--json",
+                "-e",
+                "reset --hard",
+            ],
+        )
+
+        assert result.exit_code == 0
+        mock_resolve.assert_called_once_with(["a", "b", "c"])
+        mock_safety.assert_called_once_with("reset --hard", describe_repository=False)
+        mock_confirm.assert_called_once()
+        mock_run.assert_called_once_with(
+            "reset --hard",
+            ["repo-a", "repo-b", "repo-c"],
+            max_workers=2,
+            allow_dangerous=True,
+        )
+        assert '"repository": "/ws/c"' in result.stdout
+
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.resolve_repositories", return_value=["repo"])
+    @patch("git_sensei.cli.get_user_confirmation", side_effect=KeyboardInterrupt)
+    @patch("git_sensei.cli.run_in_repositories")
+    def test_repos_interrupted_confirmation(
+        self, mock_run, _mock_confirm, _mock_resolve, _mock_available
+    ):
+        """Test that Ctrl+C at the --repos prompt exits cleanly."""
+        result = CliRunner().invoke(app, ["--repos", "a", "-e", "git reset --hard"])
+
+        assert result.exit_code == 130
+        assert "interrupted during confirmation" in result.output
+        assert not isinstance(result.exception, KeyboardInterrupt)
+        mock_run.assert_not_called()
+
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    @patch("git_sensei.cli.resolve_repositories", return_value=["repo"])
+    @patch("git_sensei.cli.check_command_safety")
+    @patch("git_sensei.cli.run_in_repositories")
+    def test_repos_failure_exit_code(
+        self, mock_run, mock_safety, _mock_resolve, _mock_available
+    ):
+        """Test that a failure in any repository fails the invocation."""
+        mock_safety.return_value = SafetyCheck(
+            is_safe=True, dangerous_patterns=[], warning_message=""
+        )
+        mock_run.return_value = [
+            RepoResult(
+                "/ws/a",
+                GitResult(
+                    stdout="",
+                    stderr="fatal: bad revision",
+                    exit_code=128,
+                    command="git log",
+                    success=False,
+                ),
+            )
+        ]
+
+        result = CliRunner().invoke(app, ["--repos", "a", "-e", "git log"])
+
+        assert result.exit_code == 1
+        assert "fatal: bad revision" in result.stdout
+        assert "1 repository: 0 succeeded, 1 failed" in result.stdout
+
+    @patch("git_sensei.cli.is_git_available", return_value=True)
+    def test_repos_without_matches(self, _mock_available):
+        """Test the error when no repository matches."""
+        result = CliRunner().invoke(
+            app, ["--repos", "/nonexistent-dir/*", "-e", "git status"]
+        )
+
+        assert result.exit_code == 1
+        assert "No Git repositories matched" in result.output
+
 
 class TestIntegrationWorkflows:  # pylint: disable=attribute-defined-outside-init
     """Integration tests for complete command execution workflows."""
@@ -289,7 +513,7 @@ class TestIntegrationWorkflows:  # pylint: disable=attribute-defined-outside-ini
         # Verify all workflow steps were called
         mock_git_available.assert_called_once()
         mock_safety.assert_called_once_with("git branch")
-        mock_execute.assert_called_once_with("git branch")
+        mock_execute.assert_called_once_with("git branch", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.check_command_safety")
@@ -328,7 +552,9 @@ class TestIntegrationWorkflows:  # pylint: disable=attribute-defined-outside-ini
         mock_confirm.assert_called_once_with(
             "This will permanently delete uncommitted changes"
         )
-        mock_execute.assert_called_once_with("git reset --hard HEAD~1")
+        mock_execute.assert_called_once_with(
+            "git reset --hard HEAD~1", text=False, foreground=True
+        )
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.check_command_safety")
@@ -393,7 +619,7 @@ class TestIntegrationWorkflows:  # pylint: disable=attribute-defined-outside-ini
         # Verify all workflow steps were called
         mock_git_available.assert_called_once()
         mock_safety.assert_called_once_with("git status")
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     def test_git_unavailable_workflow(self, mock_git_available):
@@ -668,4 +894,4 @@ class TestCLIErrorHandling:  # pylint: disable=attribute-defined-outside-init
         # Verify workflow completed
         mock_git_available.assert_called_once()
         mock_safety.assert_called_once_with("git status")
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
@@ -0,0 +1,281 @@
+"""
+Tests for the commit_graph module.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei.commit_graph import (
+    GENERATION_INFINITY,
+    RevWalker,
+    get_rev_walker,
+    load_commit_graph,
+)
+from git_sensei.odb import ObjectDatabase
+from git_sensei.refs import RefReader
+from git_sensei.safety import check_command_safety
+from tests.conftest import run_git
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestRevWalker:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for walks over real repositories."""
+
+    def setup_method(self):
+        """Create diverging branches, a merge and an octopus merge."""
+        self.repo = Path(tempfile.mkdtemp())
+        self.seconds = 0
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        self._commits("base", 5)
+        run_git(self.repo, "branch", "topic")
+        run_git(self.repo, "branch", "other")
+        run_git(self.repo, "branch", "third")
+        self._commits("main", 4)
+        run_git(self.repo, "checkout", "-q", "topic")
+        self._commits("topic", 3)
+        run_git(self.repo, "checkout", "-q", "other")
+        self._commits("other", 2)
+        run_git(self.repo, "checkout", "-q", "third")
+        self._commits("third", 1)
+        run_git(self.repo, "checkout", "-q", "main")
+        self._merge("topic", "other", "third")
+        self._commits("after", 2)
+        self.objects_dir = str(self.repo / ".git" / "objects")
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def _env(self):
+        self.seconds += 1
+        date = f"2024-01-01T00:{self.seconds // 60:02d}:{self.seconds % 60:02d}"
+        return {**os.environ, "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+
+    def _commits(self, prefix, count):
+        for i in range(count):
+            path = self.repo / f"{prefix}.txt"
+            path.write_text(f"{prefix} {i}\n", encoding="utf-8")
+            subprocess.run(
+                ["git", "-C", str(self.repo), "add", path.name],
+                check=True,
+                capture_output=True,
+            )
+            subprocess.run(
+                ["git", "-C", str(self.repo), "commit", "-q", "-m", f"{prefix} {i}"],
+                check=True,
+                capture_output=True,
+                env=self._env(),
+            )
+
+    def _merge(self, *branches):
+        subprocess.run(
+            ["git", "-C", str(self.repo), "merge", "-q", "-m", "Merge", *branches],
+            check=True,
+            capture_output=True,
+            env=self._env(),
+        )
+
+    def _walker(self):
+        odb = ObjectDatabase(self.objects_dir)
+        return RevWalker(odb, load_commit_graph(self.objects_dir))
+
+    def _rev(self, name):
+        return run_git(self.repo, "rev-parse", name)
+
+    def _assert_matches_git(self, walker):
+        pairs = [
+            ("main", "topic"),
+            ("topic", "other"),
+            ("other", "main~3"),
+            ("main~2", "third"),
+            ("topic", "topic"),
+        ]
+        for left, right in pairs:
+            left_oid, right_oid = self._rev(left), self._rev(right)
+            counts = run_git(
+                self.repo, "rev-list", "--left-right", "--count", f"{left}...{right}"
+            )
+            assert walker.ahead_behind(left_oid, right_oid) == tuple(
+                int(n) for n in counts.split()
+            )
+            bases = run_git(self.repo, "merge-base", "--all", left, right).split()
+            assert sorted(walker.merge_bases(left_oid, right_oid)) == sorted(bases)
+            unique = run_git(self.repo, "rev-list", left, "--not", right).split()
+            assert sorted(walker.unique_commits([left_oid], [right_oid])) == sorted(
+                unique
+            )
+            is_ancestor = (
+                subprocess.run(
+                    [
+                        "git",
+                        "-C",
+                        str(self.repo),
+                        "merge-base",
+                        "--is-ancestor",
+                        left,
+                        right,
+                    ],
+                    check=False,
+                ).returncode
+                == 0
+            )
+            assert walker.is_ancestor(left_oid, right_oid) is is_ancestor
+
+    def test_walk_without_graph(self):
+        """Test walking with commit dates only when no graph exists."""
+        walker = self._walker()
+
+        assert walker.graph is None
+        self._assert_matches_git(walker)
+
+    def test_walk_with_single_graph(self):
+        """Test walking a single commit-graph file, including octopus edges."""
+        run_git(self.repo, "commit-graph", "write", "--reachable")
+        walker = self._walker()
+
+        assert walker.graph is not None
+        assert walker.graph.count == int(
+            run_git(self.repo, "rev-list", "--all", "--count")
+        )
+        self._assert_matches_git(walker)
+
+    def test_walk_with_split_chain(self):
+        """Test walking a split commit-graph chain."""
+        run_git(self.repo, "commit-graph", "write", "--reachable", "--split=no-merge")
+        self._commits("later", 2)
+        run_git(self.repo, "commit-graph", "write", "--reachable", "--split=no-merge")
+        walker = self._walker()
+
+        assert len(walker.graph.layers) == 2
+        self._assert_matches_git(walker)
+
+    def test_commits_newer_than_graph(self):
+        """Test mixing graph commits with commits written afterwards."""
+        run_git(self.repo, "commit-graph", "write", "--reachable")
+        self._commits("later", 3)
+        walker = self._walker()
+        head = self._rev("HEAD")
+
+        assert walker._commit(walker._key(head))[1] == GENERATION_INFINITY
+        assert walker.ahead_behind(head, self._rev("topic")) == (13, 0)
+        assert walker.is_ancestor(self._rev("topic"), head) is True
+        assert walker.is_ancestor(head, self._rev("topic")) is False
+
+    def test_peel_annotated_tag(self):
+        """Test that annotated tags peel to their commit."""
+        run_git(self.repo, "tag", "-a", "v1", "-m", "Release", "topic")
+        walker = self._walker()
+
+        assert walker.peel(self._rev("v1")) == self._rev("topic")
+        assert walker.peel(self._rev("HEAD^{tree}")) is None
+
+    def test_get_rev_walker_reloads_graph(self):
+        """Test that a newly written graph replaces the cached walker."""
+        first = get_rev_walker(str(self.repo))
+        assert first.graph is None
+
+        run_git(self.repo, "commit-graph", "write", "--reachable")
+        second = get_rev_walker(str(self.repo))
+
+        assert second is not first
+        assert second.graph is not None
+        assert get_rev_walker(str(self.repo)) is second
+
+    def _check_in_repo(self, command):
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(self.repo)
+            return check_command_safety(command)
+        finally:
+            os.chdir(original_cwd)
+
+    def test_branch_delete_warning_counts_lost_commits(self):
+        """Test that force-deleting an unmerged branch reports lost commits."""
+        run_git(self.repo, "checkout", "-q", "-b", "doomed", "topic")
+        self._commits("doomed", 2)
+        run_git(self.repo, "checkout", "-q", "main")
+
+        result = self._check_in_repo("git branch -D doomed")
+
+        assert result.is_safe is False
+        assert "Branch 'doomed' has 2 commits not reachable" in result.warning_message
+
+    def test_branch_delete_warning_for_merged_branch(self):
+        """Test that deleting a merged branch does not report lost commits."""
+        result = self._check_in_repo("git branch -D topic")
+
+        assert result.is_safe is False
+        assert "not reachable" not in result.warning_message
+
+    def test_branch_delete_warning_in_linked_worktree(self):
+        """Test that a linked worktree sees the branches holding the commits."""
+        run_git(self.repo, "checkout", "-q", "-b", "doomed", "topic")
+        self._commits("doomed", 2)
+        run_git(self.repo, "branch", "keeper")
+        run_git(self.repo, "checkout", "-q", "main")
+        worktree = Path(tempfile.mkdtemp()) / "linked"
+        run_git(self.repo, "worktree", "add", "-q", "-b", "side", str(worktree))
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(worktree)
+            result = check_command_safety("git branch -D doomed")
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(worktree.parent, ignore_errors=True)
+
+        assert result.is_safe is False
+        assert "not reachable" not in result.warning_message
+
+    def test_branch_delete_warning_resolves_refs_once(self):
+        """Test that deleting several branches resolves each ref only once."""
+        for name in ("doomed", "gone"):
+            run_git(self.repo, "checkout", "-q", "-b", name, "topic")
+            self._commits(name, 1)
+        run_git(self.repo, "checkout", "-q", "main")
+        resolved = []
+        original = RefReader.resolve_ref
+
+        def resolve_ref(reader, name):
+            resolved.append(name)
+            return original(reader, name)
+
+        with patch.object(RefReader, "resolve_ref", resolve_ref):
+            result = self._check_in_repo("git branch -D doomed gone")
+
+        assert "Branch 'doomed' has 1 commit not reachable" in result.warning_message
+        assert "Branch 'gone' has 1 commit not reachable" in result.warning_message
+        assert resolved.count("refs/heads/main") == 2  # HEAD and the ref itself
+
+    def test_branch_delete_warning_needs_complete_refs(self):
+        """Test that no lost commits are reported from an incomplete ref list."""
+        run_git(self.repo, "checkout", "-q", "-b", "doomed", "topic")
+        self._commits("doomed", 2)
+        run_git(self.repo, "checkout", "-q", "main")
+
+        with patch.object(RefReader, "list_refs", return_value=[]):
+            result = self._check_in_repo("git branch -D doomed")
+
+        assert result.is_safe is False
+        assert "not reachable" not in result.warning_message
+
+    def test_force_push_warning_counts_lost_commits(self):
+        """Test that overwriting a diverged remote branch reports lost commits."""
+        run_git(self.repo, "update-ref", "refs/remotes/origin/main", self._rev("main"))
+        run_git(self.repo, "config", "branch.main.remote", "origin")
+        run_git(self.repo, "config", "branch.main.merge", "refs/heads/main")
+        run_git(self.repo, "reset", "-q", "--hard", "HEAD~2")
+
+        result = self._check_in_repo("git push --force")
+        explicit = self._check_in_repo("git push -f origin main")
+
+        expected = "2 commits on origin/main not contained in main"
+        assert expected in result.warning_message
+        assert expected in explicit.warning_message
@@ -7,6 +7,7 @@ Tests configuration loading, dangerous patterns management, and settings.
 from unittest.mock import patch
 
 from git_sensei.config import (
+    get_context_token_budget,
     get_dangerous_patterns,
     get_timeout,
     load_config,
@@ -190,6 +191,23 @@ class TestGetTimeout:
         assert timeout == 30  # Should return default value
 
 
+class TestGetContextTokenBudget:
+    """Test cases for get_context_token_budget function."""
+
+    def test_default_value(self):
+        """Test the default budget."""
+        assert get_context_token_budget() == 2000
+
+    @patch("git_sensei.config.load_config")
+    def test_custom_and_missing_values(self, mock_load_config):
+        """Test custom budgets and the fallback for missing values."""
+        mock_load_config.return_value = {"context_token_budget": 500}
+        assert get_context_token_budget() == 500
+
+        mock_load_config.return_value = {"context_token_budget": None}
+        assert get_context_token_budget() == 2000
+
+
 class TestShouldRequireConfirmation:
     """Test cases for should_require_confirmation function."""
 
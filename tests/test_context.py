@@ -2,15 +2,87 @@
 Tests for the context module.
 """
 
-from unittest.mock import patch
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
-from git_sensei.context import get_git_context
-from git_sensei.git_ops import GitResult
+import pytest
 
+from git_sensei import context as context_module
+from git_sensei.context import (
+    LOG_COMMAND,
+    REMOTE_COMMAND,
+    STASH_COMMAND,
+    ContextProvider,
+    RepoSnapshot,
+    context_fingerprint,
+    estimate_tokens,
+    format_status,
+    get_context_cache_path,
+    get_git_context,
+    register_context_provider,
+    unregister_context_provider,
+)
+from git_sensei.git_ops import (
+    GitCommit,
+    GitInterrupted,
+    GitResult,
+    execute_git_command,
+)
+from git_sensei.intent import PROVIDER_COMMITS
+from git_sensei.repository import clear_repository_cache, get_repository
+from git_sensei.status import STATUS_COMMAND, parse_status
+from tests.conftest import run_git
 
-class TestGetGitContext:
+OID = b"a" * 40
+ZERO = b"0" * 40
+
+
+def _by_command(results):
+    """Answer each command with the result whose command it starts with."""
+
+    def execute(command, **_kwargs):
+        for result in results:
+            if command.startswith(result.command):
+                return result
+        raise AssertionError(f"unexpected command: {command}")
+
+    return execute
+
+
+class TestGetGitContext:  # pylint: disable=attribute-defined-outside-init
     """Test cases for get_git_context function."""
 
+    def setup_method(self):
+        """Force the subprocess lookups used when the repository cannot be read."""
+        self.repository_patch = patch(
+            "git_sensei.context.get_repository", return_value=None
+        )
+        self.repository_patch.start()
+        self.backend_patch = patch(
+            "git_sensei.context.get_in_process_backend", return_value=None
+        )
+        self.backend_patch.start()
+        self.branch_patch = patch(
+            "git_sensei.context.get_current_branch", return_value=None
+        )
+        self.branch_patch.start()
+        self.commits_patch = patch(
+            "git_sensei.context.get_recent_commits", return_value=None
+        )
+        self.commits_patch.start()
+
+    def teardown_method(self):
+        """Stop patches."""
+        self.repository_patch.stop()
+        self.backend_patch.stop()
+        self.branch_patch.stop()
+        self.commits_patch.stop()
+
     @patch("git_sensei.context.execute_git_command")
     def test_get_git_context_success(self, mock_execute):
         """Test successful context gathering."""
@@ -18,35 +90,37 @@ class TestGetGitContext:
         mock_results = [
             GitResult(
                 success=True,
-                stdout="M  file1.py\nA  file2.py",
-                stderr="",
-                exit_code=0,
-                command="git status --porcelain",
-            ),
-            GitResult(
-                success=True,
-                stdout="main",
+                stdout="",
                 stderr="",
                 exit_code=0,
-                command="git branch --show-current",
+                command=STATUS_COMMAND,
+                stdout_bytes=b"# branch.oid " + OID + b"\0# branch.head main\0"
+                b"# branch.upstream origin/main\0# branch.ab +2 -0\0"
+                b"1 M. N... 100644 100644 100644 " + OID + b" " + OID + b" file1.py\0"
+                b"1 A. N... 000000 100644 100644 " + ZERO + b" " + OID + b" file2.py\0",
             ),
             GitResult(
                 success=True,
                 stdout="abc123 Latest commit\ndef456 Previous commit",
                 stderr="",
                 exit_code=0,
-                command="git log --oneline -n 5",
+                command=LOG_COMMAND,
             ),
         ]
-        mock_execute.side_effect = mock_results
+        mock_execute.side_effect = _by_command(mock_results)
 
         context = get_git_context()
 
         assert "Status:" in context
         assert "M  file1.py" in context
+        assert "A  file2.py" in context
+        assert "Upstream: origin/main (ahead 2, behind 0)" in context
         assert "Current branch: main" in context
         assert "Recent commits:" in context
         assert "abc123 Latest commit" in context
+        assert sorted(c.args[0] for c in mock_execute.call_args_list) == sorted(
+            [STATUS_COMMAND, LOG_COMMAND]
+        )
 
     @patch("git_sensei.context.execute_git_command")
     def test_get_git_context_clean_status(self, mock_execute):
@@ -57,24 +131,18 @@ class TestGetGitContext:
                 stdout="",
                 stderr="",
                 exit_code=0,
-                command="git status --porcelain",
-            ),
-            GitResult(
-                success=True,
-                stdout="main",
-                stderr="",
-                exit_code=0,
-                command="git branch --show-current",
+                command=STATUS_COMMAND,
+                stdout_bytes=b"# branch.oid " + OID + b"\0# branch.head main\0",
             ),
             GitResult(
                 success=True,
                 stdout="abc123 Latest commit",
                 stderr="",
                 exit_code=0,
-                command="git log --oneline -n 5",
+                command=LOG_COMMAND,
             ),
         ]
-        mock_execute.side_effect = mock_results
+        mock_execute.side_effect = _by_command(mock_results)
 
         context = get_git_context()
 
@@ -91,24 +159,17 @@ class TestGetGitContext:
                 stdout="",
                 stderr="not a git repository",
                 exit_code=128,
-                command="git status --porcelain",
+                command="git status",
             ),
             GitResult(
                 success=False,
                 stdout="",
                 stderr="not a git repository",
                 exit_code=128,
-                command="git branch --show-current",
-            ),
-            GitResult(
-                success=False,
-                stdout="",
-                stderr="not a git repository",
-                exit_code=128,
-                command="git log --oneline -n 5",
+                command=LOG_COMMAND,
             ),
         ]
-        mock_execute.side_effect = mock_results
+        mock_execute.side_effect = _by_command(mock_results)
 
         context = get_git_context()
 
@@ -117,51 +178,687 @@ class TestGetGitContext:
         assert "Recent commits: Unable to determine" in context
 
     @patch("git_sensei.context.execute_git_command")
-    def test_get_git_context_branch_fallback(self, mock_execute):
-        """Test branch detection fallback to git status."""
+    def test_get_git_context_branch_from_status_headers(self, mock_execute):
+        """Test that the branch comes from the single status call."""
+        mock_execute.side_effect = _by_command(
+            [
+                GitResult(
+                    success=True,
+                    stdout="",
+                    stderr="",
+                    exit_code=0,
+                    command=STATUS_COMMAND,
+                    stdout_bytes=b"# branch.oid " + OID + b"\0"
+                    b"# branch.head feature-branch\0",
+                ),
+                GitResult(
+                    success=True, stdout="", stderr="", exit_code=0, command=LOG_COMMAND
+                ),
+            ]
+        )
 
-        def mock_execute_side_effect(command):
-            if "git status --porcelain" in command:
-                return GitResult(
-                    success=True, stdout="", stderr="", exit_code=0, command=command
-                )
-            elif "git branch --show-current" in command:
-                return GitResult(
-                    success=True, stdout="", stderr="", exit_code=0, command=command
-                )
-            elif "git status" in command:
-                return GitResult(
+        context = get_git_context()
+
+        assert "Current branch: feature-branch" in context
+        assert mock_execute.call_count == 2
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_detached_head(self, mock_execute):
+        """Test that a detached HEAD is reported as such."""
+        mock_execute.side_effect = _by_command(
+            [
+                GitResult(
                     success=True,
-                    stdout="On branch feature-branch\nnothing to commit",
+                    stdout="",
                     stderr="",
                     exit_code=0,
-                    command=command,
+                    command=STATUS_COMMAND,
+                    stdout_bytes=b"# branch.oid " + OID + b"\0"
+                    b"# branch.head (detached)\0",
+                ),
+                GitResult(
+                    success=True, stdout="", stderr="", exit_code=0, command=LOG_COMMAND
+                ),
+            ]
+        )
+
+        context = get_git_context()
+
+        assert "Current branch: (detached HEAD)" in context
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_exceptions(self, mock_execute):
+        """Test context gathering when exceptions occur."""
+        mock_execute.side_effect = Exception("Git command failed")
+
+        context = get_git_context()
+
+        assert "Status: Unable to determine" in context
+        assert "Current branch: Unable to determine" in context
+        assert "Recent commits: Unable to determine" in context
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_branch_from_refs(self, mock_execute):
+        """Test that the branch is read from HEAD without running git."""
+        self.branch_patch.stop()
+
+        def mock_execute_side_effect(command, **_kwargs):
+            assert "branch" not in command
+            return GitResult(
+                success=True, stdout="", stderr="", exit_code=0, command=command
+            )
+
+        mock_execute.side_effect = mock_execute_side_effect
+        with patch("git_sensei.context.get_current_branch", return_value="develop"):
+            context = get_git_context()
+        self.branch_patch.start()
+
+        assert "Current branch: develop" in context
+        assert mock_execute.call_count == 2
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_commits_from_object_database(self, mock_execute):
+        """Test that recent commits are read in-process without git log."""
+        self.commits_patch.stop()
+
+        def mock_execute_side_effect(command, **_kwargs):
+            assert "log" not in command
+            return GitResult(
+                success=True, stdout="", stderr="", exit_code=0, command=command
+            )
+
+        mock_execute.side_effect = mock_execute_side_effect
+        with patch(
+            "git_sensei.context.get_recent_commits",
+            return_value=["abc1234 Latest commit", "def5678 Earlier commit"],
+        ):
+            context = get_git_context()
+        self.commits_patch.start()
+
+        assert (
+            "Recent commits:\nabc1234 Latest commit\ndef5678 Earlier commit" in context
+        )
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_no_commits_from_object_database(self, mock_execute):
+        """Test that an unborn HEAD is reported without running git log."""
+        mock_execute.return_value = GitResult(
+            success=True, stdout="", stderr="", exit_code=0, command="git status"
+        )
+        with patch("git_sensei.context.get_recent_commits", return_value=[]):
+            context = get_git_context()
+
+        assert "Recent commits: No commits found" in context
+        assert all("log" not in c.args[0] for c in mock_execute.call_args_list)
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_from_in_process_backend(self, mock_execute):
+        """Test that an in-process backend answers every query without git."""
+        backend = MagicMock()
+        backend.status.return_value = parse_status(
+            b"# branch.head main\0# branch.upstream origin/main\0"
+            b"# branch.ab +1 -0\0? new.txt\0"
+        )
+        backend.current_branch.return_value = "main"
+        backend.recent_commits.return_value = [
+            GitCommit(oid="abcdef1234", tree="", message="Latest commit\n")
+        ]
+        self.backend_patch.stop()
+        with patch("git_sensei.context.get_in_process_backend", return_value=backend):
+            context = get_git_context()
+        self.backend_patch.start()
+
+        assert context == (
+            "Status:\n?? new.txt\n\n"
+            "Upstream: origin/main (ahead 1, behind 0)\n\n"
+            "Current branch: main\n\n"
+            "Recent commits:\nabcdef1 Latest commit"
+        )
+        mock_execute.assert_not_called()
+        backend.recent_commits.assert_called_once_with(5)
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_history_phrase_skips_status(self, mock_execute):
+        """Test that a question about history does not scan the working tree."""
+        mock_execute.side_effect = _by_command(
+            [
+                GitResult(
+                    success=True,
+                    stdout="abc123 Latest commit",
+                    stderr="",
+                    exit_code=0,
+                    command=LOG_COMMAND,
                 )
-            elif "git log" in command:
+            ]
+        )
+
+        with patch("git_sensei.context.get_current_branch", return_value="main"):
+            context = get_git_context(phrase="show the last 5 commits")
+
+        assert context == (
+            "Current branch: main\n\nRecent commits:\nabc123 Latest commit"
+        )
+        assert [c.args[0] for c in mock_execute.call_args_list] == [LOG_COMMAND]
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_push_and_stash_phrase_add_sections(self, mock_execute):
+        """Test that remotes and stash entries are listed when asked about."""
+        mock_execute.side_effect = _by_command(
+            [
+                GitResult(
+                    success=True,
+                    stdout="",
+                    stderr="",
+                    exit_code=0,
+                    command=STATUS_COMMAND,
+                    stdout_bytes=b"# branch.oid " + OID + b"\0# branch.head main\0"
+                    b"# stash 1\0",
+                ),
+                GitResult(
+                    success=True,
+                    stdout="origin\thttps://example.com/repo.git (fetch)\n"
+                    "origin\thttps://example.com/repo.git (push)\n",
+                    stderr="",
+                    exit_code=0,
+                    command=REMOTE_COMMAND,
+                ),
+                GitResult(
+                    success=True,
+                    stdout="stash@{0} WIP on main: abc123 Latest commit\n",
+                    stderr="",
+                    exit_code=0,
+                    command=STASH_COMMAND,
+                ),
+            ]
+        )
+
+        context = get_git_context(phrase="pop my stash and push it to origin")
+
+        assert context == (
+            "Status: Working directory clean\n\n"
+            "Stash entries: 1\n\n"
+            "Current branch: main\n\n"
+            "Remotes:\norigin https://example.com/repo.git\n\n"
+            "Stash list:\nstash@{0} WIP on main: abc123 Latest commit"
+        )
+
+    @patch("git_sensei.context.execute_git_command")
+    def test_get_git_context_runs_queries_concurrently(self, mock_execute):
+        """Test that slow queries overlap and sections keep their order."""
+
+        def slow_execute(command, **_kwargs):
+            time.sleep(0.3)
+            if command == STATUS_COMMAND:
                 return GitResult(
                     success=True,
-                    stdout="abc123 Latest commit",
+                    stdout="",
                     stderr="",
                     exit_code=0,
                     command=command,
+                    stdout_bytes=b"# branch.oid " + OID + b"\0# branch.head main\0",
                 )
             return GitResult(
-                success=False, stdout="", stderr="", exit_code=1, command=command
+                success=True,
+                stdout="abc123 Latest commit",
+                stderr="",
+                exit_code=0,
+                command=command,
             )
 
-        mock_execute.side_effect = mock_execute_side_effect
+        mock_execute.side_effect = slow_execute
 
+        start = time.monotonic()
         context = get_git_context()
+        elapsed = time.monotonic() - start
 
-        assert "Current branch: feature-branch" in context
+        assert elapsed < 0.55
+        assert context == (
+            "Status: Working directory clean\n\n"
+            "Current branch: main\n\n"
+            "Recent commits:\nabc123 Latest commit"
+        )
 
     @patch("git_sensei.context.execute_git_command")
-    def test_get_git_context_exceptions(self, mock_execute):
-        """Test context gathering when exceptions occur."""
-        mock_execute.side_effect = Exception("Git command failed")
+    def test_get_git_context_deadline(self, mock_execute):
+        """Test that sections missing the deadline are cancelled and reported."""
+        release = threading.Event()
+        handles = []
 
-        context = get_git_context()
+        def execute(command, cancellation=None, **_kwargs):
+            if command.startswith("git status"):
+                handles.append(cancellation)
+                release.wait(5)
+            return GitResult(
+                success=True,
+                stdout="abc123 Latest commit",
+                stderr="",
+                exit_code=0,
+                command=command,
+            )
 
-        assert "Status: Unable to determine" in context
-        assert "Current branch: Unable to determine" in context
-        assert "Recent commits: Unable to determine" in context
+        mock_execute.side_effect = execute
+        try:
+            start = time.monotonic()
+            context = get_git_context(timeout=0.2)
+            elapsed = time.monotonic() - start
+        finally:
+            release.set()
+
+        assert elapsed < 1
+        assert context == (
+            "Status: Unable to determine (timed out)\n\n"
+            "Current branch: Unable to determine\n\n"
+            "Recent commits:\nabc123 Latest commit"
+        )
+        assert handles[0].cancelled is True
+
+
+class TestContextProviders:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for registered context providers."""
+
+    def setup_method(self):
+        """Answer the log query and HEAD without a repository."""
+        self.patches = [
+            patch("git_sensei.context.get_repository", return_value=None),
+            patch("git_sensei.context.get_in_process_backend", return_value=None),
+            patch("git_sensei.context.get_current_branch", return_value="main"),
+            patch("git_sensei.context.get_recent_commits", return_value=None),
+            patch(
+                "git_sensei.context.execute_git_command",
+                side_effect=_by_command(
+                    [
+                        GitResult(
+                            success=True,
+                            stdout="abc123 Latest commit",
+                            stderr="",
+                            exit_code=0,
+                            command=LOG_COMMAND,
+                        )
+                    ]
+                ),
+            ),
+        ]
+        for started in self.patches:
+            started.start()
+
+    def teardown_method(self):
+        """Stop patches and forget test providers."""
+        for started in self.patches:
+            started.stop()
+        unregister_context_provider("tickets")
+        unregister_context_provider("owners")
+
+    def test_slow_provider_dropped(self):
+        """Test that a provider past its timeout is dropped, not waited for."""
+        release = threading.Event()
+        daemons = []
+
+        def slow(snapshot, _cancellation):
+            # A query left running must not hold up the interpreter's exit
+            daemons.append(threading.current_thread().daemon)
+            release.wait(5)
+            snapshot.extras["tickets"] = ["never"]
+
+        def fast(snapshot, _cancellation):
+            snapshot.extras["owners"] = ["alice"]
+
+        def section(name):
+            def render(snapshot):
+                if name not in snapshot.extras:
+                    return snapshot.unknown(name.title(), name)
+                return f"{name.title()}: " + ", ".join(snapshot.extras[name])
+
+            return render
+
+        for name, query, timeout in (("tickets", slow, 0.1), ("owners", fast, None)):
+            register_context_provider(
+                ContextProvider(
+                    name,
+                    query,
+                    section(name),
+                    timeout=timeout,
+                    intents=frozenset({"history"}),
+                )
+            )
+        try:
+            start = time.monotonic()
+            context = get_git_context(phrase="show the log")
+            elapsed = time.monotonic() - start
+        finally:
+            release.set()
+
+        assert elapsed < 1
+        assert daemons == [True]
+        assert context == (
+            "Current branch: main\n\n"
+            "Recent commits:\nabc123 Latest commit\n\n"
+            "Tickets: Unable to determine (timed out)\n\n"
+            "Owners: alice"
+        )
+
+    def test_failing_and_slow_providers_degrade(self):
+        """Test that a raising and a timed-out provider leave the rest intact."""
+        release = threading.Event()
+
+        def failing(_snapshot, _cancellation):
+            raise RuntimeError("Git command failed")
+
+        def slow(snapshot, _cancellation):
+            release.wait(5)
+            snapshot.extras["owners"] = ["never"]
+
+        def section(name):
+            def render(snapshot):
+                if name not in snapshot.extras:
+                    return snapshot.unknown(name.title(), name)
+                return f"{name.title()}: " + ", ".join(snapshot.extras[name])
+
+            return render
+
+        for name, query, timeout in (("tickets", failing, None), ("owners", slow, 0.1)):
+            register_context_provider(
+                ContextProvider(
+                    name,
+                    query,
+                    section(name),
+                    timeout=timeout,
+                    intents=frozenset({"history"}),
+                )
+            )
+        try:
+            context = get_git_context(phrase="show the log")
+        finally:
+            release.set()
+
+        assert context == (
+            "Current branch: main\n\n"
+            "Recent commits:\nabc123 Latest commit\n\n"
+            "Tickets: Unable to determine\n\n"
+            "Owners: Unable to determine (timed out)"
+        )
+
+    def test_interrupted_query_stops_context(self):
+        """Test that Ctrl+C in a query is raised instead of read as a failure."""
+        cancelled = threading.Event()
+
+        def interrupted(_snapshot, _cancellation):
+            raise GitInterrupted(b"", b"")
+
+        def waiting(_snapshot, cancellation):
+            deadline = time.monotonic() + 5
+            while not cancellation.cancelled and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if cancellation.cancelled:
+                cancelled.set()
+
+        for name, query in (("tickets", interrupted), ("owners", waiting)):
+            register_context_provider(
+                ContextProvider(name, query, intents=frozenset({"history"}))
+            )
+
+        with pytest.raises(GitInterrupted):
+            get_git_context(phrase="show the log")
+
+        assert cancelled.wait(5)
+
+    def test_provider_not_planned(self):
+        """Test that providers for other intents are not run."""
+        query = MagicMock()
+        register_context_provider(
+            ContextProvider("tickets", query, intents=frozenset({"stash"}))
+        )
+
+        get_git_context(phrase="show the log")
+
+        query.assert_not_called()
+
+    def test_unknown_cost_class(self):
+        """Test that cost classes are validated."""
+        with pytest.raises(ValueError):
+            register_context_provider(ContextProvider("tickets", MagicMock(), cost="x"))
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestBuiltinProviders:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for built-in providers against a real repository."""
+
+    def setup_method(self):
+        """Create a repository one commit ahead of its upstream."""
+        clear_repository_cache()
+        self.temp_dir = Path(tempfile.mkdtemp()).resolve()
+        self.repo = self.temp_dir / "repo"
+        self.repo.mkdir()
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        (self.repo / "a.txt").write_text("one\n", encoding="utf-8")
+        run_git(self.repo, "add", "a.txt")
+        run_git(self.repo, "commit", "-q", "-m", "First commit")
+        run_git(self.repo, "update-ref", "refs/remotes/origin/main", "HEAD")
+        run_git(self.repo, "config", "branch.main.remote", "origin")
+        run_git(self.repo, "config", "branch.main.merge", "refs/heads/main")
+        run_git(self.repo, "commit", "-q", "--allow-empty", "-m", "Second commit")
+        self.original_cwd = os.getcwd()
+        os.chdir(self.repo)
+
+    def teardown_method(self):
+        """Restore the working directory and remove the repository."""
+        os.chdir(self.original_cwd)
+        clear_repository_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_upstream_operation_and_worktrees(self):
+        """Test sections read without scanning the working tree."""
+        feature = self.temp_dir / "feature"
+        run_git(self.repo, "worktree", "add", "-q", "-b", "feature", str(feature))
+        head = run_git(self.repo, "rev-parse", "HEAD")
+        (self.repo / ".git" / "MERGE_HEAD").write_text(head + "\n", encoding="utf-8")
+
+        with patch(
+            "git_sensei.context.execute_git_command", wraps=execute_git_command
+        ) as run:
+            context = get_git_context(
+                use_cache=False, phrase="how far behind is each worktree"
+            )
+
+        assert context == (
+            "Upstream: origin/main (ahead 1, behind 0)\n\n"
+            "In progress: merge\n\n"
+            "Current branch: main\n\n"
+            f"Worktrees:\n{self.repo} main\n{feature} feature"
+        )
+        assert STATUS_COMMAND not in [c.args[0] for c in run.call_args_list]
+
+
+def _huge_status():
+    """Status of a build that left 80,000 generated files behind."""
+    records = [
+        b"1 .M N... 100644 100644 100644 " + OID + b" " + OID + b" src/app.py",
+        b"1 A. N... 000000 100644 100644 " + ZERO + b" " + OID + b" src/new.py",
+        b"u UU N... 100644 100644 100644 100644 "
+        + OID
+        + b" "
+        + OID
+        + b" "
+        + OID
+        + b" conflict.txt",
+    ]
+    records += [b"? build/gen/%d/file%d.js" % (i % 8, i) for i in range(80000)]
+    records += [b"? notes/todo%d.md" % i for i in range(3)]
+    return parse_status(b"# branch.head main\0" + b"\0".join(records) + b"\0")
+
+
+class TestFormatStatus:
+    """Test cases for the token-budgeted status listing."""
+
+    def test_small_status_listed_in_full(self):
+        """Test that a status within the budget is listed unchanged."""
+        status = parse_status(b"? a.txt\0? b.txt\0")
+
+        assert format_status(status, 100) == status.short_format()
+
+    def test_huge_status_summarized(self):
+        """Test that relevant entries stay exact and the rest are counted."""
+        status = _huge_status()
+
+        text = format_status(status, 500)
+        lines = text.splitlines()
+
+        assert estimate_tokens(text) <= 500
+        assert lines[0] == "80006 entries; the most relevant are listed"
+        for line in ("UU conflict.txt", "A  src/new.py", " M src/app.py"):
+            assert line in lines
+        assert "?? notes/todo0.md" in lines
+        summary = lines[lines.index(next(l for l in lines if l.startswith("Other"))) :]
+        assert "build/gen/1/: ?? 10000" in summary
+        listed = len(lines) - len(summary) - 1
+        counted = sum(int(line.rsplit(" ", 1)[1]) for line in summary[1:])
+        assert listed + counted == len(status)
+
+    def test_tiny_budget_keeps_largest_directories(self):
+        """Test that directories are coarsened and dropped to fit the budget."""
+        status = _huge_status()
+
+        lines = format_status(status, 40).splitlines()
+
+        assert "build/: ?? 80000" in lines
+        assert lines[-1].startswith("... ")
+
+    def test_render_stays_within_budget(self):
+        """Test that the whole context respects the budget."""
+        snapshot = RepoSnapshot(
+            status=_huge_status(), branch="main", commits=["abc1234 Latest commit"]
+        )
+
+        context = snapshot.render(token_budget=400)
+
+        assert estimate_tokens(context) <= 400
+        assert context.startswith("Status:\n80006 entries")
+        assert context.endswith(
+            "Current branch: main\n\nRecent commits:\nabc1234 Latest commit"
+        )
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestContextCache:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for the on-disk context cache."""
+
+    def setup_method(self):
+        """Create a repository and an isolated cache directory."""
+        clear_repository_cache()
+        self.temp_dir = Path(tempfile.mkdtemp()).resolve()
+        self.repo = self.temp_dir / "repo"
+        (self.repo / "src").mkdir(parents=True)
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        (self.repo / "a.txt").write_text("one\n", encoding="utf-8")
+        run_git(self.repo, "add", "a.txt")
+        run_git(self.repo, "commit", "-q", "-m", "First commit")
+        self.env_patch = patch.dict(
+            "os.environ", {"XDG_CACHE_HOME": str(self.temp_dir / "cache")}
+        )
+        self.env_patch.start()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.repo)
+
+    def teardown_method(self):
+        """Restore the working directory and remove the repository."""
+        os.chdir(self.original_cwd)
+        self.env_patch.stop()
+        clear_repository_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _snapshots_taken(self, *changes):
+        """Call get_git_context after each change and count full snapshots."""
+        with patch(
+            "git_sensei.context.get_repo_snapshot",
+            wraps=context_module.get_repo_snapshot,
+        ) as mock_snapshot:
+            contexts = [get_git_context()]
+            for change in changes:
+                change()
+                contexts.append(get_git_context())
+        full = [
+            call
+            for call in mock_snapshot.call_args_list
+            if PROVIDER_COMMITS in call.args[1]
+        ]
+        return len(full), contexts
+
+    def test_hit_when_unchanged(self):
+        """Test that an unchanged repository is served from the cache."""
+        count, contexts = self._snapshots_taken(lambda: None)
+
+        assert count == 1
+        assert contexts[0] == contexts[1]
+        assert "Current branch: main" in contexts[1]
+        assert os.path.exists(get_context_cache_path(get_repository()))
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda repo: run_git(repo, "commit", "-q", "--allow-empty", "-m", "Next"),
+            lambda repo: run_git(repo, "checkout", "-q", "-b", "topic"),
+        ],
+        ids=["commit", "checkout"],
+    )
+    def test_miss_when_refs_changed(self, change):
+        """Test that changes to refs invalidate the cache."""
+        count, contexts = self._snapshots_taken(lambda: change(self.repo))
+
+        assert count == 2
+        assert contexts[0] != contexts[1]
+
+    @pytest.mark.parametrize(
+        "change, line",
+        [
+            (lambda repo: run_git(repo, "rm", "-q", "--cached", "a.txt"), "D  a.txt"),
+            (
+                lambda repo: (repo / "a.txt").write_text("two\n", encoding="utf-8"),
+                " M a.txt",
+            ),
+            (
+                lambda repo: (repo / "src" / "new.txt").write_text(
+                    "n", encoding="utf-8"
+                ),
+                "?? src/",
+            ),
+        ],
+        ids=["index", "edit", "new-file-in-subdir"],
+    )
+    def test_status_fresh_on_hit(self, change, line):
+        """Test that the status is read again when the cache is used."""
+        count, contexts = self._snapshots_taken(lambda: change(self.repo))
+
+        assert count == 1
+        assert "Working directory clean" in contexts[0]
+        assert line in contexts[1]
+        assert "Current branch: main" in contexts[1]
+
+    def test_expired_entry_recomputed(self):
+        """Test that cached sections expire."""
+
+        def expire():
+            now = time.time() + context_module.CONTEXT_CACHE_MAX_AGE + 1
+            patch("git_sensei.context.time.time", return_value=now).start()
+
+        try:
+            count, contexts = self._snapshots_taken(expire)
+        finally:
+            patch.stopall()
+
+        assert count == 2
+        assert contexts[0] == contexts[1]
+
+    def test_fingerprint_stable(self):
+        """Test that fingerprinting an unchanged repository is deterministic."""
+        repository = get_repository()
+
+        assert context_fingerprint(repository) == context_fingerprint(repository)
+
+    def test_cache_disabled(self):
+        """Test that use_cache=False neither reads nor writes the cache."""
+        get_git_context(use_cache=False)
+
+        assert not os.path.exists(get_context_cache_path(get_repository()))
@@ -2,15 +2,86 @@
 Unit tests for git_ops module data models and functions.
 """
 
+import asyncio
+import contextlib
+import os
+import shutil
+import signal
 import subprocess
-from unittest.mock import MagicMock, patch
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import ANY, MagicMock, call, patch
 
+import pytest
+
+from git_sensei import git_ops
 from git_sensei.git_ops import (
+    DEFAULT_ASYNC_CONCURRENCY,
+    TIMEOUT_EXIT_CODE,
+    GitCancellation,
+    GitInterrupted,
+    GitObjectServer,
+    GitObjectServerError,
     GitResult,
+    GitRuntime,
+    ResourceUsage,
+    SpilledOutput,
+    UsageReport,
+    clear_git_runtime_cache,
     execute_git_command,
+    execute_git_command_async,
+    execute_git_commands,
+    get_git_runtime,
     get_git_version,
+    get_object_server,
+    get_runtime_cache_path,
     is_git_available,
+    is_read_only_command,
+    parse_commit,
+    parse_tree,
+    set_async_concurrency_limit,
+    stream_git_command,
 )
+from git_sensei.refs import GitDirs
+from git_sensei.repository import Repository
+from tests.conftest import run_git
+
+
+def _git_executable():
+    """Return the executable execute_git_command will spawn."""
+    return get_git_runtime().executable
+
+
+def _assert_new_process_group(kwargs, foreground=False):
+    """Check the keywords that start a command in its own process group."""
+    if os.name != "posix":
+        assert kwargs["creationflags"] == subprocess.CREATE_NEW_PROCESS_GROUP
+    elif sys.version_info >= (3, 11):
+        assert kwargs["process_group"] == 0
+    elif foreground:
+        assert kwargs["preexec_fn"] is os.setpgrp
+        assert "start_new_session" not in kwargs
+    else:
+        assert kwargs["start_new_session"] is True
+
+
+def _make_repo():
+    """Create a temporary repository with two commits."""
+    repo = Path(tempfile.mkdtemp())
+    run_git(repo, "init", "-q")
+    run_git(repo, "config", "user.name", "Test User")
+    run_git(repo, "config", "user.email", "test@example.com")
+    (repo / "README.md").write_text("hello\n", encoding="utf-8")
+    run_git(repo, "add", "README.md")
+    run_git(repo, "commit", "-q", "-m", "Initial commit")
+    (repo / "src").mkdir()
+    (repo / "src" / "app.py").write_text("print('hi')\n", encoding="utf-8")
+    run_git(repo, "add", "src/app.py")
+    run_git(repo, "commit", "-q", "-m", "Add app\n\nLonger description")
+    return repo
 
 
 class TestGitResult:
@@ -105,9 +176,22 @@ Date: Mon Jan 1 12:00:00 2024 +0000
         assert "Initial commit" in result.stdout
 
 
-class TestGitAvailability:
+class TestGitAvailability:  # pylint: disable=attribute-defined-outside-init
     """Test cases for Git availability functions."""
 
+    def setup_method(self):
+        """Isolate the runtime cache for each test."""
+        clear_git_runtime_cache()
+        self.cache_dir = tempfile.mkdtemp()
+        self.env_patch = patch.dict("os.environ", {"XDG_CACHE_HOME": self.cache_dir})
+        self.env_patch.start()
+
+    def teardown_method(self):
+        """Restore the real runtime."""
+        self.env_patch.stop()
+        clear_git_runtime_cache()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
     @patch("shutil.which")
     def test_is_git_available_true(self, mock_which):
         """Test is_git_available when Git is installed."""
@@ -134,10 +218,12 @@ class TestGitAvailability:
         assert result is None
         mock_is_available.assert_called_once()
 
+    @patch("shutil.which")
     @patch("git_sensei.git_ops.is_git_available")
     @patch("subprocess.run")
-    def test_get_git_version_success(self, mock_run, mock_is_available):
+    def test_get_git_version_success(self, mock_run, mock_is_available, mock_which):
         """Test get_git_version with successful execution."""
+        mock_which.return_value = "/usr/bin/git"
         mock_is_available.return_value = True
         mock_result = MagicMock()
         mock_result.returncode = 0
@@ -148,7 +234,7 @@ class TestGitAvailability:
 
         assert result == "git version 2.34.1"
         mock_run.assert_called_once_with(
-            ["git", "--version"],
+            [os.path.abspath("/usr/bin/git"), "--version"],
             capture_output=True,
             text=True,
             timeout=10,
@@ -166,18 +252,103 @@ class TestGitAvailability:
 
         assert result is None
 
+    @patch("shutil.which")
+    def test_runtime_resolved_once(self, mock_which):
+        """Test that PATH is searched once for repeated availability checks."""
+        mock_which.return_value = "/usr/bin/git"
+
+        for _ in range(5):
+            assert is_git_available() is True
+
+        mock_which.assert_called_once_with("git")
+
+    @patch("shutil.which")
+    def test_runtime_refreshed_when_path_changes(self, mock_which):
+        """Test that a changed PATH triggers a new lookup."""
+        mock_which.return_value = "/usr/bin/git"
+        is_git_available()
+
+        with patch.dict("os.environ", {"PATH": "/somewhere/else"}):
+            is_git_available()
+
+        assert mock_which.call_count == 2
+
+    @patch("subprocess.run")
+    def test_version_persisted_in_cache_file(self, mock_run):
+        """Test that the version probe is reused from the cache file."""
+        binary = Path(self.cache_dir) / "git"
+        binary.write_text("fake", encoding="utf-8")
+        mock_run.return_value = MagicMock(returncode=0, stdout="git version 2.40.0\n")
+
+        assert GitRuntime(str(binary)).version == "git version 2.40.0"
+        assert GitRuntime(str(binary)).version == "git version 2.40.0"
+
+        mock_run.assert_called_once()
+        assert os.path.exists(get_runtime_cache_path())
+
+    @patch("subprocess.run")
+    def test_version_cache_invalidated_by_mtime(self, mock_run):
+        """Test that replacing the binary invalidates the cached version."""
+        binary = Path(self.cache_dir) / "git"
+        binary.write_text("fake", encoding="utf-8")
+        mock_run.return_value = MagicMock(returncode=0, stdout="git version 2.40.0\n")
+        GitRuntime(str(binary)).version  # pylint: disable=expression-not-assigned
+
+        os.utime(binary, ns=(0, 0))
+        mock_run.return_value = MagicMock(returncode=0, stdout="git version 2.41.0\n")
+
+        assert GitRuntime(str(binary)).version == "git version 2.41.0"
+        assert mock_run.call_count == 2
+
+    def test_runtime_features(self):
+        """Test feature detection from the Git version."""
+        old = GitRuntime("/usr/bin/git", version="git version 2.30.2")
+        new = GitRuntime("/usr/bin/git", version="git version 2.39.5.windows.1")
+
+        assert old.version_info == (2, 30, 2)
+        assert old.supports_porcelain_v2 is True
+        assert old.supports_commit_graph is True
+        assert old.supports_batch_command is False
+        assert old.supports_merge_tree_write_tree is False
+        assert new.supports_batch_command is True
+        assert new.supports_merge_tree_write_tree is True
+
+    def test_runtime_unknown_version(self):
+        """Test that unknown versions support no optional features."""
+        runtime = GitRuntime(None)
+
+        assert runtime.available is False
+        assert runtime.version is None
+        assert runtime.supports_porcelain_v2 is False
+
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_execute_uses_explicit_runtime(self, mock_run):
+        """Test that an explicit runtime provides the executable path."""
+        mock_run.return_value = MagicMock(stdout=b"", stderr=b"", returncode=0)
+
+        execute_git_command("status", runtime=GitRuntime("/opt/git/bin/git"))
+
+        assert mock_run.call_args[0][0] == ["/opt/git/bin/git", "status"]
+
+    def test_execute_with_unavailable_runtime(self):
+        """Test that a runtime without git reports exit code 127."""
+        result = execute_git_command("status", runtime=GitRuntime(None))
+
+        assert result.exit_code == 127
+        assert "Git is not installed" in result.stderr
+
 
 class TestExecuteGitCommand:
     """Test cases for execute_git_command function."""
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_success(self, mock_run, mock_git_available):
         """Test successful Git command execution."""
         mock_git_available.return_value = True
         mock_result = MagicMock()
-        mock_result.stdout = "On branch main"
-        mock_result.stderr = ""
+        mock_result.stdout = b"On branch main"
+        mock_result.stderr = b""
         mock_result.returncode = 0
         mock_run.return_value = mock_result
 
@@ -191,17 +362,21 @@ class TestExecuteGitCommand:
         assert result.success is True
 
         mock_run.assert_called_once_with(
-            ["git", "status"], capture_output=True, text=True, timeout=30, shell=False
+            [_git_executable(), "status"],
+            timeout=30,
+            cancellation=None,
+            env=ANY,
+            foreground=False,
         )
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_with_git_prefix(self, mock_run, mock_git_available):
         """Test command execution with 'git' prefix in command."""
         mock_git_available.return_value = True
         mock_result = MagicMock()
-        mock_result.stdout = "test output"
-        mock_result.stderr = ""
+        mock_result.stdout = b"test output"
+        mock_result.stderr = b""
         mock_result.returncode = 0
         mock_run.return_value = mock_result
 
@@ -209,15 +384,19 @@ class TestExecuteGitCommand:
 
         assert result.command == "git status"
         mock_run.assert_called_once_with(
-            ["git", "status"], capture_output=True, text=True, timeout=30, shell=False
+            [_git_executable(), "status"],
+            timeout=30,
+            cancellation=None,
+            env=ANY,
+            foreground=False,
         )
 
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_failure(self, mock_run):
         """Test failed Git command execution."""
         mock_result = MagicMock()
-        mock_result.stdout = ""
-        mock_result.stderr = "fatal: not a git repository"
+        mock_result.stdout = b""
+        mock_result.stderr = b"fatal: not a git repository"
         mock_result.returncode = 128
         mock_run.return_value = mock_result
 
@@ -229,7 +408,7 @@ class TestExecuteGitCommand:
         assert result.exit_code == 128
         assert result.success is False
 
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_timeout(self, mock_run):
         """Test Git command execution timeout."""
         mock_run.side_effect = subprocess.TimeoutExpired(["git", "status"], 30)
@@ -242,7 +421,7 @@ class TestExecuteGitCommand:
         assert result.exit_code == 124
         assert result.success is False
 
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_subprocess_error(self, mock_run):
         """Test Git command execution with subprocess error."""
         mock_run.side_effect = subprocess.SubprocessError("Test error")
@@ -255,38 +434,42 @@ class TestExecuteGitCommand:
         assert result.exit_code == 1
         assert result.success is False
 
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_custom_timeout(self, mock_run):
         """Test Git command execution with custom timeout."""
         mock_result = MagicMock()
-        mock_result.stdout = "test"
-        mock_result.stderr = ""
+        mock_result.stdout = b"test"
+        mock_result.stderr = b""
         mock_result.returncode = 0
         mock_run.return_value = mock_result
 
         result = execute_git_command("status", timeout=60)
 
         mock_run.assert_called_once_with(
-            ["git", "status"], capture_output=True, text=True, timeout=60, shell=False
+            [_git_executable(), "status"],
+            timeout=60,
+            cancellation=None,
+            env=ANY,
+            foreground=False,
         )
 
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_complex_command(self, mock_run):
         """Test execution of complex Git command with multiple arguments."""
         mock_result = MagicMock()
-        mock_result.stdout = "commit log"
-        mock_result.stderr = ""
+        mock_result.stdout = b"commit log"
+        mock_result.stderr = b""
         mock_result.returncode = 0
         mock_run.return_value = mock_result
 
         result = execute_git_command("log --oneline -n 5")
 
         mock_run.assert_called_once_with(
-            ["git", "log", "--oneline", "-n", "5"],
-            capture_output=True,
-            text=True,
+            [_git_executable(), "log", "--oneline", "-n", "5"],
             timeout=30,
-            shell=False,
+            cancellation=None,
+            env=ANY,
+            foreground=False,
         )
 
         assert result.command == "log --oneline -n 5"
@@ -348,7 +531,7 @@ class TestExecuteGitCommandErrorHandling:
         assert result.command == "git"
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_file_not_found_error(
         self, mock_run, mock_git_available
     ):
@@ -365,7 +548,7 @@ class TestExecuteGitCommandErrorHandling:
         assert result.command == "status"
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_permission_error(self, mock_run, mock_git_available):
         """Test command execution with PermissionError."""
         mock_git_available.return_value = True
@@ -380,7 +563,7 @@ class TestExecuteGitCommandErrorHandling:
         assert result.command == "status"
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_os_error(self, mock_run, mock_git_available):
         """Test command execution with OSError."""
         mock_git_available.return_value = True
@@ -395,7 +578,7 @@ class TestExecuteGitCommandErrorHandling:
         assert result.command == "status"
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_timeout_improved_message(
         self, mock_run, mock_git_available
     ):
@@ -413,7 +596,7 @@ class TestExecuteGitCommandErrorHandling:
         assert result.command == "status"
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_subprocess_error_improved(
         self, mock_run, mock_git_available
     ):
@@ -431,7 +614,7 @@ class TestExecuteGitCommandErrorHandling:
         assert result.command == "status"
 
     @patch("git_sensei.git_ops.is_git_available")
-    @patch("subprocess.run")
+    @patch("git_sensei.git_ops._run_process_group")
     def test_execute_git_command_unexpected_error(self, mock_run, mock_git_available):
         """Test handling of unexpected errors."""
         mock_git_available.return_value = True
@@ -457,3 +640,1343 @@ class TestExecuteGitCommandErrorHandling:
         assert result.success is False
         assert result.exit_code == 1
         assert "Empty command provided" in result.stderr
+
+
+class _FakeAsyncProcess:
+    """Stand-in for asyncio.subprocess.Process used by async tests."""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, delay=0.0, returncode=0, stdout=b"", stderr=b""):
+        self.delay = delay
+        self.returncode = None
+        self._exit = returncode
+        self._stdout = stdout
+        self._stderr = stderr
+        self.killed = False
+
+    async def communicate(self):
+        """Simulate a running process producing output."""
+        _FakeAsyncProcess.active += 1
+        _FakeAsyncProcess.peak = max(_FakeAsyncProcess.peak, _FakeAsyncProcess.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            _FakeAsyncProcess.active -= 1
+        self.returncode = self._exit
+        return self._stdout, self._stderr
+
+    def kill(self):
+        """Record that the process was killed."""
+        self.killed = True
+        self.returncode = -9
+
+    async def wait(self):
+        """Return the exit code."""
+        return self.returncode
+
+
+class TestExecuteGitCommands:
+    """Test cases for execute_git_commands function."""
+
+    @staticmethod
+    def _fake_execute(delays=None, failing=()):
+        """Build an execute_git_command replacement that records concurrency."""
+        state = {"active": 0, "peak": 0, "events": []}
+        lock = threading.Lock()
+
+        def fake(command, timeout=30, runtime=None):  # pylint: disable=unused-argument
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                state["events"].append(("start", command, state["active"]))
+            time.sleep((delays or {}).get(command, 0.02))
+            with lock:
+                state["active"] -= 1
+                state["events"].append(("end", command, state["active"]))
+            success = command not in failing
+            return GitResult(
+                stdout=f"out:{command}",
+                stderr="",
+                exit_code=0 if success else 1,
+                command=command,
+                success=success,
+            )
+
+        return fake, state
+
+    def test_results_in_input_order(self):
+        """Test that results follow input order regardless of finish order."""
+        commands = ["git log -1", "git status", "git diff", "git show HEAD"]
+        fake, state = self._fake_execute(
+            {"git log -1": 0.1, "git status": 0.05, "git diff": 0.0}
+        )
+        with patch("git_sensei.git_ops.execute_git_command", side_effect=fake):
+            results = execute_git_commands(commands, max_workers=4)
+
+        assert [r.command for r in results] == commands
+        assert [r.stdout for r in results] == [f"out:{c}" for c in commands]
+        assert state["peak"] > 1
+
+    def test_max_workers_bounds_concurrency(self):
+        """Test that no more than max_workers commands run at once."""
+        fake, state = self._fake_execute()
+        with patch("git_sensei.git_ops.execute_git_command", side_effect=fake):
+            execute_git_commands(["git status"] * 8, max_workers=2)
+
+        assert state["peak"] == 2
+
+    def test_mutating_commands_run_alone(self):
+        """Test that index-locking commands never overlap other commands."""
+        commands = ["git status", "git diff", "git add .", "git status", "git log"]
+        fake, state = self._fake_execute()
+        with patch("git_sensei.git_ops.execute_git_command", side_effect=fake):
+            execute_git_commands(commands, max_workers=4)
+
+        events = state["events"]
+        start = events.index(("start", "git add .", 1))
+        assert events[start + 1] == ("end", "git add .", 0)
+        started_before = [e[1] for e in events[:start] if e[0] == "start"]
+        assert started_before == ["git status", "git diff"] or started_before == [
+            "git diff",
+            "git status",
+        ]
+
+    def test_stop_on_error_skips_remaining(self):
+        """Test that commands after a failure are reported as not executed."""
+        commands = ["git status", "git add missing", "git log", "git diff"]
+        fake, _ = self._fake_execute(failing={"git add missing"})
+        with patch("git_sensei.git_ops.execute_git_command", side_effect=fake):
+            results = execute_git_commands(commands, stop_on_error=True)
+
+        assert [r.success for r in results] == [True, False, False, False]
+        assert results[1].exit_code == 1
+        assert "not executed" in results[2].stderr
+        assert results[3].command == "git diff"
+
+    def test_failures_do_not_stop_by_default(self):
+        """Test that every command runs when stop_on_error is False."""
+        commands = ["git add missing", "git status"]
+        fake, _ = self._fake_execute(failing={"git add missing"})
+        with patch("git_sensei.git_ops.execute_git_command", side_effect=fake):
+            results = execute_git_commands(commands)
+
+        assert [r.success for r in results] == [False, True]
+        assert results[1].stdout == "out:git status"
+
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list."""
+        assert execute_git_commands([]) == []
+
+    def test_invalid_max_workers(self):
+        """Test that a non-positive worker count is rejected."""
+        with pytest.raises(ValueError):
+            execute_git_commands(["git status"], max_workers=-1)
+
+    @pytest.mark.parametrize(
+        "command,expected",
+        [
+            ("git status", True),
+            ("git -C repo log --oneline", True),
+            ("rev-parse HEAD", True),
+            ("git branch", True),
+            ("git branch --list 'feature/*'", True),
+            ("git branch new-branch", False),
+            ("git branch -D old", False),
+            ("git tag", True),
+            ("git tag v1.0", False),
+            ("git stash list", True),
+            ("git stash", False),
+            ("git config --get user.name", True),
+            ("git config user.name Someone", False),
+            ("git add .", False),
+            ("git commit -m message", False),
+            ("git unknown-command", False),
+            ("git", False),
+        ],
+    )
+    def test_is_read_only_command(self, command, expected):
+        """Test classification of commands for parallel execution."""
+        assert is_read_only_command(command) is expected
+
+
+class TestResourceUsage:
+    """Test cases for resource accounting on GitResult."""
+
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_usage_attached_to_result(self, mock_run):
+        """Test that results carry wall time and output sizes."""
+        mock_run.return_value = MagicMock(
+            stdout=b"On branch main\n", stderr=b"warning\n", returncode=0
+        )
+
+        result = execute_git_command("status")
+
+        assert isinstance(result.usage, ResourceUsage)
+        assert result.usage.wall_time >= 0
+        assert result.usage.stdout_bytes == len("On branch main\n")
+        assert result.usage.stderr_bytes == len("warning\n")
+
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_usage_on_timeout(self, mock_run):
+        """Test that timed out commands still report their wall time."""
+        mock_run.side_effect = subprocess.TimeoutExpired(["git", "fetch"], 1)
+
+        result = execute_git_command("fetch", timeout=1)
+
+        assert result.exit_code == 124
+        assert result.usage is not None
+
+    def test_usage_not_part_of_equality(self):
+        """Test that results compare equal regardless of usage."""
+        plain = GitResult(stdout="", stderr="", exit_code=0, command="x", success=True)
+        measured = GitResult(
+            stdout="",
+            stderr="",
+            exit_code=0,
+            command="x",
+            success=True,
+            usage=ResourceUsage(wall_time=1.0),
+        )
+
+        assert plain == measured
+        assert plain.usage is None
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+    @pytest.mark.skipif(os.name == "nt", reason="resource module not available")
+    def test_cpu_time_measured_for_real_process(self):
+        """Test that CPU time is reported for a command run on its own."""
+        result = execute_git_command("--version")
+
+        assert result.success is True
+        assert result.usage.user_time is not None
+        assert result.usage.system_time is not None
+        assert result.usage.stdout_bytes == len(result.stdout.encode())
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+    def test_cpu_time_unknown_when_processes_overlap(self):
+        """Test that CPU time is not attributed while other processes run."""
+        with stream_git_command("--version") as stream:
+            result = execute_git_command("--version")
+            stream_result = stream.result
+
+        assert result.usage.user_time is None
+        assert stream_result.usage.user_time is None
+        assert result.usage.wall_time >= 0
+
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_usage_report_collects_commands(self, mock_run):
+        """Test that an active report records every command."""
+        mock_run.return_value = MagicMock(stdout=b"abc", stderr=b"", returncode=0)
+
+        with UsageReport() as report:
+            execute_git_command("status")
+            execute_git_command("log -1")
+        execute_git_command("diff")
+
+        assert [command for command, _ in report.records] == ["status", "log -1"]
+        text = report.format()
+        assert "status" in text
+        assert "total (2 git processes)" in text
+        assert "diff" not in text
+
+
+class TestExecuteGitCommandAsync:
+    """Test cases for execute_git_command_async function."""
+
+    def teardown_method(self):
+        """Restore the default concurrency limit."""
+        set_async_concurrency_limit(DEFAULT_ASYNC_CONCURRENCY)
+
+    @pytest.mark.asyncio
+    async def test_async_success(self):
+        """Test that async execution returns a populated GitResult."""
+        fake = _FakeAsyncProcess(stdout=b"On branch main\r\n")
+        with patch("asyncio.create_subprocess_exec", return_value=fake) as mock_exec:
+            result = await execute_git_command_async("git status")
+
+        assert isinstance(result, GitResult)
+        assert result.stdout == "On branch main\n"
+        assert result.exit_code == 0
+        assert result.success is True
+        assert result.command == "git status"
+        assert mock_exec.call_args[0] == (_git_executable(), "status")
+
+    @pytest.mark.asyncio
+    async def test_async_failure_exit_code(self):
+        """Test that a failing command reports its exit code and stderr."""
+        fake = _FakeAsyncProcess(returncode=128, stderr=b"fatal: not a git repository")
+        with patch("asyncio.create_subprocess_exec", return_value=fake):
+            result = await execute_git_command_async("status")
+
+        assert result.success is False
+        assert result.exit_code == 128
+        assert result.stderr == "fatal: not a git repository"
+
+    @pytest.mark.asyncio
+    @patch("git_sensei.git_ops._kill_process_group")
+    async def test_async_timeout_kills_process(self, mock_kill):
+        """Test that a timeout kills the process group and reports exit code 124."""
+        fake = _FakeAsyncProcess(delay=5)
+        mock_kill.side_effect = lambda process: process.kill()
+        with patch("asyncio.create_subprocess_exec", return_value=fake):
+            result = await execute_git_command_async("fetch", timeout=0.05)
+
+        assert result.exit_code == 124
+        assert "timed out" in result.stderr
+        mock_kill.assert_called_once_with(fake)
+
+    @pytest.mark.asyncio
+    @patch("git_sensei.git_ops._kill_process_group")
+    async def test_async_cancellation_kills_process(self, mock_kill):
+        """Test that cancelling the caller kills the process group."""
+        fake = _FakeAsyncProcess(delay=5)
+        mock_kill.side_effect = lambda process: process.kill()
+        with patch("asyncio.create_subprocess_exec", return_value=fake):
+            task = asyncio.ensure_future(execute_git_command_async("fetch"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        mock_kill.assert_called_once_with(fake)
+
+    @pytest.mark.asyncio
+    async def test_async_starts_process_group(self):
+        """Test that the process is started in a new process group."""
+        fake = _FakeAsyncProcess()
+        with patch("asyncio.create_subprocess_exec", return_value=fake) as mock_exec:
+            await execute_git_command_async("status")
+
+        _assert_new_process_group(mock_exec.call_args.kwargs)
+
+    @pytest.mark.asyncio
+    async def test_async_concurrency_limit(self):
+        """Test that the shared semaphore bounds concurrent processes."""
+        set_async_concurrency_limit(3)
+        _FakeAsyncProcess.peak = 0
+
+        async def fake_exec(*_args, **_kwargs):
+            return _FakeAsyncProcess(delay=0.01)
+
+        with patch("asyncio.create_subprocess_exec", side_effect=fake_exec):
+            results = await asyncio.gather(
+                *(execute_git_command_async("log -1") for _ in range(12))
+            )
+
+        assert all(result.success for result in results)
+        assert _FakeAsyncProcess.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_async_file_not_found(self):
+        """Test error mapping when the executable cannot be started."""
+        with patch("asyncio.create_subprocess_exec", side_effect=FileNotFoundError()):
+            result = await execute_git_command_async("status")
+
+        assert result.exit_code == 127
+        assert "Git executable not found" in result.stderr
+
+    @pytest.mark.asyncio
+    @patch("git_sensei.git_ops.is_git_available")
+    async def test_async_empty_command(self, mock_git_available):
+        """Test validation of empty commands."""
+        mock_git_available.return_value = True
+
+        result = await execute_git_command_async("  ")
+
+        assert result.exit_code == 1
+        assert "Empty command provided" in result.stderr
+
+    def test_invalid_concurrency_limit(self):
+        """Test that a non-positive limit is rejected."""
+        with pytest.raises(ValueError):
+            set_async_concurrency_limit(0)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestStreamGitCommand:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for streaming command output."""
+
+    def setup_method(self):
+        """Set up a temporary repository."""
+        self.repo = _make_repo()
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def test_stream_chunks(self):
+        """Test that streamed chunks reassemble into the full output."""
+        expected = run_git(self.repo, "log", "--format=%s") + "\n"
+
+        with stream_git_command(f"git -C {self.repo} log --format=%s") as stream:
+            output = b"".join(stream)
+
+        assert output.decode() == expected
+        assert stream.result.success is True
+        assert stream.result.exit_code == 0
+        assert stream.result.stdout == ""
+
+    def test_stream_lines(self):
+        """Test line-by-line iteration."""
+        stream = stream_git_command(f"git -C {self.repo} log --format=%s")
+
+        assert list(stream.iter_lines()) == [b"Add app\n", b"Initial commit\n"]
+        assert stream.result.success is True
+
+    def test_stream_small_chunk_size(self):
+        """Test that chunks never exceed the requested size."""
+        stream = stream_git_command(f"git -C {self.repo} log", chunk_size=16)
+
+        chunks = list(stream)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 16 for chunk in chunks)
+
+    def test_stream_failure_captures_stderr(self):
+        """Test that stderr and exit code are reported for failing commands."""
+        outside = tempfile.mkdtemp()
+        try:
+            stream = stream_git_command(f"git -C {outside} log")
+
+            assert list(stream) == []
+            assert stream.result.success is False
+            assert stream.result.exit_code == 128
+            assert "not a git repository" in stream.result.stderr
+        finally:
+            shutil.rmtree(outside, ignore_errors=True)
+
+    def test_stream_early_close(self):
+        """Test that abandoning the stream stops the process."""
+        with stream_git_command(f"git -C {self.repo} log", chunk_size=1) as stream:
+            first = next(iter(stream))
+
+        assert len(first) == 1
+        assert stream.result is not None
+
+    @patch("git_sensei.git_ops.is_git_available")
+    def test_stream_invalid_command(self, mock_git_available):
+        """Test validation errors are exposed through the result."""
+        mock_git_available.return_value = True
+
+        stream = stream_git_command("git")
+
+        assert list(stream) == []
+        assert stream.result.exit_code == 1
+        assert "Invalid Git command format" in stream.result.stderr
+
+    @patch("git_sensei.git_ops._start_process")
+    def test_stream_popen_error(self, mock_popen):
+        """Test that spawn errors are mapped like execute_git_command."""
+        mock_popen.side_effect = PermissionError("denied")
+
+        stream = stream_git_command("status")
+
+        assert stream.result.exit_code == 126
+
+    def test_stream_timeout(self):
+        """Test that the timeout kills a command that runs too long."""
+        with patch("git_sensei.git_ops._prepare_command") as mock_prepare:
+            mock_prepare.return_value = ["sleep", "5"]
+            stream = stream_git_command("git fetch", timeout=0.1)
+
+            assert list(stream) == []
+
+        assert stream.result.exit_code == 124
+        assert "timed out" in stream.result.stderr
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestSpillToDisk:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for bounded-memory output capture."""
+
+    def setup_method(self):
+        """Set up a temporary repository."""
+        self.repo = _make_repo()
+        self.command = f"git -C {self.repo} log -p"
+        self.expected = subprocess.run(
+            ["git", "-C", str(self.repo), "log", "-p"],
+            check=True,
+            capture_output=True,
+        ).stdout
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def test_small_output_stays_in_memory(self):
+        """Test that output under the threshold is returned as stdout."""
+        result = execute_git_command(self.command, spill_threshold=1024 * 1024)
+
+        assert result.success is True
+        assert result.spilled_stdout is None
+        assert result.stdout.encode() == self.expected
+
+    def test_large_output_spilled(self):
+        """Test that output over the threshold is moved to a temporary file."""
+        result = execute_git_command(self.command, spill_threshold=64)
+
+        spill = result.spilled_stdout
+        assert result.success is True
+        assert result.stdout == ""
+        assert spill.size == len(self.expected)
+        assert spill.view()[:] == self.expected
+        assert spill.head(6) == "commit"
+        assert spill.tail(len(self.expected)).encode() == self.expected
+        assert b"".join(spill.iter_lines()) == self.expected
+        assert result.usage.stdout_bytes == len(self.expected)
+        spill.close()
+
+    def test_spill_threshold_boundary(self):
+        """Test that output exactly at the threshold is not spilled."""
+        result = execute_git_command(self.command, spill_threshold=len(self.expected))
+
+        assert result.spilled_stdout is None
+        assert result.stdout.encode() == self.expected
+
+    def test_spill_failure_result(self):
+        """Test that failing commands keep their exit code and stderr."""
+        result = execute_git_command(
+            f"git -C {self.repo} log no-such-ref", spill_threshold=64
+        )
+
+        assert result.success is False
+        assert result.exit_code == 128
+        assert "no-such-ref" in result.stderr
+        assert result.spilled_stdout is None
+
+    def test_spill_kept_on_timeout(self):
+        """Test that output spilled before a timeout is returned."""
+        with patch("git_sensei.git_ops._prepare_command") as mock_prepare:
+            mock_prepare.return_value = ["sh", "-c", "head -c 200 /dev/zero; sleep 5"]
+            result = execute_git_command("git log", timeout=1, spill_threshold=64)
+
+        assert result.exit_code == TIMEOUT_EXIT_CODE
+        assert result.spilled_stdout.size == 200
+        result.spilled_stdout.close()
+
+    def test_spill_cancelled(self):
+        """Test that cancelling a spilling command kills it and keeps the output."""
+        cancellation = GitCancellation()
+        script = "head -c 200 /dev/zero; sleep 30 & echo $! >&2; wait"
+        timer = threading.Timer(0.5, cancellation.cancel)
+        timer.start()
+        try:
+            with patch("git_sensei.git_ops._prepare_command") as mock_prepare:
+                mock_prepare.return_value = ["sh", "-c", script]
+                start = time.monotonic()
+                result = execute_git_command(
+                    "git log",
+                    timeout=30,
+                    spill_threshold=64,
+                    cancellation=cancellation,
+                )
+        finally:
+            timer.cancel()
+
+        assert time.monotonic() - start < 5
+        assert result.exit_code == 130
+        assert "cancelled" in result.stderr
+        assert result.spilled_stdout.size == 200
+        TestProcessGroups._assert_exited(int(result.stderr.split()[0]))
+        result.spilled_stdout.close()
+
+    def test_spill_skipped_when_cancelled(self):
+        """Test that a cancelled handle stops a spilling command from starting."""
+        cancellation = GitCancellation()
+        cancellation.cancel()
+
+        with patch("git_sensei.git_ops._start_process") as mock_start:
+            result = execute_git_command(
+                self.command, spill_threshold=64, cancellation=cancellation
+            )
+
+        mock_start.assert_not_called()
+        assert result.exit_code == 130
+
+
+class TestSpilledOutput:
+    """Test cases for SpilledOutput."""
+
+    def test_empty_output(self):
+        """Test views and previews of an empty file."""
+        with SpilledOutput() as spill:
+            assert spill.view() == b""
+            assert spill.head() == ""
+            assert list(spill.iter_lines()) == []
+
+    def test_line_without_trailing_newline(self):
+        """Test that a final unterminated line is still yielded."""
+        with SpilledOutput() as spill:
+            spill.write(b"one\ntwo")
+
+            assert list(spill.iter_lines()) == [b"one\n", b"two"]
+            assert spill.tail(3) == "two"
+
+    def test_close_releases_view(self):
+        """Test that closing invalidates the memory map."""
+        spill = SpilledOutput()
+        spill.write(b"data")
+        view = spill.view()
+
+        spill.close()
+
+        assert view.closed
+        spill.close()
+
+
+class TestBytesMode:
+    """Test cases for capturing stdout as raw bytes."""
+
+    @patch("git_sensei.git_ops.is_git_available", return_value=True)
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_stdout_decoded_lazily(self, mock_run, _mock_git_available):
+        """Test that bytes mode skips text decoding until stdout is read."""
+        mock_run.return_value = MagicMock(
+            stdout=b"line one\r\nline two\n", stderr=b"warning\n", returncode=0
+        )
+
+        with patch(
+            "git_sensei.git_ops._decode_output", wraps=git_ops._decode_output
+        ) as mock_decode:
+            result = execute_git_command("git log", text=False)
+            assert mock_decode.call_count == 1  # stderr only
+            assert result.stdout == "line one\nline two\n"
+            assert result.stdout == "line one\nline two\n"
+            assert mock_decode.call_count == 2
+
+        mock_run.assert_called_once_with(
+            [_git_executable(), "log"],
+            timeout=30,
+            cancellation=None,
+            env=ANY,
+            foreground=False,
+        )
+        assert result.stdout_bytes == b"line one\r\nline two\n"
+        assert result.stderr == "warning\n"
+        assert result.usage.stdout_bytes == len(result.stdout_bytes)
+
+    @patch("git_sensei.git_ops.is_git_available", return_value=True)
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_decode_error_handling(self, mock_run, _mock_git_available):
+        """Test that the decode error handler is configurable."""
+        mock_run.return_value = MagicMock(
+            stdout=b"caf\xe9.txt\n", stderr=b"", returncode=0
+        )
+
+        with patch("locale.getpreferredencoding", return_value="utf-8"):
+            replaced = execute_git_command("git ls-files", text=False)
+            escaped = execute_git_command(
+                "git ls-files", text=False, errors="surrogateescape"
+            )
+            strict = execute_git_command("git ls-files", text=False, errors="strict")
+
+            assert replaced.stdout == "caf\ufffd.txt\n"
+            assert escaped.stdout.encode("utf-8", "surrogateescape") == (
+                b"caf\xe9.txt\n"
+            )
+            with pytest.raises(UnicodeDecodeError):
+                _ = strict.stdout
+
+    def test_text_results_unchanged(self):
+        """Test that results built from text keep their stdout and compare equal."""
+        result = GitResult(
+            stdout="out", stderr="", exit_code=0, command="git status", success=True
+        )
+        lazy = GitResult(
+            stdout=None,
+            stderr="",
+            exit_code=0,
+            command="git status",
+            success=True,
+            stdout_bytes=b"out",
+        )
+
+        assert result.stdout == "out"
+        assert result.stdout_bytes is None
+        assert lazy == result
+        assert repr(lazy) == repr(result)
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+    def test_bytes_mode_with_real_git(self):
+        """Test that bytes mode returns exactly what Git wrote."""
+        repo = _make_repo()
+        try:
+            expected = subprocess.run(
+                ["git", "-C", str(repo), "log", "-p"],
+                check=True,
+                capture_output=True,
+            ).stdout
+
+            result = execute_git_command(f"git -C {repo} log -p", text=False)
+
+            assert result.success is True
+            assert result.stdout_bytes == expected
+            assert result.stdout.encode() == expected
+        finally:
+            shutil.rmtree(repo, ignore_errors=True)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+@pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX only")
+class TestProcessGroups:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for killing Git together with the helpers it starts."""
+
+    def setup_method(self):
+        """Create a repository with an alias that leaves a helper running."""
+        self.repo = _make_repo()
+        run_git(self.repo, "config", "alias.slow", "!sleep 60 & echo $!; wait")
+        self.command = f"git -C {self.repo} slow"
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    @staticmethod
+    def _assert_exited(pid):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return
+            try:
+                # A killed orphan stays a zombie until init reaps it
+                if Path(f"/proc/{pid}/stat").read_text().split()[2] == "Z":
+                    return
+            except OSError:
+                pass
+            time.sleep(0.05)
+        pytest.fail(f"helper process {pid} is still running")
+
+    def test_timeout_kills_helpers_and_keeps_output(self):
+        """Test that a timeout kills the whole group and returns partial output."""
+        start = time.monotonic()
+        result = execute_git_command(self.command, timeout=1)
+
+        assert result.exit_code == 124
+        assert "timed out after 1 seconds" in result.stderr
+        assert time.monotonic() - start < 4
+        self._assert_exited(int(result.stdout))
+
+    def test_cancel_from_another_thread(self):
+        """Test that a cancellation handle stops a running command."""
+        cancellation = GitCancellation()
+        timer = threading.Timer(0.5, cancellation.cancel)
+        timer.start()
+        try:
+            result = execute_git_command(
+                self.command, timeout=30, cancellation=cancellation
+            )
+        finally:
+            timer.cancel()
+
+        assert cancellation.cancelled is True
+        assert result.exit_code == 130
+        assert result.success is False
+        assert "cancelled" in result.stderr
+        self._assert_exited(int(result.stdout))
+
+    def test_cancelled_handle_skips_command(self):
+        """Test that commands given a cancelled handle are not started."""
+        cancellation = GitCancellation()
+        cancellation.cancel()
+
+        with patch("git_sensei.git_ops._run_process_group") as mock_run:
+            result = execute_git_command(self.command, cancellation=cancellation)
+
+        mock_run.assert_not_called()
+        assert result.exit_code == 130
+
+    def test_finished_command_not_reported_cancelled(self):
+        """Test that cancelling after a command finished leaves it successful."""
+        cancellation = GitCancellation()
+        result = execute_git_command("--version", cancellation=cancellation)
+        cancellation.cancel()
+
+        assert result.success is True
+
+    @patch("git_sensei.git_ops._give_terminal", return_value=None)
+    @patch("git_sensei.git_ops._kill_process_group")
+    @patch("git_sensei.git_ops._GitProcess")
+    def test_keyboard_interrupt_kills_group(self, mock_popen, mock_kill, _):
+        """Test that Ctrl+C kills the group and carries the partial output."""
+        process = mock_popen.return_value
+        process.communicate.side_effect = [KeyboardInterrupt, (b"partial", b"err")]
+
+        with pytest.raises(GitInterrupted) as exc_info:
+            execute_git_command("log")
+
+        mock_kill.assert_called_once_with(process)
+        _assert_new_process_group(mock_popen.call_args.kwargs)
+        assert exc_info.value.stdout == b"partial"
+        assert exc_info.value.stderr == b"err"
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 11), reason="older versions start a new session"
+    )
+    def test_keeps_session_and_terminal(self):
+        """Test that Git stays in this session, unlike with setsid."""
+        if shutil.which("ps") is None:
+            pytest.skip("ps not available")
+        run_git(self.repo, "config", "alias.ids", "!ps -o sid=,pgid= -p $$")
+
+        result = execute_git_command(f"git -C {self.repo} ids")
+        sid, pgid = (int(field) for field in result.stdout.split())
+
+        assert sid == os.getsid(0)
+        assert pgid != os.getpgrp()
+
+    @patch("git_sensei.git_ops._GitProcess")
+    def test_foreground_keeps_session(self, mock_popen):
+        """Test that foreground commands never start a new session."""
+        mock_popen.return_value.communicate.return_value = (b"", b"")
+        mock_popen.return_value.returncode = 0
+
+        execute_git_command("status", foreground=True)
+
+        _assert_new_process_group(mock_popen.call_args.kwargs, foreground=True)
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX process groups only")
+    @patch("git_sensei.git_ops._THREAD_WAIT_TIMEOUT", 0.1)
+    @patch("git_sensei.git_ops._GitProcess")
+    def test_foreground_avoids_preexec_fn_with_threads(self, mock_popen):
+        """Test that preexec_fn is only used once no other thread is running."""
+        release = threading.Event()
+        busy = threading.Thread(target=release.wait, daemon=True)
+        busy.start()
+        try:
+            with patch("git_sensei.git_ops.sys", version_info=(3, 10, 0)):
+                git_ops._start_process(["git", "status"], None, foreground=True)
+                with_thread = mock_popen.call_args.kwargs
+                release.set()
+                busy.join()
+                git_ops._start_process(["git", "status"], None, foreground=True)
+                alone = mock_popen.call_args.kwargs
+        finally:
+            release.set()
+
+        assert with_thread["start_new_session"] is True
+        assert "preexec_fn" not in with_thread
+        assert alone["preexec_fn"] is os.setpgrp
+
+    @pytest.mark.skipif(not hasattr(os, "openpty"), reason="pseudo-terminals only")
+    def test_foreground_can_open_terminal(self):
+        """Test that a foreground command can prompt on the controlling terminal."""
+        run_git(self.repo, "config", "alias.tty", "!exec 3<>/dev/tty && echo opened")
+        code = (
+            "import os, sys; os.open(sys.argv[1], os.O_RDWR); "
+            "from git_sensei.git_ops import execute_git_command; "
+            "result = execute_git_command(sys.argv[2], foreground=True); "
+            "print(result.stdout + result.stderr)"
+        )
+        command = f"git -C {self.repo} tty"
+        master, slave = os.openpty()
+        try:
+            # The child leads a new session whose controlling terminal is the pty
+            child = subprocess.run(
+                [sys.executable, "-c", code, os.ttyname(slave), command],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=30,
+                start_new_session=True,
+                cwd=Path(__file__).resolve().parent.parent,
+                check=False,
+            )
+        finally:
+            os.close(slave)
+            os.close(master)
+
+        assert child.stdout.decode().strip() == "opened", child.stderr.decode()
+
+    @patch("git_sensei.git_ops._take_terminal")
+    @patch("git_sensei.git_ops._give_terminal", return_value=99)
+    def test_interrupt_in_foreground_raises(self, _, mock_take):
+        """Test that Ctrl+C reaching Git through the terminal raises GitInterrupted."""
+        code = (
+            "import os, signal, sys; sys.stderr.write('err'); sys.stderr.flush(); "
+            "signal.signal(signal.SIGINT, signal.SIG_DFL); "
+            "os.kill(os.getpid(), signal.SIGINT)"
+        )
+
+        with pytest.raises(GitInterrupted) as exc_info:
+            git_ops._run_process_group([sys.executable, "-c", code], foreground=True)
+
+        mock_take.assert_called_once_with(99)
+        assert exc_info.value.stderr == b"err"
+
+    @patch("git_sensei.git_ops._give_terminal")
+    def test_terminal_only_for_foreground_commands(self, mock_give):
+        """Test that only commands run in the foreground get the terminal."""
+        mock_give.return_value = None
+
+        execute_git_command(f"git -C {self.repo} status")
+        with stream_git_command(f"git -C {self.repo} log") as stream:
+            list(stream)
+        mock_give.assert_not_called()
+
+        execute_git_command(f"git -C {self.repo} status", foreground=True)
+        with stream_git_command(f"git -C {self.repo} log", foreground=True) as stream:
+            list(stream)
+        assert mock_give.call_count == 2
+
+    def test_stream_timeout_kills_helpers(self):
+        """Test that a stream timeout kills the whole group."""
+        stream = stream_git_command(self.command, timeout=1)
+        output = b"".join(stream)
+
+        assert stream.result.exit_code == 124
+        self._assert_exited(int(output))
+
+    def test_stream_closed_early_kills_helpers(self):
+        """Test that abandoning a stream kills the whole group."""
+        with stream_git_command(self.command, timeout=30) as stream:
+            pid = int(next(iter(stream)))
+
+        self._assert_exited(pid)
+
+    @pytest.mark.asyncio
+    async def test_async_timeout_kills_helpers(self):
+        """Test that an async timeout kills the whole group."""
+        run_git(self.repo, "config", "alias.slow", "!sleep 60 & echo $! >pid; wait")
+
+        result = await execute_git_command_async(self.command, timeout=1)
+
+        assert result.exit_code == 124
+        self._assert_exited(int((self.repo / "pid").read_text()))
+
+
+@pytest.mark.skipif(not hasattr(os, "tcsetpgrp"), reason="POSIX terminals only")
+class TestTerminalHandOff:
+    """Test cases for making Git the terminal's foreground process group."""
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _terminal(foreground):
+        with patch("os.open", return_value=99), patch("os.close") as mock_close, patch(
+            "os.tcgetpgrp", return_value=foreground
+        ), patch("os.tcsetpgrp") as mock_set, patch("os.killpg") as mock_killpg:
+            yield mock_set, mock_killpg, mock_close
+
+    def test_hand_off_and_back(self):
+        """Test that the group gets the terminal and gives it back."""
+        with self._terminal(os.getpgrp()) as (mock_set, mock_killpg, mock_close):
+            fd = git_ops._give_terminal(4321)
+            git_ops._take_terminal(fd)
+
+        assert fd == 99
+        assert mock_set.call_args_list == [call(99, 4321), call(99, os.getpgrp())]
+        mock_killpg.assert_called_once_with(4321, signal.SIGCONT)
+        mock_close.assert_called_once_with(99)
+
+    def test_background_process_keeps_terminal(self):
+        """Test that a background process does not take the terminal."""
+        with self._terminal(os.getpgrp() + 1) as (mock_set, _, mock_close):
+            fd = git_ops._give_terminal(4321)
+
+        assert fd is None
+        mock_set.assert_not_called()
+        mock_close.assert_called_once_with(99)
+
+    def test_one_holder_at_a_time(self):
+        """Test that concurrent commands do not take the terminal from each other."""
+        with self._terminal(os.getpgrp()) as (mock_set, _, _):
+            first = git_ops._give_terminal(4321)
+            second = git_ops._give_terminal(8765)
+            git_ops._take_terminal(first)
+
+        assert first == 99
+        assert second is None
+        assert call(99, 8765) not in mock_set.call_args_list
+
+    def test_no_terminal(self):
+        """Test that commands run without a controlling terminal."""
+        with patch("os.open", side_effect=OSError("no tty")):
+            assert git_ops._give_terminal(4321) is None
+
+        assert git_ops._terminal_lock.locked() is False
+
+
+@pytest.mark.skipif(not is_git_available(), reason="Git not available")
+class TestProcessStart:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for starting Git processes."""
+
+    def setup_method(self):
+        """Create a repository."""
+        self.repo = _make_repo()
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def test_output_and_exit_code(self):
+        """Test stdout, stderr and exit codes."""
+        result = execute_git_command(f"git -C {self.repo} log --format=%s")
+        failed = execute_git_command(f"git -C {self.repo} rev-parse no-such-ref")
+
+        assert result.success is True
+        assert result.stdout.splitlines() == ["Add app", "Initial commit"]
+        assert failed.exit_code == 128
+        assert "no-such-ref" in failed.stderr
+
+    def test_large_output(self):
+        """Test output larger than a pipe buffer."""
+        blob = "x" * 300_000 + "\n"
+        (self.repo / "big.txt").write_text(blob, encoding="utf-8")
+
+        result = execute_git_command(
+            f"git -C {self.repo} hash-object -w big.txt", timeout=10
+        )
+        shown = execute_git_command(
+            f"git -C {self.repo} cat-file -p {result.stdout.strip()}"
+        )
+
+        assert shown.stdout == blob
+
+    def test_environment_passed(self):
+        """Test that the command environment reaches Git."""
+        repository = Repository(
+            GitDirs(str(self.repo / ".git"), str(self.repo / ".git"), str(self.repo))
+        )
+
+        with patch.dict(os.environ, {"GIT_AUTHOR_NAME": "Spawned Author"}):
+            result = execute_git_command(
+                "git var GIT_AUTHOR_IDENT", repository=repository
+            )
+
+        assert result.stdout.startswith("Spawned Author <")
+
+    def test_runs_in_own_process_group(self):
+        """Test that Git leads a new process group."""
+        if shutil.which("ps") is None:
+            pytest.skip("ps not available")
+        run_git(self.repo, "config", "alias.pgid", "!ps -o pgid= -p $$")
+
+        result = execute_git_command(f"git -C {self.repo} pgid")
+
+        assert int(result.stdout) != os.getpgrp()
+
+    @pytest.mark.skipif(not git_ops._PIDFD_AVAILABLE, reason="pidfd not available")
+    def test_timed_wait_does_not_poll(self):
+        """Test that waiting with a timeout sleeps until the process exits."""
+        # pylint: disable=protected-access
+        process = git_ops._start_process([sys.executable, "-c", "pass"], None)
+
+        with patch("time.sleep") as mock_sleep:
+            stdout, stderr = process.communicate(timeout=10)
+
+        mock_sleep.assert_not_called()
+        assert (process.returncode, stdout, stderr) == (0, b"", b"")
+
+    def test_timed_wait_expires(self):
+        """Test that a timed wait still raises TimeoutExpired."""
+        # pylint: disable=protected-access
+        process = git_ops._start_process(
+            [sys.executable, "-c", "import time; time.sleep(10)"], None
+        )
+        try:
+            with pytest.raises(subprocess.TimeoutExpired):
+                process.wait(timeout=0.05)
+        finally:
+            process.kill()
+            process.communicate()
+
+        assert process.returncode == -signal.SIGKILL
+
+
+class TestCommandEnvironment:
+    """Test cases for the command environment."""
+
+    def test_command_split_once(self):
+        """Test that a command string is split once for all its uses."""
+        # pylint: disable=protected-access
+        git_ops._split_command.cache_clear()
+
+        with patch("git_sensei.git_ops.get_repository", return_value=None), patch(
+            "git_sensei.git_ops._run_process_group"
+        ) as mock_run:
+            mock_run.return_value = MagicMock(stdout=b"", stderr=b"", returncode=0)
+            execute_git_command("git log --oneline -5")
+
+        info = git_ops._split_command.cache_info()
+        assert info.misses == 1
+        assert info.hits >= 2
+        assert mock_run.call_args.args[0][1:] == ["log", "--oneline", "-5"]
+
+
+class TestExecutionLanes:
+    """Test cases for the read-only and mutating execution lanes."""
+
+    @staticmethod
+    def _peak_concurrency(commands, repositories=None):
+        """Run commands on separate threads and return the most run at once."""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_run(*_args, **_kwargs):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return MagicMock(stdout=b"", stderr=b"", returncode=0)
+
+        with patch("git_sensei.git_ops.is_git_available", return_value=True), patch(
+            "git_sensei.git_ops._run_process_group", side_effect=fake_run
+        ):
+            threads = [
+                threading.Thread(
+                    target=execute_git_command,
+                    args=(command,),
+                    kwargs={"repository": repository},
+                )
+                for command, repository in zip(
+                    commands, repositories or [None] * len(commands)
+                )
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return state["peak"]
+
+    @patch("git_sensei.git_ops.is_git_available", return_value=True)
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_read_only_disables_optional_locks(self, mock_run, _mock_git_available):
+        """Test that read-only commands run with GIT_OPTIONAL_LOCKS=0."""
+        mock_run.return_value = MagicMock(stdout=b"", stderr=b"", returncode=0)
+
+        execute_git_command("git status --porcelain")
+
+        env = mock_run.call_args.kwargs["env"]
+        assert env["GIT_OPTIONAL_LOCKS"] == "0"
+        assert env["PATH"] == os.environ["PATH"]
+
+    @patch("git_sensei.git_ops.get_repository", return_value=None)
+    @patch("git_sensei.git_ops.is_git_available", return_value=True)
+    @patch("git_sensei.git_ops._run_process_group")
+    def test_mutating_inherits_environment(
+        self, mock_run, _mock_git_available, _mock_repository
+    ):
+        """Test that mutating commands keep the caller's environment."""
+        mock_run.return_value = MagicMock(stdout=b"", stderr=b"", returncode=0)
+
+        execute_git_command("git commit -m message")
+
+        assert mock_run.call_args.kwargs["env"] is None
+
+    def test_mutating_commands_serialized(self):
+        """Test that mutating commands never run at the same time."""
+        assert self._peak_concurrency(["git add a.txt"] * 4) == 1
+
+    def test_mutating_commands_in_different_repositories_overlap(self):
+        """Test that the mutating lane is per repository."""
+        repositories = [
+            Repository(GitDirs(f"/{name}/.git", f"/{name}/.git", f"/{name}"))
+            for name in ("one", "two", "one", "two")
+        ]
+
+        assert self._peak_concurrency(["git add a.txt"] * 4, repositories) == 2
+
+    def test_read_only_commands_overlap(self):
+        """Test that read-only commands do not wait for each other."""
+        assert self._peak_concurrency(["git log -1"] * 4) > 1
+
+    @pytest.mark.asyncio
+    async def test_async_lanes(self):
+        """Test the lanes of execute_git_command_async."""
+        _FakeAsyncProcess.peak = 0
+        envs = []
+
+        async def fake_exec(*_args, **kwargs):
+            envs.append(kwargs["env"])
+            return _FakeAsyncProcess(delay=0.01)
+
+        with patch("asyncio.create_subprocess_exec", side_effect=fake_exec), patch(
+            "git_sensei.git_ops.get_repository", return_value=None
+        ):
+            await asyncio.gather(
+                *(execute_git_command_async("fetch origin") for _ in range(4))
+            )
+            assert _FakeAsyncProcess.peak == 1
+            _FakeAsyncProcess.peak = 0
+            await asyncio.gather(*(execute_git_command_async("diff") for _ in range(4)))
+            assert _FakeAsyncProcess.peak > 1
+
+        assert envs[:4] == [None] * 4
+        assert all(env["GIT_OPTIONAL_LOCKS"] == "0" for env in envs[4:])
+
+
+class TestRepositoryPinning:
+    """Test cases for pinning commands to a discovered repository."""
+
+    repository = Repository(GitDirs("/repo/.git", "/repo/.git", "/repo"))
+
+    def _env(self, command, **kwargs):
+        """Run command with a mocked process and return its environment."""
+        with patch("git_sensei.git_ops.is_git_available", return_value=True), patch(
+            "git_sensei.git_ops.get_repository", return_value=self.repository
+        ), patch("git_sensei.git_ops._run_process_group") as mock_run:
+            mock_run.return_value = MagicMock(stdout=b"", stderr=b"", returncode=0)
+            execute_git_command(command, **kwargs)
+        return mock_run.call_args.kwargs["env"] or {}
+
+    def test_commands_pinned(self):
+        """Test that GIT_DIR and GIT_WORK_TREE point at the repository."""
+        for command in ("git status", "git commit -m message", "git -c a=b log"):
+            env = self._env(command)
+
+            assert env["GIT_DIR"] == "/repo/.git"
+            assert env["GIT_WORK_TREE"] == "/repo"
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "git -C /other status",
+            "git --git-dir=/other/.git log",
+            "git --work-tree /other status",
+            "git init",
+            "git clone https://example.com/repo.git",
+            "git --version",
+        ],
+    )
+    def test_commands_choosing_a_repository_unpinned(self, command):
+        """Test that commands locating a repository themselves are left alone."""
+        assert "GIT_DIR" not in self._env(command)
+
+    def test_explicit_repository(self):
+        """Test that a given repository wins over the current one."""
+        other = Repository(GitDirs("/other.git", "/other.git", None))
+
+        env = self._env("git log", repository=other)
+
+        assert env["GIT_DIR"] == "/other.git"
+        assert "GIT_WORK_TREE" not in env
+
+
+class TestGitObjectServer:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for the cat-file backed object server."""
+
+    def setup_method(self):
+        """Set up a temporary repository and object server."""
+        self.repo = _make_repo()
+        self.server = GitObjectServer(str(self.repo))
+
+    def teardown_method(self):
+        """Stop the server and remove the repository."""
+        self.server.close()
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def test_read_blob(self):
+        """Test reading a blob by revision expression."""
+        assert self.server.read_blob("HEAD:README.md") == b"hello\n"
+
+    def test_read_commit(self):
+        """Test reading and parsing commits."""
+        head = run_git(self.repo, "rev-parse", "HEAD")
+        parent = run_git(self.repo, "rev-parse", "HEAD~1")
+
+        commit = self.server.read_commit("HEAD")
+
+        assert commit.oid == head
+        assert commit.parents == [parent]
+        assert commit.subject == "Add app"
+        assert "Test User <test@example.com>" in commit.author
+
+    def test_read_tree(self):
+        """Test reading and parsing a tree."""
+        entries = self.server.read_tree("HEAD^{tree}")
+
+        assert [(e.mode, e.name) for e in entries] == [
+            ("100644", "README.md"),
+            ("40000", "src"),
+        ]
+        assert entries[0].oid == run_git(self.repo, "rev-parse", "HEAD:README.md")
+
+    def test_batch_with_missing_objects(self):
+        """Test that missing objects yield None without breaking the batch."""
+        results = self.server.object_infos(["HEAD", "does-not-exist", "HEAD~1"])
+
+        assert results[0].type == "commit"
+        assert results[0].data is None
+        assert results[1] is None
+        assert results[2].type == "commit"
+
+    def test_read_objects_preserves_order(self):
+        """Test that batched reads return results in request order."""
+        results = self.server.read_objects(["HEAD:src/app.py", "HEAD:README.md"])
+
+        assert [r.data for r in results] == [b"print('hi')\n", b"hello\n"]
+
+    def test_reuses_single_process(self):
+        """Test that many requests are served by one spawned process."""
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            for _ in range(20):
+                self.server.read_blob("HEAD:README.md")
+
+        assert mock_popen.call_count == 1
+
+    def test_restarts_after_crash(self):
+        """Test that a killed cat-file process is transparently restarted."""
+        self.server.read_blob("HEAD:README.md")
+        worker = self.server._all[0]  # pylint: disable=protected-access
+        worker.process.kill()
+        worker.process.wait()
+
+        assert self.server.read_blob("HEAD:README.md") == b"hello\n"
+
+    def test_not_a_repository(self):
+        """Test error reporting outside of a repository."""
+        outside = tempfile.mkdtemp()
+        try:
+            with GitObjectServer(outside) as server:
+                with pytest.raises(GitObjectServerError):
+                    server.read_object("HEAD")
+        finally:
+            shutil.rmtree(outside, ignore_errors=True)
+
+    def test_closed_server_raises(self):
+        """Test that a closed server refuses requests."""
+        self.server.close()
+
+        with pytest.raises(GitObjectServerError):
+            self.server.read_object("HEAD")
+
+    def test_get_object_server_is_shared(self):
+        """Test that the shared server registry returns one server per repo."""
+        first = get_object_server(str(self.repo))
+        second = get_object_server(str(self.repo / "src" / ".."))
+
+        try:
+            assert first is second
+        finally:
+            first.close()
+
+
+class TestObjectParsing:
+    """Test cases for raw object parsers."""
+
+    def test_parse_commit_merge(self):
+        """Test parsing a merge commit with multiple parents."""
+        data = (
+            b"tree " + b"a" * 40 + b"\n"
+            b"parent " + b"b" * 40 + b"\n"
+            b"parent " + b"c" * 40 + b"\n"
+            b"author A <a@x> 1700000000 +0000\n"
+            b"committer C <c@x> 1700000000 +0000\n"
+            b"\n"
+            b"Merge branch 'x'\n"
+        )
+
+        commit = parse_commit("d" * 40, data)
+
+        assert commit.tree == "a" * 40
+        assert commit.parents == ["b" * 40, "c" * 40]
+        assert commit.subject == "Merge branch 'x'"
+
+    def test_parse_tree_empty(self):
+        """Test parsing an empty tree."""
+        assert parse_tree(b"") == []
@@ -0,0 +1,296 @@
+"""
+Tests for the index module.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei.git_ops import GitResult
+from git_sensei.index import (
+    GitIndex,
+    UnsupportedIndexError,
+    WorktreeChanges,
+    get_worktree_changes,
+    read_ewah_bitmap,
+)
+from git_sensei.safety import check_command_safety
+from tests.conftest import run_git
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestGitIndex:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for parsing real index files."""
+
+    def setup_method(self):
+        """Create a repository with a handful of tracked files."""
+        self.repo = Path(tempfile.mkdtemp())
+        run_git(self.repo, "init", "-q")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        for name in ["a.txt", "dir/b.txt", "dir/sub/c.txt", "dir/sub/d.txt", "z.sh"]:
+            path = self.repo / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"{name}\n", encoding="utf-8")
+        (self.repo / "z.sh").chmod(0o755)
+        run_git(self.repo, "add", ".")
+        run_git(self.repo, "commit", "-q", "-m", "Initial commit")
+        self.index_path = str(self.repo / ".git" / "index")
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def _expected_entries(self):
+        entries = []
+        for line in run_git(self.repo, "ls-files", "-s").splitlines():
+            info, path = line.split("\t")
+            mode, oid, stage = info.split()
+            entries.append((path, oid, int(mode, 8), int(stage)))
+        return entries
+
+    def _parsed_entries(self):
+        index = GitIndex(self.index_path)
+        return [(e.path, e.oid, e.mode, e.stage) for e in index.entries]
+
+    @pytest.mark.parametrize("version", [2, 4])
+    def test_parse_versions(self, version):
+        """Test that every on-disk version yields the same entries."""
+        run_git(self.repo, "update-index", "--index-version", str(version))
+
+        index = GitIndex(self.index_path)
+
+        assert index.version == version
+        assert self._parsed_entries() == self._expected_entries()
+
+    def test_parse_extended_flags(self):
+        """Test intent-to-add entries, which require extended flags."""
+        (self.repo / "new.txt").write_text("new\n", encoding="utf-8")
+        run_git(self.repo, "add", "-N", "new.txt")
+
+        index = GitIndex(self.index_path)
+        entries = {e.path: e for e in index.entries}
+
+        assert index.version == 3
+        assert self._parsed_entries() == self._expected_entries()
+        assert entries["new.txt"].intent_to_add is True
+        assert entries["a.txt"].intent_to_add is False
+
+    def test_split_index(self):
+        """Test merging a split index with its shared index."""
+        run_git(self.repo, "update-index", "--split-index")
+        (self.repo / "a.txt").write_text("changed\n", encoding="utf-8")
+        (self.repo / "e.txt").write_text("e\n", encoding="utf-8")
+        run_git(self.repo, "add", "a.txt", "e.txt")
+        run_git(self.repo, "rm", "-q", "dir/b.txt")
+
+        index = GitIndex(self.index_path)
+
+        assert index.shared_index is not None
+        assert "link" in index.extensions
+        assert self._parsed_entries() == self._expected_entries()
+
+    def test_untracked_cache_is_ignored(self):
+        """Test that the untracked cache extension does not prevent parsing."""
+        run_git(self.repo, "config", "core.untrackedCache", "true")
+        run_git(self.repo, "update-index", "--untracked-cache")
+        run_git(self.repo, "status", "--porcelain")
+
+        index = GitIndex(self.index_path)
+
+        assert "UNTR" in index.extensions
+        assert self._parsed_entries() == self._expected_entries()
+
+    def test_unsupported_mandatory_extension(self):
+        """Test that unknown mandatory extensions are rejected."""
+        with open(self.index_path, "rb") as index_file:
+            data = index_file.read()
+        body = data[:-20] + b"abcd" + struct.pack(">I", 0) + b"\0" * 20
+        with open(self.index_path, "wb") as index_file:
+            index_file.write(body)
+
+        with pytest.raises(UnsupportedIndexError):
+            GitIndex(self.index_path)
+
+    def test_clean_tree(self):
+        """Test that an untouched tree reports no changes."""
+        changes = GitIndex(self.index_path).detect_changes(str(self.repo))
+
+        assert changes == WorktreeChanges()
+        assert changes.dirty is False
+
+    def test_detect_modified_and_deleted(self):
+        """Test detection of modified, deleted and mode-changed files."""
+        (self.repo / "a.txt").write_text("different length\n", encoding="utf-8")
+        (self.repo / "dir" / "sub" / "c.txt").unlink()
+        (self.repo / "z.sh").chmod(0o644)
+
+        changes = GitIndex(self.index_path).detect_changes(str(self.repo))
+
+        assert sorted(changes.modified) == ["a.txt", "z.sh"]
+        assert changes.deleted == ["dir/sub/c.txt"]
+
+    def test_same_size_change_detected_by_content(self):
+        """Test that a same-size edit is caught by hashing."""
+        (self.repo / "a.txt").write_text("A.TXT\n", encoding="utf-8")
+
+        changes = GitIndex(self.index_path).detect_changes(str(self.repo))
+
+        assert changes.modified == ["a.txt"]
+
+    def test_touched_file_is_not_modified(self):
+        """Test that rewriting identical contents is not a change."""
+        (self.repo / "a.txt").write_text("a.txt\n", encoding="utf-8")
+        os.utime(self.repo / "a.txt", (1, 1))
+
+        changes = GitIndex(self.index_path).detect_changes(str(self.repo))
+
+        assert changes.dirty is False
+
+    def test_matches_git_diff(self):
+        """Test agreement with git diff on a mix of changes."""
+        (self.repo / "dir" / "b.txt").write_text("edited\n", encoding="utf-8")
+        (self.repo / "dir" / "sub" / "d.txt").unlink()
+        expected = run_git(self.repo, "diff", "--name-only").split()
+
+        changes = GitIndex(self.index_path).detect_changes(str(self.repo))
+
+        assert sorted(changes.modified + changes.deleted) == sorted(expected)
+
+    def test_staged_changes_match_git_diff_cached(self):
+        """Test that staged additions, edits and removals are found."""
+        (self.repo / "a.txt").write_text("staged edit\n", encoding="utf-8")
+        (self.repo / "new.txt").write_text("new\n", encoding="utf-8")
+        run_git(self.repo, "add", "a.txt", "new.txt")
+        run_git(self.repo, "rm", "-q", "--cached", "dir/b.txt")
+        run_git(self.repo, "update-index", "--chmod=-x", "z.sh")
+        expected = run_git(self.repo, "diff", "--cached", "--name-only").split()
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(self.repo)
+            changes = get_worktree_changes()
+        finally:
+            os.chdir(original_cwd)
+
+        assert sorted(changes.staged) == sorted(expected)
+        assert changes.modified == ["z.sh"]
+
+    def test_get_worktree_changes_in_cwd(self):
+        """Test the convenience wrapper from inside the repository."""
+        (self.repo / "a.txt").write_text("edited!\n", encoding="utf-8")
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(self.repo / "dir")
+            changes = get_worktree_changes()
+        finally:
+            os.chdir(original_cwd)
+
+        assert changes.modified == ["a.txt"]
+
+    def test_get_worktree_changes_sha256(self):
+        """Test that SHA-256 repositories are read without running Git."""
+        repo = self.repo / "sha256"
+        run_git(self.repo, "init", "-q", "--object-format=sha256", str(repo))
+        for name in ["a.txt", "dir/b.txt"]:
+            (repo / name).parent.mkdir(parents=True, exist_ok=True)
+            (repo / name).write_text(f"{name}\n", encoding="utf-8")
+        run_git(repo, "add", ".")
+        (repo / "dir" / "b.txt").write_text("edited!\n", encoding="utf-8")
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(repo)
+            with patch("git_sensei.index.execute_git_command") as mock_execute:
+                changes = get_worktree_changes()
+        finally:
+            os.chdir(original_cwd)
+
+        mock_execute.assert_not_called()
+        assert changes.modified == ["dir/b.txt"]
+
+    @patch("git_sensei.index.execute_git_command")
+    def test_get_worktree_changes_fallback(self, mock_execute):
+        """Test falling back to git status when the index cannot be parsed."""
+        oid = "a" * 40
+        mock_execute.return_value = GitResult(
+            stdout=f"# branch.oid {oid}\0# branch.head main\0"
+            f"1 .M N... 100644 100644 100644 {oid} {oid} a.txt\0"
+            f"1 .D N... 100644 100644 000000 {oid} {oid} gone.txt\0"
+            f"1 M. N... 100644 100644 100644 {oid} {oid} staged.txt\0"
+            f"u UU N... 100644 100644 100644 100644 {oid} {oid} {oid} both.txt\0",
+            stderr="",
+            exit_code=0,
+            command="git status --porcelain=v2 -z",
+            success=True,
+        )
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(self.repo)
+            with patch(
+                "git_sensei.index.GitIndex", side_effect=UnsupportedIndexError("sdir")
+            ):
+                changes = get_worktree_changes()
+        finally:
+            os.chdir(original_cwd)
+
+        assert changes.modified == ["a.txt"]
+        assert changes.deleted == ["gone.txt"]
+        assert changes.unmerged == ["both.txt"]
+        assert changes.staged == ["staged.txt"]
+
+    def test_reset_hard_warning_lists_changes(self):
+        """Test that the reset --hard warning names files that would be lost."""
+        (self.repo / "a.txt").write_text("work in progress\n", encoding="utf-8")
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(self.repo)
+            result = check_command_safety("git reset --hard")
+        finally:
+            os.chdir(original_cwd)
+
+        assert result.is_safe is False
+        assert "1 tracked file will be lost: a.txt" in result.warning_message
+
+    def test_reset_hard_warning_lists_staged_changes(self):
+        """Test that staged-only changes are named as lost by reset --hard."""
+        (self.repo / "a.txt").write_text("staged edit\n", encoding="utf-8")
+        (self.repo / "b").write_text("new file\n", encoding="utf-8")
+        run_git(self.repo, "add", "a.txt", "b")
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(self.repo)
+            result = check_command_safety("git reset --hard")
+        finally:
+            os.chdir(original_cwd)
+
+        assert "2 tracked files will be lost: a.txt, b." in result.warning_message
+
+
+class TestEwahBitmap:
+    """Test cases for EWAH bitmap decoding."""
+
+    def test_literal_and_run_words(self):
+        """Test a bitmap with a run of ones followed by a literal word."""
+        # RLW: running bit 1, run length 1, one literal word
+        rlw = 1 | (1 << 1) | (1 << 33)
+        literal = 0b1010
+        data = struct.pack(">II", 132, 2) + struct.pack(">QQ", rlw, literal)
+        data += struct.pack(">I", 0)
+
+        bits, pos = read_ewah_bitmap(data, 0)
+
+        assert bits == set(range(64)) | {65, 67}
+        assert pos == len(data)
+
+    def test_empty_bitmap(self):
+        """Test decoding a bitmap without words."""
+        data = struct.pack(">II", 0, 0) + struct.pack(">I", 0)
+
+        bits, pos = read_ewah_bitmap(data, 0)
+
+        assert bits == set()
+        assert pos == len(data)
@@ -49,7 +49,7 @@ class TestSafeCommandWorkflows:  # pylint: disable=attribute-defined-outside-ini
 
         # Verify all components were called
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.execute_git_command")
@@ -75,7 +75,9 @@ class TestSafeCommandWorkflows:  # pylint: disable=attribute-defined-outside-ini
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git log --oneline -n 1")
+        mock_execute.assert_called_once_with(
+            "git log --oneline -n 1", text=False, foreground=True
+        )
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.execute_git_command")
@@ -102,7 +104,7 @@ class TestSafeCommandWorkflows:  # pylint: disable=attribute-defined-outside-ini
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git diff")
+        mock_execute.assert_called_once_with("git diff", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.execute_git_command")
@@ -129,7 +131,7 @@ class TestSafeCommandWorkflows:  # pylint: disable=attribute-defined-outside-ini
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git branch")
+        mock_execute.assert_called_once_with("git branch", text=False, foreground=True)
 
 
 class TestDangerousCommandWorkflows:  # pylint: disable=attribute-defined-outside-init
@@ -167,7 +169,9 @@ class TestDangerousCommandWorkflows:  # pylint: disable=attribute-defined-outsid
         # Verify all workflow steps
         mock_git_available.assert_called_once()
         mock_confirm.assert_called_once()
-        mock_execute.assert_called_once_with("git push --force origin main")
+        mock_execute.assert_called_once_with(
+            "git push --force origin main", text=False, foreground=True
+        )
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.get_user_confirmation")
@@ -217,7 +221,9 @@ class TestDangerousCommandWorkflows:  # pylint: disable=attribute-defined-outsid
         # Verify all workflow steps
         mock_git_available.assert_called_once()
         mock_confirm.assert_called_once()
-        mock_execute.assert_called_once_with("git reset --hard HEAD~1")
+        mock_execute.assert_called_once_with(
+            "git reset --hard HEAD~1", text=False, foreground=True
+        )
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.get_user_confirmation")
@@ -268,7 +274,9 @@ class TestDangerousCommandWorkflows:  # pylint: disable=attribute-defined-outsid
         # Verify all workflow steps
         mock_git_available.assert_called_once()
         mock_confirm.assert_called_once()
-        mock_execute.assert_called_once_with("git clean -fd")
+        mock_execute.assert_called_once_with(
+            "git clean -fd", text=False, foreground=True
+        )
 
 
 class TestErrorHandlingWorkflows:  # pylint: disable=attribute-defined-outside-init
@@ -316,7 +324,7 @@ class TestErrorHandlingWorkflows:  # pylint: disable=attribute-defined-outside-i
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.execute_git_command")
@@ -343,7 +351,7 @@ class TestErrorHandlingWorkflows:  # pylint: disable=attribute-defined-outside-i
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.execute_git_command")
@@ -370,7 +378,7 @@ class TestErrorHandlingWorkflows:  # pylint: disable=attribute-defined-outside-i
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.check_command_safety")
@@ -666,7 +674,7 @@ class TestComplexWorkflows:  # pylint: disable=attribute-defined-outside-init
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git status")
+        mock_execute.assert_called_once_with("git status", text=False, foreground=True)
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.get_user_confirmation")
@@ -769,7 +777,9 @@ class TestWorkflowPerformance:  # pylint: disable=attribute-defined-outside-init
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git log --oneline -n 100")
+        mock_execute.assert_called_once_with(
+            "git log --oneline -n 100", text=False, foreground=True
+        )
 
     @patch("git_sensei.cli.is_git_available")
     @patch("git_sensei.cli.execute_git_command")
@@ -790,7 +800,7 @@ class TestWorkflowPerformance:  # pylint: disable=attribute-defined-outside-init
 
         # Verify workflow execution
         mock_git_available.assert_called_once()
-        mock_execute.assert_called_once_with("git diff")
+        mock_execute.assert_called_once_with("git diff", text=False, foreground=True)
 
     def test_rapid_successive_commands_workflow(self):
         """Test workflow with rapid successive command executions."""
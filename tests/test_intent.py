@@ -0,0 +1,71 @@
+"""
+Tests for the intent module.
+"""
+
+from git_sensei.intent import (
+    ALWAYS_PROVIDERS,
+    DEFAULT_PROVIDERS,
+    classify_intent,
+    plan_context,
+)
+
+
+class TestClassifyIntent:
+    """Test cases for classify_intent function."""
+
+    def test_history(self):
+        """Test that questions about history are recognized as such alone."""
+        assert classify_intent("show the last 5 commits") == ("history",)
+        assert classify_intent("who changed README.md") == ("history",)
+
+    def test_combined_intents(self):
+        """Test that every matching intent is reported in rule order."""
+        assert classify_intent("Push my changes to origin") == (
+            "working_tree",
+            "remote",
+        )
+        assert classify_intent("stash everything") == ("stash",)
+        assert classify_intent("undo the last commit") == ("history", "working_tree")
+
+    def test_no_intent(self):
+        """Test that unrelated phrases match nothing."""
+        assert classify_intent("make it better") == ()
+
+
+class TestPlanContext:
+    """Test cases for plan_context function."""
+
+    def test_history_skips_status(self):
+        """Test that history questions only read commits."""
+        plan = plan_context("show the last 5 commits")
+
+        assert plan.providers == ALWAYS_PROVIDERS | {"commits"}
+
+    def test_branch_skips_status(self):
+        """Test that mentioning a branch does not add the status scan."""
+        plan = plan_context("show the last 5 commits on this branch")
+
+        assert plan.intents == ("history", "branch")
+        assert plan.providers == ALWAYS_PROVIDERS | {"commits"}
+        assert plan_context("list branches").providers == ALWAYS_PROVIDERS
+
+    def test_push_and_stash_add_providers(self):
+        """Test that remote and stash phrases add their providers."""
+        assert plan_context("push to origin").providers == ALWAYS_PROVIDERS | {
+            "status",
+            "remotes",
+            "upstream",
+        }
+        assert plan_context("list my stashes").providers == ALWAYS_PROVIDERS | {
+            "status",
+            "stashes",
+        }
+        assert plan_context("how far behind am I").providers == ALWAYS_PROVIDERS | {
+            "upstream"
+        }
+
+    def test_defaults(self):
+        """Test that unknown or missing phrases get the default providers."""
+        assert plan_context("make it better").providers == DEFAULT_PROVIDERS
+        assert plan_context(None).providers == DEFAULT_PROVIDERS
+        assert plan_context(None).intents == ()
@@ -0,0 +1,223 @@
+"""
+Tests for the odb module.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from git_sensei.odb import (
+    DeltaBaseCache,
+    ObjectDatabase,
+    ObjectDatabaseError,
+    apply_delta,
+    get_object_database,
+    get_recent_commits,
+)
+from tests.conftest import run_git
+
+
+def _commit(repo, message, seconds):
+    """Commit staged changes with fixed author and committer dates."""
+    date = f"2024-01-01T00:{seconds // 60:02d}:{seconds % 60:02d}"
+    subprocess.run(
+        ["git", "-C", str(repo), "commit", "-q", "-m", message],
+        check=True,
+        capture_output=True,
+        env={**os.environ, "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date},
+    )
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestObjectDatabase:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for reading real object stores."""
+
+    def setup_method(self):
+        """Create a repository whose file grows a little with every commit."""
+        self.repo = Path(tempfile.mkdtemp())
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        lines = [f"line {i} of a file that deltas well\n" for i in range(200)]
+        for i in range(12):
+            lines[i * 7] = f"changed in commit {i}\n"
+            (self.repo / "data.txt").write_text("".join(lines), encoding="utf-8")
+            run_git(self.repo, "add", "data.txt")
+            _commit(self.repo, f"Commit {i}", i)
+        self.objects_dir = str(self.repo / ".git" / "objects")
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def _all_objects(self):
+        output = run_git(self.repo, "cat-file", "--batch-all-objects", "--batch-check")
+        return [line.split()[:2] for line in output.splitlines()]
+
+    def _assert_matches_git(self, odb):
+        objects = self._all_objects()
+        assert objects
+        for oid, obj_type in objects:
+            expected = subprocess.run(
+                ["git", "-C", str(self.repo), "cat-file", obj_type, oid],
+                check=True,
+                capture_output=True,
+            ).stdout
+            obj = odb.read_object(oid)
+            assert obj is not None
+            assert obj.type == obj_type
+            assert obj.data == expected
+
+    def test_loose_objects(self):
+        """Test reading objects before anything is packed."""
+        odb = ObjectDatabase(self.objects_dir)
+
+        self._assert_matches_git(odb)
+        odb.close()
+
+    def test_packed_objects_with_ofs_deltas(self):
+        """Test resolving OFS_DELTA chains in a freshly repacked store."""
+        run_git(self.repo, "repack", "-a", "-d", "-f", "-q", "--depth=50")
+        odb = ObjectDatabase(self.objects_dir)
+
+        self._assert_matches_git(odb)
+        assert len(odb.delta_cache) > 0
+        odb.close()
+
+    def test_packed_objects_with_ref_deltas_and_v1_index(self):
+        """Test REF_DELTA objects and version 1 pack indexes."""
+        run_git(self.repo, "config", "repack.useDeltaBaseOffset", "false")
+        run_git(self.repo, "config", "pack.indexVersion", "1")
+        run_git(self.repo, "repack", "-a", "-d", "-f", "-q")
+        odb = ObjectDatabase(self.objects_dir)
+
+        self._assert_matches_git(odb)
+        odb.close()
+
+    def test_new_pack_is_discovered(self):
+        """Test that objects packed after the first read are still found."""
+        run_git(self.repo, "repack", "-a", "-d", "-q")
+        odb = ObjectDatabase(self.objects_dir)
+        head = run_git(self.repo, "rev-parse", "HEAD")
+        assert odb.read_commit(head) is not None
+
+        (self.repo / "extra.txt").write_text("extra\n", encoding="utf-8")
+        run_git(self.repo, "add", "extra.txt")
+        run_git(self.repo, "commit", "-q", "-m", "Extra")
+        run_git(self.repo, "repack", "-a", "-d", "-q")
+        new_head = run_git(self.repo, "rev-parse", "HEAD")
+
+        assert odb.read_commit(new_head).subject == "Extra"
+        odb.close()
+
+    def test_alternates(self):
+        """Test reading objects borrowed from another repository."""
+        clone = Path(tempfile.mkdtemp()) / "clone"
+        try:
+            subprocess.run(
+                ["git", "clone", "-q", "--shared", str(self.repo), str(clone)],
+                check=True,
+                capture_output=True,
+            )
+            odb = ObjectDatabase(str(clone / ".git" / "objects"))
+            head = run_git(self.repo, "rev-parse", "HEAD")
+
+            assert odb.read_commit(head).subject == "Commit 11"
+            odb.close()
+        finally:
+            shutil.rmtree(clone.parent, ignore_errors=True)
+
+    def test_missing_object(self):
+        """Test that absent objects are reported as None."""
+        odb = ObjectDatabase(self.objects_dir)
+
+        assert odb.read_object("0" * 40) is None
+        odb.close()
+
+    def test_iter_commits_matches_git_log(self):
+        """Test that the history walk matches git log ordering."""
+        run_git(self.repo, "checkout", "-q", "-b", "side", "HEAD~3")
+        (self.repo / "side.txt").write_text("side\n", encoding="utf-8")
+        run_git(self.repo, "add", "side.txt")
+        _commit(self.repo, "Side", 60)
+        run_git(self.repo, "checkout", "-q", "main")
+        run_git(self.repo, "merge", "-q", "--no-ff", "--no-commit", "side")
+        _commit(self.repo, "Merge side", 120)
+        run_git(self.repo, "repack", "-a", "-d", "-q")
+        odb = ObjectDatabase(self.objects_dir)
+        head = run_git(self.repo, "rev-parse", "HEAD")
+
+        walked = [commit.oid for commit in odb.iter_commits([head])]
+
+        assert walked == run_git(self.repo, "rev-list", "HEAD").splitlines()
+        odb.close()
+
+    def test_get_recent_commits_matches_oneline_log(self):
+        """Test the git log --oneline replacement used by context."""
+        expected = run_git(self.repo, "log", "--oneline", "-n", "5").splitlines()
+
+        assert get_recent_commits(5, str(self.repo)) == expected
+
+    def test_get_recent_commits_unborn_head(self):
+        """Test that a repository without commits yields an empty list."""
+        run_git(self.repo, "checkout", "-q", "--orphan", "fresh")
+
+        assert get_recent_commits(5, str(self.repo)) == []
+
+    def test_get_object_database_cached(self):
+        """Test that databases are reused per object directory."""
+        odb = get_object_database(str(self.repo))
+
+        assert odb is not None
+        assert odb is get_object_database(str(self.repo / ".git"))
+
+
+class TestApplyDelta:
+    """Test cases for delta application."""
+
+    def test_copy_and_insert(self):
+        """Test a delta mixing copy and insert instructions."""
+        base = b"hello world"
+        # source size 11, target size 11; copy 6 bytes from 0, insert "there"
+        delta = bytes([11, 11, 0x90, 6, 5]) + b"there"
+
+        assert apply_delta(base, delta) == b"hello there"
+
+    def test_copy_with_offset(self):
+        """Test a copy instruction with an explicit offset."""
+        base = b"hello world"
+        delta = bytes([11, 5, 0x91, 6, 5])
+
+        assert apply_delta(base, delta) == b"world"
+
+    def test_wrong_base_size(self):
+        """Test that a mismatched base is rejected."""
+        with pytest.raises(ObjectDatabaseError):
+            apply_delta(b"short", bytes([11, 0]))
+
+
+class TestDeltaBaseCache:
+    """Test cases for the LRU delta base cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is dropped when over budget."""
+        cache = DeltaBaseCache(max_bytes=10)
+        cache.put(("p", 1), ("blob", b"aaaa"))
+        cache.put(("p", 2), ("blob", b"bbbb"))
+        assert cache.get(("p", 1)) is not None
+        cache.put(("p", 3), ("blob", b"cccc"))
+
+        assert cache.get(("p", 2)) is None
+        assert cache.get(("p", 1)) == ("blob", b"aaaa")
+        assert cache.get(("p", 3)) == ("blob", b"cccc")
+
+    def test_oversized_entries_not_cached(self):
+        """Test that objects larger than the budget are skipped."""
+        cache = DeltaBaseCache(max_bytes=4)
+        cache.put(("p", 1), ("blob", b"too large"))
+
+        assert len(cache) == 0
@@ -0,0 +1,280 @@
+"""
+Tests for the refs module.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei.refs import (
+    GitDirs,
+    PackedRefs,
+    RefReader,
+    discover_git_dirs,
+    get_current_branch,
+    get_ref_reader,
+)
+from tests.conftest import run_git
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestRefReader:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for RefReader against real repositories."""
+
+    def setup_method(self):
+        """Create a repository with one commit on branch main."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.repo = self.temp_dir / "repo"
+        self.repo.mkdir()
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        (self.repo / "file.txt").write_text("content\n", encoding="utf-8")
+        run_git(self.repo, "add", "file.txt")
+        run_git(self.repo, "commit", "-q", "-m", "Initial commit")
+        self.head = run_git(self.repo, "rev-parse", "HEAD")
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _reader(self, path=None):
+        return RefReader(discover_git_dirs(str(path or self.repo)))
+
+    def test_current_branch(self):
+        """Test reading the current branch from HEAD."""
+        reader = self._reader()
+
+        assert reader.current_branch() == "main"
+        assert reader.is_detached() is False
+        assert reader.read_head().oid == self.head
+
+    def test_current_branch_from_subdirectory(self):
+        """Test discovery from a nested directory."""
+        nested = self.repo / "a" / "b"
+        nested.mkdir(parents=True)
+
+        assert get_current_branch(str(nested)) == "main"
+
+    def test_detached_head(self):
+        """Test detection of a detached HEAD."""
+        run_git(self.repo, "checkout", "-q", "--detach")
+        reader = self._reader()
+
+        assert reader.current_branch() is None
+        assert reader.is_detached() is True
+        assert reader.read_head().oid == self.head
+
+    def test_unborn_branch(self):
+        """Test that an unborn branch is still reported by name."""
+        run_git(self.repo, "checkout", "-q", "--orphan", "fresh")
+
+        reader = self._reader()
+
+        assert reader.current_branch() == "fresh"
+        assert reader.read_head().oid is None
+
+    def test_packed_refs_lookup(self):
+        """Test resolving refs that only exist in packed-refs."""
+        for i in range(200):
+            run_git(self.repo, "branch", f"feature/{i:03d}")
+        run_git(self.repo, "tag", "-a", "v1.0", "-m", "Release")
+        run_git(self.repo, "pack-refs", "--all")
+        reader = self._reader()
+
+        assert not (self.repo / ".git" / "refs" / "heads" / "main").exists()
+        assert reader.current_branch() == "main"
+        assert reader.resolve_ref("refs/heads/main") == self.head
+        for i in (0, 57, 123, 199):
+            assert reader.resolve_ref(f"refs/heads/feature/{i:03d}") == self.head
+        assert reader.resolve_ref("refs/heads/feature/200") is None
+        assert reader.resolve_ref("refs/heads/aaa") is None
+        assert reader.resolve_ref("refs/tags/zzz") is None
+
+    def test_lookup_annotated_tag(self):
+        """Test tag lookups with and without peeling."""
+        run_git(self.repo, "tag", "-a", "v1.0", "-m", "Release")
+        tag_oid = run_git(self.repo, "rev-parse", "refs/tags/v1.0")
+        run_git(self.repo, "pack-refs", "--all")
+        reader = self._reader()
+
+        assert reader.lookup_tag("v1.0") == tag_oid
+        assert reader.lookup_tag("v1.0", peel=True) == self.head
+        assert reader.lookup_tag("missing") is None
+
+    def test_packed_refs_refreshed_after_change(self):
+        """Test that a rewritten packed-refs file is picked up."""
+        reader = self._reader()
+        run_git(self.repo, "branch", "later")
+        run_git(self.repo, "pack-refs", "--all")
+
+        assert reader.resolve_ref("refs/heads/later") == self.head
+
+    def test_upstream(self):
+        """Test reading the upstream branch from config."""
+        run_git(self.repo, "config", "branch.main.remote", "origin")
+        run_git(self.repo, "config", "branch.main.merge", "refs/heads/main")
+        run_git(self.repo, "config", "branch.feature/x.remote", ".")
+        run_git(self.repo, "config", "branch.feature/x.merge", "refs/heads/main")
+        reader = self._reader()
+
+        assert reader.upstream() == "origin/main"
+        assert reader.upstream("feature/x") == "main"
+        assert reader.upstream("other") is None
+
+    def test_list_refs(self):
+        """Test listing loose and packed refs together."""
+        run_git(self.repo, "branch", "packed")
+        run_git(self.repo, "pack-refs", "--all")
+        run_git(self.repo, "branch", "loose")
+
+        refs = self._reader().list_refs("refs/heads/")
+
+        assert refs == ["refs/heads/loose", "refs/heads/main", "refs/heads/packed"]
+
+    def test_list_refs_partial_name(self):
+        """Test that a prefix ending inside a name matches loose and packed refs."""
+        run_git(self.repo, "branch", "main2")
+        run_git(self.repo, "pack-refs", "--all")
+        run_git(self.repo, "branch", "maloose")
+        run_git(self.repo, "branch", "other")
+
+        refs = self._reader().list_refs("refs/heads/ma")
+
+        assert refs == ["refs/heads/main", "refs/heads/main2", "refs/heads/maloose"]
+
+    def test_linked_worktree(self):
+        """Test that linked worktrees use their own HEAD and shared refs."""
+        worktree = self.temp_dir / "wt"
+        run_git(self.repo, "worktree", "add", "-q", "-b", "topic", str(worktree))
+        run_git(self.repo, "pack-refs", "--all")
+
+        dirs = discover_git_dirs(str(worktree))
+        reader = RefReader(dirs)
+
+        assert os.path.samefile(dirs.common_dir, self.repo / ".git")
+        assert dirs.git_dir != dirs.common_dir
+        assert reader.current_branch() == "topic"
+        assert reader.resolve_ref("refs/heads/main") == self.head
+
+    def test_list_refs_linked_worktree(self):
+        """Test that a linked worktree lists shared and its own loose refs."""
+        worktree = self.temp_dir / "wt"
+        run_git(self.repo, "worktree", "add", "-q", "-b", "topic", str(worktree))
+        run_git(self.repo, "tag", "v1")
+        run_git(self.repo, "update-ref", "refs/bisect/main-only", "HEAD")
+        run_git(worktree, "update-ref", "refs/bisect/bad", "HEAD")
+
+        reader = RefReader(discover_git_dirs(str(worktree)))
+        expected = run_git(worktree, "for-each-ref", "--format=%(refname)").split()
+
+        assert reader.list_refs() == sorted(expected)
+        assert "refs/heads/topic" in reader.list_refs("refs/heads/")
+        assert reader.list_refs("refs/bisect/") == ["refs/bisect/bad"]
+
+    def test_get_ref_reader_cached(self):
+        """Test that readers are reused per repository."""
+        assert get_ref_reader(str(self.repo)) is get_ref_reader(str(self.repo))
+
+    def test_git_dir_environment(self):
+        """Test that GIT_DIR takes precedence over discovery."""
+        with patch.dict("os.environ", {"GIT_DIR": str(self.repo / ".git")}):
+            dirs = discover_git_dirs(str(self.temp_dir))
+
+        assert dirs is not None
+        assert dirs.git_dir == str(self.repo / ".git")
+
+
+class TestPackedRefs:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for packed-refs parsing."""
+
+    def setup_method(self):
+        """Create a scratch directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "packed-refs")
+
+    def teardown_method(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, content):
+        with open(self.path, "w", encoding="utf-8") as packed:
+            packed.write(content)
+
+    def test_unsorted_file_uses_scan(self):
+        """Test lookups in a file without the sorted trait."""
+        self._write(
+            "# pack-refs with: peeled\n"
+            f"{'b' * 40} refs/tags/v2\n"
+            f"^{'c' * 40}\n"
+            f"{'a' * 40} refs/heads/main\n"
+        )
+        packed = PackedRefs(self.path)
+
+        assert packed.lookup("refs/heads/main") == ("a" * 40, None)
+        assert packed.lookup("refs/tags/v2") == ("b" * 40, "c" * 40)
+        assert packed.lookup("refs/heads/other") is None
+        packed.close()
+
+    def test_sorted_file_with_peel_lines(self):
+        """Test binary search across records followed by peel lines."""
+        lines = ["# pack-refs with: peeled fully-peeled sorted \n"]
+        for i in range(50):
+            lines.append(f"{i:040x} refs/tags/t{i:03d}\n")
+            lines.append(f"^{i + 1000:040x}\n")
+        self._write("".join(lines))
+        packed = PackedRefs(self.path)
+
+        for i in range(50):
+            assert packed.lookup(f"refs/tags/t{i:03d}") == (
+                f"{i:040x}",
+                f"{i + 1000:040x}",
+            )
+        assert packed.lookup("refs/tags/t050") is None
+        packed.close()
+
+    def test_missing_and_empty_files(self):
+        """Test that absent or empty files have no refs."""
+        packed = PackedRefs(self.path)
+        assert packed.lookup("refs/heads/main") is None
+
+        self._write("")
+        assert packed.lookup("refs/heads/main") is None
+        assert packed.names() == []
+
+
+class TestDiscovery:
+    """Test cases for repository discovery."""
+
+    def test_not_a_repository(self):
+        """Test discovery outside of any repository."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            assert discover_git_dirs(temp_dir) is None
+            assert get_current_branch(temp_dir) is None
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_git_file_pointing_elsewhere(self):
+        """Test following a .git file to a separate git directory."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            git_dir = os.path.join(temp_dir, "store")
+            work = os.path.join(temp_dir, "work")
+            os.makedirs(git_dir)
+            os.makedirs(work)
+            with open(os.path.join(git_dir, "HEAD"), "w", encoding="utf-8") as head:
+                head.write("ref: refs/heads/trunk\n")
+            with open(os.path.join(work, ".git"), "w", encoding="utf-8") as dot_git:
+                dot_git.write("gitdir: ../store\n")
+
+            dirs = discover_git_dirs(work)
+
+            assert dirs == GitDirs(git_dir=git_dir, common_dir=git_dir, work_tree=work)
+            assert RefReader(dirs).current_branch() == "trunk"
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,108 @@
+"""
+Tests for the repository module.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei import repository as repository_module
+from git_sensei.git_ops import execute_git_command
+from git_sensei.repository import (
+    Repository,
+    UnsafeRepositoryError,
+    clear_repository_cache,
+    get_repository,
+)
+from tests.conftest import run_git
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestGetRepository:  # pylint: disable=attribute-defined-outside-init
+    """Test cases for discovering and caching repositories."""
+
+    def setup_method(self):
+        """Create a repository with a subdirectory."""
+        clear_repository_cache()
+        self.temp_dir = Path(tempfile.mkdtemp()).resolve()
+        self.repo = self.temp_dir / "repo"
+        self.subdir = self.repo / "src"
+        self.subdir.mkdir(parents=True)
+        run_git(self.repo, "init", "-q", "-b", "main")
+        self.original_cwd = os.getcwd()
+
+    def teardown_method(self):
+        """Restore the working directory and remove the repository."""
+        os.chdir(self.original_cwd)
+        clear_repository_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_discovers_from_subdirectory(self):
+        """Test that the work tree, git dir and common dir are found."""
+        repository = get_repository(str(self.subdir))
+
+        assert repository.work_tree == str(self.repo)
+        assert repository.git_dir == str(self.repo / ".git")
+        assert repository.common_dir == str(self.repo / ".git")
+        assert repository.environment == {
+            "GIT_DIR": str(self.repo / ".git"),
+            "GIT_WORK_TREE": str(self.repo),
+        }
+
+    def test_cached_by_directory(self):
+        """Test that discovery runs once per directory."""
+        with patch(
+            "git_sensei.repository.discover_git_dirs",
+            wraps=repository_module.discover_git_dirs,
+        ) as mock_discover:
+            first = get_repository(str(self.subdir))
+            second = get_repository(str(self.subdir))
+            get_repository(str(self.repo))
+
+        assert first is second
+        assert mock_discover.call_count == 2
+
+    def test_recreated_directory_rediscovered(self):
+        """Test that a new directory at the same path is not served from cache."""
+        outside = self.temp_dir / "outside"
+        outside.mkdir()
+        assert get_repository(str(outside)) is None
+
+        shutil.rmtree(outside)
+        shutil.move(str(self.repo), str(outside))
+
+        assert get_repository(str(outside)).work_tree == str(outside)
+
+    def test_not_a_repository(self):
+        """Test that directories outside repositories are not pinned."""
+        assert get_repository(str(self.temp_dir)) is None
+        assert get_repository(str(self.temp_dir / "missing")) is None
+
+    @pytest.mark.skipif(not hasattr(os, "geteuid"), reason="POSIX ownership")
+    def test_foreign_repository_not_pinned(self):
+        """Test that repositories owned by another user are left to Git."""
+        with patch("os.geteuid", return_value=os.geteuid() + 1):
+            assert get_repository(str(self.repo)) is None
+
+    @pytest.mark.skipif(not hasattr(os, "geteuid"), reason="POSIX ownership")
+    def test_foreign_repository_strict(self):
+        """Test that strict discovery reports the ownership problem."""
+        with patch("os.geteuid", return_value=os.geteuid() + 1):
+            with pytest.raises(UnsafeRepositoryError, match="not owned by the current"):
+                get_repository(str(self.repo), strict=True)
+
+        assert get_repository(str(self.temp_dir), strict=True) is None
+
+    def test_pinned_command_keeps_prefix(self):
+        """Test that pinned commands still see the current subdirectory."""
+        os.chdir(self.subdir)
+
+        result = execute_git_command("git rev-parse --show-prefix --show-toplevel")
+
+        assert isinstance(get_repository(), Repository)
+        assert result.success is True
+        assert result.stdout.split() == ["src/", str(self.repo)]
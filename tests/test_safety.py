@@ -153,6 +153,17 @@ class TestCheckCommandSafety:
         assert len(result.dangerous_patterns) > 0
         assert "reset" in result.warning_message.lower()
 
+    def test_branch_force_delete_case_sensitive(self):
+        """Test that "branch -D" is flagged and the safe "branch -d" is not."""
+        forced = check_command_safety("git branch -D feature")
+        merged_only = check_command_safety("git branch -d feature")
+
+        assert forced.is_safe is False
+        assert r"branch\s+(-D|--delete\s+--force)" in forced.dangerous_patterns
+        assert "force delete branches" in forced.warning_message
+        assert merged_only.is_safe is True
+        assert not merged_only.dangerous_patterns
+
     def test_check_dangerous_command_filter_branch(self):
         """Test safety check for dangerous filter-branch command."""
         result = check_command_safety(
@@ -326,6 +337,15 @@ class TestWarningMessageGeneration:
             or "changes" in result.warning_message.lower()
         )
 
+    @patch("git_sensei.safety._describe_uncommitted_changes")
+    def test_warning_without_repository_details(self, mock_describe):
+        """Test that repository details can be left out of the warning."""
+        result = check_command_safety("git reset --hard", describe_repository=False)
+
+        assert result.is_safe is False
+        assert result.warning_message.endswith("reset your working directory.")
+        mock_describe.assert_not_called()
+
     def test_filter_branch_warning_message(self):
         """Test warning message for filter-branch operations."""
         result = check_command_safety("git filter-branch --tree-filter 'rm file'")
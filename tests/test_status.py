@@ -0,0 +1,299 @@
+"""
+Tests for the status module.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei.git_ops import GitResult
+from git_sensei.status import (
+    ENTRY_ORDINARY,
+    ENTRY_RENAMED,
+    ENTRY_UNMERGED,
+    ENTRY_UNTRACKED,
+    STATUS_COMMAND,
+    StatusParseError,
+    get_status,
+    parse_status,
+    status_from_result,
+)
+from tests.conftest import run_git
+
+OID = "a" * 40
+
+
+def _ordinary(xy, path, sub="N..."):
+    return f"1 {xy} {sub} 100644 100644 100644 {OID} {OID} {path}"
+
+
+def _output(*records):
+    return ("\0".join(records) + "\0").encode("utf-8", "surrogateescape")
+
+
+class TestParseStatus:
+    """Test cases for parsing porcelain v2 output."""
+
+    def test_headers(self):
+        """Test that branch and stash headers are exposed."""
+        status = parse_status(
+            _output(
+                f"# branch.oid {OID}",
+                "# branch.head feature",
+                "# branch.upstream origin/feature",
+                "# branch.ab +3 -1",
+                "# stash 2",
+            )
+        )
+
+        assert status.oid == OID
+        assert status.head == "feature"
+        assert status.upstream == "origin/feature"
+        assert (status.ahead, status.behind) == (3, 1)
+        assert status.stash_count == 2
+        assert len(status) == 0
+        assert status.is_clean is True
+
+    def test_initial_and_detached(self):
+        """Test the placeholders for unborn and detached HEADs."""
+        status = parse_status(
+            _output("# branch.oid (initial)", "# branch.head (detached)")
+        )
+
+        assert status.oid is None
+        assert status.head is None
+        assert status.upstream is None
+        assert status.ahead is None
+
+    def test_entries(self):
+        """Test ordinary, renamed, unmerged, untracked and ignored entries."""
+        status = parse_status(
+            _output(
+                "# branch.head main",
+                _ordinary(".M", "src/app.py"),
+                f"2 R. N... 100644 100644 100644 {OID} {OID} R100 new name.txt",
+                "old name.txt",
+                f"u UU N... 100644 100644 100644 100644 {OID} {OID} {OID} both.txt",
+                _ordinary("A.", "2.txt"),
+                "? notes/todo.txt",
+                "! build/",
+            )
+        )
+
+        assert len(status) == 6
+        assert list(status.types) == [
+            ENTRY_ORDINARY,
+            ENTRY_RENAMED,
+            ENTRY_UNMERGED,
+            ENTRY_ORDINARY,
+            ENTRY_UNTRACKED,
+            ord("!"),
+        ]
+        assert status.paths == [
+            "src/app.py",
+            "new name.txt",
+            "both.txt",
+            "2.txt",
+            "notes/todo.txt",
+            "build/",
+        ]
+        assert status[1].orig_path == "old name.txt"
+        assert status[0].orig_path is None
+        assert status[0].unstaged is True and status[0].staged is False
+        assert status[3].staged is True
+        assert status[4].index_status == "?"
+        assert status.count(ENTRY_UNTRACKED) == 1
+        assert status.short_format().splitlines() == [
+            " M src/app.py",
+            "R  old name.txt -> new name.txt",
+            "UU both.txt",
+            "A  2.txt",
+            "?? notes/todo.txt",
+            "!! build/",
+        ]
+
+    def test_rename_original_path_starting_with_type_byte(self):
+        """Test that original paths are never mistaken for records."""
+        status = parse_status(
+            _output(
+                f"2 R. N... 100644 100644 100644 {OID} {OID} R90 a.txt",
+                "2 b.txt",
+                f"2 C. N... 100644 100644 100644 {OID} {OID} C75 c.txt",
+                "? d.txt",
+            )
+        )
+
+        assert status.paths == ["a.txt", "c.txt"]
+        assert status.orig_paths == {0: "2 b.txt", 1: "? d.txt"}
+
+    def test_memoryview_and_text_input(self):
+        """Test that buffers and text parse the same as bytes."""
+        data = _output(_ordinary("M.", "a.txt"), "? b.txt")
+
+        assert parse_status(memoryview(data)).paths == ["a.txt", "b.txt"]
+        assert parse_status(bytearray(data)).paths == ["a.txt", "b.txt"]
+        assert parse_status(data.decode()).paths == ["a.txt", "b.txt"]
+
+    def test_paths_are_interned(self):
+        """Test that equal paths from separate parses share one object."""
+        first = parse_status(_output(_ordinary(".M", "src/interned.py")))
+        second = parse_status(_output(_ordinary("M.", "src/interned.py")))
+
+        assert first.paths[0] is second.paths[0]
+
+    def test_non_utf8_path(self):
+        """Test that undecodable paths round-trip through surrogateescape."""
+        status = parse_status(_output("? caf\udce9.txt"))
+
+        assert os.fsencode(status.paths[0]) == b"caf\xe9.txt"
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"porcelain v1 output\n",
+            _output("? a.txt", _ordinary(".M", "b.txt")),
+            _output("1 .M"),
+            _output(f"2 R. N... 100644 100644 100644 {OID} {OID} R100 new.txt"),
+            _output("# branch.ab +x -y"),
+            b"\0\0",
+        ],
+    )
+    def test_malformed_output(self, data):
+        """Test that output in another format is rejected."""
+        with pytest.raises(StatusParseError):
+            parse_status(data)
+
+    def test_status_from_result(self):
+        """Test parsing results captured in text and bytes mode."""
+        data = _output("# branch.head main", "? a.txt")
+        text = GitResult(
+            stdout=data.decode(), stderr="", exit_code=0, command="", success=True
+        )
+        raw = GitResult(
+            stdout=None,
+            stderr="",
+            exit_code=0,
+            command="",
+            success=True,
+            stdout_bytes=data,
+        )
+
+        assert status_from_result(text).paths == ["a.txt"]
+        assert status_from_result(raw).head == "main"
+
+    @patch("git_sensei.status.execute_git_command")
+    def test_get_status_failure(self, mock_execute):
+        """Test that get_status returns None when git fails."""
+        mock_execute.return_value = GitResult(
+            stdout="", stderr="fatal", exit_code=128, command="", success=False
+        )
+
+        assert get_status() is None
+        mock_execute.assert_called_once_with(
+            f"{STATUS_COMMAND} --untracked-files=normal", text=False
+        )
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestStatusWithGit:  # pylint: disable=attribute-defined-outside-init
+    """Test cases comparing the parser with real Git output."""
+
+    def setup_method(self):
+        """Create a repository with a tracked upstream and a stash."""
+        self.repo = Path(tempfile.mkdtemp())
+        run_git(self.repo, "init", "-q", "-b", "main")
+        run_git(self.repo, "config", "user.name", "Test User")
+        run_git(self.repo, "config", "user.email", "test@example.com")
+        for name in ("keep.txt", "edit.txt", "move.txt", "gone.txt"):
+            (self.repo / name).write_text(f"{name}\n" * 20, encoding="utf-8")
+        run_git(self.repo, "add", ".")
+        run_git(self.repo, "commit", "-q", "-m", "Initial commit")
+        run_git(self.repo, "update-ref", "refs/remotes/origin/main", "HEAD")
+        run_git(self.repo, "config", "remote.origin.url", str(self.repo))
+        run_git(
+            self.repo,
+            "config",
+            "remote.origin.fetch",
+            "+refs/heads/*:refs/remotes/origin/*",
+        )
+        run_git(self.repo, "config", "branch.main.remote", "origin")
+        run_git(self.repo, "config", "branch.main.merge", "refs/heads/main")
+        (self.repo / "keep.txt").write_text("stashed\n", encoding="utf-8")
+        run_git(self.repo, "stash", "-q")
+
+    def teardown_method(self):
+        """Remove the repository."""
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def _status(self):
+        return parse_status(
+            run_git(
+                self.repo,
+                *STATUS_COMMAND.split()[1:],
+                "--untracked-files=all",
+                text=False,
+            )
+        )
+
+    def test_matches_git_short_format(self):
+        """Test that entries match git status --short."""
+        (self.repo / "edit.txt").write_text("changed\n", encoding="utf-8")
+        run_git(self.repo, "mv", "move.txt", "moved.txt")
+        (self.repo / "gone.txt").unlink()
+        (self.repo / "new dir").mkdir()
+        (self.repo / "new dir" / "file.txt").write_text("new\n", encoding="utf-8")
+        if os.name == "posix":
+            (self.repo / os.fsdecode(b"caf\xe9.txt")).write_text("x", encoding="utf-8")
+
+        status = self._status()
+        short = run_git(
+            self.repo,
+            "status",
+            "--short",
+            "-z",
+            "--untracked-files=all",
+            "--no-renames",
+            text=False,
+        )
+
+        assert status.head == "main"
+        assert status.upstream == "origin/main"
+        assert (status.ahead, status.behind) == (0, 0)
+        assert status.stash_count == 1
+        assert status.orig_paths == {status.paths.index("moved.txt"): "move.txt"}
+        renamed = "R  move.txt -> moved.txt"
+        lines = status.short_format().splitlines()
+        assert renamed in lines
+        expected = _short_lines(short) - {"D  move.txt", "A  moved.txt"}
+        assert set(lines) - {renamed} == expected
+
+    def test_unmerged_entry(self):
+        """Test that conflicts are reported as unmerged entries."""
+        run_git(self.repo, "checkout", "-q", "-b", "other")
+        (self.repo / "edit.txt").write_text("other\n", encoding="utf-8")
+        run_git(self.repo, "commit", "-q", "-am", "Other")
+        run_git(self.repo, "checkout", "-q", "main")
+        (self.repo / "edit.txt").write_text("main\n", encoding="utf-8")
+        run_git(self.repo, "commit", "-q", "-am", "Main")
+        subprocess.run(
+            ["git", "-C", str(self.repo), "merge", "-q", "other"],
+            check=False,
+            capture_output=True,
+        )
+
+        status = self._status()
+
+        assert status.paths == ["edit.txt"]
+        assert status[0].type == "u"
+        assert status[0].short_format() == "UU edit.txt"
+        assert (status.ahead, status.behind) == (1, 0)
+
+
+def _short_lines(output: bytes) -> set:
+    """Records of git status --short -z output, decoded like the parser does."""
+    return set(output.decode("utf-8", "surrogateescape").split("\0")) - {""}
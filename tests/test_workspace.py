@@ -0,0 +1,161 @@
+"""
+Tests for the workspace module.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from git_sensei.git_ops import GitResult
+from git_sensei.repository import clear_repository_cache
+from git_sensei.workspace import (
+    RepoResult,
+    WorkspaceError,
+    format_results_json,
+    format_results_table,
+    load_workspace_file,
+    resolve_repositories,
+    run_in_repositories,
+)
+from tests.conftest import run_git
+
+
+def _result(command, exit_code=0, stdout="", stderr=""):
+    return GitResult(
+        stdout=stdout,
+        stderr=stderr,
+        exit_code=exit_code,
+        command=command,
+        success=exit_code == 0,
+    )
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Git not available")
+class TestWorkspaceWithGit:  # pylint: disable=attribute-defined-outside-init
+    """Test cases resolving and running commands in real repositories."""
+
+    def setup_method(self):
+        """Create a workspace with three services and one plain directory."""
+        clear_repository_cache()
+        self.root = Path(tempfile.mkdtemp()).resolve()
+        self.services = []
+        for name in ("billing", "orders", "users"):
+            repo = self.root / "services" / name
+            repo.mkdir(parents=True)
+            run_git(repo, "init", "-q", "-b", name)
+            (repo / "nested").mkdir()
+            self.services.append(repo)
+        (self.root / "services" / "docs").mkdir()
+
+    def teardown_method(self):
+        """Remove the workspace."""
+        clear_repository_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_resolve_glob(self):
+        """Test that patterns match repository tops and skip other directories."""
+        repositories = resolve_repositories(
+            [str(self.root / "services" / "*"), str(self.root / "services/**/")]
+        )
+
+        assert [repo.work_tree for repo in repositories] == [
+            str(path) for path in self.services
+        ]
+
+    def test_resolve_literal_path_must_be_repository(self):
+        """Test that a listed directory that is not a repository is an error."""
+        with pytest.raises(WorkspaceError):
+            resolve_repositories([str(self.root / "services" / "docs")])
+        with pytest.raises(WorkspaceError):
+            resolve_repositories([str(self.services[0] / "nested")])
+
+    @pytest.mark.skipif(not hasattr(os, "geteuid"), reason="POSIX ownership")
+    def test_resolve_foreign_repository(self):
+        """Test that a repository owned by another user is reported as such."""
+        with patch("os.geteuid", return_value=os.geteuid() + 1):
+            with pytest.raises(WorkspaceError, match="Unsafe repository ownership"):
+                resolve_repositories([str(self.services[0])])
+
+    def test_workspace_file(self):
+        """Test that workspace entries are relative to the file."""
+        workspace = self.root / "workspace.txt"
+        workspace.write_text(
+            "# services\n\nservices/orders\nservices/u*\n", encoding="utf-8"
+        )
+
+        entries = load_workspace_file(str(workspace))
+
+        assert entries[0] == os.path.join(str(self.root), "services/orders")
+        assert [repo.work_tree for repo in resolve_repositories(entries)] == [
+            str(self.services[1]),
+            str(self.services[2]),
+        ]
+
+    def test_missing_workspace_file(self):
+        """Test that an unreadable workspace file raises WorkspaceError."""
+        with pytest.raises(WorkspaceError):
+            load_workspace_file(str(self.root / "missing.txt"))
+
+    def test_run_in_repositories(self):
+        """Test that each repository runs the command with its own state."""
+        repositories = resolve_repositories([str(self.root / "services" / "*")])
+
+        results = run_in_repositories(
+            "git symbolic-ref --short HEAD", repositories, max_workers=2
+        )
+
+        assert [r.path for r in results] == [str(path) for path in self.services]
+        assert [r.result.stdout.strip() for r in results] == [
+            "billing",
+            "orders",
+            "users",
+        ]
+
+    def test_dangerous_command_refused(self):
+        """Test that dangerous commands need allow_dangerous."""
+        repositories = resolve_repositories([str(self.services[0])])
+
+        with patch("git_sensei.workspace.execute_git_command") as mock_execute:
+            with pytest.raises(WorkspaceError):
+                run_in_repositories("git reset --hard HEAD~1", repositories)
+
+        mock_execute.assert_not_called()
+
+
+class TestFormatting:
+    """Test cases for rendering workspace results."""
+
+    results = [
+        RepoResult("/ws/api", _result("git fetch", stdout="Fetched\nmore\n")),
+        RepoResult("/ws/web", _result("git fetch", 128, stderr="fatal: no remote\n")),
+    ]
+
+    def test_table(self):
+        """Test one row per repository plus a count line."""
+        with patch("os.getcwd", return_value="/ws"):
+            lines = format_results_table(self.results).splitlines()
+
+        assert lines == [
+            "repository  exit  output",
+            "api            0  Fetched",
+            "web          128  fatal: no remote",
+            "2 repositories: 1 succeeded, 1 failed",
+        ]
+
+    def test_json(self):
+        """Test that JSON output carries the full result of each repository."""
+        data = json.loads(format_results_json(self.results))
+
+        assert data[1] == {
+            "repository": "/ws/web",
+            "command": "git fetch",
+            "exit_code": 128,
+            "success": False,
+            "stdout": "",
+            "stderr": "fatal: no remote\n",
+        }